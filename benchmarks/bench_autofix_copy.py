@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark AutoFixEngine copy-on-write fixes against a full deepcopy
+
+Builds synthetic classifications (five composition entries per segment,
+each with evidence snippets) and times two ways of fixing one segment's
+shares plus the document mixture:
+
+    deepcopy   - deepcopy the whole classification, then fix in place
+                 (what apply_fixes did before copy-on-write)
+    apply      - AutoFixEngine.apply_fixes, which copies only the fixed
+                 segment and mixture entries
+
+Usage:
+    python benchmarks/bench_autofix_copy.py
+    python benchmarks/bench_autofix_copy.py --segments 10 100 1000 --evidence 3 --repeat 5
+"""
+
+import argparse
+import sys
+import time
+from copy import deepcopy
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.agents.auto_fix_engine import AutoFixEngine  # noqa: E402
+from src.schemas import (  # noqa: E402
+    CheckCode,
+    ClassificationOutput,
+    DocumentMixture,
+    DocumentType,
+    Evidence,
+    Issue,
+    IssueSeverity,
+    PresenceLevel,
+    Segment,
+    SegmentComposition,
+    SelfEvaluation,
+)
+
+SNIPPET = "FINAL DIAGNOSIS: Invasive ductal carcinoma, grade 2, margins negative. " * 3
+
+
+def build_classification(segments, evidence):
+    """Classification with `segments` single-page segments and `evidence` snippets per composition entry"""
+    types = list(DocumentType)
+
+    def composition(page):
+        return [
+            SegmentComposition(
+                document_type=doc_type,
+                presence_level=PresenceLevel.PRIMARY if i == 0 else PresenceLevel.NO_EVIDENCE,
+                confidence=0.9,
+                segment_share=1.0 if i == 0 else 0.0,
+                top_evidence=[Evidence(page=page, snippet=SNIPPET, anchors_found=["FINAL DIAGNOSIS"])
+                              for _ in range(evidence if i == 0 else 0)],
+                reasoning="Synthetic reasoning for benchmarking",
+            )
+            for i, doc_type in enumerate(types)
+        ]
+
+    classification = ClassificationOutput(
+        dominant_type_overall=types[0],
+        segments=[
+            Segment(
+                segment_index=n,
+                start_page=n,
+                end_page=n,
+                segment_page_count=1,
+                dominant_type=types[0],
+                segment_composition=composition(n),
+            )
+            for n in range(1, segments + 1)
+        ],
+        document_mixture=[
+            DocumentMixture(
+                document_type=doc_type,
+                presence_level=PresenceLevel.PRIMARY if i == 0 else PresenceLevel.NO_EVIDENCE,
+                confidence=0.9,
+                overall_share=1.0 if i == 0 else 0.0,
+                overall_share_explanation="All pages",
+                reasoning="Synthetic reasoning for benchmarking",
+            )
+            for i, doc_type in enumerate(types)
+        ],
+        number_of_segments=segments,
+        self_evaluation=SelfEvaluation(evaluation_summary="", changes_made=""),
+    )
+
+    # Break the shares the fixes will normalize (unvalidated, as a bad LLM response would be after repair)
+    middle = classification.segments[segments // 2]
+    middle.segment_composition[0].segment_share = 0.8
+    classification.document_mixture[0].overall_share = 0.9
+    return classification, middle.segment_index
+
+
+def build_issues(segment_index):
+    return [
+        Issue(ig_id="IG-8", issue_id="V2-0000", agent="V2", severity=IssueSeverity.MAJOR,
+              check_code=CheckCode.SEGMENT_SHARE_SUM,
+              message=f"Segment {segment_index} shares sum to 0.800 instead of 1.0",
+              location={"segment_index": segment_index, "field": "segment_share"}, auto_fixable=True),
+        Issue(ig_id="IG-8", issue_id="V2-0001", agent="V2", severity=IssueSeverity.MAJOR,
+              check_code=CheckCode.MIXTURE_SHARE_SUM,
+              message="Document mixture overall_share sums to 0.900 instead of 1.0",
+              location={"field": "document_mixture"}, auto_fixable=True),
+    ]
+
+
+def deepcopy_then_fix(engine, classification, issues):
+    """The previous apply_fixes: copy everything, then fix the copy"""
+    modified = deepcopy(classification)
+    for issue in issues:
+        modified = engine.fix_registry[issue.check_code](modified, issue)
+    return modified
+
+
+def best_of(repeat, fn, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark copy-on-write auto-fix against deepcopy")
+    parser.add_argument("--segments", type=int, nargs="+", default=[10, 100, 1000], help="Segment counts to test")
+    parser.add_argument("--evidence", type=int, default=3, help="Evidence snippets per PRIMARY composition entry")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    engine = AutoFixEngine()
+
+    print(f"{'segments':>8} {'deepcopy ms':>12} {'apply ms':>10} {'speedup':>8}")
+    print("-" * 41)
+    for segments in args.segments:
+        classification, segment_index = build_classification(segments, args.evidence)
+        issues = build_issues(segment_index)
+
+        fixed, _ = engine.apply_fixes(classification, issues)
+        assert fixed.model_dump() == deepcopy_then_fix(engine, classification, issues).model_dump()
+
+        copy_seconds = best_of(args.repeat, deepcopy_then_fix, engine, classification, issues)
+        apply_seconds = best_of(args.repeat, engine.apply_fixes, classification, issues)
+        print(f"{segments:>8} {copy_seconds * 1e3:>12.2f} {apply_seconds * 1e3:>10.2f} {copy_seconds / apply_seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark local evidence screening and the V4 prompt size it saves
+
+Builds synthetic documents (pages of varied clinical text) with one
+single-page segment per page, each citing one evidence snippet quoted from
+its page, and reports:
+
+    index ms     - EvidenceIndex build time over all segment pages
+    us/snippet   - mean time to locate one snippet and its anchors
+    prompt chars - V4 prompt length with page text for every segment page
+                   (no local screening) vs after screening
+
+Usage:
+    python benchmarks/bench_evidence_matcher.py
+    python benchmarks/bench_evidence_matcher.py --pages 10 100 500 --repeat 3
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.agents.v4_evidence_quality import V4EvidenceQualityAssessor  # noqa: E402
+from src.evidence_matcher import EvidenceIndex  # noqa: E402
+from src.payload_planner import PayloadPlanner  # noqa: E402
+from src.schemas import (  # noqa: E402
+    ClassificationOutput,
+    DocumentBundle,
+    DocumentMixture,
+    DocumentType,
+    Evidence,
+    PresenceLevel,
+    Segment,
+    SegmentComposition,
+    SelfEvaluation,
+)
+
+WORDS = (
+    "patient biopsy carcinoma margin grade tumor specimen lymph node invasive ductal nottingham score "
+    "receptor estrogen progesterone her2 negative positive gross description microscopic final diagnosis "
+    "left right breast core needle follow up clinic plan history medication imaging mass lesion"
+).split()
+
+
+def build_document(pages, words_per_page=350, seed=7):
+    """Bundle of pages of random clinical words, and one classification citing a snippet per page"""
+    rng = random.Random(seed)
+    texts = [" ".join(rng.choice(WORDS) for _ in range(words_per_page)) for _ in range(pages)]
+    bundle = DocumentBundle(
+        doc_id="bench", pdf_filename="bench.pdf", file_path="/tmp/bench.pdf", total_pages=pages,
+        processing_timestamp=datetime.now().isoformat(),
+        pages=[{"page_number": n + 1, "text": text} for n, text in enumerate(texts)],
+    )
+
+    def composition(page):
+        words = texts[page - 1].split()
+        start = rng.randrange(0, words_per_page - 25)
+        return [
+            SegmentComposition(
+                document_type=doc_type,
+                presence_level=PresenceLevel.PRIMARY if i == 0 else PresenceLevel.NO_EVIDENCE,
+                confidence=0.9 if i == 0 else 0.0,
+                segment_share=1.0 if i == 0 else 0.0,
+                top_evidence=[Evidence(page=page, snippet=" ".join(words[start:start + 25]),
+                                       anchors_found=words[start:start + 2])] if i == 0 else [],
+                reasoning="Synthetic",
+            )
+            for i, doc_type in enumerate(DocumentType)
+        ]
+
+    classification = ClassificationOutput(
+        dominant_type_overall=DocumentType.PATHOLOGY_REPORT,
+        segments=[
+            Segment(segment_index=n, start_page=n, end_page=n, segment_page_count=1,
+                    dominant_type=DocumentType.CLINICAL_NOTE, segment_composition=composition(n))
+            for n in range(1, pages + 1)
+        ],
+        document_mixture=[
+            DocumentMixture(document_type=doc_type, presence_level=PresenceLevel.PRIMARY if i == 0 else PresenceLevel.NO_EVIDENCE,
+                            confidence=0.9 if i == 0 else 0.0, overall_share=1.0 if i == 0 else 0.0,
+                            overall_share_explanation="All pages", reasoning="Synthetic")
+            for i, doc_type in enumerate(DocumentType)
+        ],
+        number_of_segments=pages,
+        self_evaluation=SelfEvaluation(evaluation_summary="", changes_made=""),
+    )
+    return bundle, classification
+
+
+def best_of(repeat, fn, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local evidence screening")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 500], help="Page counts to test")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    v4 = V4EvidenceQualityAssessor.__new__(V4EvidenceQualityAssessor)  # screening and prompts need no client
+    v4.prompt_base = ""
+    v4.planner = PayloadPlanner(mode="full")  # page selection is measured by bench_payload_planner.py
+
+    print(f"{'pages':>6} {'index ms':>9} {'us/snippet':>11} {'full prompt':>12} {'screened':>10}")
+    print("-" * 52)
+    for pages in args.pages:
+        bundle, classification = build_document(pages)
+        evidence = [(ev, seg.start_page) for seg in classification.segments
+                    for comp in seg.segment_composition for ev in comp.top_evidence]
+
+        index_seconds = best_of(args.repeat, EvidenceIndex.from_bundle, bundle, range(1, pages + 1))
+        index = EvidenceIndex.from_bundle(bundle, range(1, pages + 1))
+
+        def match_all():
+            for ev, page in evidence:
+                index.match_snippet(ev.snippet, page)
+                for anchor in ev.anchors_found:
+                    index.find_anchor(anchor, page)
+        match_seconds = best_of(args.repeat, match_all)
+
+        screening = v4._screen_evidence(classification, bundle)
+        full = len(v4._llm_request(classification, bundle, None)["contents"])
+        screened = len(v4._llm_request(classification, bundle, screening)["contents"])
+        print(f"{pages:>6} {index_seconds * 1e3:>9.2f} {match_seconds / len(evidence) * 1e6:>11.1f} {full:>12,} {screened:>10,}")
+
+
+if __name__ == "__main__":
+    main()
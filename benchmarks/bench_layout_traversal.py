@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark DocumentProcessor layout block traversal on synthetic layouts
+
+Builds Layout Parser shaped block trees (plain objects, no GCP calls) and
+times DocumentProcessor._extract_pages at increasing page counts. Time per
+block should stay flat as documents grow if traversal is linear.
+
+Usage:
+    python benchmarks/bench_layout_traversal.py
+    python benchmarks/bench_layout_traversal.py --pages 10 100 1000 --repeat 5
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.document_processor import DocumentProcessor  # noqa: E402
+
+LINE = "Patient seen in clinic today for follow-up of hypertension and diabetes."
+
+
+def _text_block(text, page, children=()):
+    return SimpleNamespace(
+        text_block=SimpleNamespace(text=text, type="paragraph", blocks=list(children)),
+        table_block=None,
+        page_span=SimpleNamespace(page_start=page)
+    )
+
+
+def _table_block(page, rows, cols):
+    body_rows = [
+        SimpleNamespace(cells=[
+            SimpleNamespace(blocks=[_text_block(f"r{r}c{c} {LINE[:20]}", page)])
+            for c in range(cols)
+        ])
+        for r in range(rows)
+    ]
+    return SimpleNamespace(
+        text_block=None,
+        table_block=SimpleNamespace(body_rows=body_rows),
+        page_span=SimpleNamespace(page_start=page)
+    )
+
+
+def nested_layout(pages, depth=40, width=3):
+    """Each page is a heading chain `depth` levels deep with `width` paragraphs per level"""
+    blocks = []
+    for page in range(1, pages + 1):
+        node = _text_block(LINE, page)
+        for level in range(depth):
+            siblings = [_text_block(LINE, page) for _ in range(width)]
+            node = _text_block(f"Heading {level}", page, [node] + siblings)
+        blocks.append(node)
+    return blocks, pages * (depth * (width + 1) + 1)
+
+
+def table_layout(pages, tables=4, rows=20, cols=6):
+    """Each page holds several tables of single-paragraph cells"""
+    blocks = []
+    for page in range(1, pages + 1):
+        blocks.append(_text_block(f"Lab results page {page}", page))
+        blocks.extend(_table_block(page, rows, cols) for _ in range(tables))
+    return blocks, pages * (1 + tables * (1 + rows * cols))
+
+
+def single_page_layout(pages, blocks_per_page=100):
+    """All blocks on one page - the worst case for per-page string concatenation"""
+    total = pages * blocks_per_page
+    return [_text_block(LINE, 1) for _ in range(total)], total
+
+
+LAYOUTS = {
+    "nested": nested_layout,
+    "tables": table_layout,
+    "single_page": single_page_layout,
+}
+
+
+def time_extraction(processor, blocks, repeat):
+    """Best-of-N wall time for _extract_pages on the given blocks"""
+    document = SimpleNamespace(document_layout=SimpleNamespace(blocks=blocks), pages=[])
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        processor._extract_pages(document)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark layout block traversal")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000], help="Page counts to test")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    # No client or cache is needed: _extract_pages works on an in-memory document
+    processor = DocumentProcessor.__new__(DocumentProcessor)
+
+    print(f"{'layout':<12} {'pages':>6} {'blocks':>9} {'seconds':>9} {'us/block':>9}")
+    print("-" * 49)
+    for name, build in LAYOUTS.items():
+        for pages in args.pages:
+            blocks, block_count = build(pages)
+            seconds = time_extraction(processor, blocks, args.repeat)
+            print(f"{name:<12} {pages:>6} {block_count:>9} {seconds:>9.3f} {seconds / block_count * 1e6:>9.2f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark evidence-scoped V2/V4 payloads against the full-context prompts
+
+Builds synthetic documents (pages of varied clinical text) split into
+20-page segments, each citing two evidence snippets with anchors, and
+reports per page count:
+
+    plan ms      - time to select and serialize the V2 page set
+    V2 full/plan - estimated prompt tokens with every segment page vs planned
+    V4 full/plan - the same for V4 without local screening
+
+Usage:
+    python benchmarks/bench_payload_planner.py
+    python benchmarks/bench_payload_planner.py --pages 20 200 1000 --repeat 3
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.agents.v2_consistency_checker import V2ConsistencyChecker  # noqa: E402
+from src.agents.v4_evidence_quality import V4EvidenceQualityAssessor  # noqa: E402
+from src.payload_planner import PayloadPlanner  # noqa: E402
+from src.prompt_budget import get_default_estimator  # noqa: E402
+from src.schemas import (  # noqa: E402
+    ClassificationOutput,
+    DocumentBundle,
+    DocumentMixture,
+    DocumentType,
+    Evidence,
+    PresenceLevel,
+    Segment,
+    SegmentComposition,
+    SelfEvaluation,
+)
+
+WORDS = (
+    "patient biopsy carcinoma margin grade tumor specimen lymph node invasive ductal nottingham score "
+    "receptor estrogen progesterone her2 negative positive gross description microscopic final diagnosis "
+    "left right breast core needle follow up clinic plan history medication imaging mass lesion"
+).split()
+SEGMENT_PAGES = 20
+
+
+def build_document(pages, words_per_page=350, seed=7):
+    """Bundle of random clinical pages and a classification of 20-page segments with two cited snippets each"""
+    rng = random.Random(seed)
+    texts = [" ".join(rng.choice(WORDS) for _ in range(words_per_page)) for _ in range(pages)]
+    bundle = DocumentBundle(
+        doc_id="bench", pdf_filename="bench.pdf", file_path="/tmp/bench.pdf", total_pages=pages,
+        processing_timestamp=datetime.now().isoformat(),
+        pages=[{"page_number": n + 1, "text": text} for n, text in enumerate(texts)],
+    )
+
+    def evidence(page):
+        words = texts[page - 1].split()
+        start = rng.randrange(0, words_per_page - 25)
+        # Random anchors would hit every page of this vocabulary; use a rarer three-word phrase
+        return Evidence(page=page, snippet=" ".join(words[start:start + 25]), anchors_found=[" ".join(words[start:start + 3])])
+
+    def composition(first, last):
+        return [
+            SegmentComposition(
+                document_type=doc_type,
+                presence_level=PresenceLevel.PRIMARY if i == 0 else PresenceLevel.NO_EVIDENCE,
+                confidence=0.9 if i == 0 else 0.0,
+                segment_share=1.0 if i == 0 else 0.0,
+                top_evidence=[evidence(rng.randint(first, last)) for _ in range(2)] if i == 0 else [],
+                reasoning="Synthetic",
+            )
+            for i, doc_type in enumerate(DocumentType)
+        ]
+
+    ranges = [(first, min(first + SEGMENT_PAGES - 1, pages)) for first in range(1, pages + 1, SEGMENT_PAGES)]
+    classification = ClassificationOutput(
+        dominant_type_overall=DocumentType.PATHOLOGY_REPORT,
+        segments=[
+            Segment(segment_index=n, start_page=first, end_page=last, segment_page_count=last - first + 1,
+                    dominant_type=DocumentType.CLINICAL_NOTE, segment_composition=composition(first, last))
+            for n, (first, last) in enumerate(ranges, start=1)
+        ],
+        document_mixture=[
+            DocumentMixture(document_type=doc_type, presence_level=PresenceLevel.PRIMARY if i == 0 else PresenceLevel.NO_EVIDENCE,
+                            confidence=0.9 if i == 0 else 0.0, overall_share=1.0 if i == 0 else 0.0,
+                            overall_share_explanation="All pages", reasoning="Synthetic")
+            for i, doc_type in enumerate(DocumentType)
+        ],
+        number_of_segments=len(ranges),
+        self_evaluation=SelfEvaluation(evaluation_summary="", changes_made=""),
+    )
+    return bundle, classification
+
+
+def best_of(repeat, fn, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark evidence-scoped V2/V4 payloads")
+    parser.add_argument("--pages", type=int, nargs="+", default=[20, 200, 1000], help="Page counts to test")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    # Request building needs no client
+    v2 = V2ConsistencyChecker.__new__(V2ConsistencyChecker)
+    v4 = V4EvidenceQualityAssessor.__new__(V4EvidenceQualityAssessor)
+    v2.prompt_base = v4.prompt_base = ""
+    full, planned = PayloadPlanner(mode="full"), PayloadPlanner(mode="planned")
+    estimator = get_default_estimator()
+
+    def tokens(agent, planner, classification, bundle):
+        agent.planner = planner
+        return estimator.estimate(agent._llm_request(classification, bundle)["contents"])
+
+    print(f"{'pages':>6} {'plan ms':>8} {'V2 full':>9} {'V2 plan':>9} {'V4 full':>9} {'V4 plan':>9}")
+    print("-" * 55)
+    for pages in args.pages:
+        bundle, classification = build_document(pages)
+        plan_seconds = best_of(args.repeat, planned.plan, classification, bundle)
+        print(f"{pages:>6} {plan_seconds * 1e3:>8.2f} "
+              f"{tokens(v2, full, classification, bundle):>9,} {tokens(v2, planned, classification, bundle):>9,} "
+              f"{tokens(v4, full, classification, bundle):>9,} {tokens(v4, planned, classification, bundle):>9,}")
+
+
+if __name__ == "__main__":
+    main()
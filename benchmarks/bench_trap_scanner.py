@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark the trap-dictionary automaton against per-term substring scans
+
+Scans synthetic pages (varied clinical words) with the bundled trap
+dictionary padded with random made-up terms, and reports per dictionary size:
+
+    automaton ms - one TrapDictionary.scan pass over every page
+    per-term ms  - lower-casing each page and testing every term with `in`
+                   (how V3 looked for its keyword lists before)
+
+Usage:
+    python benchmarks/bench_trap_scanner.py
+    python benchmarks/bench_trap_scanner.py --pages 500 --terms 0 1000 10000 --repeat 3
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.trap_dictionary import TrapDictionary, TrapTerm  # noqa: E402
+
+WORDS = (
+    "patient biopsy carcinoma margin grade tumor specimen lymph node invasive ductal nottingham score "
+    "receptor estrogen progesterone HER2 negative positive gross description microscopic final diagnosis "
+    "left right breast core needle follow up clinic plan history medication imaging mass lesion BRCA1 "
+    "requisition insurance quest"
+).split()
+
+
+def best_of(repeat, fn, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the trap-dictionary automaton")
+    parser.add_argument("--pages", type=int, default=200, help="Pages scanned")
+    parser.add_argument("--terms", type=int, nargs="+", default=[0, 1000, 5000], help="Extra random terms added to the dictionary")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    pages = [" ".join(rng.choice(WORDS) for _ in range(350)) for _ in range(args.pages)]
+    base = TrapDictionary.load().terms
+
+    print(f"{'terms':>7} {'automaton ms':>13} {'per-term ms':>12} {'hits':>7}")
+    print("-" * 43)
+    for extra in args.terms:
+        made_up = [
+            TrapTerm("gene", " ".join("".join(rng.choices(string.ascii_lowercase, k=6)) for _ in range(rng.randint(1, 3))), False)
+            for _ in range(extra)
+        ]
+        dictionary = TrapDictionary(base + made_up)
+        needles = [term.term.lower() for term in dictionary.terms]
+
+        def automaton():
+            return sum(len(dictionary.scan(page)) for page in pages)
+
+        def per_term():
+            return sum(needle in page.lower() for page in pages for needle in needles)
+
+        print(f"{len(dictionary):>7} {best_of(args.repeat, automaton) * 1e3:>13.1f} "
+              f"{best_of(args.repeat, per_term) * 1e3:>12.1f} {automaton():>7,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Run the full classification pipeline over a corpus of PDFs"""
+
+import argparse
+from pathlib import Path
+from src.batch_runner import BatchRunner, collect_inputs
+from src.config import settings
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Batch-classify clinical PDF documents",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Every PDF in a directory, 4 worker processes
+  python run_batch.py data/input/raw_documents
+
+  # Glob pattern with 8 workers
+  python run_batch.py "data/input/**/*.pdf" --workers 8
+
+  # Restart after a crash: completed stages are skipped automatically
+  python run_batch.py data/input/raw_documents
+
+  # Force a full rerun
+  python run_batch.py data/input/raw_documents --no-resume
+
+  # One process, one event loop, up to 200 documents in flight
+  python run_batch.py data/input/raw_documents --executor async --workers 200
+
+  # Manifest file (one PDF path per line)
+  python run_batch.py backfill_manifest.txt --summary output/batch_summary.json
+        """
+    )
+    parser.add_argument("source", help="Directory, glob pattern, or manifest file of PDF paths")
+    parser.add_argument("--workers", "-w", type=int, default=4, help="Documents processed concurrently (default: 4)")
+    parser.add_argument(
+        "--executor",
+        choices=["process", "thread", "async"],
+        default="process",
+        help="Worker pool type (default: process); async runs all documents on one event loop "
+             "with --workers as the global limit on documents in flight"
+    )
+    parser.add_argument(
+        "--output-dir", "-o",
+        default=str(Path(settings.default_output_dir) / "batch"),
+        help="Directory for per-document classification/verification JSON (default: output/batch)"
+    )
+    parser.add_argument("--summary", help="Optional path to save batch summary JSON")
+    parser.add_argument(
+        "--journal-dir",
+        default=str(Path(settings.default_output_dir) / "checkpoints"),
+        help="Checkpoint journal directory for resumable runs (default: output/checkpoints)"
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Ignore completed stages in the journal and reprocess every document"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        pdf_paths = collect_inputs(args.source)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    missing = [p for p in pdf_paths if not p.exists()]
+    if missing:
+        print(f"Error: {len(missing)} input file(s) not found, e.g. {missing[0]}")
+        return 1
+    if not pdf_paths:
+        print(f"Error: no PDFs found for: {args.source}")
+        return 1
+
+    runner = BatchRunner(
+        workers=args.workers,
+        executor=args.executor,
+        pipeline_kwargs={
+            "output_dir": args.output_dir,
+            "journal_dir": args.journal_dir,
+            "resume": not args.no_resume,
+        }
+    )
+    results, summary = runner.run(pdf_paths)
+    runner.print_summary(summary)
+
+    if args.summary:
+        runner.save_summary(summary, results, Path(args.summary))
+        print(f"\n✓ Batch summary saved to: {args.summary}")
+
+    return 0 if summary.failed == 0 else 2
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -2,12 +2,13 @@
 """Main script to test end-to-end classification"""
 
 import argparse
-import json
 import os
 from pathlib import Path
 from src.document_processor import DocumentProcessor
 from src.primary_classifier_agent import PrimaryClassifierAgent
 from src.config import settings
+from src.atomic_io import atomic_write_json
+from src.bundle_store import BUNDLE_SUFFIX, write_bundle
 
 
 def main():
@@ -78,28 +79,16 @@ Examples:
     print("Initializing Primary Classifier...")
     classifier = PrimaryClassifierAgent()
     
-    # Process document or load existing bundle
+    # Process document (served from the content-hash bundle cache when the same bytes were seen before)
     print(f"\nProcessing PDF: {pdf_path}")
-    bundle_dir = Path("output/document_bundles")
-    bundle_path = bundle_dir / f"bundle_{pdf_path.stem}.json"
-    
-    if bundle_path.exists():
-        print(f"Loading existing bundle: {bundle_path}")
-        from src.schemas import DocumentBundle
-        with open(bundle_path, 'r', encoding='utf-8') as f:
-            bundle_data = json.load(f)
-        doc_bundle = DocumentBundle.model_validate(bundle_data)
-        print(f"Loaded bundle with {doc_bundle.total_pages} pages")
-    else:
-        doc_bundle = doc_processor.process_pdf(str(pdf_path))
-        print(f"Extracted {doc_bundle.total_pages} pages")
+    doc_bundle = doc_processor.process_pdf(str(pdf_path))
+    print(f"Extracted {doc_bundle.total_pages} pages")
     
-    # Format for LLM
-    document_text = doc_processor.format_for_llm(doc_bundle)
-    
-    # Classify
+    # Classify (prompt fitted to the token budget before the API call)
     print("\nClassifying document...")
-    classification = classifier.classify(document_text)
+    classification = classifier.classify_bundle(doc_bundle)
+    prompt_metadata = classifier.last_prompt_metadata
+    print(f"Prompt: ~{prompt_metadata.estimated_tokens} tokens (estimated), strategy: {prompt_metadata.strategy}")
     
     # Assign document type to bundle from classification result
     doc_bundle.document_type = classification.dominant_type_overall.value
@@ -168,16 +157,14 @@ Examples:
     print(f"  Fixable: {arbiter_decision.fixable_count}")
     
     # Save final classification to file
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(final_classification.model_dump(), f, indent=2)
+    atomic_write_json(output_path, final_classification.model_dump(mode='json'))
     print(f"\n✓ Final classification output saved to: {output_path}")
     
     # Save DocumentBundle for future use (SME review, evidence verification, etc.)
     bundle_dir = Path("output/document_bundles")
     bundle_dir.mkdir(parents=True, exist_ok=True)
-    bundle_path = bundle_dir / f"bundle_{pdf_path.stem}.json"
-    with open(bundle_path, 'w', encoding='utf-8') as f:
-        json.dump(doc_bundle.model_dump(mode='json'), f, indent=2, default=str)
+    bundle_path = bundle_dir / f"bundle_{pdf_path.stem}{BUNDLE_SUFFIX}"
+    write_bundle(bundle_path, doc_bundle)
     print(f"✓ DocumentBundle saved to: {bundle_path}")
     
     # Save verification report with arbiter decision and retry log
@@ -185,10 +172,17 @@ Examples:
     verification_data = verification_report.model_dump()
     verification_data['arbiter_decision'] = arbiter_decision.model_dump()
     verification_data['retry_log'] = retry_log
-    with open(verification_output_path, 'w', encoding='utf-8') as f:
-        json.dump(verification_data, f, indent=2)
+    verification_data['prompt_metadata'] = prompt_metadata.model_dump()
+    atomic_write_json(verification_output_path, verification_data, default=str)
     print(f"✓ Verification report saved to: {verification_output_path}")
     
+    # LLM response cache statistics (shared by classifier and V2-V4)
+    if settings.llm_cache_enabled:
+        from src.llm_cache import get_default_cache
+        cache_stats = get_default_cache().stats()
+        print(f"✓ LLM cache: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es), "
+              f"{cache_stats['entries']} entries ({cache_stats['size_bytes'] / 1024:.0f} KB)")
+    
     # Auto-generate SME packet if escalated
     if arbiter_decision.decision == "ESCALATE_TO_SME":
         print(f"\n{'='*60}")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Rebuild DocumentBundles from archived Document AI responses (no Document AI calls)"""
+
+import argparse
+import time
+from collections import Counter
+from src.batch_runner import collect_inputs
+from src.config import settings
+from src.reextract import reextract
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-run page extraction over stored Document AI responses",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Responses are archived when DOCUMENTAI_STORE_RESPONSES=true.
+
+Examples:
+  # Refresh the bundle cache for every stored response, one worker per CPU
+  python run_reextract.py
+
+  # Rebuild named bundles for a corpus (matched by PDF content hash)
+  python run_reextract.py data/input/raw_documents --bundle-dir output/document_bundles
+        """
+    )
+    parser.add_argument("source", nargs="?", help="Optional directory, glob pattern, or manifest file of PDF paths")
+    parser.add_argument("--workers", "-w", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument(
+        "--store-dir",
+        default=settings.documentai_response_dir,
+        help=f"Response store directory (default: {settings.documentai_response_dir})"
+    )
+    parser.add_argument("--bundle-dir", help="Also write bundle_<doc_id>.bundle files here (requires source)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not update the bundle cache")
+
+    args = parser.parse_args()
+
+    try:
+        pdf_paths = collect_inputs(args.source) if args.source else None
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    if pdf_paths is not None and not pdf_paths:
+        print(f"Error: no PDFs found for: {args.source}")
+        return 1
+
+    start = time.perf_counter()
+    results = reextract(
+        pdf_paths=pdf_paths,
+        store_dir=args.store_dir,
+        bundle_dir=args.bundle_dir,
+        update_cache=not args.no_cache,
+        workers=args.workers
+    )
+    elapsed = time.perf_counter() - start
+
+    counts = Counter(r.status for r in results)
+    pages = sum(r.total_pages for r in results)
+    print(f"\n{'='*60}")
+    print("RE-EXTRACTION SUMMARY")
+    print(f"{'='*60}")
+    print(f"Rebuilt: {counts['rebuilt']}  Missing response: {counts['missing']}  Failed: {counts['failed']}")
+    print(f"Pages:   {pages} in {elapsed:.1f}s")
+    for result in results:
+        if result.status != "rebuilt":
+            label = result.doc_id or (result.pdf_sha256[:12] if result.pdf_sha256 else result.archive_path)
+            print(f"  ✗ {label}: {result.status} {result.error or ''}")
+
+    return 0 if counts['failed'] == 0 else 2
+
+
+if __name__ == "__main__":
+    exit(main())
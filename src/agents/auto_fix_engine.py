@@ -1,185 +1,262 @@
 """
 Auto-Fix Engine - Applies automated fixes to classification issues
 
-Supports fix types:
-- Share normalization (segment-level)
-- Share normalization (document-level)
+Fixes are dispatched on Issue.check_code, the machine-readable code of the
+rule that raised the issue. Each fixer is registered for its codes with
+the @fixes decorator:
+
+- Share normalization (segment-level)      SEGMENT_SHARE_SUM
+- Share normalization (document-level)     MIXTURE_SHARE_SUM
+- segment_page_count recomputation         SEGMENT_PAGE_COUNT
+- number_of_segments recomputation         SEGMENT_COUNT
 - Page boundary adjustments (future)
+
+Fixes are copy-on-write: each fix returns a new ClassificationOutput in
+which only the objects it changed (a segment, its composition entries, the
+mixture entries) are copies, and every other segment, composition and
+evidence list is shared with the input. Neither side is modified in place,
+so callers must treat classifications as immutable.
 """
 
-from typing import List, Tuple, Callable, Dict
-from copy import deepcopy
+from typing import List, Optional, Tuple, Callable, Dict
 import logging
 
-from ..schemas import ClassificationOutput, Issue, IssueSeverity
+from ..schemas import CheckCode, ClassificationOutput, Issue, IssueSeverity
 
 logger = logging.getLogger(__name__)
 
+# Check code -> name of the AutoFixEngine method that fixes it (filled by @fixes)
+_FIXERS: Dict[CheckCode, str] = {}
+
+# Issues without a check code (LLM-reported, or recorded before codes existed)
+# are matched to a fixer by the field they point at
+_FIELD_CODES: Dict[str, CheckCode] = {
+    "segment_share": CheckCode.SEGMENT_SHARE_SUM,
+    "overall_share": CheckCode.MIXTURE_SHARE_SUM,
+    "segment_page_count": CheckCode.SEGMENT_PAGE_COUNT,
+    "number_of_segments": CheckCode.SEGMENT_COUNT,
+}
+
+
+def fixes(*codes: CheckCode) -> Callable:
+    """Register an AutoFixEngine method as the fixer for the given check codes"""
+    def register(method: Callable) -> Callable:
+        for code in codes:
+            _FIXERS[code] = method.__name__
+        return method
+    return register
+
 
 class AutoFixEngine:
     """
     Engine for applying automatic fixes to classification output
     based on identified issues.
     """
-    
+
     def __init__(self):
         """Initialize the fix engine with registry"""
-        self.fix_registry: Dict[str, Callable] = {
-            'share_normalization_segment': self._fix_segment_share_normalization,
-            'share_normalization_document': self._fix_document_share_normalization,
+        self.fix_registry: Dict[CheckCode, Callable] = {
+            code: getattr(self, name) for code, name in _FIXERS.items()
         }
-    
+
     def apply_fixes(
-        self, 
-        classification: ClassificationOutput, 
+        self,
+        classification: ClassificationOutput,
         issues: List[Issue]
     ) -> Tuple[ClassificationOutput, List[str]]:
         """
         Apply all auto-fixable issues to classification
-        
+
         Args:
             classification: Original classification output
             issues: List of issues to fix
-            
+
         Returns:
-            (modified_classification, fixes_applied_log)
+            (modified_classification, fixes_applied_log); the input is never
+            modified, and unchanged sub-objects are shared with it
         """
-        # Work on a deep copy to avoid modifying original
-        modified = deepcopy(classification)
+        modified = classification
         fixes_log = []
-        
+
         # Filter to only auto-fixable issues
         fixable_issues = [i for i in issues if i.auto_fixable]
-        
+
         if not fixable_issues:
             logger.info("No auto-fixable issues found")
             return modified, fixes_log
-        
+
         logger.info(f"Attempting to fix {len(fixable_issues)} issues")
-        
+
         # Apply fixes
         for issue in fixable_issues:
             try:
-                fix_type = self._infer_fix_type(issue)
-                
-                if not fix_type:
-                    logger.warning(f"Could not infer fix type for issue {issue.issue_id}")
-                    continue
-                
-                if fix_type not in self.fix_registry:
-                    logger.warning(f"No fix handler for type '{fix_type}'")
+                code = self._check_code(issue)
+                fixer = self.fix_registry.get(code) if code else None
+
+                if fixer is None:
+                    logger.warning(f"No fix handler for issue {issue.issue_id} (check code: {code.value if code else None})")
                     continue
-                
+
                 # Apply the fix
-                modified = self.fix_registry[fix_type](modified, issue)
-                
-                fix_description = f"{fix_type} for {issue.issue_id}: {issue.message[:60]}"
+                modified = fixer(modified, issue)
+
+                fix_description = f"{code.value} for {issue.issue_id}: {issue.message[:60]}"
                 fixes_log.append(fix_description)
                 logger.info(f"Applied fix: {fix_description}")
-                
+
             except Exception as e:
                 logger.error(f"Failed to apply fix for {issue.issue_id}: {e}")
                 # Continue with other fixes
-        
+
         return modified, fixes_log
-    
-    def _infer_fix_type(self, issue: Issue) -> str:
-        """
-        Infer fix type from issue characteristics
-        
-        Args:
-            issue: Issue to analyze
-            
-        Returns:
-            Fix type string or empty string if cannot infer
-        """
-        message_lower = issue.message.lower()
-        
-        # Check for share sum issues
-        if 'share' in message_lower and 'sum' in message_lower:
-            # Determine if segment-level or document-level
-            if 'segment' in message_lower and issue.location.get('segment') is not None:
-                return 'share_normalization_segment'
-            elif 'document' in message_lower or 'overall' in message_lower or 'mixture' in message_lower:
-                return 'share_normalization_document'
-        
-        # Future: Add more patterns for other fix types
-        
-        return ""
-    
+
+    @staticmethod
+    def _check_code(issue: Issue) -> Optional[CheckCode]:
+        """The issue's check code, or one implied by its location field"""
+        if issue.check_code is not None:
+            return issue.check_code
+        return _FIELD_CODES.get((issue.location or {}).get('field'))
+
+    @staticmethod
+    def _find_segment(classification: ClassificationOutput, issue: Issue):
+        """Segment named by the issue's location (segment_index is 1-based), or None"""
+        segment_idx = (issue.location or {}).get('segment_index')
+
+        if segment_idx is None:
+            logger.warning(f"No segment index in issue location: {issue.location}")
+            return None
+
+        for seg in classification.segments:
+            if seg.segment_index == segment_idx:
+                return seg
+
+        logger.warning(f"Segment {segment_idx} not found")
+        return None
+
+    @staticmethod
+    def _replace_segment(classification: ClassificationOutput, segment, fixed_segment) -> ClassificationOutput:
+        """Copy of classification with one segment swapped; the other segments are shared"""
+        segments = [fixed_segment if seg is segment else seg for seg in classification.segments]
+        return classification.model_copy(update={"segments": segments})
+
+    @fixes(CheckCode.SEGMENT_SHARE_SUM)
     def _fix_segment_share_normalization(
-        self, 
-        classification: ClassificationOutput, 
+        self,
+        classification: ClassificationOutput,
         issue: Issue
     ) -> ClassificationOutput:
         """
         Fix: Normalize segment composition shares to sum to 1.0
-        
+
         Args:
-            classification: Classification to modify
+            classification: Classification to fix (not modified)
             issue: Issue with location info
-            
+
         Returns:
-            Modified classification
+            Copy with only the target segment and its composition entries replaced
         """
-        segment_idx = issue.location.get('segment')
-        
-        if segment_idx is None:
-            logger.warning(f"No segment index in issue location: {issue.location}")
-            return classification
-        
-        # Find the segment (segment_index is 1-based)
-        segment = None
-        for seg in classification.segments:
-            if seg.segment_index == segment_idx:
-                segment = seg
-                break
-        
+        segment = self._find_segment(classification, issue)
         if not segment:
-            logger.warning(f"Segment {segment_idx} not found")
             return classification
-        
+
         # Calculate current sum
         current_sum = sum(comp.segment_share for comp in segment.segment_composition)
-        
+
         if current_sum == 0:
-            logger.warning(f"Segment {segment_idx} has zero share sum, cannot normalize")
+            logger.warning(f"Segment {segment.segment_index} has zero share sum, cannot normalize")
             return classification
-        
+
         # Normalize to 1.0
-        for comp in segment.segment_composition:
-            comp.segment_share = comp.segment_share / current_sum
-        
-        logger.info(f"Normalized segment {segment_idx} shares from {current_sum:.4f} to 1.0")
-        
-        return classification
-    
+        fixed_segment = segment.model_copy(update={
+            "segment_composition": [
+                comp.model_copy(update={"segment_share": comp.segment_share / current_sum})
+                for comp in segment.segment_composition
+            ]
+        })
+
+        logger.info(f"Normalized segment {segment.segment_index} shares from {current_sum:.4f} to 1.0")
+
+        return self._replace_segment(classification, segment, fixed_segment)
+
+    @fixes(CheckCode.MIXTURE_SHARE_SUM)
     def _fix_document_share_normalization(
-        self, 
-        classification: ClassificationOutput, 
+        self,
+        classification: ClassificationOutput,
         issue: Issue
     ) -> ClassificationOutput:
         """
         Fix: Normalize document mixture overall_share to sum to 1.0
-        
+
         Args:
-            classification: Classification to modify
+            classification: Classification to fix (not modified)
             issue: Issue (location not required)
-            
+
         Returns:
-            Modified classification
+            Copy with only the mixture entries replaced; segments are shared
         """
         # Calculate current sum
         current_sum = sum(mix.overall_share for mix in classification.document_mixture)
-        
+
         if current_sum == 0:
             logger.warning("Document mixture has zero share sum, cannot normalize")
             return classification
-        
+
         # Normalize to 1.0
-        for mixture in classification.document_mixture:
-            mixture.overall_share = mixture.overall_share / current_sum
-        
+        document_mixture = [
+            mixture.model_copy(update={"overall_share": mixture.overall_share / current_sum})
+            for mixture in classification.document_mixture
+        ]
+
         logger.info(f"Normalized document mixture shares from {current_sum:.4f} to 1.0")
-        
-        return classification
+
+        return classification.model_copy(update={"document_mixture": document_mixture})
+
+    @fixes(CheckCode.SEGMENT_PAGE_COUNT)
+    def _fix_segment_page_count(
+        self,
+        classification: ClassificationOutput,
+        issue: Issue
+    ) -> ClassificationOutput:
+        """
+        Fix: Set segment_page_count to end_page - start_page + 1
+
+        Args:
+            classification: Classification to fix (not modified)
+            issue: Issue with location info
+
+        Returns:
+            Copy with only the target segment replaced
+        """
+        segment = self._find_segment(classification, issue)
+        if not segment:
+            return classification
+
+        expected_count = segment.end_page - segment.start_page + 1
+        if expected_count < 1:
+            logger.warning(f"Segment {segment.segment_index} has an inverted page range, cannot recompute page count")
+            return classification
+
+        logger.info(f"Set segment {segment.segment_index} page count from {segment.segment_page_count} to {expected_count}")
+
+        fixed_segment = segment.model_copy(update={"segment_page_count": expected_count})
+        return self._replace_segment(classification, segment, fixed_segment)
+
+    @fixes(CheckCode.SEGMENT_COUNT)
+    def _fix_number_of_segments(
+        self,
+        classification: ClassificationOutput,
+        issue: Issue
+    ) -> ClassificationOutput:
+        """
+        Fix: Set number_of_segments to the length of the segments array
+
+        Args:
+            classification: Classification to fix (not modified)
+            issue: Issue (location not required)
+
+        Returns:
+            Copy with number_of_segments updated; segments are shared
+        """
+        logger.info(f"Set number_of_segments from {classification.number_of_segments} to {len(classification.segments)}")
+
+        return classification.model_copy(update={"number_of_segments": len(classification.segments)})
@@ -0,0 +1,287 @@
+"""
+Check Dependencies - What each verification check reads, and a per-document result memo
+
+Each check is declared with the parts of ClassificationOutput and of the
+DocumentBundle it reads. A check's result is memoized under a digest of
+exactly those inputs, so when AutoFixEngine only rewrites share values the
+retry re-runs the rule checks that read shares and reuses every LLM check.
+
+    Check       Classification fields         Bundle pages
+    V1          all                           none (total_pages only)
+    V2-rules    all (ranges and shares)       none
+    V2-llm      all except share values       pages inside segments
+    V3-rules    all except share values       all pages
+    V3-llm      all except share values       top trap-signal windows (all pages)
+    V4          all except share values       pages inside segments and cited by evidence
+
+The LLM checks judge labels, page ranges and evidence against the text;
+share arithmetic is owned by the V2 rules. When a memoized LLM result is
+reused after share values changed, its issues located on a share field are
+dropped, since they described the numbers the fix replaced.
+
+A memo given a VerificationResultStore also persists the results of the
+checks it has versions for (the LLM checks), so later runs on the same
+classification and bundle reuse them too. A check whose LLM call failed
+raises (DegradedResult when part of the result is still usable), so a
+failed or partial result is never memoized or persisted; track_failed_checks()
+reports such failures to the caller of an agent, which catches them.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ..schemas import ClassificationOutput, DocumentBundle, Issue
+from ..verification_store import VerificationResultStore, bundle_content_hash
+
+# Numeric fields rewritten by share normalization
+SHARE_FIELDS = ("segment_share", "overall_share")
+
+# Checks that raised in the current thread or task (see track_failed_checks)
+_failed_checks: ContextVar[Optional[List[str]]] = ContextVar("failed_checks", default=None)
+
+
+class DegradedResult(Exception):
+    """Raised by a check that finished with a partial result (e.g. one of several LLM requests failed)"""
+
+    def __init__(self, result: Any, reason: str):
+        self.result = result
+        super().__init__(reason)
+
+
+class CheckDependency(NamedTuple):
+    """Inputs one check reads"""
+    include_shares: bool  # reads segment_share / overall_share values
+    pages: str  # "none", "segments" or "all"
+    llm: bool  # makes a Gemini call
+
+
+CHECK_DEPENDENCIES: Dict[str, CheckDependency] = {
+    "V1": CheckDependency(include_shares=True, pages="none", llm=False),
+    "V2-rules": CheckDependency(include_shares=True, pages="none", llm=False),
+    "V2-llm": CheckDependency(include_shares=False, pages="segments", llm=True),
+    "V3-rules": CheckDependency(include_shares=False, pages="all", llm=False),
+    "V3-llm": CheckDependency(include_shares=False, pages="all", llm=True),
+    "V4": CheckDependency(include_shares=False, pages="segments", llm=True),
+}
+
+
+def project_classification(classification: ClassificationOutput, include_shares: bool) -> Dict[str, Any]:
+    """The classification fields a check reads, as plain JSON data"""
+    data = classification.model_dump(mode='json')
+    if include_shares:
+        return data
+    for segment in data['segments']:
+        for composition in segment['segment_composition']:
+            composition.pop('segment_share', None)
+    for mixture in data['document_mixture']:
+        mixture.pop('overall_share', None)
+    return data
+
+
+def _bundle_projection(doc_bundle: DocumentBundle, pages: str) -> Dict[str, Any]:
+    """Bundle identity and the pages a check reads (segment pages follow from the classification's ranges)"""
+    projection = {"total_pages": doc_bundle.total_pages}
+    if pages != "none":
+        projection["content"] = doc_bundle.source_sha256 or doc_bundle.doc_id
+    return projection
+
+
+def _digest(data: Any) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class VerificationMemo:
+    """
+    Results of verification checks for one document, reused across retry attempts
+
+    Safe to share between the V2-V4 threads or tasks of one verification run.
+    """
+
+    def __init__(self, store: Optional[VerificationResultStore] = None, versions: Optional[Dict[str, str]] = None):
+        """
+        Initialize memo
+
+        Args:
+            store: Optional persistent store consulted on a memo miss
+            versions: Check name -> agent version string; only these checks are persisted
+                (see VerificationRunner.create_memo)
+        """
+        self._results: Dict[Tuple[str, str], Tuple[Any, str]] = {}
+        self._lock = threading.Lock()
+        self.store = store
+        self.versions = dict(versions or {})
+        self._bundle_hash: Optional[Tuple[DocumentBundle, str]] = None
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.stored_hits: Counter = Counter()
+
+    def _keys(self, check: str, classification: ClassificationOutput, doc_bundle: DocumentBundle) -> Tuple[str, str]:
+        """(dependency digest, share-values digest) for a check on this input"""
+        dependency = CHECK_DEPENDENCIES[check]
+        projection = {
+            "classification": project_classification(classification, dependency.include_shares),
+            "bundle": _bundle_projection(doc_bundle, dependency.pages),
+        }
+        shares = [
+            [c.segment_share for c in segment.segment_composition] for segment in classification.segments
+        ] + [[m.overall_share for m in classification.document_mixture]]
+        return _digest(projection), _digest(shares)
+
+    def _stored_key(self, check: str, key: str, doc_bundle: DocumentBundle) -> Optional[str]:
+        """Persistent store key for a check, or None when the check is not persisted"""
+        if self.store is None or check not in self.versions:
+            return None
+        with self._lock:
+            if self._bundle_hash is None or self._bundle_hash[0] is not doc_bundle:
+                self._bundle_hash = (doc_bundle, bundle_content_hash(doc_bundle))
+            bundle_hash = self._bundle_hash[1]
+        return self.store.make_key(check, key, bundle_hash, self.versions[check])
+
+    def _lookup(self, check: str, key: str, shares: str, stored_key: Optional[str] = None) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._results.get((check, key))
+        if entry is None and stored_key is not None:
+            entry = self.store.get(stored_key)
+            if entry is not None:
+                with self._lock:
+                    self._results[(check, key)] = entry
+                    self.stored_hits[check] += 1
+        with self._lock:
+            if entry is None:
+                self.misses[check] += 1
+                return False, None
+            self.hits[check] += 1
+        result, recorded_shares = entry
+        if recorded_shares != shares:
+            return True, _filter_issues(result, _not_on_share_field)
+        return True, _filter_issues(result, None)
+
+    def _store(self, check: str, key: str, shares: str, result: Any, stored_key: Optional[str] = None):
+        with self._lock:
+            self._results[(check, key)] = (_filter_issues(result, None), shares)
+        if stored_key is not None:
+            self.store.put(stored_key, check, result, shares)
+
+    def run(
+        self,
+        check: str,
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        compute: Callable[[], Any]
+    ) -> Any:
+        """Return the memoized result of check for these inputs, computing it on a miss"""
+        key, shares = self._keys(check, classification, doc_bundle)
+        stored_key = self._stored_key(check, key, doc_bundle)
+        found, result = self._lookup(check, key, shares, stored_key)
+        if found:
+            return result
+        result = compute()
+        self._store(check, key, shares, result, stored_key)
+        return result
+
+    async def arun(
+        self,
+        check: str,
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Async counterpart of run(); compute returns an awaitable (store I/O runs off the event loop)"""
+        key, shares = self._keys(check, classification, doc_bundle)
+        if self.store is None or check not in self.versions:
+            found, result = self._lookup(check, key, shares)
+            if found:
+                return result
+            result = await compute()
+            self._store(check, key, shares, result)
+            return result
+
+        stored_key = await asyncio.to_thread(self._stored_key, check, key, doc_bundle)
+        found, result = await asyncio.to_thread(self._lookup, check, key, shares, stored_key)
+        if found:
+            return result
+        result = await compute()
+        await asyncio.to_thread(self._store, check, key, shares, result, stored_key)
+        return result
+
+    def hit_counts(self) -> Counter:
+        """Snapshot of memo hits per check"""
+        with self._lock:
+            return Counter(self.hits)
+
+    def stored_hit_counts(self) -> Counter:
+        """Snapshot of hits served from the persistent store per check"""
+        with self._lock:
+            return Counter(self.stored_hits)
+
+    def reused_since(self, before: Counter) -> List[str]:
+        """Checks served from the memo since the before snapshot, in declaration order"""
+        with self._lock:
+            return [check for check in CHECK_DEPENDENCIES if self.hits[check] > before[check]]
+
+    def stored_since(self, before: Counter) -> List[str]:
+        """Checks served from the persistent store since the before snapshot (of stored_hit_counts)"""
+        with self._lock:
+            return [check for check in CHECK_DEPENDENCIES if self.stored_hits[check] > before[check]]
+
+
+@contextmanager
+def track_failed_checks() -> Iterator[List[str]]:
+    """
+    Collect the checks that fail (raise, including DegradedResult) in this thread or task
+
+    Agents fall back to partial issues when a check fails, so their callers
+    cannot tell from the result alone; the checkpoint journal uses this to
+    skip recording degraded results.
+
+    Yields:
+        List of failed check names, filled in as memoized()/amemoized() calls fail
+    """
+    failed: List[str] = []
+    token = _failed_checks.set(failed)
+    try:
+        yield failed
+    finally:
+        _failed_checks.reset(token)
+
+
+def _record_failure(check: str):
+    failed = _failed_checks.get()
+    if failed is not None:
+        failed.append(check)
+
+
+def memoized(memo: Optional[VerificationMemo], check: str, classification, doc_bundle, compute: Callable[[], Any]) -> Any:
+    """memo.run(), or compute() directly when no memo is in use"""
+    try:
+        return compute() if memo is None else memo.run(check, classification, doc_bundle, compute)
+    except Exception:
+        _record_failure(check)
+        raise
+
+
+async def amemoized(memo: Optional[VerificationMemo], check: str, classification, doc_bundle, compute) -> Any:
+    """Async counterpart of memoized()"""
+    try:
+        return await compute() if memo is None else await memo.arun(check, classification, doc_bundle, compute)
+    except Exception:
+        _record_failure(check)
+        raise
+
+
+def _not_on_share_field(issue: Issue) -> bool:
+    return (issue.location or {}).get("field") not in SHARE_FIELDS
+
+
+def _filter_issues(result: Any, keep: Optional[Callable[[Issue], bool]]) -> Any:
+    """Copy a list of issues or an (issues, score) result, keeping issues that pass keep"""
+    if isinstance(result, tuple):
+        issues, score = result
+        return [i for i in issues if keep is None or keep(i)], score
+    return [i for i in result if keep is None or keep(i)]
@@ -1,10 +1,10 @@
 """Agent Output Saver - Save individual agent outputs for debugging and analysis"""
 
-import json
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from ..schemas import ClassificationOutput, Issue
+from ..atomic_io import atomic_write_json
 
 
 class AgentOutputSaver:
@@ -42,8 +42,7 @@ class AgentOutputSaver:
             "classification": classification.model_dump(mode='json')
         }
         
-        with open(path, 'w') as f:
-            json.dump(output, f, indent=2, default=str)
+        atomic_write_json(path, output, default=str)
         
         print(f"   ✓ Saved primary classification to {path.name}")
     
@@ -75,8 +74,7 @@ class AgentOutputSaver:
         
         path = self.output_dir / f"{agent_name}.json"
         
-        with open(path, 'w') as f:
-            json.dump(output, f, indent=2, default=str)
+        atomic_write_json(path, output, default=str)
         
         print(f"   ✓ Saved {agent_name} output ({len(issues)} issues)")
     
@@ -95,8 +93,7 @@ class AgentOutputSaver:
             "report": report
         }
         
-        with open(path, 'w') as f:
-            json.dump(output, f, indent=2, default=str)
+        atomic_write_json(path, output, default=str)
         
         print(f"   ✓ Saved verification report to {path.name}")
     
@@ -120,7 +117,6 @@ class AgentOutputSaver:
         
         path = self.output_dir / "v5_arbiter_decision.json"
         
-        with open(path, 'w') as f:
-            json.dump(output, f, indent=2, default=str)
+        atomic_write_json(path, output, default=str)
         
         print(f"   ✓ Saved arbiter decision: {decision}")
@@ -8,7 +8,7 @@ with cycle detection and retry limits.
 import hashlib
 import json
 import logging
-from typing import Tuple, List, Dict, Any
+from typing import Any, Dict, List, Optional, Tuple
 
 from ..schemas import ClassificationOutput, DocumentBundle, VerificationReport, ArbiterDecision
 from .verification_runner import VerificationRunner
@@ -24,9 +24,15 @@ class RetryOrchestrator:
     
     MAX_RETRIES = 2  # Maximum retry attempts to prevent infinite loops
     
-    def __init__(self):
-        """Initialize orchestrator with verification runner and fix engine"""
-        self.verification_runner = VerificationRunner()
+    def __init__(self, client=None, journal=None):
+        """
+        Initialize orchestrator with verification runner and fix engine
+        
+        Args:
+            client: Shared Gemini client passed through to VerificationRunner
+            journal: Optional CheckpointJournal passed through to VerificationRunner
+        """
+        self.verification_runner = VerificationRunner(client=client, journal=journal)
         self.fix_engine = AutoFixEngine()
     
     def verify_with_retry(
@@ -52,86 +58,152 @@ class RetryOrchestrator:
         current_classification = classification
         retry_log = []
         seen_fingerprints = set()
+        # Checks whose inputs an auto-fix did not touch are reused on the next attempt
+        # (and LLM checks already in the result store are reused from earlier runs)
+        memo = self.verification_runner.create_memo()
         
         for attempt in range(self.MAX_RETRIES + 1):
-            logger.info(f"\n{'='*60}")
-            logger.info(f"VERIFICATION ATTEMPT {attempt + 1}/{self.MAX_RETRIES + 1}")
-            logger.info(f"{'='*60}")
+            self._log_attempt(attempt)
             
             # Run V1-V5 verification
             report, decision = self.verification_runner.run_all(
                 current_classification, 
-                doc_bundle
+                doc_bundle,
+                memo=memo
             )
             
-            # Check for cycle (same classification seen before)
-            fingerprint = self._get_classification_fingerprint(current_classification)
-            if fingerprint in seen_fingerprints:
-                logger.warning("🔄 Cycle detected - same classification seen before")
-                decision = ArbiterDecision(
-                    decision="ESCALATE_TO_SME",
-                    reason=f"Cycle detected in auto-fix loop after {attempt} attempts. Fixes did not resolve issues.",
-                    issues_analyzed=decision.issues_analyzed,
-                    blocker_count=decision.blocker_count,
-                    major_count=decision.major_count,
-                    minor_count=decision.minor_count,
-                    fixable_count=decision.fixable_count
-                )
-                return current_classification, report, decision, retry_log
-            
-            seen_fingerprints.add(fingerprint)
-            
-            # Check decision
-            if decision.decision != "AUTO_RETRY":
-                # Either AUTO_ACCEPT or ESCALATE_TO_SME - we're done
-                logger.info(f"✓ Final decision: {decision.decision}")
-                return current_classification, report, decision, retry_log
-            
-            # AUTO_RETRY decision - check if we can retry
-            if attempt >= self.MAX_RETRIES:
-                logger.warning(f"⚠️  Max retries ({self.MAX_RETRIES}) reached")
-                # Override decision to escalate
-                decision = ArbiterDecision(
-                    decision="ESCALATE_TO_SME",
-                    reason=f"Max retries ({self.MAX_RETRIES}) reached. Auto-fix could not resolve all issues.",
-                    issues_analyzed=decision.issues_analyzed,
-                    blocker_count=decision.blocker_count,
-                    major_count=decision.major_count,
-                    minor_count=decision.minor_count,
-                    fixable_count=decision.fixable_count
-                )
+            next_classification, decision = self._after_verification(
+                attempt, current_classification, report, decision, seen_fingerprints, retry_log
+            )
+            if next_classification is None:
                 return current_classification, report, decision, retry_log
+            current_classification = next_classification
+        
+        # Should not reach here
+        raise RuntimeError("Retry loop exited unexpectedly")
+    
+    async def averify_with_retry(
+        self,
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle
+    ) -> Tuple[ClassificationOutput, VerificationReport, ArbiterDecision, List[Dict[str, Any]]]:
+        """
+        Async counterpart of verify_with_retry() (V2-V4 run on the event loop)
+        
+        Args:
+            classification: Initial classification output
+            doc_bundle: Document bundle
             
-            # Apply auto-fixes
-            logger.info(f"\n🔧 Applying auto-fixes (Attempt {attempt + 1})")
+        Returns:
+            (final_classification, final_verification_report, final_arbiter_decision, retry_log)
+        """
+        current_classification = classification
+        retry_log = []
+        seen_fingerprints = set()
+        memo = self.verification_runner.create_memo()
+        
+        for attempt in range(self.MAX_RETRIES + 1):
+            self._log_attempt(attempt)
             
-            fixable_issues = [i for i in report.issues if i.auto_fixable]
-            logger.info(f"   Found {len(fixable_issues)} fixable issues")
+            report, decision = await self.verification_runner.arun_all(current_classification, doc_bundle, memo=memo)
             
-            current_classification, fixes_applied = self.fix_engine.apply_fixes(
-                current_classification,
-                fixable_issues
+            next_classification, decision = self._after_verification(
+                attempt, current_classification, report, decision, seen_fingerprints, retry_log
             )
-            
-            # Log retry attempt
-            retry_entry = {
-                'attempt': attempt + 1,
-                'issues_before_fix': len(report.issues),
-                'fixable_issues': len(fixable_issues),
-                'fixes_applied': fixes_applied,
-                'decision_before_retry': decision.decision
-            }
-            retry_log.append(retry_entry)
-            
-            logger.info(f"   Applied {len(fixes_applied)} fixes:")
-            for fix in fixes_applied:
-                logger.info(f"     - {fix}")
-            
-            # Continue to next iteration to re-verify
+            if next_classification is None:
+                return current_classification, report, decision, retry_log
+            current_classification = next_classification
         
-        # Should not reach here
         raise RuntimeError("Retry loop exited unexpectedly")
     
+    def _log_attempt(self, attempt: int):
+        logger.info(f"\n{'='*60}")
+        logger.info(f"VERIFICATION ATTEMPT {attempt + 1}/{self.MAX_RETRIES + 1}")
+        logger.info(f"{'='*60}")
+    
+    def _after_verification(
+        self,
+        attempt: int,
+        current_classification: ClassificationOutput,
+        report: VerificationReport,
+        decision: ArbiterDecision,
+        seen_fingerprints: set,
+        retry_log: List[Dict[str, Any]]
+    ) -> Tuple[Optional[ClassificationOutput], ArbiterDecision]:
+        """
+        Act on one verification attempt's decision
+        
+        Returns:
+            (fixed classification to re-verify, or None when finished; final or current decision)
+        """
+        if report.reused_checks:
+            logger.info(f"♻️  Reused unchanged checks: {', '.join(report.reused_checks)}")
+        
+        # Check for cycle (same classification seen before)
+        fingerprint = self._get_classification_fingerprint(current_classification)
+        if fingerprint in seen_fingerprints:
+            logger.warning("🔄 Cycle detected - same classification seen before")
+            decision = ArbiterDecision(
+                decision="ESCALATE_TO_SME",
+                reason=f"Cycle detected in auto-fix loop after {attempt} attempts. Fixes did not resolve issues.",
+                issues_analyzed=decision.issues_analyzed,
+                blocker_count=decision.blocker_count,
+                major_count=decision.major_count,
+                minor_count=decision.minor_count,
+                fixable_count=decision.fixable_count
+            )
+            return None, decision
+        
+        seen_fingerprints.add(fingerprint)
+        
+        # Check decision
+        if decision.decision != "AUTO_RETRY":
+            # Either AUTO_ACCEPT or ESCALATE_TO_SME - we're done
+            logger.info(f"✓ Final decision: {decision.decision}")
+            return None, decision
+        
+        # AUTO_RETRY decision - check if we can retry
+        if attempt >= self.MAX_RETRIES:
+            logger.warning(f"⚠️  Max retries ({self.MAX_RETRIES}) reached")
+            # Override decision to escalate
+            decision = ArbiterDecision(
+                decision="ESCALATE_TO_SME",
+                reason=f"Max retries ({self.MAX_RETRIES}) reached. Auto-fix could not resolve all issues.",
+                issues_analyzed=decision.issues_analyzed,
+                blocker_count=decision.blocker_count,
+                major_count=decision.major_count,
+                minor_count=decision.minor_count,
+                fixable_count=decision.fixable_count
+            )
+            return None, decision
+        
+        # Apply auto-fixes
+        logger.info(f"\n🔧 Applying auto-fixes (Attempt {attempt + 1})")
+        
+        fixable_issues = [i for i in report.issues if i.auto_fixable]
+        logger.info(f"   Found {len(fixable_issues)} fixable issues")
+        
+        current_classification, fixes_applied = self.fix_engine.apply_fixes(
+            current_classification,
+            fixable_issues
+        )
+        
+        # Log retry attempt
+        retry_entry = {
+            'attempt': attempt + 1,
+            'issues_before_fix': len(report.issues),
+            'fixable_issues': len(fixable_issues),
+            'fixes_applied': fixes_applied,
+            'decision_before_retry': decision.decision
+        }
+        retry_log.append(retry_entry)
+        
+        logger.info(f"   Applied {len(fixes_applied)} fixes:")
+        for fix in fixes_applied:
+            logger.info(f"     - {fix}")
+        
+        return current_classification, decision
+    
     def _get_classification_fingerprint(self, classification: ClassificationOutput) -> str:
         """
         Generate a fingerprint hash of classification to detect cycles
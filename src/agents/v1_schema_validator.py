@@ -2,6 +2,7 @@
 
 from typing import List
 from ..schemas import (
+    CheckCode,
     ClassificationOutput,
     DocumentBundle,
     Issue,
@@ -73,6 +74,7 @@ class V1SchemaValidator:
                 issue_id=f"V1-{start_counter:04d}",
                 agent="V1",
                 severity=IssueSeverity.BLOCKER,
+                check_code=CheckCode.SEGMENT_COUNT,
                 message=f"number_of_segments is {expected} but segments array has {actual} items",
                 location={"field": "number_of_segments"},
                 suggested_fix=f"Set number_of_segments = {actual}",
@@ -99,6 +101,7 @@ class V1SchemaValidator:
                     issue_id=f"V1-{start_counter + len(issues):04d}",
                     agent="V1",
                     severity=IssueSeverity.BLOCKER,
+                    check_code=CheckCode.START_PAGE_RANGE,
                     message=f"Segment {segment.segment_index} start_page={segment.start_page} out of range [1, {max_page}]",
                     location={"segment_index": segment.segment_index, "field": "start_page"},
                     suggested_fix=f"Adjust start_page to valid range [1, {max_page}]",
@@ -112,6 +115,7 @@ class V1SchemaValidator:
                     issue_id=f"V1-{start_counter + len(issues):04d}",
                     agent="V1",
                     severity=IssueSeverity.BLOCKER,
+                    check_code=CheckCode.END_PAGE_RANGE,
                     message=f"Segment {segment.segment_index} end_page={segment.end_page} out of range [1, {max_page}]",
                     location={"segment_index": segment.segment_index, "field": "end_page"},
                     suggested_fix=f"Adjust end_page to valid range [1, {max_page}]",
@@ -125,6 +129,7 @@ class V1SchemaValidator:
                     issue_id=f"V1-{start_counter + len(issues):04d}",
                     agent="V1",
                     severity=IssueSeverity.BLOCKER,
+                    check_code=CheckCode.PAGE_RANGE_ORDER,
                     message=f"Segment {segment.segment_index}: start_page ({segment.start_page}) > end_page ({segment.end_page})",
                     location={"segment_index": segment.segment_index, "field": "page_range"},
                     suggested_fix="Swap start_page and end_page or adjust page range",
@@ -139,6 +144,7 @@ class V1SchemaValidator:
                     issue_id=f"V1-{start_counter + len(issues):04d}",
                     agent="V1",
                     severity=IssueSeverity.MAJOR,
+                    check_code=CheckCode.SEGMENT_PAGE_COUNT,
                     message=f"Segment {segment.segment_index}: segment_page_count={segment.segment_page_count} but should be {expected_count} (end_page - start_page + 1)",
                     location={"segment_index": segment.segment_index, "field": "segment_page_count"},
                     suggested_fix=f"Set segment_page_count = {expected_count}",
@@ -164,6 +170,7 @@ class V1SchemaValidator:
                         issue_id=f"V1-{start_counter + len(issues):04d}",
                         agent="V1",
                         severity=IssueSeverity.BLOCKER,
+                        check_code=CheckCode.SEGMENT_CONFIDENCE_RANGE,
                         message=f"Segment {segment.segment_index}, {comp.document_type.value}: confidence={comp.confidence} out of range [0.0, 1.0]",
                         location={
                             "segment_index": segment.segment_index,
@@ -182,6 +189,7 @@ class V1SchemaValidator:
                     issue_id=f"V1-{start_counter + len(issues):04d}",
                     agent="V1",
                     severity=IssueSeverity.BLOCKER,
+                    check_code=CheckCode.MIXTURE_CONFIDENCE_RANGE,
                     message=f"Document mixture {mix.document_type.value}: confidence={mix.confidence} out of range [0.0, 1.0]",
                     location={"document_type": mix.document_type.value, "field": "confidence"},
                     suggested_fix="Adjust confidence to [0.0, 1.0]",
@@ -213,6 +221,7 @@ class V1SchemaValidator:
                         issue_id=f"V1-{start_counter + len(issues):04d}",
                         agent="V1",
                         severity=IssueSeverity.BLOCKER,
+                        check_code=CheckCode.SEGMENT_TYPES_MISSING,
                         message=f"Segment {segment.segment_index} missing document types: {', '.join(t.value for t in missing_types)}",
                         location={"segment_index": segment.segment_index, "field": "segment_composition"},
                         suggested_fix=f"Add missing types with NO_EVIDENCE presence_level",
@@ -225,6 +234,7 @@ class V1SchemaValidator:
                         issue_id=f"V1-{start_counter + len(issues):04d}",
                         agent="V1",
                         severity=IssueSeverity.BLOCKER,
+                        check_code=CheckCode.SEGMENT_TYPES_EXTRA,
                         message=f"Segment {segment.segment_index} has extra/duplicate types: {', '.join(t.value for t in extra_types)}",
                         location={"segment_index": segment.segment_index, "field": "segment_composition"},
                         suggested_fix="Remove duplicate entries",
@@ -245,6 +255,7 @@ class V1SchemaValidator:
                     issue_id=f"V1-{start_counter + len(issues):04d}",
                     agent="V1",
                     severity=IssueSeverity.BLOCKER,
+                    check_code=CheckCode.MIXTURE_TYPES_MISSING,
                     message=f"document_mixture missing types: {', '.join(t.value for t in missing_types)}",
                     location={"field": "document_mixture"},
                     suggested_fix=f"Add missing types with NO_EVIDENCE",
@@ -257,6 +268,7 @@ class V1SchemaValidator:
                     issue_id=f"V1-{start_counter + len(issues):04d}",
                     agent="V1",
                     severity=IssueSeverity.BLOCKER,
+                    check_code=CheckCode.MIXTURE_TYPES_EXTRA,
                     message=f"document_mixture has extra/duplicate types: {', '.join(t.value for t in extra_types)}",
                     location={"field": "document_mixture"},
                     suggested_fix="Remove duplicates",
@@ -284,6 +296,7 @@ class V1SchemaValidator:
                             issue_id=f"V1-{start_counter + len(issues):04d}",
                             agent="V1",
                             severity=IssueSeverity.MINOR,
+                            check_code=CheckCode.EVIDENCE_MISSING,
                             message=f"Segment {segment.segment_index}, {comp.document_type.value} has {comp.presence_level.value} but no evidence provided",
                             location={
                                 "segment_index": segment.segment_index,
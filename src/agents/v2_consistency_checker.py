@@ -1,11 +1,12 @@
 """V2: Consistency Checker - Hybrid rule-based + LLM approach"""
 
 import json
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from pathlib import Path
 from google import genai
 from google.genai.types import GenerateContentConfig
 from ..schemas import (
+    CheckCode,
     ClassificationOutput,
     DocumentBundle,
     Issue,
@@ -14,6 +15,10 @@ from ..schemas import (
     DocumentType
 )
 from ..config import settings
+from ..boilerplate import strip_boilerplate
+from ..payload_planner import get_default_planner, log_plan
+from ..llm_cache import aparse_and_commit, parse_and_commit
+from .check_dependencies import VerificationMemo, amemoized, memoized
 
 
 class V2ConsistencyChecker:
@@ -25,8 +30,12 @@ class V2ConsistencyChecker:
     
     SHARE_TOLERANCE = 0.01
     
+    # Bump when the LLM request or response parsing changes (invalidates stored results)
+    AGENT_VERSION = "2"
+    
     def __init__(self, client: genai.Client):
         self.client = client
+        self.planner = get_default_planner()
         # Load prompt
         prompt_path = Path("Prompts/V2_Internal_Consistency_Auditor.txt")
         if not prompt_path.exists():
@@ -34,35 +43,40 @@ class V2ConsistencyChecker:
         with open(prompt_path, "r") as f:
             self.prompt_base = f.read()
     
+    @property
+    def request_variant(self) -> str:
+        """Settings that shape the LLM request (part of the stored-result version)"""
+        return self.planner.variant
+    
     def validate(
         self,
         classification: ClassificationOutput,
-        doc_bundle: DocumentBundle
+        doc_bundle: DocumentBundle,
+        memo: Optional[VerificationMemo] = None
     ) -> Tuple[List[Issue], float]:
         """
         Run consistency checks
         
+        Args:
+            classification: Classification output to validate
+            doc_bundle: Original document bundle
+            memo: Optional per-document memo; checks whose inputs are unchanged
+                since an earlier attempt reuse that attempt's result
+        
         Returns:
             (issues, consistency_score)
             consistency_score: 0.0-1.0, where 1.0 = perfect consistency
         """
-        issues = []
-        issue_counter = 0
-        
-        # PHASE 1: Rule-based pre-filter (fast, zero cost)
-        rule_issues = self._run_rule_checks(classification, issue_counter)
-        issues.extend(rule_issues)
-        issue_counter = len(issues)
-        
-        # If critical rule violations, skip LLM
-        has_blocker = any(i.severity == IssueSeverity.BLOCKER for i in rule_issues)
-        if has_blocker:
-            print("    V2: BLOCKER issues found in rules, skipping LLM validation")
+        issues, issue_counter, skip_llm = self._rule_phase(classification, doc_bundle, memo)
+        if skip_llm:
             return issues, 0.0
         
         # PHASE 2: LLM semantic validation
         try:
-            llm_issues = self._run_llm_check(classification, doc_bundle, issue_counter)
+            llm_issues = memoized(
+                memo, "V2-llm", classification, doc_bundle,
+                lambda: self._run_llm_check(classification, doc_bundle, issue_counter)
+            )
             issues.extend(llm_issues)
         except Exception as e:
             print(f"    V2: LLM check failed: {e}")
@@ -73,6 +87,51 @@ class V2ConsistencyChecker:
         
         return issues, score
     
+    async def avalidate(
+        self,
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        memo: Optional[VerificationMemo] = None
+    ) -> Tuple[List[Issue], float]:
+        """Async counterpart of validate() (LLM phase via the client's aio API)"""
+        issues, issue_counter, skip_llm = self._rule_phase(classification, doc_bundle, memo)
+        if skip_llm:
+            return issues, 0.0
+        
+        try:
+            llm_issues = await amemoized(
+                memo, "V2-llm", classification, doc_bundle,
+                lambda: self._arun_llm_check(classification, doc_bundle, issue_counter)
+            )
+            issues.extend(llm_issues)
+        except Exception as e:
+            print(f"    V2: LLM check failed: {e}")
+        
+        return issues, self._compute_score(issues)
+    
+    def _rule_phase(
+        self,
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        memo: Optional[VerificationMemo] = None
+    ) -> Tuple[List[Issue], int, bool]:
+        """
+        PHASE 1: Rule-based pre-filter (fast, zero cost)
+        
+        Returns:
+            (issues, issue_counter, skip_llm) - the LLM is skipped on critical rule violations
+        """
+        rule_issues = memoized(
+            memo, "V2-rules", classification, doc_bundle,
+            lambda: self._run_rule_checks(classification, 0)
+        )
+        
+        has_blocker = any(i.severity == IssueSeverity.BLOCKER for i in rule_issues)
+        if has_blocker:
+            print("    V2: BLOCKER issues found in rules, skipping LLM validation")
+        
+        return list(rule_issues), len(rule_issues), has_blocker
+    
     def _run_rule_checks(
         self,
         classification: ClassificationOutput,
@@ -90,6 +149,7 @@ class V2ConsistencyChecker:
                     issue_id=f"V2-{start_counter + len(issues):04d}",
                     agent="V2",
                     severity=IssueSeverity.MAJOR,
+                    check_code=CheckCode.SEGMENT_SHARE_SUM,
                     message=f"Segment {seg.segment_index} shares sum to {total:.3f} instead of 1.0",
                     location={"segment_index": seg.segment_index, "field": "segment_share"},
                     suggested_fix="Normalize shares to sum to 1.0",
@@ -104,6 +164,7 @@ class V2ConsistencyChecker:
                 issue_id=f"V2-{start_counter + len(issues):04d}",
                 agent="V2",
                 severity=IssueSeverity.MAJOR,
+                check_code=CheckCode.MIXTURE_SHARE_SUM,
                 message=f"Document mixture overall_share sums to {total_overall:.3f} instead of 1.0",
                 location={"field": "document_mixture"},
                 suggested_fix="Normalize overall_share values",
@@ -120,6 +181,7 @@ class V2ConsistencyChecker:
                     issue_id=f"V2-{start_counter + len(issues):04d}",
                     agent="V2",
                     severity=IssueSeverity.BLOCKER,
+                    check_code=CheckCode.PAGE_RANGE_ORDER,
                     message=f"Segment {seg.segment_index}: start_page ({seg.start_page}) > end_page ({seg.end_page})",
                     location={"segment_index": seg.segment_index},
                     suggested_fix="Swap or adjust page range",
@@ -135,6 +197,7 @@ class V2ConsistencyChecker:
                         issue_id=f"V2-{start_counter + len(issues):04d}",
                         agent="V2",
                         severity=IssueSeverity.BLOCKER,
+                        check_code=CheckCode.SEGMENT_OVERLAP,
                         message=f"Segment {seg.segment_index} ends at {seg.end_page}, overlaps with Segment {next_seg.segment_index} starting at {next_seg.start_page}",
                         location={"segment_index": seg.segment_index},
                         suggested_fix="Adjust page ranges to eliminate overlap",
@@ -150,21 +213,47 @@ class V2ConsistencyChecker:
         start_counter: int
     ) -> List[Issue]:
         """LLM-based semantic validation"""
-        
-        # Prepare input
-        classification_json = classification.model_dump_json(indent=2)
-        
-        # NEW: Get full text from all segments (not just 3000 char preview)
-        segment_texts = {}
-        for seg in classification.segments:
-            seg_text = ""
-            for page_num in range(seg.start_page, seg.end_page + 1):
-                if page_num <= len(doc_bundle.pages):
-                    page_data = doc_bundle.pages[page_num - 1]
-                    seg_text += f"--- PAGE {page_num} ---\n{page_data['text']}\n\n"
-            segment_texts[seg.segment_index] = seg_text
-        
-        segment_texts_json = json.dumps(segment_texts, indent=2)
+        request = self._llm_request(classification, doc_bundle)
+        try:
+            response = self.client.models.generate_content(**request)
+            return parse_and_commit(response, lambda r: self._parse_llm_response(r.text, start_counter))
+        except json.JSONDecodeError as e:
+            print(f"    V2 LLM: Failed to parse JSON response: {e}")
+            raise
+        except Exception as e:
+            print(f"    V2 LLM: Error: {e}")
+            raise
+    
+    async def _arun_llm_check(
+        self,
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        start_counter: int
+    ) -> List[Issue]:
+        """Async LLM-based semantic validation"""
+        request = self._llm_request(classification, doc_bundle)
+        try:
+            response = await self.client.aio.models.generate_content(**request)
+            return await aparse_and_commit(response, lambda r: self._parse_llm_response(r.text, start_counter))
+        except json.JSONDecodeError as e:
+            print(f"    V2 LLM: Failed to parse JSON response: {e}")
+            raise
+        except Exception as e:
+            print(f"    V2 LLM: Error: {e}")
+            raise
+    
+    def _llm_request(self, classification: ClassificationOutput, doc_bundle: DocumentBundle) -> dict:
+        """Build the generate_content arguments for the semantic check"""
+        plan = self.planner.plan(classification, doc_bundle)
+        if plan is not None:
+            log_plan("V2 LLM", plan, len(doc_bundle.pages))
+            classification_json = plan.classification_json
+            segment_texts_json = plan.text
+            texts_description = ("Boundary pages, evidence pages and the pages where evidence anchors occur "
+                                 "in each segment (other pages are omitted)")
+        else:
+            classification_json, segment_texts_json = self._full_context(classification, doc_bundle)
+            texts_description = "Full text from all segments for semantic validation"
         
         # Build full prompt with INPUT/OUTPUT format
         full_prompt = f"""{self.prompt_base}
@@ -173,7 +262,7 @@ class V2ConsistencyChecker:
 
 You will receive:
 1. "classification_output": The complete ClassificationOutput JSON
-2. "segment_texts": Full text from all segments for semantic validation
+2. "segment_texts": {texts_description}
 
 ===== OUTPUT FORMAT =====
 
@@ -196,48 +285,53 @@ If no issues: return []
 CLASSIFICATION OUTPUT:
 {classification_json}
 
-SEGMENT TEXTS (full text from document):
+SEGMENT TEXTS:
 {segment_texts_json}
 
 ===== YOUR OUTPUT (JSON array only) =====
 """
         
-        # Call LLM
-        try:
-            response = self.client.models.generate_content(
-                model=settings.gemini_model,
-                contents=full_prompt,
-                config=GenerateContentConfig(
-                    temperature=0.0,
-                    response_mime_type="application/json"
-                )
-            )
-            
-            # Parse JSON
-            llm_issues_raw = json.loads(response.text)
-            
-            # Convert to Issue objects
-            issues = []
-            for raw_issue in llm_issues_raw:
-                issues.append(Issue(
-                    ig_id=raw_issue.get("ig_id", "IG-9"),
-                    issue_id=raw_issue.get("issue_id", f"V2-LLM-{start_counter + len(issues):04d}"),
-                    agent="V2",
-                    severity=IssueSeverity(raw_issue.get("severity", "MAJOR")),
-                    message=raw_issue.get("message", "Unknown issue"),
-                    location=raw_issue.get("location"),
-                    suggested_fix=raw_issue.get("suggested_fix"),
-                    auto_fixable=raw_issue.get("auto_fixable", False)
-                ))
-            
-            return issues
-            
-        except json.JSONDecodeError as e:
-            print(f"    V2 LLM: Failed to parse JSON response: {e}")
-            return []
-        except Exception as e:
-            print(f"    V2 LLM: Error: {e}")
-            raise
+        return {
+            "model": settings.gemini_model,
+            "contents": full_prompt,
+            "config": GenerateContentConfig(
+                temperature=0.0,
+                response_mime_type="application/json"
+            ),
+        }
+    
+    def _full_context(self, classification: ClassificationOutput, doc_bundle: DocumentBundle) -> Tuple[str, str]:
+        """Indented classification JSON and the text of every segment page (payload mode "full")"""
+        classification_json = classification.model_dump_json(indent=2)
+        segment_texts = {}
+        boilerplate = doc_bundle.boilerplate if settings.strip_boilerplate else None
+        for seg in classification.segments:
+            seg_text = ""
+            first_page = max(seg.start_page, 1)
+            # Slice so lazily loaded bundles only decode this segment's pages
+            for page_num, page_data in enumerate(doc_bundle.pages[first_page - 1:seg.end_page], start=first_page):
+                seg_text += f"--- PAGE {page_num} ---\n{strip_boilerplate(page_data['text'], boilerplate)}\n\n"
+            segment_texts[seg.segment_index] = seg_text
+        return classification_json, json.dumps(segment_texts, indent=2)
+    
+    def _parse_llm_response(self, response_text: str, start_counter: int) -> List[Issue]:
+        """Convert the LLM's JSON array into Issue objects"""
+        llm_issues_raw = json.loads(response_text)
+        
+        issues = []
+        for raw_issue in llm_issues_raw:
+            issues.append(Issue(
+                ig_id=raw_issue.get("ig_id", "IG-9"),
+                issue_id=raw_issue.get("issue_id", f"V2-LLM-{start_counter + len(issues):04d}"),
+                agent="V2",
+                severity=IssueSeverity(raw_issue.get("severity", "MAJOR")),
+                message=raw_issue.get("message", "Unknown issue"),
+                location=raw_issue.get("location"),
+                suggested_fix=raw_issue.get("suggested_fix"),
+                auto_fixable=raw_issue.get("auto_fixable", False)
+            ))
+        
+        return issues
     
     def _compute_score(self, issues: List[Issue]) -> float:
         """Compute consistency score from issues"""
@@ -2,11 +2,16 @@
 
 import re
 import json
-from typing import List, Tuple
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from pathlib import Path
 from google import genai
 from google.genai.types import GenerateContentConfig
 from ..schemas import (
+    BoilerplateIndex,
+    CheckCode,
     ClassificationOutput,
     DocumentBundle,
     Issue,
@@ -15,21 +20,50 @@ from ..schemas import (
     DocumentType
 )
 from ..config import settings
+from ..boilerplate import is_boilerplate_snippet
+from ..document_processor import format_page_ranges
+from ..trap_dictionary import get_default_dictionary, words
+from ..trap_signals import TrapHitIndex, rank_windows
+from ..llm_cache import aparse_and_commit, parse_and_commit
+from .check_dependencies import DegradedResult, VerificationMemo, amemoized, memoized
+
+# Generic header/footer content in evidence snippets
+HEADER_FOOTER_PATTERN = re.compile(
+    r'page \d+ of \d+'
+    r'|fax.*?\d{3}[-.]?\d{3}[-.]?\d{4}'
+    r'|medical record number|mrn'
+    r'|date of birth.*?\d{2}/\d{2}/\d{4}',
+    re.IGNORECASE
+)
+
+# Kept when window results report the same trap with different severities
+SEVERITY_RANK = {IssueSeverity.MINOR: 0, IssueSeverity.MAJOR: 1, IssueSeverity.BLOCKER: 2}
+
+
+class TrapShard(NamedTuple):
+    """Document text sent in one LLM trap-check request"""
+    description: str  # which text this is, as stated in the prompt
+    text: str
 
 
 class V3TrapDetector:
     """
     Detects domain-specific classification traps using hybrid approach:
-    - Rule-based pattern matching for obvious traps (vendors, keywords)
+    - Rule-based pattern matching for obvious traps (vendors, keywords), from
+      a per-page index of trap-dictionary hits (trap_dictionary)
     - LLM contextual analysis for subtle traps (gene names in history, etc.)
+      over the page windows with the most trap signals (trap_signals), sent
+      concurrently and merged
     """
     
-    # Trap patterns for rule-based detection
-    VENDOR_ROUTINE_LABS = ["quest", "labcorp", "lab corp"]
-    ADMIN_KEYWORDS = ["requisition", "authorization number", "fax cover", "test request", "specimen receipt"]
+    # Bump when the LLM request or response parsing changes (invalidates stored results)
+    AGENT_VERSION = "3"
     
     def __init__(self, client: genai.Client):
         self.client = client
+        # Trap-dictionary hits of the last bundle, shared by the rule and LLM phases
+        self._trap_hits: Optional[Tuple[DocumentBundle, TrapHitIndex]] = None
+        self._trap_hits_lock = threading.Lock()
         # Load prompt
         prompt_path = Path("Prompts/V3_Trap_Detector_and_Rule_Violation_Checker.txt")
         if not prompt_path.exists():
@@ -40,34 +74,82 @@ class V3TrapDetector:
     def validate(
         self,
         classification: ClassificationOutput,
-        doc_bundle: DocumentBundle
+        doc_bundle: DocumentBundle,
+        memo: Optional[VerificationMemo] = None
     ) -> Tuple[List[Issue], int]:
         """
         Run trap detection checks
         
+        Args:
+            classification: Classification output to validate
+            doc_bundle: Original document bundle
+            memo: Optional per-document memo; checks whose inputs are unchanged
+                since an earlier attempt reuse that attempt's result
+        
         Returns:
             (issues, traps_triggered_count)
         """
-        issues = []
-        issue_counter = 0
+        issues = self._rule_phase(classification, doc_bundle, memo)
         
-        # Get full text
-        full_text = self._get_full_text(doc_bundle)
+        # PHASE 2: LLM contextual analysis
+        try:
+            counter = len(issues)
+            llm_issues = memoized(
+                memo, "V3-llm", classification, doc_bundle,
+                lambda: self._run_llm_check(classification, doc_bundle, counter)
+            )
+            issues.extend(llm_issues)
+        except DegradedResult as e:
+            print(f"    V3: LLM check incomplete: {e}")
+            issues.extend(e.result)
+        except Exception as e:
+            print(f"    V3: LLM check failed: {e}")
         
-        # PHASE 1: Rule-based trap detection
-        rule_issues = self._run_rule_traps(classification, full_text, issue_counter)
-        issues.extend(rule_issues)
-        issue_counter = len(issues)
+        return issues, len(issues)
+    
+    async def avalidate(
+        self,
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        memo: Optional[VerificationMemo] = None
+    ) -> Tuple[List[Issue], int]:
+        """Async counterpart of validate() (LLM phase via the client's aio API)"""
+        issues = self._rule_phase(classification, doc_bundle, memo)
         
-        # PHASE 2: LLM contextual analysis
         try:
-            llm_issues = self._run_llm_check(classification, full_text, issue_counter)
+            counter = len(issues)
+            llm_issues = await amemoized(
+                memo, "V3-llm", classification, doc_bundle,
+                lambda: self._arun_llm_check(classification, doc_bundle, counter)
+            )
             issues.extend(llm_issues)
+        except DegradedResult as e:
+            print(f"    V3: LLM check incomplete: {e}")
+            issues.extend(e.result)
         except Exception as e:
             print(f"    V3: LLM check failed: {e}")
         
         return issues, len(issues)
     
+    def _rule_phase(
+        self,
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        memo: Optional[VerificationMemo] = None
+    ) -> List[Issue]:
+        """PHASE 1: Rule-based trap detection"""
+        return memoized(
+            memo, "V3-rules", classification, doc_bundle,
+            lambda: self._run_rule_traps(classification, self._hit_index(doc_bundle), 0, doc_bundle.boilerplate)
+        )
+    
+    def _hit_index(self, doc_bundle: DocumentBundle) -> TrapHitIndex:
+        """Trap-dictionary hits of every page, scanned once per bundle"""
+        with self._trap_hits_lock:
+            if self._trap_hits is None or self._trap_hits[0] is not doc_bundle:
+                self._trap_hits = (doc_bundle, TrapHitIndex.from_bundle(doc_bundle))
+            return self._trap_hits[1]
+    
     def _get_full_text(self, doc_bundle: DocumentBundle) -> str:
         """Combine all page texts"""
         return "\n".join(page['text'] for page in doc_bundle.pages)
@@ -75,20 +157,28 @@ class V3TrapDetector:
     def _run_rule_traps(
         self,
         classification: ClassificationOutput,
-        full_text: str,
-        start_counter: int
+        trap_hits: TrapHitIndex,
+        start_counter: int,
+        boilerplate: Optional[BoilerplateIndex] = None
     ) -> List[Issue]:
-        """Pattern-based trap detection"""
+        """Pattern-based trap detection
+        
+        Args:
+            trap_hits: Trap-dictionary hits of every page of the document
+            boilerplate: The bundle's repeated header/footer lines; evidence
+                matching them is flagged in addition to the regex patterns
+        """
         issues = []
         
         # Trap 1: Routine lab vendors + Genomic PRIMARY
         for mix in classification.document_mixture:
             if mix.document_type == DocumentType.GENOMIC_REPORT and mix.presence_level == PresenceLevel.PRIMARY:
                 # Check vendor signals
+                dictionary = get_default_dictionary()
                 has_routine_vendor = any(
-                    vendor in vendor_sig.lower()
-                    for vendor in self.VENDOR_ROUTINE_LABS
+                    hit.category == "routine_lab"
                     for vendor_sig in classification.vendor_signals
+                    for hit in dictionary.scan(vendor_sig)
                 )
                 
                 if has_routine_vendor:
@@ -97,6 +187,7 @@ class V3TrapDetector:
                         issue_id=f"V3-{start_counter + len(issues):04d}",
                         agent="V3",
                         severity=IssueSeverity.BLOCKER,
+                        check_code=CheckCode.ROUTINE_LAB_GENOMIC,
                         message=f"Routine lab vendor detected ({', '.join(classification.vendor_signals)}) but Genomic Report marked PRIMARY - likely routine labs, not genomic",
                         location={"document_type": "Genomic Report", "field": "presence_level"},
                         suggested_fix="Reclassify as 'Other' or downgrade to MENTION_ONLY",
@@ -104,8 +195,9 @@ class V3TrapDetector:
                     ))
         
         # Trap 2: Admin keywords + Report classification
-        has_admin = any(keyword in full_text.lower() for keyword in self.ADMIN_KEYWORDS)
-        if has_admin:
+        admin_pages = trap_hits.pages_with("admin")
+        if admin_pages:
+            admin_terms = ", ".join(trap_hits.terms("admin"))
             for mix in classification.document_mixture:
                 if mix.document_type in [DocumentType.GENOMIC_REPORT, DocumentType.PATHOLOGY_REPORT]:
                     if mix.presence_level != PresenceLevel.NO_EVIDENCE:
@@ -114,49 +206,172 @@ class V3TrapDetector:
                             issue_id=f"V3-{start_counter + len(issues):04d}",
                             agent="V3",
                             severity=IssueSeverity.BLOCKER,
-                            message=f"Administrative keywords found (requisition/authorization/fax) but {mix.document_type.value} marked as {mix.presence_level.value}",
+                            check_code=CheckCode.ADMINISTRATIVE_REPORT,
+                            message=f"Administrative keywords found ({admin_terms}) on page(s) {format_page_ranges(admin_pages)} but {mix.document_type.value} marked as {mix.presence_level.value}",
                             location={"document_type": mix.document_type.value},
                             suggested_fix="Reclassify as 'Other' (administrative document)",
                             auto_fixable=False
                         ))
         
-        # Trap 3: Header/footer content check (basic pattern)
-        header_footer_patterns = [
-            r'page \d+ of \d+',
-            r'fax.*?\d{3}[-.]?\d{3}[-.]?\d{4}',
-            r'medical record number|mrn',
-            r'date of birth.*?\d{2}/\d{2}/\d{4}'
-        ]
-        
-        # Check evidence snippets for header/footer content
+        # Trap 3: Header/footer content check (this document's indexed
+        # boilerplate first, then generic patterns)
         for seg in classification.segments:
             for comp in seg.segment_composition:
                 for evidence in comp.top_evidence:
-                    snippet_lower = evidence.snippet.lower()
-                    for pattern in header_footer_patterns:
-                        if re.search(pattern, snippet_lower, re.IGNORECASE):
-                            issues.append(Issue(
-                                ig_id="IG-2",
-                                issue_id=f"V3-{start_counter + len(issues):04d}",
-                                agent="V3",
-                                severity=IssueSeverity.MINOR,
-                                message=f"Evidence snippet in Segment {seg.segment_index} appears to contain header/footer content: '{evidence.snippet[:50]}...'",
-                                location={"segment_index": seg.segment_index, "document_type": comp.document_type.value},
-                                suggested_fix="Exclude header/footer content from evidence",
-                                auto_fixable=False
-                            ))
-                            break  # Only flag once per evidence
+                    if is_boilerplate_snippet(evidence.snippet, boilerplate) or HEADER_FOOTER_PATTERN.search(evidence.snippet):
+                        issues.append(Issue(
+                            ig_id="IG-2",
+                            issue_id=f"V3-{start_counter + len(issues):04d}",
+                            agent="V3",
+                            severity=IssueSeverity.MINOR,
+                            check_code=CheckCode.BOILERPLATE_EVIDENCE,
+                            message=f"Evidence snippet in Segment {seg.segment_index} appears to contain header/footer content: '{evidence.snippet[:50]}...'",
+                            location={"segment_index": seg.segment_index, "document_type": comp.document_type.value},
+                            suggested_fix="Exclude header/footer content from evidence",
+                            auto_fixable=False
+                        ))
         
         return issues
     
+    @property
+    def request_variant(self) -> str:
+        """Settings that shape the LLM requests (part of the stored-result version)"""
+        if settings.v3_trap_scan_mode == "head":
+            return "head"
+        return (f"sharded:{settings.v3_trap_window_pages}x{settings.v3_trap_top_windows}"
+                f":{settings.v3_trap_window_chars}:{get_default_dictionary().digest[:12]}")
+    
+    def _shards(self, doc_bundle: DocumentBundle) -> List[TrapShard]:
+        """Text for the LLM check: the first 4000 characters, or the top trap-signal page windows"""
+        if settings.v3_trap_scan_mode == "head":
+            return [TrapShard("First 4000 characters", self._get_full_text(doc_bundle)[:4000])]
+        
+        windows = rank_windows(self._hit_index(doc_bundle).signals, settings.v3_trap_window_pages, settings.v3_trap_top_windows)
+        shards = []
+        for k, window in enumerate(windows, start=1):
+            pages = doc_bundle.pages[window.first_page - 1:window.last_page]
+            text = "\n".join(f"--- PAGE {n} ---\n{page['text']}" for n, page in enumerate(pages, start=window.first_page))
+            signals = ", ".join(f"{category} x{n}" for category, n in sorted(window.signals.items())) or "none"
+            shards.append(TrapShard(
+                f"Pages {window.first_page}-{window.last_page} of {len(doc_bundle.pages)} "
+                f"(window {k} of {len(windows)}, chosen for trap signals: {signals})",
+                text[:settings.v3_trap_window_chars]
+            ))
+        print(f"    V3 LLM: {len(windows)} trap window(s): "
+              f"{', '.join(f'pages {w.first_page}-{w.last_page}' for w in windows)}")
+        return shards
+    
     def _run_llm_check(
         self,
         classification: ClassificationOutput,
-        full_text: str,
+        doc_bundle: DocumentBundle,
         start_counter: int
     ) -> List[Issue]:
-        """LLM-based contextual trap detection"""
+        """
+        LLM-based contextual trap detection, one concurrent request per shard
         
+        Raises:
+            DegradedResult: A shard request failed; carries the other shards' merged issues
+        """
+        shards = self._shards(doc_bundle)
+        workers = max(1, min(settings.v3_trap_window_concurrency, len(shards)))
+        
+        def check(shard: TrapShard) -> Optional[List[Issue]]:
+            try:
+                return self._check_shard(classification, shard, start_counter)
+            except Exception:
+                return None
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="v3-window") as executor:
+            results = list(executor.map(check, shards))
+        return self._merge_shard_results(results, start_counter)
+    
+    async def _arun_llm_check(
+        self,
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        start_counter: int
+    ) -> List[Issue]:
+        """Async LLM-based contextual trap detection (at most v3_trap_window_concurrency shards in flight)"""
+        shards = self._shards(doc_bundle)
+        semaphore = asyncio.Semaphore(max(1, settings.v3_trap_window_concurrency))
+        
+        async def check(shard: TrapShard) -> Optional[List[Issue]]:
+            async with semaphore:
+                try:
+                    return await self._acheck_shard(classification, shard, start_counter)
+                except Exception:
+                    return None
+        
+        results = await asyncio.gather(*(check(shard) for shard in shards))
+        return self._merge_shard_results(list(results), start_counter)
+    
+    def _check_shard(self, classification: ClassificationOutput, shard: TrapShard, start_counter: int) -> List[Issue]:
+        """One LLM trap-check request"""
+        request = self._llm_request(classification, shard)
+        try:
+            response = self.client.models.generate_content(**request)
+            return parse_and_commit(response, lambda r: self._parse_llm_response(r.text, start_counter))
+        except json.JSONDecodeError as e:
+            print(f"    V3 LLM: Failed to parse JSON: {e}")
+            raise
+        except Exception as e:
+            print(f"    V3 LLM: Error: {e}")
+            raise
+    
+    async def _acheck_shard(self, classification: ClassificationOutput, shard: TrapShard, start_counter: int) -> List[Issue]:
+        """Async counterpart of _check_shard()"""
+        request = self._llm_request(classification, shard)
+        try:
+            response = await self.client.aio.models.generate_content(**request)
+            return await aparse_and_commit(response, lambda r: self._parse_llm_response(r.text, start_counter))
+        except json.JSONDecodeError as e:
+            print(f"    V3 LLM: Failed to parse JSON: {e}")
+            raise
+        except Exception as e:
+            print(f"    V3 LLM: Error: {e}")
+            raise
+    
+    def _merge_shard_results(self, results: List[Optional[List[Issue]]], start_counter: int) -> List[Issue]:
+        """Merge shard issues, raising DegradedResult when a shard failed (None)"""
+        failed = sum(result is None for result in results)
+        issues = self._merge_shard_issues([result for result in results if result is not None], start_counter)
+        if failed:
+            raise DegradedResult(issues, f"{failed} of {len(results)} trap window request(s) failed")
+        return issues
+    
+    def _merge_shard_issues(self, results: List[List[Issue]], start_counter: int) -> List[Issue]:
+        """
+        Combine per-shard issues
+        
+        Windows often report the same trap; issues with the same ig_id,
+        check_code, location and message (compared case- and
+        punctuation-insensitively) are merged, keeping the most severe.
+        Different traps sharing a coarse location are all kept. Issue ids are
+        reassigned since every window numbers its issues from 0001.
+        """
+        if len(results) <= 1:
+            return results[0] if results else []
+        
+        merged: Dict[Tuple[str, Optional[str], str, str], Issue] = {}
+        for issues in results:
+            for issue in issues:
+                key = (
+                    issue.ig_id,
+                    issue.check_code,
+                    json.dumps(issue.location, sort_keys=True, default=str),
+                    " ".join(words(issue.message.lower())),
+                )
+                kept = merged.get(key)
+                if kept is None or SEVERITY_RANK[issue.severity] > SEVERITY_RANK[kept.severity]:
+                    merged[key] = issue
+        return [
+            issue.model_copy(update={"issue_id": f"V3-LLM-{start_counter + i:04d}"})
+            for i, issue in enumerate(merged.values())
+        ]
+    
+    def _llm_request(self, classification: ClassificationOutput, shard: TrapShard) -> dict:
+        """Build the generate_content arguments for contextual trap detection"""
         classification_json = classification.model_dump_json(indent=2)
         
         full_prompt = f"""{self.prompt_base}
@@ -165,7 +380,7 @@ class V3TrapDetector:
 
 You will receive:
 1. "classification_output": Complete ClassificationOutput JSON
-2. "document_text": First 4000 characters for context
+2. "document_text": {shard.description}
 
 ===== OUTPUT FORMAT =====
 
@@ -188,42 +403,36 @@ If no traps: return []
 CLASSIFICATION OUTPUT:
 {classification_json}
 
-DOCUMENT TEXT (first 4000 chars):
-{full_text[:4000]}
+DOCUMENT TEXT ({shard.description}):
+{shard.text}
 
 ===== YOUR OUTPUT (JSON array) =====
 """
         
-        try:
-            response = self.client.models.generate_content(
-                model=settings.gemini_model,
-                contents=full_prompt,
-                config=GenerateContentConfig(
-                    temperature=0.0,
-                    response_mime_type="application/json"
-                )
-            )
-            
-            llm_issues_raw = json.loads(response.text)
-            issues = []
-            
-            for raw in llm_issues_raw:
-                issues.append(Issue(
-                    ig_id=raw.get("ig_id", "X1"),
-                    issue_id=raw.get("issue_id", f"V3-LLM-{start_counter + len(issues):04d}"),
-                    agent="V3",
-                    severity=IssueSeverity(raw.get("severity", "MAJOR")),
-                    message=raw.get("message", "Unknown trap"),
-                    location=raw.get("location"),
-                    suggested_fix=raw.get("suggested_fix"),
-                    auto_fixable=raw.get("auto_fixable", False)
-                ))
-            
-            return issues
-            
-        except json.JSONDecodeError as e:
-            print(f"    V3 LLM: Failed to parse JSON: {e}")
-            return []
-        except Exception as e:
-            print(f"    V3 LLM: Error: {e}")
-            raise
+        return {
+            "model": settings.gemini_model,
+            "contents": full_prompt,
+            "config": GenerateContentConfig(
+                temperature=0.0,
+                response_mime_type="application/json"
+            ),
+        }
+    
+    def _parse_llm_response(self, response_text: str, start_counter: int) -> List[Issue]:
+        """Convert the LLM's JSON array into Issue objects"""
+        llm_issues_raw = json.loads(response_text)
+        issues = []
+        
+        for raw in llm_issues_raw:
+            issues.append(Issue(
+                ig_id=raw.get("ig_id", "X1"),
+                issue_id=raw.get("issue_id", f"V3-LLM-{start_counter + len(issues):04d}"),
+                agent="V3",
+                severity=IssueSeverity(raw.get("severity", "MAJOR")),
+                message=raw.get("message", "Unknown trap"),
+                location=raw.get("location"),
+                suggested_fix=raw.get("suggested_fix"),
+                auto_fixable=raw.get("auto_fixable", False)
+            ))
+        
+        return issues
@@ -1,27 +1,49 @@
-"""V4: Evidence Quality Assessor - Full LLM-based semantic analysis"""
+"""V4: Evidence Quality Assessor - Local evidence screening plus LLM semantic analysis"""
 
 import json
-from typing import List, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from pathlib import Path
 from google import genai
 from google.genai.types import GenerateContentConfig
 from ..schemas import (
+    CheckCode,
     ClassificationOutput,
     DocumentBundle,
     Issue,
-    IssueSeverity
+    IssueSeverity,
+    PresenceLevel
 )
 from ..config import settings
+from ..boilerplate import strip_boilerplate
+from ..evidence_matcher import EvidenceIndex, MatchStatus
+from ..payload_planner import get_default_planner, log_plan
+from ..llm_cache import aparse_and_commit, parse_and_commit
+from .check_dependencies import VerificationMemo, amemoized, memoized
+
+
+class EvidenceScreening(NamedTuple):
+    """Result of the local evidence check"""
+    issues: List[Issue]  # fabricated, misplaced and anchor issues found locally
+    unresolved_pages: List[int]  # pages the LLM needs to judge partially matched snippets
+    verified: int  # snippets located on their claimed page
 
 
 class V4EvidenceQualityAssessor:
     """
-    Assesses evidence quality using full LLM-based semantic understanding.
-    Checks snippet relevance, anchor appropriateness, and confidence alignment.
+    Assesses evidence quality in two phases:
+    - Local screening: every snippet and anchor is located on its claimed page
+      (evidence_matcher); fabricated or misplaced evidence is reported directly
+    - LLM semantic analysis of snippet relevance, anchor appropriateness and
+      confidence alignment, with page text only for snippets the screening
+      could not resolve
     """
     
+    # Bump when the LLM request or response parsing changes (invalidates stored results)
+    AGENT_VERSION = "3"
+    
     def __init__(self, client: genai.Client):
         self.client = client
+        self.planner = get_default_planner()
         # Load prompt
         prompt_path = Path("Prompts/V4_Evidence_Quality_Assessor.txt")
         if not prompt_path.exists():
@@ -29,10 +51,17 @@ class V4EvidenceQualityAssessor:
         with open(prompt_path, "r") as f:
             self.prompt_base = f.read()
     
+    @property
+    def request_variant(self) -> str:
+        """Settings that shape the LLM request (part of the stored-result version)"""
+        screening = "screened" if settings.v4_local_evidence_check else "unscreened"
+        return f"{self.planner.variant}:{screening}"
+    
     def validate(
         self,
         classification: ClassificationOutput,
-        doc_bundle: DocumentBundle
+        doc_bundle: DocumentBundle,
+        memo: Optional[VerificationMemo] = None
     ) -> Tuple[List[Issue], float]:
         """
         Assess evidence quality with independent verification against source PDF
@@ -40,41 +69,217 @@ class V4EvidenceQualityAssessor:
         Args:
             classification: Classification output to validate
             doc_bundle: Original document bundle for independent verification
+            memo: Optional per-document memo; reuses an earlier attempt's result
+                when the evidence, labels and page ranges are unchanged
             
         Returns:
             (issues, evidence_quality_score)
             evidence_quality_score: 0.0-1.0
         """
+        screening = self._screen_evidence(classification, doc_bundle)
         
-        classification_json = classification.model_dump_json(indent=2)
+        def assess():
+            response = self.client.models.generate_content(**self._llm_request(classification, doc_bundle, screening))
+            return parse_and_commit(response, lambda r: self._parse_response(r.text, classification))
+        
+        try:
+            llm_issues, _ = memoized(memo, "V4", classification, doc_bundle, assess)
+        except json.JSONDecodeError as e:
+            print(f"    V4 LLM: Failed to parse JSON: {e}")
+            llm_issues = []
+        except Exception as e:
+            print(f"    V4 LLM: Error: {e}")
+            llm_issues = []
+        
+        issues = (screening.issues if screening else []) + llm_issues
+        return issues, self._compute_quality_score(issues, classification)
+    
+    async def avalidate(
+        self,
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        memo: Optional[VerificationMemo] = None
+    ) -> Tuple[List[Issue], float]:
+        """Async counterpart of validate() using the client's aio API"""
+        screening = self._screen_evidence(classification, doc_bundle)
+        
+        async def assess():
+            response = await self.client.aio.models.generate_content(**self._llm_request(classification, doc_bundle, screening))
+            return await aparse_and_commit(response, lambda r: self._parse_response(r.text, classification))
+        
+        try:
+            llm_issues, _ = await amemoized(memo, "V4", classification, doc_bundle, assess)
+        except json.JSONDecodeError as e:
+            print(f"    V4 LLM: Failed to parse JSON: {e}")
+            llm_issues = []
+        except Exception as e:
+            print(f"    V4 LLM: Error: {e}")
+            llm_issues = []
+        
+        issues = (screening.issues if screening else []) + llm_issues
+        return issues, self._compute_quality_score(issues, classification)
+    
+    def _screen_evidence(
+        self,
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle
+    ) -> Optional[EvidenceScreening]:
+        """
+        PHASE 1: Locate every snippet and anchor on its claimed page (local, zero cost)
+        
+        Returns:
+            EvidenceScreening, or None when settings.v4_local_evidence_check is off
+        """
+        if not settings.v4_local_evidence_check:
+            return None
+        
+        pages = {n for seg in classification.segments for n in range(seg.start_page, seg.end_page + 1)}
+        pages |= {ev.page for seg in classification.segments for comp in seg.segment_composition for ev in comp.top_evidence}
+        index = EvidenceIndex.from_bundle(doc_bundle, pages)
+        
+        issues = []
+        unresolved = set()
+        verified = 0
+        
+        def add_issue(severity: IssueSeverity, check_code: CheckCode, message: str, location: Dict, suggested_fix: str):
+            issues.append(Issue(
+                ig_id="IG-3",
+                issue_id=f"V4-EV-{len(issues) + 1:04d}",
+                agent="V4",
+                severity=severity,
+                check_code=check_code,
+                message=message,
+                location=location,
+                suggested_fix=suggested_fix,
+                auto_fixable=False
+            ))
         
-        # NEW: Build PDF context for independent evidence verification
-        pdf_context = {}
         for seg in classification.segments:
-            for page_num in range(seg.start_page, seg.end_page + 1):
-                if page_num <= len(doc_bundle.pages):
-                    page_data = doc_bundle.pages[page_num - 1]
-                    pdf_context[page_num] = {
-                        "text": page_data['text'],
-                        "paragraph_count": len(page_data.get('paragraphs', []))
+            for comp in seg.segment_composition:
+                for evidence_index, evidence in enumerate(comp.top_evidence):
+                    label = f"Segment {seg.segment_index}, {comp.document_type.value}"
+                    location = {
+                        "segment_index": seg.segment_index,
+                        "document_type": comp.document_type.value,
+                        "field": "top_evidence",
+                        "evidence_index": evidence_index,
+                        "page": evidence.page,
                     }
+                    match = index.match_snippet(evidence.snippet, evidence.page)
+                    
+                    if match.status == MatchStatus.NOT_FOUND:
+                        add_issue(
+                            IssueSeverity.BLOCKER if comp.presence_level == PresenceLevel.PRIMARY else IssueSeverity.MAJOR,
+                            CheckCode.EVIDENCE_NOT_FOUND,
+                            f"{label}: evidence snippet not found in the document text (claimed page {evidence.page})",
+                            location,
+                            "Quote evidence verbatim from the document"
+                        )
+                        continue
+                    if match.status == MatchStatus.MISPLACED:
+                        add_issue(
+                            IssueSeverity.MAJOR,
+                            CheckCode.EVIDENCE_MISPLACED,
+                            f"{label}: evidence snippet is on page {match.page}, not the claimed page {evidence.page}",
+                            location,
+                            f"Set evidence page to {match.page}"
+                        )
+                        continue
+                    if match.status == MatchStatus.UNRESOLVED:
+                        unresolved.add(evidence.page)
+                        continue
+                    
+                    verified += 1
+                    for anchor in evidence.anchors_found:
+                        if not index.find_anchor(anchor, evidence.page):
+                            add_issue(
+                                IssueSeverity.MAJOR,
+                                CheckCode.ANCHOR_NOT_FOUND,
+                                f"{label}: anchor '{anchor}' not found on page {evidence.page}",
+                                {**location, "field": "anchors_found", "anchor": anchor},
+                                "List only anchors that appear on the evidence page"
+                            )
         
-        pdf_context_json = json.dumps(pdf_context, indent=2)
+        if issues or unresolved:
+            print(f"    V4: Evidence screening: {verified} verified, {len(issues)} issues, {len(unresolved)} pages left to the LLM")
+        return EvidenceScreening(issues, sorted(unresolved), verified)
+    
+    def _page_context(self, classification: ClassificationOutput, doc_bundle: DocumentBundle, pages: Optional[List[int]]) -> Dict[int, dict]:
+        """Page text for the prompt: every segment page, or only the listed pages"""
+        boilerplate = doc_bundle.boilerplate if settings.strip_boilerplate else None
+        if pages is None:
+            ranges = [(max(seg.start_page, 1), seg.end_page) for seg in classification.segments]
+        else:
+            ranges = [(n, n) for n in pages if 1 <= n <= len(doc_bundle.pages)]
+        
+        pdf_context = {}
+        for first_page, last_page in ranges:
+            # Slice so lazily loaded bundles only decode these pages
+            for page_num, page_data in enumerate(doc_bundle.pages[first_page - 1:last_page], start=first_page):
+                pdf_context[page_num] = {
+                    "text": strip_boilerplate(page_data['text'], boilerplate),
+                    "paragraph_count": len(page_data.get('paragraphs', []))
+                }
+        return pdf_context
+    
+    def _llm_request(
+        self,
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        screening: Optional[EvidenceScreening] = None
+    ) -> dict:
+        """Build the generate_content arguments; page text is limited to what the screening left unresolved"""
+        if screening is None:
+            # No local screening: the LLM verifies existence against the evidence pages (every segment page in "full" mode)
+            plan = self.planner.plan(classification, doc_bundle, reasons=("evidence", "anchor"))
+        else:
+            plan = self.planner.plan(classification, doc_bundle, reasons=(), extra_pages=screening.unresolved_pages)
+        if plan is not None:
+            log_plan("V4", plan, len(doc_bundle.pages))
+            classification_json, pdf_context_json = plan.classification_json, plan.text
+        else:
+            classification_json = classification.model_dump_json(indent=2)
+            pages = None if screening is None else screening.unresolved_pages
+            pdf_context_json = json.dumps(self._page_context(classification, doc_bundle, pages), indent=2)
+        
+        if screening is None:
+            task = """- Assess evidence quality for all document types across all segments
+- VERIFY that evidence snippets actually exist in the PDF text
+- CHECK that anchors are present on the claimed pages
+- FLAG any evidence that cannot be verified in the source"""
+            inputs = f"""You will receive:
+1. ClassificationOutput JSON with evidence snippets and anchors
+2. Actual PDF text from the document for independent verification"""
+            data = f"""ACTUAL PDF TEXT (for independent verification):
+{pdf_context_json}"""
+        else:
+            screened = [
+                {"location": issue.location, "message": issue.message} for issue in screening.issues
+            ]
+            task = """- Assess evidence quality for all document types across all segments
+- Snippet and anchor existence has already been checked against the PDF text:
+  do NOT report evidence or anchors as missing from the document, and do NOT
+  repeat the locally detected issues listed below
+- For evidence on the pages whose text is provided, judge whether the snippet
+  is a faithful (possibly OCR-damaged or abridged) quote of that page"""
+            inputs = f"""You will receive:
+1. ClassificationOutput JSON with evidence snippets and anchors
+2. Issues already found by local evidence verification ({screening.verified} snippets verified on their pages)
+3. PDF text only for pages whose evidence could not be verified locally"""
+            data = f"""LOCALLY DETECTED EVIDENCE ISSUES (already reported):
+{json.dumps(screened, indent=2 if plan is None else None)}
+
+PDF TEXT FOR UNVERIFIED EVIDENCE PAGES:
+{pdf_context_json}"""
         
-        # Build enhanced prompt with actual PDF text
         full_prompt = f"""{self.prompt_base}
 
 ===== INPUT FORMAT =====
 
-You will receive:
-1. ClassificationOutput JSON with evidence snippets and anchors
-2. Actual PDF text from the document for independent verification
+{inputs}
 
 Your task: 
-- Assess evidence quality for all document types across all segments
-- VERIFY that evidence snippets actually exist in the PDF text
-- CHECK that anchors are present on the claimed pages
-- FLAG any evidence that cannot be verified in the source
+{task}
 
 ===== OUTPUT FORMAT =====
 
@@ -101,48 +306,45 @@ If no issues: return []
 CLASSIFICATION OUTPUT:
 {classification_json}
 
-ACTUAL PDF TEXT (for independent verification):
-{pdf_context_json}
+{data}
 
 ===== YOUR OUTPUT (JSON array) =====
 """
         
-        try:
-            response = self.client.models.generate_content(
-                model=settings.gemini_model,
-                contents=full_prompt,
-                config=GenerateContentConfig(
-                    temperature=0.0,
-                    response_mime_type="application/json"
-                )
-            )
-            
-            llm_issues_raw = json.loads(response.text)
-            issues = []
-            
-            for raw in llm_issues_raw:
-                issues.append(Issue(
-                    ig_id=raw.get("ig_id", "IG-3"),
-                    issue_id=raw.get("issue_id", f"V4-{len(issues):04d}"),
-                    agent="V4",
-                    severity=IssueSeverity(raw.get("severity", "MAJOR")),
-                    message=raw.get("message", "Unknown evidence issue"),
-                    location=raw.get("location"),
-                    suggested_fix=raw.get("suggested_fix"),
-                    auto_fixable=raw.get("auto_fixable", False)
-                ))
-            
-            # Compute quality score
-            score = self._compute_quality_score(issues, classification)
-            
-            return issues, score
-            
-        except json.JSONDecodeError as e:
-            print(f"    V4 LLM: Failed to parse JSON: {e}")
-            return [], 1.0
-        except Exception as e:
-            print(f"    V4 LLM: Error: {e}")
-            return [], 1.0
+        return {
+            "model": settings.gemini_model,
+            "contents": full_prompt,
+            "config": GenerateContentConfig(
+                temperature=0.0,
+                response_mime_type="application/json"
+            ),
+        }
+    
+    def _parse_response(
+        self,
+        response_text: str,
+        classification: ClassificationOutput
+    ) -> Tuple[List[Issue], float]:
+        """Convert the LLM's JSON array into Issue objects and score evidence quality"""
+        llm_issues_raw = json.loads(response_text)
+        issues = []
+        
+        for raw in llm_issues_raw:
+            issues.append(Issue(
+                ig_id=raw.get("ig_id", "IG-3"),
+                issue_id=raw.get("issue_id", f"V4-{len(issues):04d}"),
+                agent="V4",
+                severity=IssueSeverity(raw.get("severity", "MAJOR")),
+                message=raw.get("message", "Unknown evidence issue"),
+                location=raw.get("location"),
+                suggested_fix=raw.get("suggested_fix"),
+                auto_fixable=raw.get("auto_fixable", False)
+            ))
+        
+        # Compute quality score
+        score = self._compute_quality_score(issues, classification)
+        
+        return issues, score
     
     def _compute_quality_score(
         self,
@@ -1,9 +1,10 @@
 """V5: Arbiter Agent - Final decision maker for classification output"""
 
-from typing import Tuple
+from typing import List, Tuple
 from ..schemas import (
     VerificationReport,
     ArbiterDecision,
+    Issue,
     IssueSeverity
 )
 
@@ -73,6 +74,22 @@ class V5ArbiterAgent:
             fixable_count=fixable_count
         )
     
+    def is_settled(self, issues: List[Issue]) -> bool:
+        """
+        True when no further issues can change the decision reached on ``issues``
+        
+        Rules 1-4 (BLOCKER, ≥3 MAJOR, non-fixable MAJOR) only count upwards,
+        so once one of them escalates, issues from agents that have not
+        finished yet cannot turn the decision back.
+        """
+        blocker_count = len([i for i in issues if i.severity == IssueSeverity.BLOCKER])
+        major_count = len([i for i in issues if i.severity == IssueSeverity.MAJOR])
+        major_non_fixable = len([
+            i for i in issues
+            if i.severity == IssueSeverity.MAJOR and not i.auto_fixable
+        ])
+        return blocker_count > 0 or major_count >= 3 or major_non_fixable >= 1
+    
     def _apply_decision_rules(
         self,
         blocker_count: int,
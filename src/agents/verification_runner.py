@@ -1,15 +1,27 @@
 """Verification Runner - Orchestrates all V1-V4 agents"""
 
-from typing import Tuple
+import asyncio
+import functools
+import hashlib
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from google import genai
 from ..config import settings
+from ..genai_client import create_genai_client
+from ..checkpoint import CheckpointJournal
+from ..verification_store import VerificationResultStore, agent_version, get_default_verification_store
 from ..schemas import (
+    ArbiterDecision,
     ClassificationOutput,
     DocumentBundle,
     VerificationReport,
     Issue,
     IssueSeverity
 )
+from .check_dependencies import VerificationMemo, memoized, track_failed_checks
 from .v1_schema_validator import V1SchemaValidator
 from .v2_consistency_checker import V2ConsistencyChecker
 from .v3_trap_detector import V3TrapDetector
@@ -21,17 +33,68 @@ from .output_saver import AgentOutputSaver
 class VerificationRunner:
     """
     Orchestrates all V1-V5 verification agents.
-    Runs agents in sequence and consolidates results into unified report.
+    V1 runs first (rule-based), then the independent V2-V4 LLM agents run
+    either concurrently or in sequence, and results are consolidated into
+    a unified report in fixed V1 → V4 order.
+    
+    LLM check results are persisted in a VerificationResultStore (when
+    enabled), so verifying a classification/bundle pair seen in an earlier
+    run reuses those results instead of calling Gemini again.
+    
+    In decision-bound mode the runner stops waiting for V2-V4 as soon as the
+    issues found so far force ESCALATE_TO_SME (V5ArbiterAgent.is_settled);
+    the remaining agents are reported as skipped and, optionally, finished
+    in the background to enrich the SME packet (see enrich_report).
     """
     
-    def __init__(self):
-        """Initialize all agents and Gemini client"""
+    # Result used for an LLM agent that did not finish (timed out or skipped)
+    TIMEOUT_RESULTS = {
+        "V2": ([], None),
+        "V3": ([], 0),
+        "V4": ([], None),
+    }
+    
+    def __init__(
+        self,
+        client: Optional[genai.Client] = None,
+        concurrent: Optional[bool] = None,
+        agent_timeout: Optional[float] = None,
+        journal: Optional[CheckpointJournal] = None,
+        decision_bound: Optional[bool] = None,
+        enrich_skipped: Optional[bool] = None,
+        result_store: Optional[VerificationResultStore] = None
+    ):
+        """
+        Initialize all agents and Gemini client
+        
+        Args:
+            client: Shared Gemini client (created via create_genai_client if not provided)
+            concurrent: Run V2-V4 concurrently (defaults to settings.verification_concurrent)
+            agent_timeout: Seconds to wait for each V2-V4 agent (defaults to settings.verification_agent_timeout)
+            journal: Optional checkpoint journal; V-agent results already recorded for the
+                same document and classification are restored instead of re-run
+            decision_bound: Skip remaining LLM agents once the decision is settled
+                (defaults to settings.verification_decision_bound)
+            enrich_skipped: Let skipped agents finish in the background for the SME packet
+                (defaults to settings.verification_enrich_skipped)
+            result_store: Persistent store for LLM check results (defaults to the shared
+                store when settings.verification_store_enabled)
+        """
         # Initialize Gemini client for LLM-based agents
-        self.client = genai.Client(
-            vertexai=True,
-            project=settings.gcp_project_id,
-            location=settings.vertex_ai_location
-        )
+        self.client = client or create_genai_client()
+        self.concurrent = settings.verification_concurrent if concurrent is None else concurrent
+        self.agent_timeout = settings.verification_agent_timeout if agent_timeout is None else agent_timeout
+        self.journal = journal
+        self.decision_bound = settings.verification_decision_bound if decision_bound is None else decision_bound
+        self.enrich_skipped = settings.verification_enrich_skipped if enrich_skipped is None else enrich_skipped
+        if result_store is None and settings.verification_store_enabled:
+            result_store = get_default_verification_store()
+        self.result_store = result_store
+        
+        # Skipped agents still running for enrichment: doc_id -> {agent: future or task}
+        self._deferred: Dict[str, Dict[str, Any]] = {}
+        self._deferred_lock = threading.Lock()
+        self._background: Optional[ThreadPoolExecutor] = None
         
         # Initialize agents
         self.v1 = V1SchemaValidator()
@@ -40,10 +103,20 @@ class VerificationRunner:
         self.v4 = V4EvidenceQualityAssessor(self.client)
         self.v5 = V5ArbiterAgent()
     
+    def create_memo(self) -> VerificationMemo:
+        """Per-document memo backed by the result store, which persists the LLM checks"""
+        versions = {
+            "V2-llm": agent_version(self.v2),
+            "V3-llm": agent_version(self.v3),
+            "V4": agent_version(self.v4),
+        }
+        return VerificationMemo(store=self.result_store, versions=versions)
+    
     def run_all(
         self,
         classification: ClassificationOutput,
-        doc_bundle: DocumentBundle
+        doc_bundle: DocumentBundle,
+        memo: Optional[VerificationMemo] = None
     ) -> VerificationReport:
         """
         Run all verification agents (V1-V5) and return unified report
@@ -51,16 +124,112 @@ class VerificationRunner:
         Args:
             classification: Output from primary classifier
             doc_bundle: Original document bundle
+            memo: Optional per-document memo shared across retry attempts; checks
+                whose inputs did not change reuse the earlier result (a store-backed
+                memo is created when omitted and a result store is configured)
             
         Returns:
             VerificationReport with all issues and scores
         """
+        memo = self._memo_for_run(memo)
+        hits_before = memo.hit_counts() if memo else Counter()
+        stored_before = memo.stored_hit_counts() if memo else Counter()
+        saver, digest, v1_issues = self._run_v1(classification, doc_bundle, memo)
+        
+        # V2-V4: independent LLM agents (each is a separate Gemini round trip)
+        llm_agents = [
+            ("V2", self._checkpointed("V2", self._with_memo(self.v2.validate, memo), doc_bundle.doc_id, digest)),
+            ("V3", self._checkpointed("V3", self._with_memo(self.v3.validate, memo), doc_bundle.doc_id, digest)),
+            ("V4", self._checkpointed("V4", self._with_memo(self.v4.validate, memo), doc_bundle.doc_id, digest)),
+        ]
+        if self._settled(v1_issues):
+            print("  V2-V4: Decision settled by V1, skipping LLM agents")
+            results, timed_out, skipped = self._skip_agents(llm_agents, classification, doc_bundle)
+        elif self.concurrent:
+            print("  V2-V4: Running LLM agents concurrently...")
+            results, timed_out, skipped = self._run_agents_concurrently(llm_agents, classification, doc_bundle, v1_issues)
+        else:
+            results, timed_out, skipped = self._run_agents_sequentially(llm_agents, classification, doc_bundle, v1_issues)
+        
+        self._defer(doc_bundle.doc_id, skipped)
+        reused = self._report_reuse(memo, hits_before, stored_before)
+        return self._consolidate(saver, v1_issues, results, timed_out, list(skipped), reused)
+    
+    async def arun_all(
+        self,
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        memo: Optional[VerificationMemo] = None
+    ) -> Tuple[VerificationReport, ArbiterDecision]:
+        """
+        Async counterpart of run_all(): V2-V4 run as tasks on the event loop
+        
+        Args:
+            classification: Output from primary classifier
+            doc_bundle: Original document bundle
+            memo: Optional per-document memo shared across retry attempts
+            
+        Returns:
+            VerificationReport with all issues and scores, and the V5 decision
+        """
+        memo = self._memo_for_run(memo)
+        hits_before = memo.hit_counts() if memo else Counter()
+        stored_before = memo.stored_hit_counts() if memo else Counter()
+        saver, digest, v1_issues = self._run_v1(classification, doc_bundle, memo)
+        
+        llm_agents = [
+            ("V2", self._acheckpointed("V2", self._with_memo(self.v2.avalidate, memo), doc_bundle.doc_id, digest)),
+            ("V3", self._acheckpointed("V3", self._with_memo(self.v3.avalidate, memo), doc_bundle.doc_id, digest)),
+            ("V4", self._acheckpointed("V4", self._with_memo(self.v4.avalidate, memo), doc_bundle.doc_id, digest)),
+        ]
+        if self._settled(v1_issues):
+            print("  V2-V4: Decision settled by V1, skipping LLM agents")
+            if self.enrich_skipped:
+                skipped = {name: asyncio.ensure_future(avalidate(classification, doc_bundle)) for name, avalidate in llm_agents}
+            else:
+                skipped = {name: None for name, _ in llm_agents}
+            results = {name: self.TIMEOUT_RESULTS[name] for name, _ in llm_agents}
+            timed_out = []
+        else:
+            results, timed_out, skipped = await self._arun_agents(llm_agents, classification, doc_bundle, v1_issues)
+        
+        self._defer(doc_bundle.doc_id, skipped)
+        reused = self._report_reuse(memo, hits_before, stored_before)
+        return self._consolidate(saver, v1_issues, results, timed_out, list(skipped), reused)
+    
+    def _memo_for_run(self, memo: Optional[VerificationMemo]) -> Optional[VerificationMemo]:
+        """The caller's memo, or a store-backed one for a standalone run"""
+        if memo is None and self.result_store is not None:
+            return self.create_memo()
+        return memo
+    
+    @staticmethod
+    def _report_reuse(memo: Optional[VerificationMemo], hits_before: Counter, stored_before: Counter) -> List[str]:
+        """Checks reused in this run, printing those restored from the result store"""
+        if memo is None:
+            return []
+        stored = memo.stored_since(stored_before)
+        if stored:
+            print(f"  ♻️  Restored from result store: {', '.join(stored)}")
+        return memo.reused_since(hits_before)
+    
+    @staticmethod
+    def _with_memo(validate: Callable, memo: Optional[VerificationMemo]) -> Callable:
+        """Bind the memo to an agent's validate()/avalidate() when one is in use"""
+        return validate if memo is None else functools.partial(validate, memo=memo)
+    
+    def _run_v1(
+        self,
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        memo: Optional[VerificationMemo] = None
+    ) -> Tuple[AgentOutputSaver, Optional[str], List[Issue]]:
+        """Start the output saver and run V1; returns (saver, classification digest, V1 issues)"""
         # NEW: Initialize output saver
         saver = AgentOutputSaver(doc_bundle.doc_id)
         saver.save_primary_classification(classification)
         
-        all_issues = []
-        llm_calls = 0
+        digest = self._classification_digest(classification) if self.journal else None
         
         print("\n" + "="*60)
         print("RUNNING VERIFICATION AGENTS (V1-V4)")
@@ -68,44 +237,61 @@ class VerificationRunner:
         
         # V1: Schema validation (rule-based, no LLM)
         print("  V1: Schema & Completeness Validator (rule-based)...")
-        v1_issues = self.v1.validate(classification, doc_bundle)
+        def v1_validate(classification: ClassificationOutput, doc_bundle: DocumentBundle) -> List[Issue]:
+            return memoized(memo, "V1", classification, doc_bundle, lambda: self.v1.validate(classification, doc_bundle))
+        
+        v1_issues = self._checkpointed("V1", v1_validate, doc_bundle.doc_id, digest)(classification, doc_bundle)
         saver.save_agent_output("v1_schema_validation", v1_issues)
-        all_issues.extend(v1_issues)
-        v1_passed = len([i for i in v1_issues if i.severity == IssueSeverity.BLOCKER]) == 0
         print(f"      ✓ Issues found: {len(v1_issues)}")
         
-        # V2: Consistency checking (hybrid: rules + LLM)
+        return saver, digest, v1_issues
+    
+    def _consolidate(
+        self,
+        saver: AgentOutputSaver,
+        v1_issues: List[Issue],
+        results: Dict[str, tuple],
+        timed_out: List[str],
+        skipped: List[str] = (),
+        reused: List[str] = ()
+    ) -> Tuple[VerificationReport, ArbiterDecision]:
+        """Merge V1-V4 results into the report and run the V5 arbiter"""
+        all_issues = list(v1_issues)
+        llm_calls = 0
+        v1_passed = len([i for i in v1_issues if i.severity == IssueSeverity.BLOCKER]) == 0
+        
+        # Consolidate in fixed V2 → V3 → V4 order so issue ordering is deterministic
         print("  V2: Consistency Checker (hybrid)...")
-        v2_issues, consistency_score = self.v2.validate(classification, doc_bundle)
+        v2_issues, consistency_score = results["V2"]
         saver.save_agent_output("v2_consistency_check", v2_issues, consistency_score)
         all_issues.extend(v2_issues)
-        # Count LLM call (only if no BLOCKER in V1 and V2 rules)
+        # Count LLM call (only if no BLOCKER in V2 rules and not served from the memo)
         v2_blocker_in_rules = any(
             i.severity == IssueSeverity.BLOCKER 
             for i in v2_issues 
             if "V2-" in i.issue_id and not "LLM" in i.issue_id
         )
-        if not v1_passed or not v2_blocker_in_rules:
+        if v2_blocker_in_rules or "V2" in skipped or "V2-llm" in reused:
             pass  # LLM was skipped
         else:
             llm_calls += 1
-        print(f"      ✓ Issues found: {len(v2_issues)}, Consistency score: {consistency_score:.2f}")
+        print(f"      ✓ Issues found: {len(v2_issues)}, Consistency score: {self._format_score(consistency_score)}")
         
         # V3: Trap detection (hybrid: patterns + LLM)
         print("  V3: Trap Detector (hybrid)...")
-        v3_issues, traps_triggered = self.v3.validate(classification, doc_bundle)
+        v3_issues, traps_triggered = results["V3"]
         saver.save_agent_output("v3_trap_detection", v3_issues, metadata={"traps_triggered": traps_triggered})
         all_issues.extend(v3_issues)
-        llm_calls += 1
+        llm_calls += 0 if "V3" in skipped or "V3-llm" in reused else 1
         print(f"      ✓ Traps detected: {traps_triggered}")
         
         # V4: Evidence quality (full LLM) - NOW WITH DOCUMENTBUNDLE
         print("  V4: Evidence Quality Assessor (LLM with PDF verification)...")
-        v4_issues, evidence_score = self.v4.validate(classification, doc_bundle)
+        v4_issues, evidence_score = results["V4"]
         saver.save_agent_output("v4_evidence_quality", v4_issues, evidence_score)
         all_issues.extend(v4_issues)
-        llm_calls += 1
-        print(f"      ✓ Issues found: {len(v4_issues)}, Quality score: {evidence_score:.2f}")
+        llm_calls += 0 if "V4" in skipped or "V4" in reused else 1
+        print(f"      ✓ Issues found: {len(v4_issues)}, Quality score: {self._format_score(evidence_score)}")
         
         # Build consolidated report
         report = VerificationReport(
@@ -116,7 +302,10 @@ class VerificationRunner:
             v4_evidence_quality_score=evidence_score,
             has_blocker_issues=any(i.severity == IssueSeverity.BLOCKER for i in all_issues),
             total_issues=len(all_issues),
-            llm_calls_made=llm_calls
+            llm_calls_made=llm_calls,
+            timed_out_agents=timed_out,
+            skipped_agents=list(skipped),
+            reused_checks=list(reused)
         )
         
         # V5: Arbiter decision (rule-based, no LLM)
@@ -133,6 +322,284 @@ class VerificationRunner:
         
         return report, arbiter_decision
     
+    def _settled(self, issues: List[Issue]) -> bool:
+        """True in decision-bound mode once the issues so far force the V5 decision"""
+        return self.decision_bound and self.v5.is_settled(issues)
+    
+    def _skip_agents(
+        self,
+        agents: List[Tuple[str, Callable]],
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle
+    ) -> Tuple[Dict[str, tuple], List[str], Dict[str, Any]]:
+        """Mark agents as skipped, starting them in the background when enrichment is on"""
+        skipped = {}
+        for name, validate in agents:
+            skipped[name] = self._submit_background(validate, classification, doc_bundle) if self.enrich_skipped else None
+        return {name: self.TIMEOUT_RESULTS[name] for name, _ in agents}, [], skipped
+    
+    def _run_agents_sequentially(
+        self,
+        agents: List[Tuple[str, Callable]],
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        v1_issues: List[Issue] = ()
+    ) -> Tuple[Dict[str, tuple], List[str], Dict[str, Any]]:
+        """Run agents one after another (no timeout enforcement)"""
+        results = {}
+        issues = list(v1_issues)
+        for i, (name, validate) in enumerate(agents):
+            if self._settled(issues):
+                print(f"  {', '.join(n for n, _ in agents[i:])}: Decision settled, skipping")
+                skipped_results, _, skipped = self._skip_agents(agents[i:], classification, doc_bundle)
+                results.update(skipped_results)
+                return results, [], skipped
+            results[name] = validate(classification, doc_bundle)
+            issues.extend(results[name][0])
+        return results, [], {}
+    
+    def _run_agents_concurrently(
+        self,
+        agents: List[Tuple[str, Callable]],
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        v1_issues: List[Issue] = ()
+    ) -> Tuple[Dict[str, tuple], List[str], Dict[str, Any]]:
+        """
+        Submit all agents at once and collect results in submission order
+        
+        Every agent shares one deadline (agent_timeout seconds from submission),
+        so wall-clock time is bounded by the slowest agent, not the sum. In
+        decision-bound mode the wait ends as soon as the decision is settled.
+        
+        Returns:
+            (results keyed by agent name, names of agents that timed out,
+            skipped agents mapped to their still-running future or None)
+        """
+        results = {}
+        timed_out = []
+        skipped = {}
+        executor = ThreadPoolExecutor(max_workers=len(agents), thread_name_prefix="verification")
+        try:
+            futures = {name: executor.submit(validate, classification, doc_bundle) for name, validate in agents}
+            deadline = time.monotonic() + self.agent_timeout
+            issues = list(v1_issues)
+            pending = set(futures.values())
+            settled = False
+            while pending and not settled:
+                done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    issues.extend(future.result()[0])
+                settled = self._settled(issues)
+            
+            for name, future in futures.items():
+                if future.done():
+                    results[name] = future.result()
+                    continue
+                if settled:
+                    print(f"    {name}: Decision settled, skipping")
+                    skipped[name] = future if self.enrich_skipped else None
+                else:
+                    print(f"    {name}: timed out after {self.agent_timeout:.0f}s, dropping LLM result")
+                    timed_out.append(name)
+                if not skipped.get(name):
+                    future.cancel()
+                results[name] = self.TIMEOUT_RESULTS[name]
+        finally:
+            # Don't block on timed-out or skipped agents; their threads finish in the background
+            executor.shutdown(wait=False, cancel_futures=not self.enrich_skipped)
+        
+        return results, timed_out, skipped
+    
+    async def _arun_agents(
+        self,
+        agents: List[Tuple[str, Callable]],
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        v1_issues: List[Issue] = ()
+    ) -> Tuple[Dict[str, tuple], List[str], Dict[str, Any]]:
+        """
+        Run async agents as tasks with one shared deadline (agent_timeout seconds)
+        
+        Returns:
+            (results keyed by agent name, names of agents that timed out,
+            skipped agents mapped to their still-running task or None)
+        """
+        tasks = {name: asyncio.ensure_future(validate(classification, doc_bundle)) for name, validate in agents}
+        deadline = time.monotonic() + self.agent_timeout
+        issues = list(v1_issues)
+        pending = set(tasks.values())
+        settled = False
+        while pending and not settled:
+            done, pending = await asyncio.wait(
+                pending, timeout=max(0.0, deadline - time.monotonic()), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for task in done:
+                issues.extend(task.result()[0])
+            settled = self._settled(issues)
+        
+        results = {}
+        timed_out = []
+        skipped = {}
+        for name, task in tasks.items():
+            if task.done():
+                results[name] = task.result()
+                continue
+            if settled:
+                print(f"    {name}: Decision settled, skipping")
+                skipped[name] = task if self.enrich_skipped else None
+            else:
+                print(f"    {name}: timed out after {self.agent_timeout:.0f}s, dropping LLM result")
+                timed_out.append(name)
+            if not skipped.get(name):
+                task.cancel()
+            results[name] = self.TIMEOUT_RESULTS[name]
+        
+        return results, timed_out, skipped
+    
+    def _submit_background(self, validate: Callable, classification: ClassificationOutput, doc_bundle: DocumentBundle):
+        """Start a skipped agent on the shared background pool"""
+        with self._deferred_lock:
+            if self._background is None:
+                self._background = ThreadPoolExecutor(thread_name_prefix="verification-enrich")
+        return self._background.submit(validate, classification, doc_bundle)
+    
+    def _defer(self, doc_id: str, skipped: Dict[str, Any]):
+        """Keep skipped agents that are still running so enrich_report can collect them"""
+        running = {name: handle for name, handle in skipped.items() if handle is not None}
+        with self._deferred_lock:
+            if running:
+                self._deferred[doc_id] = running
+            else:
+                self._deferred.pop(doc_id, None)
+    
+    def enrich_report(self, report: VerificationReport, doc_id: str) -> VerificationReport:
+        """
+        Add results of agents skipped for doc_id once they finish (SME packet only)
+        
+        The decision is not revisited; waits at most agent_timeout seconds.
+        
+        Returns:
+            A copy of report with the enrichment issues, or report unchanged
+            when nothing was deferred for the document
+        """
+        with self._deferred_lock:
+            deferred = self._deferred.pop(doc_id, {})
+        results = {}
+        for name, future in deferred.items():
+            try:
+                results[name] = future.result(timeout=self.agent_timeout)
+            except Exception as e:
+                print(f"    {name}: Enrichment dropped: {e or type(e).__name__}")
+                future.cancel()
+        return self._enriched(report, results)
+    
+    async def aenrich_report(self, report: VerificationReport, doc_id: str) -> VerificationReport:
+        """Async counterpart of enrich_report() for tasks deferred by arun_all()"""
+        with self._deferred_lock:
+            deferred = self._deferred.pop(doc_id, {})
+        if deferred:
+            await asyncio.wait(deferred.values(), timeout=self.agent_timeout)
+        results = {}
+        for name, task in deferred.items():
+            if task.done() and not task.cancelled() and task.exception() is None:
+                results[name] = task.result()
+            else:
+                print(f"    {name}: Enrichment dropped")
+                task.cancel()
+        return self._enriched(report, results)
+    
+    @staticmethod
+    def _enriched(report: VerificationReport, results: Dict[str, tuple]) -> VerificationReport:
+        """Merge late V2-V4 results into a copy of the report, in V2 → V4 order"""
+        if not results:
+            return report
+        issues = list(report.issues)
+        update = {"enriched_agents": [name for name in ("V2", "V3", "V4") if name in results]}
+        for name in update["enriched_agents"]:
+            agent_issues, result = results[name]
+            issues.extend(agent_issues)
+            if name == "V2":
+                update["v2_consistency_score"] = result
+            elif name == "V3":
+                update["v3_traps_triggered"] = result
+            else:
+                update["v4_evidence_quality_score"] = result
+        update.update(
+            issues=issues,
+            total_issues=len(issues),
+            has_blocker_issues=any(i.severity == IssueSeverity.BLOCKER for i in issues)
+        )
+        return report.model_copy(update=update)
+    
+    def _checkpointed(self, agent: str, validate: Callable, doc_id: str, digest: Optional[str]) -> Callable:
+        """
+        Wrap an agent's validate() so completed runs are replayed from the journal
+        
+        V1 returns a list of issues; V2-V4 return (issues, score_or_count). A run
+        whose LLM check failed (the agent fell back to rule-only or partial
+        issues) is not recorded, so a resume retries it.
+        """
+        if self.journal is None:
+            return validate
+        
+        def run(classification: ClassificationOutput, doc_bundle: DocumentBundle):
+            recorded = self.journal.get_agent_result(doc_id, digest, agent)
+            if recorded is not None:
+                print(f"    {agent}: restored from checkpoint")
+                issues = [Issue(**issue) for issue in recorded["issues"]]
+                return issues if agent == "V1" else (issues, recorded["result"])
+            
+            with track_failed_checks() as failed:
+                output = validate(classification, doc_bundle)
+            if failed:
+                print(f"    {agent}: not checkpointed ({', '.join(failed)} failed)")
+                return output
+            issues, result = (output, None) if agent == "V1" else output
+            self.journal.record_agent_result(
+                doc_id, digest, agent, [issue.model_dump(mode='json') for issue in issues], result
+            )
+            return output
+        
+        return run
+    
+    def _acheckpointed(self, agent: str, avalidate: Callable, doc_id: str, digest: Optional[str]) -> Callable:
+        """Async counterpart of _checkpointed() for the V2-V4 avalidate() coroutines"""
+        if self.journal is None:
+            return avalidate
+        
+        async def run(classification: ClassificationOutput, doc_bundle: DocumentBundle):
+            recorded = self.journal.get_agent_result(doc_id, digest, agent)
+            if recorded is not None:
+                print(f"    {agent}: restored from checkpoint")
+                return [Issue(**issue) for issue in recorded["issues"]], recorded["result"]
+            
+            with track_failed_checks() as failed:
+                issues, result = await avalidate(classification, doc_bundle)
+            if failed:
+                print(f"    {agent}: not checkpointed ({', '.join(failed)} failed)")
+                return issues, result
+            self.journal.record_agent_result(
+                doc_id, digest, agent, [issue.model_dump(mode='json') for issue in issues], result
+            )
+            return issues, result
+        
+        return run
+    
+    @staticmethod
+    def _classification_digest(classification: ClassificationOutput) -> str:
+        """Content hash identifying the exact classification being verified"""
+        return hashlib.sha256(classification.model_dump_json().encode()).hexdigest()
+    
+    @staticmethod
+    def _format_score(score: Optional[float]) -> str:
+        """Format an optional agent score for console output"""
+        return f"{score:.2f}" if score is not None else "N/A"
+    
     def print_report_summary(self, report: VerificationReport):
         """Print human-readable verification report summary"""
         print("\n" + "="*60)
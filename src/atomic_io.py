@@ -0,0 +1,47 @@
+"""Atomic file writes - write to a temp file in the target directory, then rename"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Union
+
+
+def atomic_write_bytes(path: Union[str, Path], data: bytes):
+    """
+    Write bytes so readers see either the old file or the complete new one
+
+    The temp file lives in the destination directory so os.replace is a
+    same-filesystem rename, which is atomic on POSIX and Windows.
+
+    Args:
+        path: Destination file path (parent directories are created)
+        data: File contents
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def atomic_write_json(path: Union[str, Path], data: Any, indent: int = 2, **dump_kwargs):
+    """
+    Serialize data as JSON and write it atomically
+
+    Args:
+        path: Destination file path
+        data: JSON-serializable object
+        indent: JSON indentation
+        **dump_kwargs: Extra arguments for json.dumps (e.g. default=str)
+    """
+    atomic_write_bytes(path, json.dumps(data, indent=indent, **dump_kwargs).encode('utf-8'))
@@ -0,0 +1,304 @@
+"""
+Batch Runner - Run the document pipeline over a corpus with bounded concurrency
+
+Each worker (process or thread) builds one DocumentPipeline on startup, so a
+worker reuses a single Gemini client and a single Document AI client for every
+document it handles. The "async" executor instead runs every document on one
+event loop through a single pipeline's async API, with a global limit on
+documents in flight.
+"""
+
+import asyncio
+import glob
+import json
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from .pipeline import DocumentPipeline, DocumentRunResult
+
+logger = logging.getLogger(__name__)
+
+# Per-worker pipeline (thread-local so thread pools get one pipeline per thread too)
+_worker_state = threading.local()
+
+
+def _init_worker(pipeline_factory: Callable, pipeline_kwargs: Dict):
+    """Worker initializer: build this worker's pipeline (and its clients) once"""
+    _worker_state.pipeline = pipeline_factory(**pipeline_kwargs)
+
+
+def _run_document(pdf_path: str) -> DocumentRunResult:
+    """Run one document on the calling worker's pipeline"""
+    return _worker_state.pipeline.run(pdf_path)
+
+
+def collect_inputs(source: str) -> List[Path]:
+    """
+    Resolve a batch input specification into a sorted list of PDF paths
+
+    Args:
+        source: Directory (all *.pdf inside), glob pattern (e.g. 'data/**/*.pdf'),
+            or manifest file (.txt/.lst with one path per line, '#' comments allowed)
+
+    Returns:
+        De-duplicated list of PDF paths
+
+    Raises:
+        ValueError: If two different PDFs share a file stem (see check_unique_doc_ids)
+    """
+    path = Path(source)
+
+    if path.is_dir():
+        pdf_paths = sorted(path.glob("*.pdf"))
+    elif path.is_file() and path.suffix.lower() != ".pdf":
+        pdf_paths = []
+        for line in path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#"):
+                entry = Path(line)
+                if not entry.is_absolute():
+                    entry = path.parent / entry
+                pdf_paths.append(entry)
+    elif path.is_file():
+        pdf_paths = [path]
+    else:
+        pdf_paths = sorted(Path(p) for p in glob.glob(source, recursive=True))
+
+    # Preserve order, drop duplicates
+    seen = set()
+    unique_paths = []
+    for pdf_path in pdf_paths:
+        key = str(pdf_path.resolve())
+        if key not in seen:
+            seen.add(key)
+            unique_paths.append(pdf_path)
+    check_unique_doc_ids(unique_paths)
+    return unique_paths
+
+
+def check_unique_doc_ids(pdf_paths: List[Path]):
+    """
+    Reject inputs whose doc_ids collide
+
+    A document's doc_id is its file stem; it names the journal entries,
+    output files, bundle and agent output directory, so two PDFs with the
+    same stem (e.g. site_a/report.pdf and site_b/report.pdf) would overwrite
+    each other's results.
+
+    Args:
+        pdf_paths: PDFs of one batch
+
+    Raises:
+        ValueError: Listing every stem shared by more than one path
+    """
+    by_stem: Dict[str, List[Path]] = {}
+    for pdf_path in pdf_paths:
+        by_stem.setdefault(pdf_path.stem, []).append(pdf_path)
+    duplicates = {stem: paths for stem, paths in by_stem.items() if len(paths) > 1}
+    if duplicates:
+        details = "; ".join(
+            f"{stem}: {', '.join(str(p) for p in paths)}" for stem, paths in sorted(duplicates.items())
+        )
+        raise ValueError(
+            f"{len(duplicates)} doc_id(s) shared by several PDFs (doc_id = file name without .pdf); "
+            f"rename or split the batch: {details}"
+        )
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (pct in 0-100) of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class BatchSummary(BaseModel):
+    """Throughput, latency and decision summary for a batch run"""
+    total_documents: int
+    completed: int
+    failed: int
+    wall_seconds: float
+    docs_per_minute: float
+    stage_latency: Dict[str, Dict[str, float]] = Field(default_factory=dict, description="{stage: {p50, p95, count}} in seconds")
+    decisions: Dict[str, int] = Field(default_factory=dict, description="Final decisions; AUTO_RETRY counts documents that went through ≥1 retry cycle")
+    failures: Dict[str, str] = Field(default_factory=dict, description="doc_id → error")
+
+
+class BatchRunner:
+    """Run DocumentPipeline across many documents with a bounded worker pool"""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        executor: str = "process",
+        pipeline_factory: Callable = DocumentPipeline,
+        pipeline_kwargs: Optional[Dict] = None
+    ):
+        """
+        Initialize batch runner
+
+        Args:
+            workers: Maximum documents in flight at once
+            executor: 'process' (one OS process per worker), 'thread', or 'async'
+                (one event loop and one pipeline; workers may be in the hundreds)
+            pipeline_factory: Callable building a per-worker pipeline with a run(pdf_path)
+                method (and arun(pdf_path) for the async executor)
+            pipeline_kwargs: Keyword arguments for pipeline_factory
+        """
+        if executor not in ("process", "thread", "async"):
+            raise ValueError(f"executor must be 'process', 'thread' or 'async', got: {executor}")
+
+        self.workers = max(1, workers)
+        self.executor = executor
+        self.pipeline_factory = pipeline_factory
+        self.pipeline_kwargs = pipeline_kwargs or {}
+
+    def run(self, pdf_paths: List[Path]) -> Tuple[List[DocumentRunResult], BatchSummary]:
+        """
+        Process all documents and summarise the run
+
+        Args:
+            pdf_paths: PDFs to process
+
+        Returns:
+            (per-document results in completion order, batch summary)
+        """
+        check_unique_doc_ids(pdf_paths)
+        results = []
+        total = len(pdf_paths)
+
+        if self.executor == "async":
+            print(f"🚀 Processing {total} document(s) on one event loop, up to {self.workers} in flight")
+        else:
+            print(f"🚀 Processing {total} document(s) with {self.workers} {self.executor} worker(s)")
+        start = time.perf_counter()
+
+        if self.executor == "async":
+            asyncio.run(self._run_async(pdf_paths, results))
+            summary = self.summarize(results, time.perf_counter() - start)
+            return results, summary
+
+        pool_class = ProcessPoolExecutor if self.executor == "process" else ThreadPoolExecutor
+        with pool_class(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.pipeline_factory, self.pipeline_kwargs)
+        ) as pool:
+            futures = {pool.submit(_run_document, str(pdf_path)): pdf_path for pdf_path in pdf_paths}
+            for future in as_completed(futures):
+                pdf_path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Worker crashed (e.g. pipeline failed to initialise)
+                    result = DocumentRunResult(
+                        doc_id=pdf_path.stem, pdf_path=str(pdf_path), status="failed", error=str(e)
+                    )
+                self._record(results, result, total)
+
+        summary = self.summarize(results, time.perf_counter() - start)
+        return results, summary
+
+    async def _run_async(self, pdf_paths: List[Path], results: List[DocumentRunResult]):
+        """Run every document on this event loop with at most self.workers in flight"""
+        pipeline = self.pipeline_factory(**self.pipeline_kwargs)
+        semaphore = asyncio.Semaphore(self.workers)
+        total = len(pdf_paths)
+
+        async def run_one(pdf_path: Path) -> DocumentRunResult:
+            async with semaphore:
+                try:
+                    return await pipeline.arun(str(pdf_path))
+                except Exception as e:
+                    return DocumentRunResult(
+                        doc_id=pdf_path.stem, pdf_path=str(pdf_path), status="failed", error=str(e)
+                    )
+
+        for next_result in asyncio.as_completed([run_one(pdf_path) for pdf_path in pdf_paths]):
+            self._record(results, await next_result, total)
+
+    @staticmethod
+    def _record(results: List[DocumentRunResult], result: DocumentRunResult, total: int):
+        """Append a finished document and print its progress line"""
+        results.append(result)
+        outcome = result.decision if result.status == "completed" else f"FAILED ({result.error})"
+        print(f"  [{len(results)}/{total}] {result.doc_id}: {outcome}")
+
+    @staticmethod
+    def summarize(results: List[DocumentRunResult], wall_seconds: float) -> BatchSummary:
+        """Compute throughput, p50/p95 per-stage latency and decision counts"""
+        stage_times: Dict[str, List[float]] = {}
+        for result in results:
+            for stage, seconds in result.stage_seconds.items():
+                stage_times.setdefault(stage, []).append(seconds)
+
+        stage_latency = {
+            stage: {
+                "p50": percentile(stage_times[stage], 50),
+                "p95": percentile(stage_times[stage], 95),
+                "count": len(stage_times[stage]),
+            }
+            for stage in DocumentPipeline.STAGES
+            if stage in stage_times
+        }
+
+        decisions = Counter(r.decision for r in results if r.status == "completed")
+        decisions["AUTO_RETRY"] = sum(1 for r in results if r.retry_attempts > 0)
+
+        completed = sum(1 for r in results if r.status == "completed")
+        return BatchSummary(
+            total_documents=len(results),
+            completed=completed,
+            failed=len(results) - completed,
+            wall_seconds=wall_seconds,
+            docs_per_minute=completed / wall_seconds * 60 if wall_seconds > 0 else 0.0,
+            stage_latency=stage_latency,
+            decisions=dict(decisions),
+            failures={r.doc_id: r.error for r in results if r.status != "completed"}
+        )
+
+    @staticmethod
+    def print_summary(summary: BatchSummary):
+        """Print human-readable batch summary"""
+        print("\n" + "="*60)
+        print("BATCH SUMMARY")
+        print("="*60)
+        print(f"Documents:   {summary.total_documents} ({summary.completed} completed, {summary.failed} failed)")
+        print(f"Wall time:   {summary.wall_seconds:.1f}s")
+        print(f"Throughput:  {summary.docs_per_minute:.2f} docs/min")
+
+        if summary.stage_latency:
+            print("\nPer-stage latency (seconds):")
+            for stage, stats in summary.stage_latency.items():
+                print(f"  {stage:<15} p50={stats['p50']:.2f}  p95={stats['p95']:.2f}  (n={stats['count']})")
+
+        print("\nDecisions:")
+        for decision in ("AUTO_ACCEPT", "AUTO_RETRY", "ESCALATE_TO_SME"):
+            print(f"  {decision:<16} {summary.decisions.get(decision, 0)}")
+
+        if summary.failures:
+            print(f"\n🔴 Failures ({len(summary.failures)}):")
+            for doc_id, error in list(summary.failures.items())[:10]:
+                print(f"  {doc_id}: {error}")
+            if len(summary.failures) > 10:
+                print(f"  ... and {len(summary.failures) - 10} more")
+
+    @staticmethod
+    def save_summary(summary: BatchSummary, results: List[DocumentRunResult], path: Path):
+        """Save summary and per-document results as JSON"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "summary": summary.model_dump(),
+                "documents": [r.model_dump() for r in results]
+            }, f, indent=2)
@@ -0,0 +1,96 @@
+"""
+Boilerplate Index - Repeated page headers and footers per DocumentBundle
+
+Built once at extraction time in a single pass over the pages: lines near
+the top or bottom of a page are normalized (case, whitespace, digits) and
+counted per page. Lines that recur on enough pages ("Page 3 of 12", fax
+banners, PATIENT/MRN/DOB lines) are recorded on the bundle, so prompt
+builders can strip them and V3 can recognise header/footer evidence.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Iterable, Optional
+
+from .config import settings
+from .schemas import BoilerplateIndex
+
+_DIGITS = re.compile(r'\d+')
+_SPACES = re.compile(r'\s+')
+_LETTERS = re.compile(r'[a-z]')
+
+# Snippet/line overlaps shorter than this are too generic to call boilerplate
+MIN_MATCH_CHARS = 8
+
+
+def normalize_line(line: str) -> str:
+    """Lowercase, collapse whitespace and replace digit runs with '#'"""
+    return _SPACES.sub(' ', _DIGITS.sub('#', line.lower())).strip()
+
+
+def _edge_lines(text: str, edge_lines: int) -> Iterable[str]:
+    """Non-empty lines within edge_lines of the top or bottom of a page"""
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) <= 2 * edge_lines:
+        return lines
+    return lines[:edge_lines] + lines[-edge_lines:]
+
+
+def build_boilerplate_index(
+    pages,
+    min_fraction: float = None,
+    min_pages: int = None,
+    edge_lines: int = None
+) -> BoilerplateIndex:
+    """
+    Find lines repeated at page edges across a document
+
+    Args:
+        pages: Page dicts with 'text'
+        min_fraction: Fraction of pages a line must appear on (defaults to settings.boilerplate_min_fraction)
+        min_pages: Minimum absolute page count (defaults to settings.boilerplate_min_pages)
+        edge_lines: Lines from the top and bottom of each page to consider (defaults to settings.boilerplate_edge_lines)
+
+    Returns:
+        BoilerplateIndex (empty for documents shorter than min_pages)
+    """
+    min_fraction = settings.boilerplate_min_fraction if min_fraction is None else min_fraction
+    min_pages = settings.boilerplate_min_pages if min_pages is None else min_pages
+    edge_lines = settings.boilerplate_edge_lines if edge_lines is None else edge_lines
+
+    counts = Counter()
+    page_count = 0
+    for page in pages:
+        page_count += 1
+        counts.update({
+            normalized
+            for normalized in map(normalize_line, _edge_lines(page.get('text') or '', edge_lines))
+            if len(_LETTERS.findall(normalized)) >= 3
+        })
+
+    threshold = max(min_pages, math.ceil(min_fraction * page_count))
+    lines = {line: count for line, count in counts.items() if count >= threshold}
+    return BoilerplateIndex(lines=lines, pages_scanned=page_count, min_pages=threshold)
+
+
+def strip_boilerplate(text: str, index: Optional[BoilerplateIndex]) -> str:
+    """Remove indexed boilerplate lines from page text"""
+    if not index or not index.lines:
+        return text
+    kept = [line for line in text.splitlines(keepends=True) if normalize_line(line) not in index.lines]
+    return ''.join(kept)
+
+
+def is_boilerplate_snippet(snippet: str, index: Optional[BoilerplateIndex]) -> bool:
+    """True if an evidence snippet contains, or is part of, an indexed boilerplate line"""
+    if not index or not index.lines:
+        return False
+    normalized = normalize_line(snippet)
+    if normalized in index.lines:
+        return True
+    return any(
+        (len(line) >= MIN_MATCH_CHARS and line in normalized)
+        or (len(normalized) >= MIN_MATCH_CHARS and normalized in line)
+        for line in index.lines
+    )
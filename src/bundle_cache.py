@@ -0,0 +1,164 @@
+"""
+Bundle Cache - Content-addressed DocumentBundle store
+
+Bundles are keyed by the SHA-256 of the PDF bytes plus the Document AI
+processor ID and the extractor version, so two different PDFs that share a
+filename never collide, a changed PDF is always re-extracted, and repeat
+ingestion of identical bytes (e.g. fax-forwarded duplicates) costs no
+Document AI call. A SQLite index maps keys to bundle files and drives
+age- and size-based LRU eviction. Bundles are stored in the compact
+binary format (bundle_store) and returned with lazily decoded pages.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .bundle_store import BUNDLE_SUFFIX, load_bundle, write_bundle
+from .config import settings
+from .schemas import DocumentBundle
+
+logger = logging.getLogger(__name__)
+
+
+class BundleCache:
+    """On-disk DocumentBundle cache with an index and LRU eviction"""
+
+    def __init__(
+        self,
+        cache_dir: str = None,
+        max_bytes: int = None,
+        max_age_days: float = None
+    ):
+        """
+        Initialize bundle cache
+
+        Args:
+            cache_dir: Cache directory (defaults to settings.bundle_cache_dir)
+            max_bytes: Maximum total size of cached bundles (defaults to settings.bundle_cache_max_mb)
+            max_age_days: Expire bundles not read for this many days (defaults to settings.bundle_cache_max_age_days)
+        """
+        self.cache_dir = Path(cache_dir or settings.bundle_cache_dir)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.bundle_cache_max_mb * 1024 * 1024
+        max_age_days = max_age_days if max_age_days is not None else settings.bundle_cache_max_age_days
+        self.max_age_seconds = max_age_days * 86400
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_dir / "index.sqlite3"), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bundles ("
+            " key TEXT PRIMARY KEY,"
+            " path TEXT NOT NULL,"
+            " pdf_sha256 TEXT NOT NULL,"
+            " processor_id TEXT,"
+            " extractor_version TEXT,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_bundles_last_access ON bundles(last_access)")
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(pdf_sha256: str, processor_id: str, extractor_version: str) -> str:
+        """Cache key for a PDF's bytes extracted by a given processor and extractor version"""
+        return hashlib.sha256(f"{pdf_sha256}:{processor_id}:{extractor_version}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[DocumentBundle]:
+        """Return the cached bundle (refreshing its LRU position), or None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, last_access FROM bundles WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+
+            path = self.cache_dir / row[0]
+            if not path.exists():
+                # Index entry outlived its file (manual cleanup) - drop it
+                self._conn.execute("DELETE FROM bundles WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE bundles SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return load_bundle(path)
+
+    def put(
+        self,
+        key: str,
+        bundle: DocumentBundle,
+        pdf_sha256: str,
+        processor_id: str = None,
+        extractor_version: str = None
+    ):
+        """Store a bundle and evict entries if the cache is over budget"""
+        relative_path = Path(key[:2]) / f"{key}{BUNDLE_SUFFIX}"
+        size = write_bundle(self.cache_dir / relative_path, bundle)
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO bundles"
+                " (key, path, pdf_sha256, processor_id, extractor_version, size, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, str(relative_path), pdf_sha256, processor_id, extractor_version, size, now, now)
+            )
+            self._conn.commit()
+            self._evict_locked(now)
+
+    def evict(self):
+        """Run age- and size-based eviction"""
+        with self._lock:
+            self._evict_locked(time.time())
+
+    def _evict_locked(self, now: float):
+        """Remove expired bundles, then least recently used until under max_bytes"""
+        rows = self._conn.execute(
+            "SELECT key, path, size, last_access FROM bundles ORDER BY last_access ASC"
+        ).fetchall()
+        total = sum(row[2] for row in rows)
+
+        stale = []
+        for key, path, size, last_access in rows:
+            if now - last_access > self.max_age_seconds or total > self.max_bytes:
+                stale.append((key, path))
+                total -= size
+
+        for key, path in stale:
+            (self.cache_dir / path).unlink(missing_ok=True)
+        self._conn.executemany("DELETE FROM bundles WHERE key = ?", [(key,) for key, _ in stale])
+        self._conn.commit()
+
+        if stale:
+            self.evictions += len(stale)
+            logger.info(f"Bundle cache evicted {len(stale)} bundles")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus current cache size"""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM bundles"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": total,
+        }
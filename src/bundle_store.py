@@ -0,0 +1,426 @@
+"""
+Bundle Store - Compact binary DocumentBundle files with lazy page access
+
+Layout of a ``.bundle`` file:
+
+    header   magic, format version, flags, page count, meta offset, index offset
+    pages    one record per page (zlib-compressed unless FLAG_ZLIB is clear)
+    meta     bundle fields other than pages, plus the page_num of every record
+    index    (offset, length) of each page record
+
+A page record is a small JSON head followed by the page text as UTF-8.
+Paragraphs are stored as [start, end] character offsets into the text
+instead of a second copy of it; a paragraph that is not a substring of
+the text at the expected position is stored literally.
+
+Readers load only the header, meta and index; each page is read and
+decoded when it is accessed through LazyPages, so ``bundle.pages[4:9]``
+touches five records regardless of document size. Uncompressed files
+(written for documents of settings.bundle_mmap_min_pages pages or more)
+are memory-mapped instead: pages come back as LazyPage mappings whose
+text is decoded from the mapped file only when read, so worker memory
+stays flat regardless of document length. Legacy JSON bundles are still
+readable through load_bundle and read_pages.
+"""
+
+import json
+import mmap
+import struct
+import threading
+import zlib
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .atomic_io import atomic_write_bytes
+from .config import settings
+from .schemas import DocumentBundle
+
+BUNDLE_SUFFIX = ".bundle"
+MAGIC = b"DBND"
+FORMAT_VERSION = 1
+FLAG_ZLIB = 0x01
+
+HEADER = struct.Struct("<4sBBHIQQ")  # magic, version, flags, reserved, page_count, meta_offset, index_offset
+INDEX_ENTRY = struct.Struct("<QI")   # record offset, record length
+RECORD_HEAD = struct.Struct("<I")    # length of the JSON head that precedes the page text
+
+
+def _encode_page(page: Dict) -> bytes:
+    """Encode a page dict as a JSON head (metadata + paragraph offsets) followed by its text"""
+    text = page.get('text') or ''
+
+    spans = []
+    cursor = 0
+    for paragraph in page.get('paragraphs', []):
+        start = text.find(paragraph, cursor)
+        if paragraph and start >= 0:
+            end = start + len(paragraph)
+            spans.append([start, end])
+            cursor = end
+        else:
+            spans.append(paragraph)
+
+    head = {
+        'n': page.get('page_num'),
+        'p': spans,
+        'm': page.get('layout_metadata', {}),
+    }
+    extra = {k: v for k, v in page.items() if k not in ('page_num', 'text', 'paragraphs', 'layout_metadata')}
+    if extra:
+        head['x'] = extra
+
+    head_bytes = json.dumps(head, separators=(',', ':'), default=str).encode('utf-8')
+    return RECORD_HEAD.pack(len(head_bytes)) + head_bytes + text.encode('utf-8')
+
+
+def _decode_head(record, offset: int = 0):
+    """Parse a record's JSON head; returns (head, offset where the page text starts)"""
+    (head_len,) = RECORD_HEAD.unpack_from(record, offset)
+    head_start = offset + RECORD_HEAD.size
+    return json.loads(bytes(record[head_start:head_start + head_len])), head_start + head_len
+
+
+def _paragraphs(text: str, spans: List) -> List[str]:
+    return [text[span[0]:span[1]] if isinstance(span, list) else span for span in spans]
+
+
+def _decode_page(record: bytes) -> Dict:
+    """Inverse of _encode_page"""
+    head, text_start = _decode_head(record)
+    text = record[text_start:].decode('utf-8')
+
+    page = {
+        'page_num': head['n'],
+        'text': text,
+        'paragraphs': _paragraphs(text, head['p']),
+        'layout_metadata': head['m'],
+    }
+    page.update(head.get('x', {}))
+    return page
+
+
+def encode_bundle(bundle: DocumentBundle, compress: bool = True) -> bytes:
+    """
+    Serialize a DocumentBundle to the compact binary format
+
+    Args:
+        bundle: Bundle to serialize (pages may be a list or LazyPages)
+        compress: zlib-compress page records and meta
+
+    Returns:
+        Encoded file contents
+    """
+    def pack(data: bytes) -> bytes:
+        return zlib.compress(data, 6) if compress else data
+
+    chunks = []
+    index = []
+    offset = HEADER.size
+    page_nums = []
+    for page in bundle.pages:
+        record = pack(_encode_page(page))
+        index.append((offset, len(record)))
+        chunks.append(record)
+        offset += len(record)
+        page_nums.append(page.get('page_num'))
+
+    meta = bundle.model_dump(mode='json', exclude={'pages'})
+    meta['page_nums'] = page_nums
+    meta_bytes = pack(json.dumps(meta, separators=(',', ':'), default=str).encode('utf-8'))
+    meta_offset = offset
+    index_offset = meta_offset + len(meta_bytes)
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, FLAG_ZLIB if compress else 0, 0,
+        len(index), meta_offset, index_offset
+    )
+    index_bytes = b''.join(INDEX_ENTRY.pack(*entry) for entry in index)
+    return header + b''.join(chunks) + meta_bytes + index_bytes
+
+
+def write_bundle(path: Union[str, Path], bundle: DocumentBundle, compress: Optional[bool] = None) -> int:
+    """
+    Write a bundle atomically in the compact binary format
+
+    Args:
+        path: Destination file path
+        bundle: Bundle to write
+        compress: zlib-compress page records and meta (default: only bundles
+            shorter than settings.bundle_mmap_min_pages; longer ones are left
+            uncompressed so readers can memory-map them)
+
+    Returns:
+        Number of bytes written
+    """
+    if compress is None:
+        compress = len(bundle.pages) < settings.bundle_mmap_min_pages
+    data = encode_bundle(bundle, compress=compress)
+    atomic_write_bytes(path, data)
+    return len(data)
+
+
+class BundleReader:
+    """Random access to the pages of a binary bundle file"""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open a bundle file and read its header, meta and page index
+
+        The file stays open until close() so pages remain readable even if
+        the file is replaced or evicted from a cache in the meantime.
+
+        Args:
+            path: Path to a .bundle file
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'rb')
+        try:
+            magic, version, flags, _, page_count, meta_offset, index_offset = HEADER.unpack(
+                self._file.read(HEADER.size)
+            )
+            if magic != MAGIC:
+                raise ValueError(f"Not a bundle file: {self.path}")
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported bundle format version {version}: {self.path}")
+            self.compressed = bool(flags & FLAG_ZLIB)
+
+            self._file.seek(meta_offset)
+            self.meta = json.loads(self._unpack(self._file.read(index_offset - meta_offset)))
+            self._file.seek(index_offset)
+            index_bytes = self._file.read(page_count * INDEX_ENTRY.size)
+        except BaseException:
+            self._file.close()
+            raise
+        self._index = [INDEX_ENTRY.unpack_from(index_bytes, i * INDEX_ENTRY.size) for i in range(page_count)]
+        self.page_nums: List[int] = self.meta.pop('page_nums')
+
+    def _unpack(self, data: bytes) -> bytes:
+        return zlib.decompress(data) if self.compressed else data
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def read_page(self, index: int) -> Dict:
+        """Read and decode the page record at a 0-based position"""
+        offset, length = self._index[index]
+        with self._lock:
+            self._file.seek(offset)
+            record = self._file.read(length)
+        return _decode_page(self._unpack(record))
+
+    def close(self):
+        self._file.close()
+
+    def __del__(self):
+        file = getattr(self, '_file', None)
+        if file is not None:
+            file.close()
+
+
+class MappedBundleReader:
+    """Read-only memory-mapped access to an uncompressed bundle file"""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Map a bundle file and read its header, meta and page index
+
+        Args:
+            path: Path to an uncompressed .bundle file
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, flags, _, page_count, meta_offset, index_offset = HEADER.unpack_from(self._mm)
+            if magic != MAGIC:
+                raise ValueError(f"Not a bundle file: {self.path}")
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported bundle format version {version}: {self.path}")
+            if flags & FLAG_ZLIB:
+                raise ValueError(f"Compressed bundles cannot be memory-mapped: {self.path}")
+            self.meta = json.loads(self._mm[meta_offset:index_offset])
+        except BaseException:
+            self._mm.close()
+            raise
+        self._index = [INDEX_ENTRY.unpack_from(self._mm, index_offset + i * INDEX_ENTRY.size) for i in range(page_count)]
+        self.page_nums: List[int] = self.meta.pop('page_nums')
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def read_page(self, index: int) -> 'LazyPage':
+        """Parse the record head at a 0-based position; text stays in the mapped file"""
+        offset, length = self._index[index]
+        head, text_start = _decode_head(self._mm, offset)
+        return LazyPage(self, head, text_start, offset + length)
+
+    def text_view(self, start: int, end: int) -> memoryview:
+        """Zero-copy view of UTF-8 page text bytes"""
+        return memoryview(self._mm)[start:end]
+
+    def close(self):
+        self._mm.close()
+
+
+class LazyPage(Mapping):
+    """
+    Page dict view over a memory-mapped record
+
+    'text' and 'paragraphs' are decoded from the mapped file each time they
+    are read and are not retained, so holding many pages costs only their
+    small metadata heads.
+    """
+
+    def __init__(self, reader: MappedBundleReader, head: Dict, text_start: int, text_end: int):
+        self._reader = reader
+        self._head = head
+        self._text_start = text_start
+        self._text_end = text_end
+
+    def text_view(self) -> memoryview:
+        """UTF-8 bytes of the page text without copying"""
+        return self._reader.text_view(self._text_start, self._text_end)
+
+    def __getitem__(self, key):
+        if key == 'page_num':
+            return self._head['n']
+        if key == 'text':
+            return str(self.text_view(), 'utf-8')
+        if key == 'paragraphs':
+            return _paragraphs(self['text'], self._head['p'])
+        if key == 'layout_metadata':
+            return self._head['m']
+        return self._head.get('x', {})[key]
+
+    def __iter__(self):
+        yield from ('page_num', 'text', 'paragraphs', 'layout_metadata')
+        yield from self._head.get('x', {})
+
+    def __len__(self) -> int:
+        return 4 + len(self._head.get('x', {}))
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+    def __repr__(self) -> str:
+        return f"LazyPage(page_num={self._head['n']}, {self._text_end - self._text_start} text bytes)"
+
+
+class LazyPages(Sequence):
+    """
+    Read-only sequence of pages decoded from a bundle reader on access
+
+    Each access returns a freshly decoded dict (LazyPage for memory-mapped
+    bundles); modifying it does not change the stored bundle.
+    """
+
+    def __init__(self, reader: Union[BundleReader, MappedBundleReader]):
+        self._reader = reader
+
+    def __len__(self) -> int:
+        return len(self._reader)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._reader.read_page(i) for i in range(*item.indices(len(self)))]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("page index out of range")
+        return self._reader.read_page(item)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, LazyPages)):
+            return len(self) == len(other) and all(dict(a) == dict(b) for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Open file handles cannot cross process boundaries - ship the pages instead
+        return (list, (list(self),))
+
+    def __repr__(self) -> str:
+        return f"LazyPages({len(self)} pages from {self._reader.path.name})"
+
+
+def _sniff(path: Union[str, Path]) -> Optional[int]:
+    """Header flags of a binary bundle file, or None for anything else (legacy JSON)"""
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+        return None
+    return HEADER.unpack(header)[2]
+
+
+def is_binary_bundle(path: Union[str, Path]) -> bool:
+    """True if the file starts with the binary bundle magic"""
+    return _sniff(path) is not None
+
+
+def open_reader(path: Union[str, Path]) -> Union[BundleReader, MappedBundleReader]:
+    """Memory-map uncompressed bundle files, read compressed ones record by record"""
+    flags = _sniff(path)
+    if flags is None:
+        raise ValueError(f"Not a bundle file: {path}")
+    if flags & FLAG_ZLIB:
+        return BundleReader(path)
+    return MappedBundleReader(path)
+
+
+def load_bundle(path: Union[str, Path], lazy: bool = True) -> DocumentBundle:
+    """
+    Load a DocumentBundle from a binary or legacy JSON bundle file
+
+    Args:
+        path: Bundle file path
+        lazy: For binary files, decode pages on access instead of up front
+
+    Returns:
+        DocumentBundle (pages is a LazyPages sequence when lazy; uncompressed
+        files are memory-mapped)
+    """
+    if not is_binary_bundle(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return DocumentBundle.model_validate(json.load(f))
+
+    reader = open_reader(path)
+    pages = LazyPages(reader)
+    if lazy:
+        # Validate the small meta (nested models included), then attach lazy pages
+        return DocumentBundle.model_validate({**reader.meta, 'pages': []}).model_copy(update={'pages': pages})
+    bundle = DocumentBundle.model_validate({**reader.meta, 'pages': [dict(page) for page in pages]})
+    reader.close()
+    return bundle
+
+
+def read_pages(path: Union[str, Path], start_page: int, end_page: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Read pages with start_page <= page_num <= end_page without loading the rest
+
+    Args:
+        path: Binary or legacy JSON bundle file
+        start_page: First page number (1-indexed, inclusive)
+        end_page: Last page number (inclusive), defaults to start_page
+
+    Returns:
+        Page dicts in file order
+    """
+    end_page = start_page if end_page is None else end_page
+
+    if not is_binary_bundle(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            pages = json.load(f).get('pages', [])
+        return [p for p in pages if start_page <= p.get('page_num', 0) <= end_page]
+
+    reader = BundleReader(path)
+    try:
+        return [
+            reader.read_page(i)
+            for i, page_num in enumerate(reader.page_nums)
+            if page_num is not None and start_page <= page_num <= end_page
+        ]
+    finally:
+        reader.close()
@@ -0,0 +1,141 @@
+"""
+Checkpoint Journal - Per-document, per-stage progress records for resumable runs
+
+One JSON file per document under ``output/checkpoints`` records which stages
+(extraction, classification, each V-agent, verification, packet) have completed
+and where their artifacts live. Every write is atomic, so a crash never leaves
+a truncated journal or artifact behind.
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .atomic_io import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointJournal:
+    """Record and query stage completion for each document"""
+
+    STAGES = ("extraction", "classification", "verification", "packet")
+
+    def __init__(self, journal_dir: str = "output/checkpoints"):
+        """
+        Initialize journal
+
+        Args:
+            journal_dir: Directory holding one <doc_id>.json file per document
+        """
+        self.journal_dir = Path(journal_dir)
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        # V2-V4 run concurrently and record their results into the same document file
+        self._lock = threading.RLock()
+
+    def begin(self, doc_id: str, pdf_path: str, resume: bool = True) -> Dict[str, Any]:
+        """
+        Open the journal entry for a document
+
+        The entry is reset when resume is False or when the source PDF changed
+        (size or mtime) since the entry was written.
+
+        Args:
+            doc_id: Document identifier
+            pdf_path: Path to source PDF
+            resume: Keep completed stages from a previous run
+
+        Returns:
+            The document's journal entry
+        """
+        signature = self._source_signature(pdf_path)
+        with self._lock:
+            entry = self._load(doc_id)
+            if entry is not None and resume and entry.get("source_signature") == signature:
+                completed = [s for s in self.STAGES if s in entry["stages"]]
+                if completed:
+                    logger.info(f"{doc_id}: resuming, completed stages: {', '.join(completed)}")
+                return entry
+
+            entry = {
+                "doc_id": doc_id,
+                "pdf_path": str(pdf_path),
+                "source_signature": signature,
+                "stages": {},
+                "verification_agents": {},
+            }
+            self._save(entry)
+            return entry
+
+    def is_complete(self, doc_id: str, stage: str) -> bool:
+        """Whether a stage has completed for a document"""
+        return self.get(doc_id, stage) is not None
+
+    def get(self, doc_id: str, stage: str) -> Optional[Dict[str, Any]]:
+        """Return the stage record (artifacts and metadata) or None if not completed"""
+        with self._lock:
+            entry = self._load(doc_id)
+            return entry["stages"].get(stage) if entry else None
+
+    def mark_complete(self, doc_id: str, stage: str, **data):
+        """
+        Record a completed stage
+
+        Args:
+            doc_id: Document identifier
+            stage: Stage name
+            **data: JSON-serializable artifacts/metadata (e.g. artifact paths, decision)
+        """
+        with self._lock:
+            entry = self._load(doc_id) or {"doc_id": doc_id, "stages": {}, "verification_agents": {}}
+            entry["stages"][stage] = {"completed_at": datetime.utcnow().isoformat(), **data}
+            self._save(entry)
+
+    def get_agent_result(self, doc_id: str, classification_digest: str, agent: str) -> Optional[Dict[str, Any]]:
+        """Return a recorded V-agent result for this exact classification, or None"""
+        with self._lock:
+            entry = self._load(doc_id)
+            if not entry:
+                return None
+            return entry["verification_agents"].get(classification_digest, {}).get(agent)
+
+    def record_agent_result(self, doc_id: str, classification_digest: str, agent: str, issues: list, result: Any):
+        """
+        Record a completed V-agent run
+
+        Args:
+            doc_id: Document identifier
+            classification_digest: Hash of the classification the agent verified
+            agent: Agent name (V1-V4)
+            issues: Issues as JSON dicts
+            result: Agent score / trap count (None for V1)
+        """
+        with self._lock:
+            entry = self._load(doc_id) or {"doc_id": doc_id, "stages": {}, "verification_agents": {}}
+            entry["verification_agents"].setdefault(classification_digest, {})[agent] = {
+                "issues": issues,
+                "result": result,
+            }
+            self._save(entry)
+
+    def _path(self, doc_id: str) -> Path:
+        return self.journal_dir / f"{doc_id}.json"
+
+    def _load(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        path = self._path(doc_id)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save(self, entry: Dict[str, Any]):
+        atomic_write_json(self._path(entry["doc_id"]), entry)
+
+    @staticmethod
+    def _source_signature(pdf_path: str) -> str:
+        """Cheap change detector for the source PDF"""
+        stat = Path(pdf_path).stat()
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
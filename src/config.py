@@ -13,6 +13,29 @@ class Settings(BaseSettings):
     # Document AI Configuration
     document_ai_processor_id: str
     document_ai_location: str = "us"
+    document_ai_shard_pages: int = 15  # split longer PDFs into page ranges (0 = never split)
+    document_ai_shard_concurrency: int = 4  # shard requests in flight per document
+    document_ai_shard_retries: int = 2  # retries per failed shard
+    document_ai_shard_retry_backoff: float = 2.0  # seconds, doubled on each retry
+    documentai_store_responses: bool = False  # archive raw responses for reextract
+    documentai_response_dir: str = "output/documentai_responses"
+    
+    # PDF extraction backend: "documentai" (Layout Parser) or "local" (PDF text layer via pypdf)
+    extraction_backend: str = "documentai"
+    local_extraction_fallback: bool = True  # send pages without a text layer to Document AI
+    
+    # DocumentBundle cache (keyed by PDF SHA-256 + extraction backend + extractor version)
+    bundle_cache_enabled: bool = True
+    bundle_cache_dir: str = "output/cache/bundles"
+    bundle_cache_max_mb: int = 2048
+    bundle_cache_max_age_days: float = 90.0
+    bundle_mmap_min_pages: int = 200  # bundles this long are stored uncompressed and memory-mapped on load
+    
+    # Boilerplate (repeated header/footer) index built at extraction time
+    boilerplate_min_fraction: float = 0.5  # share of pages a line must repeat on
+    boilerplate_min_pages: int = 3
+    boilerplate_edge_lines: int = 4  # lines from the top/bottom of each page considered
+    strip_boilerplate: bool = False  # remove indexed lines from classifier, V2 and V4 prompts
     
     # Vertex AI Configuration
     vertex_ai_location: str = "us-central1"
@@ -20,6 +43,53 @@ class Settings(BaseSettings):
     gemini_temperature: float = 0.0
     gemini_max_tokens: int = 8192
     
+    # Prompt token budget (checked locally before the classifier call)
+    prompt_token_budget: int = 200_000
+    token_chars_per_token: float = 4.0  # local estimator: characters per token for words
+    prompt_min_window_fraction: float = 0.8  # below this page coverage, route to map-reduce
+    
+    # Map-reduce classification over overlapping page windows
+    classifier_window_pages: int = 20  # maximum pages per window (windows also stay within the token budget)
+    classifier_window_overlap: int = 2  # pages shared by neighbouring windows
+    classifier_window_concurrency: int = 4  # window requests in flight per document
+    classifier_windowed_min_pages: int = 0  # always use windows from this page count (0 = only when over budget)
+    
+    # Verification (V2-V4 LLM agents)
+    verification_concurrent: bool = True
+    verification_agent_timeout: float = 180.0  # seconds per agent
+    verification_decision_bound: bool = False  # skip remaining LLM agents once V5 must escalate
+    verification_enrich_skipped: bool = False  # finish skipped agents in the background for the SME packet
+    v4_local_evidence_check: bool = True  # match snippets/anchors locally; V4 sends page text only for unresolved evidence
+    verification_payload_mode: str = "planned"  # "planned" (boundary/evidence/anchor pages, compact) or "full" (every segment page)
+    verification_payload_anchor_pages: int = 4  # anchor-hit pages sent per segment besides boundary and evidence pages
+    v3_trap_scan_mode: str = "sharded"  # "sharded" (top trap-signal page windows) or "head" (first 4000 characters)
+    v3_trap_window_pages: int = 2  # pages per trap window
+    v3_trap_top_windows: int = 3  # trap windows sent to Gemini per document
+    v3_trap_window_chars: int = 8000  # character cap per trap window
+    v3_trap_window_concurrency: int = 3  # trap window requests in flight
+    trap_dictionary_file: Optional[str] = None  # V3 trap terms (default: bundled src/trap_dictionary.txt)
+    
+    # Shared Gemini quota (token buckets shared by every agent, thread and worker process)
+    gemini_rate_limit_enabled: bool = True
+    gemini_rate_limit_dir: str = "output/cache/ratelimit"
+    gemini_requests_per_minute: float = 60  # 0 = unlimited
+    gemini_tokens_per_minute: float = 1_000_000  # prompt tokens, 0 = unlimited
+    gemini_retry_attempts: int = 6  # attempts per call on 429/5xx/timeouts
+    gemini_backoff_base: float = 1.0  # seconds, doubled per retry (full jitter)
+    gemini_backoff_max: float = 60.0
+    
+    # LLM response cache (temperature-0 calls only)
+    llm_cache_enabled: bool = True
+    llm_cache_dir: str = "output/cache/llm"
+    llm_cache_max_mb: int = 512
+    llm_cache_max_age_days: float = 30.0
+    
+    # Verification result store (V2-V4 LLM check results, keyed by classification, bundle text and agent/prompt versions)
+    verification_store_enabled: bool = True
+    verification_store_dir: str = "output/cache/verification"
+    verification_store_max_mb: int = 256
+    verification_store_max_age_days: float = 30.0
+    
     # Prompts
     prompt_dir: str = "Prompts/raw_text"
     primary_prompt_file: str = "primary_classifier_agent_prompt.txt"
@@ -1,34 +1,117 @@
-"""Document processor using Google Cloud Document AI"""
+"""Document processor using Google Cloud Document AI or a local PDF text-layer backend"""
 
 from google.cloud import documentai_v1 as documentai
 from google.api_core.client_options import ClientOptions
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import logging
 import os
+import time
 from datetime import datetime
 from .config import settings
-from .schemas import DocumentBundle
+from .schemas import BoilerplateIndex, DocumentBundle
+from .boilerplate import build_boilerplate_index, strip_boilerplate as strip_boilerplate_lines
+from .bundle_cache import BundleCache
+from .extraction_backends import ExtractionBackend, LocalPDFBackend, split_pdf
+from .response_store import ResponseStore
+
+logger = logging.getLogger(__name__)
 
 
 class DocumentProcessor:
-    """Extract structured text from PDFs using Document AI"""
+    """Extract structured text from PDFs using Document AI or a local backend
     
-    def __init__(self):
-        """Initialize Document AI client"""
-        opts = ClientOptions(
-            api_endpoint=f"{settings.document_ai_location}-documentai.googleapis.com"
-        )
-        self.client = documentai.DocumentProcessorServiceClient(client_options=opts)
+    DocumentProcessor is also the Document AI extraction backend; with
+    settings.extraction_backend == "local" pages are read from the PDF text
+    layer instead, falling back to Document AI for pages without one.
+    """
+    
+    # Bump when page extraction logic changes so cached bundles are rebuilt
+    EXTRACTOR_VERSION = "2"
+    
+    name = "documentai"
+    
+    def __init__(
+        self,
+        client=None,
+        bundle_cache: Optional[BundleCache] = None,
+        backend: Optional[ExtractionBackend] = None,
+        response_store: Optional[ResponseStore] = None
+    ):
+        """
+        Initialize document processor
+        
+        Args:
+            client: Document AI client (created lazily from settings if not provided)
+            bundle_cache: Bundle cache (defaults to a BundleCache when settings.bundle_cache_enabled)
+            backend: Extraction backend (defaults to settings.extraction_backend)
+            response_store: Archive for raw Document AI responses (defaults to a
+                ResponseStore when settings.documentai_store_responses)
+        """
+        self._client = client
+        self._async_client = None
         
         # Construct processor name
-        self.processor_name = self.client.processor_path(
+        self.processor_name = documentai.DocumentProcessorServiceClient.processor_path(
             settings.gcp_project_id,
             settings.document_ai_location,
             settings.document_ai_processor_id
         )
+        
+        if backend is None:
+            backend = self._default_backend()
+        self.backend = backend
+        
+        if bundle_cache is None and settings.bundle_cache_enabled:
+            bundle_cache = BundleCache()
+        self.bundle_cache = bundle_cache
+        
+        if response_store is None and settings.documentai_store_responses:
+            response_store = ResponseStore()
+        self.response_store = response_store
+    
+    @property
+    def client(self):
+        """Document AI client, created on first use so local-only runs need no GCP credentials"""
+        if self._client is None:
+            opts = ClientOptions(
+                api_endpoint=f"{settings.document_ai_location}-documentai.googleapis.com"
+            )
+            self._client = documentai.DocumentProcessorServiceClient(client_options=opts)
+        return self._client
+    
+    @property
+    def async_client(self):
+        """Async Document AI client for aprocess_pdf, created on first use (inside the running event loop)"""
+        if self._async_client is None:
+            opts = ClientOptions(
+                api_endpoint=f"{settings.document_ai_location}-documentai.googleapis.com"
+            )
+            self._async_client = documentai.DocumentProcessorServiceAsyncClient(client_options=opts)
+        return self._async_client
+    
+    @property
+    def cache_id(self) -> str:
+        """Document AI bundles are identified by processor ID"""
+        return settings.document_ai_processor_id
+    
+    def _default_backend(self) -> ExtractionBackend:
+        """Build the backend selected by settings.extraction_backend"""
+        if settings.extraction_backend == "documentai":
+            return self
+        if settings.extraction_backend == "local":
+            fallback = self if settings.local_extraction_fallback else None
+            return LocalPDFBackend(fallback=fallback)
+        raise ValueError(f"Unknown extraction backend: {settings.extraction_backend}")
     
     def process_pdf(self, pdf_path: str) -> DocumentBundle:
         """
-        Process PDF using Document AI and return structured document bundle
+        Extract a PDF with the configured backend and return a document bundle
+        
+        Bundles are cached by PDF content hash, extraction backend and
+        extractor version; identical bytes under any filename are served from cache.
         
         Args:
             pdf_path: Path to PDF file
@@ -40,41 +123,263 @@ class DocumentProcessor:
         with open(pdf_path, 'rb') as file:
             pdf_content = file.read()
         
-        # Create Document AI request
+        doc_id, pdf_sha256, cache_key, cached = self._cache_lookup(pdf_path, pdf_content)
+        if cached is not None:
+            return cached
+        
+        # Extract page-wise text and layout
+        pages = self.backend.extract(pdf_content)
+        bundle = self.build_bundle(doc_id, pdf_path, pages, pdf_sha256)
+        self._cache_store(cache_key, bundle)
+        
+        return bundle
+    
+    async def aprocess_pdf(self, pdf_path: str) -> DocumentBundle:
+        """
+        Async counterpart of process_pdf()
+        
+        Document AI requests (and shard requests) are awaited on the event
+        loop; file, cache and local-backend work runs in worker threads.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Returns:
+            DocumentBundle with extracted text and layout metadata
+        """
+        with open(pdf_path, 'rb') as file:
+            pdf_content = await asyncio.to_thread(file.read)
+        
+        doc_id, pdf_sha256, cache_key, cached = await asyncio.to_thread(self._cache_lookup, pdf_path, pdf_content)
+        if cached is not None:
+            return cached
+        
+        if self.backend is self:
+            pages = await self.aextract(pdf_content)
+        else:
+            pages = await asyncio.to_thread(self.backend.extract, pdf_content)
+        bundle = await asyncio.to_thread(self.build_bundle, doc_id, pdf_path, pages, pdf_sha256)
+        await asyncio.to_thread(self._cache_store, cache_key, bundle)
+        
+        return bundle
+    
+    def _cache_lookup(
+        self,
+        pdf_path: str,
+        pdf_content: bytes
+    ) -> Tuple[str, str, Optional[str], Optional[DocumentBundle]]:
+        """
+        Serve repeat ingestion of the same bytes from the bundle cache
+        
+        Returns:
+            (doc_id, pdf_sha256, cache_key or None, cached bundle or None)
+        """
+        doc_id = os.path.splitext(os.path.basename(pdf_path))[0]
+        pdf_sha256 = hashlib.sha256(pdf_content).hexdigest()
+        
+        if self.bundle_cache is None:
+            return doc_id, pdf_sha256, None, None
+        
+        cache_key = BundleCache.make_key(pdf_sha256, self.backend.cache_id, self.EXTRACTOR_VERSION)
+        cached = self.bundle_cache.get(cache_key)
+        if cached is not None:
+            print(f"Loaded cached bundle for {doc_id} (sha256 {pdf_sha256[:12]}, {cached.total_pages} pages)")
+            cached = cached.model_copy(update={"doc_id": doc_id, "file_path": pdf_path})
+        return doc_id, pdf_sha256, cache_key, cached
+    
+    def _cache_store(self, cache_key: Optional[str], bundle: DocumentBundle):
+        """Put a freshly extracted bundle into the bundle cache"""
+        if cache_key is not None:
+            self.bundle_cache.put(
+                cache_key,
+                bundle,
+                pdf_sha256=bundle.source_sha256,
+                processor_id=self.backend.cache_id,
+                extractor_version=self.EXTRACTOR_VERSION
+            )
+    
+    @staticmethod
+    def build_bundle(doc_id: str, file_path: str, pages: List[Dict], pdf_sha256: Optional[str] = None) -> DocumentBundle:
+        """
+        Create a document bundle from extracted pages, indexing repeated headers/footers
+        
+        Args:
+            doc_id: Document ID
+            file_path: Source PDF path
+            pages: Extracted page dictionaries
+            pdf_sha256: SHA-256 of the source PDF bytes
+            
+        Returns:
+            DocumentBundle with boilerplate index
+        """
+        return DocumentBundle(
+            doc_id=doc_id,
+            file_path=file_path,
+            total_pages=len(pages),
+            pages=pages,
+            processing_timestamp=datetime.utcnow().isoformat(),
+            source_sha256=pdf_sha256,
+            boilerplate=build_boilerplate_index(pages)
+        )
+    
+    def extract(self, pdf_content: bytes) -> List[Dict]:
+        """
+        Extract pages from PDF bytes with Document AI (ExtractionBackend interface)
+        
+        PDFs longer than settings.document_ai_shard_pages are split into page
+        ranges that are processed concurrently (at most
+        settings.document_ai_shard_concurrency requests in flight) and merged
+        in page order. A failed shard is retried on its own. When a response
+        store is configured the raw responses are archived for re-extraction.
+        
+        Args:
+            pdf_content: Raw PDF bytes
+            
+        Returns:
+            List of page dictionaries
+        """
+        responses = self._fetch_responses(pdf_content)
+        
+        if self.response_store is not None:
+            self.response_store.put(hashlib.sha256(pdf_content).hexdigest(), self.cache_id, responses)
+        
+        return self.pages_from_responses(responses)
+    
+    async def aextract(self, pdf_content: bytes) -> List[Dict]:
+        """
+        Async counterpart of extract() using the async Document AI client
+        
+        Args:
+            pdf_content: Raw PDF bytes
+            
+        Returns:
+            List of page dictionaries
+        """
+        responses = await self._afetch_responses(pdf_content)
+        
+        if self.response_store is not None:
+            await asyncio.to_thread(
+                self.response_store.put, hashlib.sha256(pdf_content).hexdigest(), self.cache_id, responses
+            )
+        
+        return self.pages_from_responses(responses)
+    
+    def pages_from_responses(self, responses: List[Tuple[int, documentai.Document]]) -> List[Dict]:
+        """
+        Build page dictionaries from (page_offset, document) responses in page order
+        
+        Args:
+            responses: One Document AI response per shard
+            
+        Returns:
+            List of page dictionaries numbered within the full PDF
+        """
+        return [
+            page
+            for page_offset, document in responses
+            for page in self._extract_pages(document, page_offset=page_offset)
+        ]
+    
+    def _fetch_responses(self, pdf_content: bytes) -> List[Tuple[int, documentai.Document]]:
+        """Send the PDF (sharded if long) to Document AI; returns (page_offset, document) per shard"""
+        shards = split_pdf(pdf_content, settings.document_ai_shard_pages)
+        if len(shards) == 1:
+            return [(0, self._process_document(pdf_content))]
+        
+        print(f"Document AI: processing {len(shards)} shards of up to {settings.document_ai_shard_pages} pages")
+        workers = max(1, min(settings.document_ai_shard_concurrency, len(shards)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                (page_offset, executor.submit(self._process_shard, shard_content, page_offset))
+                for page_offset, shard_content in shards
+            ]
+            return [(page_offset, future.result()) for page_offset, future in futures]
+    
+    def _process_shard(self, shard_content: bytes, page_offset: int) -> documentai.Document:
+        """
+        Process one page range, retrying only this shard on failure
+        
+        Args:
+            shard_content: PDF bytes holding the shard's pages
+            page_offset: Number of pages before this shard in the full document
+            
+        Returns:
+            Document AI response for the shard
+        """
+        attempts = settings.document_ai_shard_retries + 1
+        for attempt in range(1, attempts + 1):
+            try:
+                return self._process_document(shard_content)
+            except Exception as e:
+                if attempt == attempts:
+                    raise
+                delay = settings.document_ai_shard_retry_backoff * 2 ** (attempt - 1)
+                logger.warning(
+                    f"Shard starting at page {page_offset + 1} failed (attempt {attempt}/{attempts}): {e}; "
+                    f"retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+    
+    async def _afetch_responses(self, pdf_content: bytes) -> List[Tuple[int, documentai.Document]]:
+        """Async counterpart of _fetch_responses(); shard requests share one concurrency limit"""
+        shards = await asyncio.to_thread(split_pdf, pdf_content, settings.document_ai_shard_pages)
+        if len(shards) == 1:
+            return [(0, await self._aprocess_document(pdf_content))]
+        
+        print(f"Document AI: processing {len(shards)} shards of up to {settings.document_ai_shard_pages} pages")
+        semaphore = asyncio.Semaphore(max(1, settings.document_ai_shard_concurrency))
+        
+        async def process(page_offset: int, shard_content: bytes) -> Tuple[int, documentai.Document]:
+            async with semaphore:
+                return page_offset, await self._aprocess_shard(shard_content, page_offset)
+        
+        return list(await asyncio.gather(*(process(offset, content) for offset, content in shards)))
+    
+    async def _aprocess_shard(self, shard_content: bytes, page_offset: int) -> documentai.Document:
+        """Async counterpart of _process_shard()"""
+        attempts = settings.document_ai_shard_retries + 1
+        for attempt in range(1, attempts + 1):
+            try:
+                return await self._aprocess_document(shard_content)
+            except Exception as e:
+                if attempt == attempts:
+                    raise
+                delay = settings.document_ai_shard_retry_backoff * 2 ** (attempt - 1)
+                logger.warning(
+                    f"Shard starting at page {page_offset + 1} failed (attempt {attempt}/{attempts}): {e}; "
+                    f"retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+    
+    async def _aprocess_document(self, pdf_content: bytes) -> documentai.Document:
+        """Send PDF bytes to the Document AI processor without blocking the event loop"""
+        result = await self.async_client.process_document(request=self._process_request(pdf_content))
+        return result.document
+    
+    def _process_request(self, pdf_content: bytes) -> documentai.ProcessRequest:
+        """Build the Document AI request for PDF bytes"""
         raw_document = documentai.RawDocument(
             content=pdf_content,
             mime_type='application/pdf'
         )
-        
-        request = documentai.ProcessRequest(
+        return documentai.ProcessRequest(
             name=self.processor_name,
             raw_document=raw_document
         )
-        
+    
+    def _process_document(self, pdf_content: bytes) -> documentai.Document:
+        """Send PDF bytes to the Document AI processor and return the parsed document"""
         # Process document
-        result = self.client.process_document(request=request)
+        result = self.client.process_document(request=self._process_request(pdf_content))
         document = result.document
         
         # Debug: Print document info
         print(f"Document AI response - Total pages in document: {len(document.pages) if document.pages else 0}")
         print(f"Document AI response - Text length: {len(document.text) if document.text else 0}")
         
-        # Extract page-wise text and layout
-        pages = self._extract_pages(document)
-        
-        # Create document bundle
-        doc_id = os.path.splitext(os.path.basename(pdf_path))[0]
-        bundle = DocumentBundle(
-            doc_id=doc_id,
-            file_path=pdf_path,
-            total_pages=len(pages),
-            pages=pages,
-            processing_timestamp=datetime.utcnow().isoformat()
-        )
-        
-        return bundle
+        return document
     
-    def _extract_pages(self, document: documentai.Document) -> List[Dict]:
+    def _extract_pages(self, document: documentai.Document, page_offset: int = 0) -> List[Dict]:
         """
         Extract text and layout metadata from Layout Parser response
         
@@ -82,10 +387,14 @@ class DocumentProcessor:
         - Heading blocks can contain nested paragraph blocks
         - Table blocks contain cells with paragraph blocks
         
-        We need to recursively process ALL blocks to capture full content.
+        We need to visit ALL nested blocks to capture full content.
+        
+        Args:
+            document: Document AI response document
+            page_offset: Pages preceding this document when it is one shard of a larger PDF
         
         Returns list of page dictionaries with:
-        - page_num: 1-indexed page number
+        - page_num: 1-indexed page number (within the full PDF)
         - text: Full text content
         - paragraphs: List of paragraph texts (including content from all block types)
         - layout_metadata: Block types and structure
@@ -97,36 +406,55 @@ class DocumentProcessor:
             layout = document.document_layout
             
             if hasattr(layout, 'blocks') and layout.blocks:
-                # Process all blocks recursively
-                self._process_blocks_recursively(layout.blocks, pages_dict)
+                # Process all blocks, including nested ones
+                self._process_blocks(layout.blocks, pages_dict)
         
-        # Convert dict to sorted list
-        pages = [pages_dict[page_num] for page_num in sorted(pages_dict.keys())]
+        # Convert dict to sorted list, joining each page's text once
+        pages = []
+        for page_num in sorted(pages_dict.keys()):
+            page = pages_dict[page_num]
+            page['text'] = ''.join(text + '\n' for text in page['paragraphs'])
+            pages.append(page)
         
         # If no pages extracted, fall back to legacy pages array (for OCR processor)
         if not pages and hasattr(document, 'pages') and document.pages:
             pages = self._extract_pages_legacy(document)
         
+        # Shard-relative page numbers -> document page numbers
+        if page_offset:
+            for page in pages:
+                page['page_num'] += page_offset
+        
         return pages
     
-    def _process_blocks_recursively(self, blocks, pages_dict: Dict, parent_type: str = None):
+    def _process_blocks(self, blocks, pages_dict: Dict):
         """
-        Recursively process blocks and nested sub-blocks
+        Visit blocks and all nested sub-blocks in document order
+        
+        Uses an explicit stack instead of recursion, so arbitrarily deep
+        Layout Parser nesting cannot hit the interpreter recursion limit.
+        Text fragments are collected into each page's paragraphs list; the
+        page text is joined once in _extract_pages (linear in block count).
         
         Args:
-            blocks: List of blocks to process
+            blocks: Top-level blocks to process
             pages_dict: Dictionary to accumulate page data
-            parent_type: Type of parent block (for context)
         """
-        for block in blocks:
+        # Pre-order traversal: children are pushed in reverse so they pop in order
+        stack = list(reversed(blocks))
+        
+        while stack:
+            block = stack.pop()
+            
             # Get page number
             page_num = 1  # default
             if hasattr(block, 'page_span') and block.page_span:
                 page_num = block.page_span.page_start if hasattr(block.page_span, 'page_start') else 1
             
             # Initialize page if not exists
-            if page_num not in pages_dict:
-                pages_dict[page_num] = {
+            page = pages_dict.get(page_num)
+            if page is None:
+                page = pages_dict[page_num] = {
                     'page_num': page_num,
                     'text': '',
                     'paragraphs': [],
@@ -136,6 +464,8 @@ class DocumentProcessor:
                     }
                 }
             
+            children = []
+            
             # Process text blocks
             if hasattr(block, 'text_block') and block.text_block:
                 text_block = block.text_block
@@ -144,32 +474,31 @@ class DocumentProcessor:
                 
                 # Add text to page (if not empty)
                 if text.strip():
-                    pages_dict[page_num]['text'] += text + '\n'
-                    
-                    # Add to paragraphs array for ALL text content
+                    # Paragraphs hold ALL text content
                     # (headings, paragraphs, everything with actual text)
-                    pages_dict[page_num]['paragraphs'].append(text)
+                    page['paragraphs'].append(text)
                     
                     # Track block type
-                    pages_dict[page_num]['layout_metadata']['block_types'].append(block_type)
+                    page['layout_metadata']['block_types'].append(block_type)
                 
-                # Process nested blocks if present
+                # Queue nested blocks if present
                 if hasattr(text_block, 'blocks') and text_block.blocks:
-                    self._process_blocks_recursively(text_block.blocks, pages_dict, block_type)
+                    children.extend(text_block.blocks)
             
             # Process table blocks
             elif hasattr(block, 'table_block') and block.table_block:
-                pages_dict[page_num]['layout_metadata']['has_tables'] = True
+                page['layout_metadata']['has_tables'] = True
                 
-                # Extract text from table cells
+                # Queue blocks from table cells
                 table_block = block.table_block
                 if hasattr(table_block, 'body_rows') and table_block.body_rows:
                     for row in table_block.body_rows:
                         if hasattr(row, 'cells') and row.cells:
                             for cell in row.cells:
                                 if hasattr(cell, 'blocks') and cell.blocks:
-                                    # Recursively process blocks in table cells
-                                    self._process_blocks_recursively(cell.blocks, pages_dict, 'table')
+                                    children.extend(cell.blocks)
+            
+            stack.extend(reversed(children))
     
     def _extract_pages_legacy(self, document: documentai.Document) -> List[Dict]:
         """
@@ -225,18 +554,55 @@ class DocumentProcessor:
         
         return text.strip()
     
-    def format_for_llm(self, bundle: DocumentBundle) -> str:
+    @staticmethod
+    def format_page_for_llm(page: Dict, boilerplate: Optional[BoilerplateIndex] = None) -> str:
+        """Format one page with its page marker (boilerplate lines removed when an index is given)"""
+        return f"--- PAGE {page['page_num']} ---\n{strip_boilerplate_lines(page['text'], boilerplate)}\n\n"
+    
+    @staticmethod
+    def format_for_llm(
+        bundle: DocumentBundle,
+        strip_boilerplate: Optional[bool] = None,
+        page_nums: Optional[Iterable[int]] = None,
+        pages_note: str = "remaining pages omitted to fit the prompt budget"
+    ) -> str:
         """
         Format document bundle into text for LLM classification
         
+        Args:
+            bundle: Document bundle
+            strip_boilerplate: Drop repeated header/footer lines (defaults to settings.strip_boilerplate)
+            page_nums: Only include these pages (a note lists the included range)
+            pages_note: Explanation appended to the included-pages line
+        
         Returns formatted string with page markers
         """
-        formatted_text = f"Document ID: {bundle.doc_id}\n"
-        formatted_text += f"Total Pages: {bundle.total_pages}\n\n"
+        if strip_boilerplate is None:
+            strip_boilerplate = settings.strip_boilerplate
+        boilerplate = bundle.boilerplate if strip_boilerplate else None
+        
+        parts = [f"Document ID: {bundle.doc_id}\n", f"Total Pages: {bundle.total_pages}\n\n"]
+        
+        if page_nums is not None:
+            page_nums = set(page_nums)
+            parts.append(
+                f"Pages Included: {format_page_ranges(sorted(page_nums))} "
+                f"({pages_note})\n\n"
+            )
         
         for page in bundle.pages:
-            formatted_text += f"--- PAGE {page['page_num']} ---\n"
-            formatted_text += page['text']
-            formatted_text += "\n\n"
+            if page_nums is None or page['page_num'] in page_nums:
+                parts.append(DocumentProcessor.format_page_for_llm(page, boilerplate))
         
-        return formatted_text
+        return ''.join(parts)
+
+
+def format_page_ranges(page_nums: List[int]) -> str:
+    """Compact page list, e.g. [1, 2, 3, 7] -> '1-3, 7'"""
+    ranges = []
+    for page_num in page_nums:
+        if ranges and page_num == ranges[-1][1] + 1:
+            ranges[-1][1] = page_num
+        else:
+            ranges.append([page_num, page_num])
+    return ', '.join(f"{start}-{end}" if start != end else str(start) for start, end in ranges)
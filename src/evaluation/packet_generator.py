@@ -8,6 +8,7 @@ from datetime import datetime
 from .ground_truth_schemas import SMEPacket, SMEReviewStatus
 from src.schemas import ClassificationOutput, VerificationReport, ArbiterDecision
 from src.production_schemas import ProductionResult
+from src.atomic_io import atomic_write_json
 import json
 import logging
 
@@ -128,8 +129,7 @@ class SMEPacketGenerator:
         filename = f"sme_packet_{packet.doc_id}.json"
         file_path = output_path / filename
         
-        with open(file_path, 'w') as f:
-            json.dump(packet.model_dump(mode='json'), f, indent=2, default=str)
+        atomic_write_json(file_path, packet.model_dump(mode='json'), default=str)
         
         logger.info(f"SME packet saved to: {file_path}")
         
@@ -11,6 +11,7 @@ from src.evaluation.ground_truth_schemas import (
     GroundTruthSource, SMEReviewStatus
 )
 from src.schemas import ClassificationOutput
+from src.bundle_store import read_pages
 
 
 class SMEReviewHelper:
@@ -396,14 +397,11 @@ class SMEReviewHelper:
                     bundle_path = project_root / bundle_path
                 
                 if bundle_path.exists():
-                    with open(bundle_path, 'r') as f:
-                        bundle_data = json.load(f)
-                    
-                    # Extract text from relevant pages (segment pages)
+                    # Extract text from relevant pages (segment pages) only
                     start_page = segment.start_page
                     end_page = segment.end_page
                     
-                    for page in bundle_data.get('pages', []):
+                    for page in read_pages(bundle_path, start_page, end_page):
                         page_num = page.get('page_num')
                         if start_page <= page_num <= end_page:
                             # Check if this page contains any evidence snippets
@@ -0,0 +1,239 @@
+"""
+Evidence Matcher - Local check that evidence snippets and anchors occur on their pages
+
+V4 used to send the text of every segment page to Gemini only to confirm
+that each Evidence.snippet and its anchors_found appear on the claimed page.
+This module answers that deterministically. Page text is normalized (NFKC,
+case, punctuation, whitespace) and indexed by word trigrams. A snippet is
+located by voting its trigrams onto alignment diagonals (page position minus
+snippet position), which tolerates OCR noise and small edits but requires
+the words to appear together and in order. Snippets elided with "..." are
+matched fragment by fragment.
+
+A match is EXACT or FUZZY on the claimed page, MISPLACED when it aligns on
+another indexed page, NOT_FOUND when it aligns nowhere, and UNRESOLVED when
+the evidence is partial; only UNRESOLVED snippets need the LLM.
+"""
+
+import difflib
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from enum import Enum
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .schemas import DocumentBundle
+
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+_ELLIPSIS = re.compile(r'\.{3,}|…|\[\.\.\.\]')
+
+# Word n-gram size of the page index
+SHINGLE_WORDS = 3
+# Share of a snippet's trigrams that must align on one page to accept it there
+MATCH_THRESHOLD = 0.8
+# Below this on every page the snippet is not in the document
+REJECT_THRESHOLD = 0.3
+# Words of insertion/deletion tolerated between aligned trigrams
+DIAGONAL_SLACK = 2
+# Pages re-scored when looking for a snippet outside its claimed page
+CANDIDATE_PAGES = 3
+# Similarity for an anchor word to match an OCR-damaged page word
+ANCHOR_WORD_CUTOFF = 0.8
+
+
+def normalize_text(text: str) -> str:
+    """NFKC-fold, lowercase, and reduce punctuation and whitespace runs to single spaces"""
+    return _NON_WORD.sub(' ', unicodedata.normalize("NFKC", text).lower()).strip()
+
+
+def tokenize(text: str) -> List[str]:
+    """Normalized words of text"""
+    normalized = normalize_text(text)
+    return normalized.split() if normalized else []
+
+
+def _shingles(tokens: Sequence[str]) -> List[Tuple[str, ...]]:
+    return [tuple(tokens[i:i + SHINGLE_WORDS]) for i in range(len(tokens) - SHINGLE_WORDS + 1)]
+
+
+class MatchStatus(str, Enum):
+    """Where an evidence snippet was found"""
+    EXACT = "exact"  # normalized snippet occurs verbatim on the claimed page
+    FUZZY = "fuzzy"  # aligns on the claimed page above MATCH_THRESHOLD
+    MISPLACED = "misplaced"  # aligns on a different page
+    NOT_FOUND = "not_found"  # below REJECT_THRESHOLD on every page
+    UNRESOLVED = "unresolved"  # partial match; needs a qualitative judgement
+
+
+class SnippetMatch(NamedTuple):
+    """Outcome of locating one snippet"""
+    status: MatchStatus
+    page: Optional[int]  # page of the best match (None when not found)
+    score: float  # aligned share of the snippet on that page
+
+
+class PageIndex:
+    """Normalized text and word-trigram positions of one page"""
+
+    def __init__(self, text: str):
+        self.tokens = tokenize(text)
+        self._padded = f" {' '.join(self.tokens)} "
+        self.vocabulary: Set[str] = set(self.tokens)
+        self.shingles: Dict[Tuple[str, ...], List[int]] = defaultdict(list)
+        for position, shingle in enumerate(_shingles(self.tokens)):
+            self.shingles[shingle].append(position)
+
+    def contains(self, tokens: Sequence[str]) -> bool:
+        """True if the words occur contiguously on the page"""
+        return bool(tokens) and f" {' '.join(tokens)} " in self._padded
+
+    def alignment(self, tokens: Sequence[str]) -> float:
+        """
+        Share of the words' trigrams that align on one diagonal band of the page
+
+        Args:
+            tokens: Normalized words of one snippet fragment
+
+        Returns:
+            0.0-1.0; fragments shorter than a trigram score 1.0 only on an exact occurrence
+        """
+        if len(tokens) < SHINGLE_WORDS:
+            return 1.0 if self.contains(tokens) else 0.0
+
+        shingles = _shingles(tokens)
+        # diagonal -> snippet trigrams that land on it
+        diagonals: Dict[int, Set[int]] = defaultdict(set)
+        for offset, shingle in enumerate(shingles):
+            for position in self.shingles.get(shingle, ()):
+                diagonals[position - offset].add(offset)
+        if not diagonals:
+            return 0.0
+
+        best = 0
+        for diagonal in diagonals:
+            band = set()
+            for d in range(diagonal - DIAGONAL_SLACK, diagonal + DIAGONAL_SLACK + 1):
+                band |= diagonals.get(d, set())
+            best = max(best, len(band))
+        return best / len(shingles)
+
+
+class EvidenceIndex:
+    """Page indexes for the pages evidence may cite, with a trigram -> pages postings map"""
+
+    def __init__(self, pages: Dict[int, str]):
+        """
+        Build the index
+
+        Args:
+            pages: Page number -> page text
+        """
+        self.pages: Dict[int, PageIndex] = {number: PageIndex(text) for number, text in pages.items()}
+        self._postings: Dict[Tuple[str, ...], Set[int]] = defaultdict(set)
+        for number, page in self.pages.items():
+            for shingle in page.shingles:
+                self._postings[shingle].add(number)
+
+    @classmethod
+    def from_bundle(cls, doc_bundle: DocumentBundle, page_numbers: Iterable[int]) -> "EvidenceIndex":
+        """Index the given 1-based pages of a bundle (numbers outside the bundle are ignored)"""
+        wanted = sorted({n for n in page_numbers if 1 <= n <= len(doc_bundle.pages)})
+        pages = {}
+        # Contiguous slices so lazily loaded bundles decode each page once
+        for start, end in _runs(wanted):
+            for number, page in enumerate(doc_bundle.pages[start - 1:end], start=start):
+                pages[number] = page['text']
+        return cls(pages)
+
+    def match_snippet(self, snippet: str, page: int) -> SnippetMatch:
+        """
+        Locate a snippet, preferring its claimed page
+
+        Args:
+            snippet: Evidence snippet (may be elided with "...")
+            page: Claimed 1-based page number
+
+        Returns:
+            SnippetMatch with the status, the page matched and its score
+        """
+        fragments = [tokens for tokens in (tokenize(part) for part in _ELLIPSIS.split(snippet)) if tokens]
+        if not fragments:
+            return SnippetMatch(MatchStatus.UNRESOLVED, None, 0.0)
+
+        claimed = self.pages.get(page)
+        if claimed is not None and all(claimed.contains(tokens) for tokens in fragments):
+            return SnippetMatch(MatchStatus.EXACT, page, 1.0)
+
+        claimed_score = self._score(claimed, fragments) if claimed is not None else 0.0
+        if claimed_score >= MATCH_THRESHOLD:
+            return SnippetMatch(MatchStatus.FUZZY, page, claimed_score)
+
+        other_page, other_score = self._best_other_page(fragments, page)
+        if other_score >= MATCH_THRESHOLD:
+            return SnippetMatch(MatchStatus.MISPLACED, other_page, other_score)
+
+        if max(claimed_score, other_score) < REJECT_THRESHOLD and not self._short_words_present(fragments):
+            return SnippetMatch(MatchStatus.NOT_FOUND, None, max(claimed_score, other_score))
+
+        if claimed_score >= other_score:
+            return SnippetMatch(MatchStatus.UNRESOLVED, page, claimed_score)
+        return SnippetMatch(MatchStatus.UNRESOLVED, other_page, other_score)
+
+    def find_anchor(self, anchor: str, page: int) -> bool:
+        """True if the anchor phrase occurs on the page (each word may be OCR-damaged)"""
+        index = self.pages.get(page)
+        tokens = tokenize(anchor)
+        if index is None or not tokens:
+            return False
+        if index.contains(tokens):
+            return True
+        if len(tokens) >= SHINGLE_WORDS and index.alignment(tokens) >= MATCH_THRESHOLD:
+            return True
+        return all(
+            token in index.vocabulary
+            or difflib.get_close_matches(token, index.vocabulary, n=1, cutoff=ANCHOR_WORD_CUTOFF)
+            for token in tokens
+        )
+
+    def _score(self, index: PageIndex, fragments: List[List[str]]) -> float:
+        """Alignment of all fragments on one page, weighted by fragment length"""
+        total = sum(len(tokens) for tokens in fragments)
+        return sum(index.alignment(tokens) * len(tokens) for tokens in fragments) / total
+
+    def _best_other_page(self, fragments: List[List[str]], claimed: int) -> Tuple[Optional[int], float]:
+        """Best-scoring page other than the claimed one, among pages sharing the most trigrams"""
+        votes = Counter()
+        for tokens in fragments:
+            for shingle in set(_shingles(tokens)):
+                votes.update(self._postings.get(shingle, ()))
+        if not votes:
+            # Fragments too short for trigrams: look for exact occurrences instead
+            candidates = [n for n, index in self.pages.items() if n != claimed and all(index.contains(t) for t in fragments)]
+            return (candidates[0], 1.0) if candidates else (None, 0.0)
+
+        best_page, best_score = None, 0.0
+        for number, _ in votes.most_common(CANDIDATE_PAGES + 1):
+            if number == claimed:
+                continue
+            score = self._score(self.pages[number], fragments)
+            if score > best_score:
+                best_page, best_score = number, score
+        return best_page, best_score
+
+    def _short_words_present(self, fragments: List[List[str]]) -> bool:
+        """For snippets too short to align, whether all their words occur somewhere (OCR may split them)"""
+        if any(len(tokens) >= SHINGLE_WORDS for tokens in fragments):
+            return False
+        words = {token for tokens in fragments for token in tokens}
+        return any(words <= index.vocabulary for index in self.pages.values())
+
+
+def _runs(numbers: List[int]) -> List[Tuple[int, int]]:
+    """Sorted numbers -> inclusive (start, end) runs of consecutive values"""
+    runs = []
+    for number in numbers:
+        if runs and number == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], number)
+        else:
+            runs.append((number, number))
+    return runs
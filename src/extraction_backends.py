@@ -0,0 +1,173 @@
+"""
+Extraction Backends - Pluggable PDF page extraction for DocumentProcessor
+
+A backend turns raw PDF bytes into the DocumentBundle page shape:
+    {'page_num', 'text', 'paragraphs', 'layout_metadata': {'block_types', 'has_tables', ...}}
+
+Backends:
+- DocumentProcessor itself is the Document AI (Layout Parser) backend
+- LocalPDFBackend reads the PDF text layer with pypdf, no network calls,
+  and optionally hands pages without a text layer to a fallback backend
+"""
+
+import io
+import logging
+from typing import Dict, List, Optional, Protocol, Tuple, runtime_checkable
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # optional dependency, only needed for the local backend
+    PdfReader = None
+    PdfWriter = None
+
+logger = logging.getLogger(__name__)
+
+
+@runtime_checkable
+class ExtractionBackend(Protocol):
+    """Interface implemented by every extraction backend"""
+
+    # Short backend name, e.g. "documentai" or "local"
+    name: str
+
+    @property
+    def cache_id(self) -> str:
+        """Identifies the backend configuration in bundle cache keys"""
+        ...
+
+    def extract(self, pdf_content: bytes) -> List[Dict]:
+        """Extract page dictionaries (1-indexed page_num) from PDF bytes"""
+        ...
+
+
+def split_pdf(pdf_content: bytes, pages_per_shard: int) -> List[Tuple[int, bytes]]:
+    """
+    Split a PDF into consecutive page ranges
+
+    Args:
+        pdf_content: Raw PDF bytes
+        pages_per_shard: Maximum pages per shard (0 disables splitting)
+
+    Returns:
+        (page_offset, shard_bytes) tuples in page order; the whole PDF as a
+        single shard when it is short enough, unreadable, or pypdf is not installed
+    """
+    if PdfReader is None or pages_per_shard <= 0:
+        return [(0, pdf_content)]
+
+    try:
+        reader = PdfReader(io.BytesIO(pdf_content))
+        page_count = len(reader.pages)
+    except Exception as e:
+        # Leave unparseable files to the backend, which reports its own error
+        logger.warning(f"Could not read PDF for sharding, sending it whole: {e}")
+        return [(0, pdf_content)]
+    if page_count <= pages_per_shard:
+        return [(0, pdf_content)]
+
+    shards = []
+    for start in range(0, page_count, pages_per_shard):
+        writer = PdfWriter()
+        for index in range(start, min(start + pages_per_shard, page_count)):
+            writer.add_page(reader.pages[index])
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        shards.append((start, buffer.getvalue()))
+    return shards
+
+
+class LocalPDFBackend:
+    """Extract pages from the PDF text layer with pypdf"""
+
+    name = "local"
+
+    def __init__(self, fallback: Optional[ExtractionBackend] = None, min_chars: int = 1):
+        """
+        Initialize local backend
+
+        Args:
+            fallback: Backend used for pages with no text layer (e.g. scanned pages), or None
+            min_chars: Pages with fewer non-whitespace characters than this count as having no text layer
+        """
+        if PdfReader is None:
+            raise ImportError("LocalPDFBackend requires pypdf: pip install pypdf")
+        self.fallback = fallback
+        self.min_chars = min_chars
+
+    @property
+    def cache_id(self) -> str:
+        """Local text extraction, plus the fallback backend when one is configured"""
+        if self.fallback is None:
+            return "local-pypdf"
+        return f"local-pypdf+{self.fallback.cache_id}"
+
+    def extract(self, pdf_content: bytes) -> List[Dict]:
+        """
+        Extract pages from the text layer, sending empty pages to the fallback
+
+        Args:
+            pdf_content: Raw PDF bytes
+
+        Returns:
+            List of page dictionaries in page order
+        """
+        reader = PdfReader(io.BytesIO(pdf_content))
+
+        pages = []
+        missing = []
+        for index, pdf_page in enumerate(reader.pages):
+            text = pdf_page.extract_text() or ''
+            if len(''.join(text.split())) < self.min_chars:
+                missing.append(index)
+            pages.append(self._build_page(index + 1, text))
+
+        if missing and self.fallback is not None:
+            print(f"Local extraction: {len(missing)}/{len(pages)} pages have no text layer, using {self.fallback.name}")
+            for index, page in zip(missing, self._extract_with_fallback(reader, missing)):
+                pages[index] = page
+        elif missing:
+            logger.warning(f"{len(missing)} pages have no text layer and no fallback backend is configured")
+
+        return pages
+
+    def _extract_with_fallback(self, reader, page_indexes: List[int]) -> List[Dict]:
+        """
+        Send only the given pages to the fallback backend as a sub-PDF
+
+        Args:
+            reader: PdfReader for the full document
+            page_indexes: 0-based indexes of pages to re-extract
+
+        Returns:
+            Page dictionaries renumbered to their position in the full document
+        """
+        writer = PdfWriter()
+        for index in page_indexes:
+            writer.add_page(reader.pages[index])
+        buffer = io.BytesIO()
+        writer.write(buffer)
+
+        extracted = {page['page_num']: page for page in self.fallback.extract(buffer.getvalue())}
+
+        pages = []
+        for position, index in enumerate(page_indexes, start=1):
+            page = extracted.get(position) or self._build_page(index + 1, '')
+            page['page_num'] = index + 1
+            page.setdefault('layout_metadata', {})['source'] = self.fallback.name
+            pages.append(page)
+        return pages
+
+    @staticmethod
+    def _build_page(page_num: int, text: str) -> Dict:
+        """Build a page dictionary with one paragraph per non-empty text line"""
+        paragraphs = [line.strip() for line in text.splitlines() if line.strip()]
+        return {
+            'page_num': page_num,
+            'text': ''.join(paragraph + '\n' for paragraph in paragraphs),
+            'paragraphs': paragraphs,
+            'layout_metadata': {
+                'block_types': ['paragraph'] * len(paragraphs),
+                'has_tables': False,
+                'source': 'pdf_text_layer'
+            }
+        }
@@ -0,0 +1,42 @@
+"""Factory for the Gemini client shared by the classifier and verification agents"""
+
+from typing import Optional
+from google import genai
+from .config import settings
+from .llm_cache import CachedGenAIClient, get_default_cache
+from .rate_limiter import RateLimitedGenAIClient, get_default_rate_limiter
+
+
+def create_genai_client(
+    project: Optional[str] = None,
+    location: Optional[str] = None,
+    use_cache: Optional[bool] = None,
+    rate_limit: Optional[bool] = None
+):
+    """
+    Create a Vertex AI Gemini client, rate-limited and wrapped in the response cache if enabled
+
+    The cache sits outside the limiter, so cache hits never consume quota.
+
+    Args:
+        project: GCP project ID (defaults to settings.gcp_project_id)
+        location: Vertex AI region (defaults to settings.vertex_ai_location)
+        use_cache: Wrap in CachedGenAIClient (defaults to settings.llm_cache_enabled)
+        rate_limit: Wrap in RateLimitedGenAIClient (defaults to settings.gemini_rate_limit_enabled)
+
+    Returns:
+        genai.Client or a wrapper exposing the same models.generate_content API
+    """
+    client = genai.Client(
+        vertexai=True,
+        project=project or settings.gcp_project_id,
+        location=location or settings.vertex_ai_location
+    )
+
+    if settings.gemini_rate_limit_enabled if rate_limit is None else rate_limit:
+        client = RateLimitedGenAIClient(client, get_default_rate_limiter())
+
+    if settings.llm_cache_enabled if use_cache is None else use_cache:
+        client = CachedGenAIClient(client, get_default_cache())
+
+    return client
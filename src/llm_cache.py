@@ -0,0 +1,419 @@
+"""
+LLM Response Cache - Content-addressed, disk-backed cache for Gemini calls
+
+Every agent calls ``client.models.generate_content`` with temperature 0, so a
+response is fully determined by the model, the prompt contents and the
+generation config. ``CachedGenAIClient`` wraps a ``genai.Client`` and serves
+repeat requests from an on-disk SQLite store instead of the network; the
+async API (``client.aio.models.generate_content``) shares the same store.
+
+A fresh response is not stored until the caller has parsed and validated
+it: callers run ``commit_response(response)`` on success, and
+``discard_response(response)`` when the text is unusable (which also drops a
+bad entry served from the cache). A truncated or malformed reply is therefore
+never replayed to the caller's retry loop or to later runs.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LLMResponseCache:
+    """
+    On-disk response store with size- and age-based LRU eviction.
+
+    Entries not read for ``max_age_days`` are expired, and when the store
+    exceeds ``max_bytes`` the least recently used entries are evicted.
+    Safe to share between threads and between processes (SQLite locking).
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = None,
+        max_bytes: int = None,
+        max_age_days: float = None
+    ):
+        """
+        Initialize cache store
+
+        Args:
+            cache_dir: Directory holding the SQLite file (defaults to settings.llm_cache_dir)
+            max_bytes: Maximum total size of cached responses (defaults to settings.llm_cache_max_mb)
+            max_age_days: Expire entries not read for this many days (defaults to settings.llm_cache_max_age_days)
+        """
+        self.cache_dir = Path(cache_dir or settings.llm_cache_dir)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.llm_cache_max_mb * 1024 * 1024
+        max_age_days = max_age_days if max_age_days is not None else settings.llm_cache_max_age_days
+        self.max_age_seconds = max_age_days * 86400
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.cache_dir / "responses.sqlite3"),
+            timeout=30,
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT,"
+            " response_text TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.bypassed = 0
+
+    @staticmethod
+    def make_key(model: str, contents: Any, config: Any = None) -> str:
+        """
+        Build a content-addressed cache key
+
+        Args:
+            model: Gemini model name
+            contents: Prompt string, Part, or list of strings/Parts
+            config: GenerateContentConfig (or None)
+
+        Returns:
+            SHA-256 hex digest of model + per-part content hashes + config
+        """
+        parts = contents if isinstance(contents, (list, tuple)) else [contents]
+        key_data = {
+            "model": model,
+            "contents": [_hash_content(part) for part in parts],
+            "config": _serialize_config(config),
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached response text (and refresh its LRU position), or None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response_text, last_access FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response_text: str, model: str = None):
+        """Store a response and evict entries if the store is over budget"""
+        now = time.time()
+        size = len(response_text.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response_text, size, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response_text, size, now, now)
+            )
+            self._conn.commit()
+            self.writes += 1
+            self._evict_locked(now)
+
+    def delete(self, key: str):
+        """Remove one entry (e.g. a cached response the caller could not parse)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def evict(self):
+        """Run age- and size-based eviction"""
+        with self._lock:
+            self._evict_locked(time.time())
+
+    def _evict_locked(self, now: float):
+        """Evict expired entries, then least recently used until under max_bytes"""
+        cursor = self._conn.execute(
+            "DELETE FROM responses WHERE last_access < ?", (now - self.max_age_seconds,)
+        )
+        evicted = cursor.rowcount
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC"
+            ).fetchall()
+            stale_keys = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                stale_keys.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+            evicted += len(stale_keys)
+
+        # Always commit: the DELETE opens a write transaction even when nothing matched
+        self._conn.commit()
+        if evicted:
+            self.evictions += evicted
+            logger.info(f"LLM cache evicted {evicted} entries")
+
+    def clear(self):
+        """Remove all cached responses"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus current store size"""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "bypassed": self.bypassed,
+            "entries": entries,
+            "size_bytes": total,
+        }
+
+
+class CachedResponse:
+    """Minimal stand-in for GenerateContentResponse served from cache"""
+
+    def __init__(self, text: str, cache: LLMResponseCache = None, key: str = None):
+        self.text = text
+        self._cache = cache
+        self._key = key
+
+    def commit(self):
+        """Already stored"""
+
+    def discard(self):
+        """Drop the cached entry so the next call goes to Gemini"""
+        if self._cache is not None:
+            self._cache.delete(self._key)
+
+
+class PendingResponse:
+    """
+    Fresh Gemini response, stored only once the caller commits it
+
+    Every other attribute is delegated to the wrapped response.
+    """
+
+    def __init__(self, response, cache: LLMResponseCache, key: str, model: str):
+        self._response = response
+        self._cache = cache
+        self._key = key
+        self._model = model
+
+    @property
+    def text(self):
+        return self._response.text
+
+    def commit(self):
+        """Store the response (call after it parsed and validated)"""
+        if self._response.text:
+            self._cache.put(self._key, self._response.text, model=self._model)
+
+    def discard(self):
+        """Nothing stored yet"""
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+
+def commit_response(response: Any):
+    """Store a validated response if it came through CachedGenAIClient (no-op otherwise)"""
+    commit = getattr(response, "commit", None)
+    if callable(commit):
+        commit()
+
+
+def discard_response(response: Any):
+    """Forget a response that failed to parse or validate (no-op for uncached clients)"""
+    discard = getattr(response, "discard", None)
+    if callable(discard):
+        discard()
+
+
+def parse_and_commit(response: Any, parse: Callable[[Any], T]) -> T:
+    """
+    Parse a response, caching it only if parsing succeeds
+
+    Args:
+        response: Response from generate_content
+        parse: Parses and validates the response; raises on bad output
+
+    Returns:
+        parse(response)
+    """
+    try:
+        result = parse(response)
+    except Exception:
+        discard_response(response)
+        raise
+    commit_response(response)
+    return result
+
+
+async def aparse_and_commit(response: Any, parse: Callable[[Any], T]) -> T:
+    """Async counterpart of parse_and_commit() (cache I/O runs off the event loop)"""
+    try:
+        result = parse(response)
+    except Exception:
+        await asyncio.to_thread(discard_response, response)
+        raise
+    await asyncio.to_thread(commit_response, response)
+    return result
+
+
+class _CachedModels:
+    """Wraps ``client.models`` so generate_content consults the cache first"""
+
+    def __init__(self, models, cache: LLMResponseCache):
+        self._models = models
+        self._cache = cache
+
+    def generate_content(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        """Serve deterministic (temperature 0) requests from cache, otherwise call Gemini"""
+        if not _is_deterministic(config):
+            self._cache.bypassed += 1
+            return self._models.generate_content(model=model, contents=contents, config=config, **kwargs)
+
+        key = self._cache.make_key(model, contents, config)
+        cached_text = self._cache.get(key)
+        if cached_text is not None:
+            return CachedResponse(cached_text, self._cache, key)
+
+        response = self._models.generate_content(model=model, contents=contents, config=config, **kwargs)
+        return PendingResponse(response, self._cache, key, model)
+
+    def __getattr__(self, name):
+        return getattr(self._models, name)
+
+
+class _CachedAsyncModels:
+    """Wraps ``client.aio.models``; SQLite lookups run off the event loop"""
+
+    def __init__(self, models, cache: LLMResponseCache):
+        self._models = models
+        self._cache = cache
+
+    async def generate_content(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        """Async counterpart of _CachedModels.generate_content"""
+        if not _is_deterministic(config):
+            self._cache.bypassed += 1
+            return await self._models.generate_content(model=model, contents=contents, config=config, **kwargs)
+
+        key = self._cache.make_key(model, contents, config)
+        cached_text = await asyncio.to_thread(self._cache.get, key)
+        if cached_text is not None:
+            return CachedResponse(cached_text, self._cache, key)
+
+        response = await self._models.generate_content(model=model, contents=contents, config=config, **kwargs)
+        return PendingResponse(response, self._cache, key, model)
+
+    def __getattr__(self, name):
+        return getattr(self._models, name)
+
+
+class _CachedAsyncClient:
+    """Wraps ``client.aio`` so async calls share the same cache"""
+
+    def __init__(self, aio, cache: LLMResponseCache):
+        self._aio = aio
+        self.models = _CachedAsyncModels(aio.models, cache)
+
+    def __getattr__(self, name):
+        return getattr(self._aio, name)
+
+
+class CachedGenAIClient:
+    """
+    Drop-in wrapper around ``genai.Client`` with a shared response cache.
+
+    Only ``models.generate_content`` (and its ``aio`` counterpart) is
+    intercepted; every other attribute is delegated to the wrapped client.
+    Responses are cached when the caller passes them to commit_response().
+    """
+
+    def __init__(self, client, cache: LLMResponseCache):
+        self._client = client
+        self.cache = cache
+        self.models = _CachedModels(client.models, cache)
+        self._aio = None
+
+    @property
+    def aio(self) -> _CachedAsyncClient:
+        """Async client sharing this wrapper's cache (built on first use)"""
+        if self._aio is None:
+            self._aio = _CachedAsyncClient(self._client.aio, self.cache)
+        return self._aio
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> LLMResponseCache:
+    """Process-wide cache instance so every agent shares one store and one set of counters"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache()
+        return _default_cache
+
+
+def _hash_content(part: Any) -> str:
+    """Hash one prompt part (prompt text, or a Part such as inline PDF bytes)"""
+    if isinstance(part, str):
+        payload = part.encode("utf-8")
+    elif isinstance(part, bytes):
+        payload = part
+    elif hasattr(part, "model_dump_json"):
+        payload = part.model_dump_json(exclude_none=True).encode("utf-8")
+    else:
+        payload = repr(part).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _serialize_config(config: Any) -> Any:
+    """Stable representation of a GenerateContentConfig"""
+    if config is None:
+        return None
+    if hasattr(config, "model_dump"):
+        return config.model_dump(mode="json", exclude_none=True)
+    return config
+
+
+def _is_deterministic(config: Any) -> bool:
+    """Only temperature-0 requests are cacheable"""
+    if config is None:
+        return False
+    temperature = config.get("temperature") if isinstance(config, dict) else getattr(config, "temperature", None)
+    return temperature == 0
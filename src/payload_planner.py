@@ -0,0 +1,244 @@
+"""
+Payload Planner - Evidence-scoped page selection for V2/V4 prompt payloads
+
+V2 and V4 used to send the text of every page of every segment, serialized
+with json.dumps(indent=2), so a 200-page document was sent in full twice per
+verification. The planner picks the pages a check actually needs from each
+segment:
+
+    boundary - first and last page (where segmentation errors show)
+    evidence - pages cited by the segment's top_evidence
+    anchor   - pages where the evidence anchors occur, most anchors first
+               (at most settings.verification_payload_anchor_pages per segment)
+
+and serializes them as plain "--- PAGE n ---" blocks under a header per
+segment, with the classification as compact JSON. Each plan reports its
+estimated tokens against the full-context payload; mode "full"
+(settings.verification_payload_mode) turns planning off and the agents send
+every segment page as before.
+"""
+
+import logging
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .boilerplate import strip_boilerplate
+from .config import settings
+from .evidence_matcher import normalize_text
+from .prompt_budget import TokenEstimator, get_default_estimator, page_token_key
+from .schemas import ClassificationOutput, DocumentBundle, PresenceLevel
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_MODES = ("planned", "full")
+PAGE_REASONS = ("boundary", "evidence", "anchor")
+
+
+class PayloadPlan(NamedTuple):
+    """Pages chosen for one prompt and their serialized text"""
+    pages: Dict[int, List[int]]  # segment_index -> pages sent (unassigned extra pages under 0)
+    reasons: Dict[int, Set[str]]  # page -> why it was sent
+    text: str  # page blocks for the prompt
+    classification_json: str  # compact classification JSON
+    tokens_full: int  # estimated tokens of the full-context payload
+    tokens_sent: int  # estimated tokens of this payload
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.tokens_full - self.tokens_sent)
+
+    @property
+    def page_count(self) -> int:
+        return sum(len(pages) for pages in self.pages.values())
+
+
+class PayloadPlanner:
+    """Choose and serialize the minimal page set for V2/V4 prompts"""
+
+    def __init__(self, mode: str = None, max_anchor_pages: int = None, estimator: TokenEstimator = None):
+        """
+        Initialize planner
+
+        Args:
+            mode: "planned" or "full" (defaults to settings.verification_payload_mode, read per call)
+            max_anchor_pages: Anchor-hit pages kept per segment (defaults to settings.verification_payload_anchor_pages)
+            estimator: Token estimator (defaults to the shared estimator)
+        """
+        if mode is not None and mode not in PAYLOAD_MODES:
+            raise ValueError(f"Unknown payload mode: {mode} (expected one of {', '.join(PAYLOAD_MODES)})")
+        self._mode = mode
+        self._max_anchor_pages = max_anchor_pages
+        self.estimator = estimator or get_default_estimator()
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.tokens_full = 0
+        self.tokens_sent = 0
+
+    @property
+    def mode(self) -> str:
+        return self._mode or settings.verification_payload_mode
+
+    @property
+    def max_anchor_pages(self) -> int:
+        return settings.verification_payload_anchor_pages if self._max_anchor_pages is None else self._max_anchor_pages
+
+    @property
+    def variant(self) -> str:
+        """Settings that change the page text V2/V4 send (part of their stored-result version)"""
+        stripped = "stripped" if settings.strip_boilerplate else "raw"
+        if self.mode == "full":
+            return f"full:{stripped}"
+        return f"planned:{self.max_anchor_pages}:{stripped}"
+
+    def plan(
+        self,
+        classification: ClassificationOutput,
+        doc_bundle: DocumentBundle,
+        reasons: Iterable[str] = PAGE_REASONS,
+        extra_pages: Iterable[int] = ()
+    ) -> Optional[PayloadPlan]:
+        """
+        Select and serialize pages for one prompt
+
+        Args:
+            classification: Classification being verified
+            doc_bundle: Document bundle
+            reasons: Which page kinds to select (subset of PAGE_REASONS)
+            extra_pages: Further pages to send (e.g. V4's unresolved evidence pages)
+
+        Returns:
+            PayloadPlan, or None in "full" mode
+        """
+        if self.mode == "full":
+            return None
+
+        reasons = set(reasons)
+        boilerplate = doc_bundle.boilerplate if settings.strip_boilerplate else None
+        total = len(doc_bundle.pages)
+        texts: Dict[int, str] = {}
+
+        def page_text(number: int) -> str:
+            if number not in texts:
+                texts[number] = strip_boilerplate(doc_bundle.pages[number - 1]['text'], boilerplate)
+            return texts[number]
+
+        def full_tokens(number: int) -> int:
+            # Usually cached by the classifier's prompt assembly; the page is decoded only on a miss
+            key = page_token_key(doc_bundle, number, boilerplate is not None)
+            tokens = self.estimator.peek(key)
+            if tokens is None:
+                tokens = self.estimator.cached(key, f"--- PAGE {number} ---\n{page_text(number)}\n\n")
+            return tokens
+
+        # page -> reasons, and segment -> pages
+        chosen: Dict[int, Set[str]] = {}
+        by_segment: Dict[int, Set[int]] = {}
+        segment_of: Dict[int, int] = {}
+        tokens_full = 0
+
+        for seg in classification.segments:
+            first, last = max(seg.start_page, 1), min(seg.end_page, total)
+            selected = by_segment.setdefault(seg.segment_index, set())
+            if first > last:
+                continue
+            for number in range(first, last + 1):
+                segment_of.setdefault(number, seg.segment_index)
+
+            def choose(number: int, reason: str):
+                if 1 <= number <= total:
+                    selected.add(number)
+                    chosen.setdefault(number, set()).add(reason)
+
+            if "boundary" in reasons:
+                choose(first, "boundary")
+                choose(last, "boundary")
+
+            evidence = [
+                ev for comp in seg.segment_composition
+                if comp.presence_level != PresenceLevel.NO_EVIDENCE
+                for ev in comp.top_evidence
+            ]
+            if "evidence" in reasons:
+                for ev in evidence:
+                    choose(ev.page, "evidence")
+
+            anchors = {normalize_text(a) for ev in evidence for a in ev.anchors_found} - {""}
+            # Full-context cost of this segment, and anchor hits on the pages not already chosen
+            hits: List[Tuple[int, int]] = []
+            for number in range(first, last + 1):
+                tokens_full += full_tokens(number)
+                if "anchor" in reasons and anchors and number not in selected:
+                    padded = f" {normalize_text(page_text(number))} "
+                    count = sum(1 for anchor in anchors if f" {anchor} " in padded)
+                    if count:
+                        hits.append((count, number))
+            for _, number in sorted(hits, key=lambda hit: (-hit[0], hit[1]))[:self.max_anchor_pages]:
+                choose(number, "anchor")
+
+        for number in extra_pages:
+            if 1 <= number <= total:
+                by_segment.setdefault(segment_of.get(number, 0), set()).add(number)
+                chosen.setdefault(number, set()).add("requested")
+
+        pages = {index: sorted(numbers) for index, numbers in by_segment.items()}
+        text = self._serialize(classification, pages, page_text)
+        classification_json = classification.model_dump_json()
+        tokens_full += self.estimator.estimate(classification.model_dump_json(indent=2))
+        tokens_sent = self.estimator.estimate(text) + self.estimator.estimate(classification_json)
+
+        with self._lock:
+            self.calls += 1
+            self.tokens_full += tokens_full
+            self.tokens_sent += tokens_sent
+
+        return PayloadPlan(pages, chosen, text, classification_json, tokens_full, tokens_sent)
+
+    @staticmethod
+    def _serialize(classification: ClassificationOutput, pages: Dict[int, List[int]], page_text) -> str:
+        """Plain-text page blocks grouped by segment (no JSON escaping or indentation)"""
+        ranges = {seg.segment_index: (seg.start_page, seg.end_page) for seg in classification.segments}
+        blocks = []
+        for index in sorted(pages):
+            numbers = pages[index]
+            if not numbers:
+                continue
+            if index in ranges:
+                start, end = ranges[index]
+                blocks.append(f"=== SEGMENT {index} (pages {start}-{end}; included: {', '.join(map(str, numbers))}) ===")
+            else:
+                blocks.append(f"=== OUTSIDE SEGMENTS (included: {', '.join(map(str, numbers))}) ===")
+            for number in numbers:
+                blocks.append(f"--- PAGE {number} ---\n{page_text(number)}")
+        return "\n".join(blocks) if blocks else "(no pages)"
+
+    def stats(self) -> Dict[str, int]:
+        """Totals over every plan made by this planner"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "tokens_full": self.tokens_full,
+                "tokens_sent": self.tokens_sent,
+                "tokens_saved": max(0, self.tokens_full - self.tokens_sent),
+            }
+
+
+_default_planner: Optional[PayloadPlanner] = None
+_default_planner_lock = threading.Lock()
+
+
+def get_default_planner() -> PayloadPlanner:
+    """Process-wide planner shared by V2 and V4 so savings are totalled in one place"""
+    global _default_planner
+    with _default_planner_lock:
+        if _default_planner is None:
+            _default_planner = PayloadPlanner()
+        return _default_planner
+
+
+def log_plan(agent: str, plan: PayloadPlan, total_pages: int):
+    """Print and log the pages sent and the tokens saved by one plan"""
+    message = (f"{agent}: payload {plan.page_count}/{total_pages} pages, "
+               f"~{plan.tokens_sent:,} tokens (~{plan.tokens_saved:,} saved vs full context)")
+    print(f"    {message}")
+    logger.info(message)
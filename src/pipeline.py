@@ -0,0 +1,358 @@
+"""
+Document Pipeline - End-to-end processing of a single PDF
+
+DocumentProcessor → PrimaryClassifierAgent → RetryOrchestrator → SMEPacketGenerator,
+with per-stage timings. One pipeline instance owns one Gemini client and one
+Document AI client, so batch workers build it once and reuse it for every document.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from .atomic_io import atomic_write_json
+from .bundle_store import BUNDLE_SUFFIX, load_bundle, write_bundle
+from .checkpoint import CheckpointJournal
+from .config import settings
+from .document_processor import DocumentProcessor
+from .genai_client import create_genai_client
+from .primary_classifier_agent import PrimaryClassifierAgent
+from .agents import RetryOrchestrator
+from .evaluation.packet_generator import SMEPacketGenerator
+from .schemas import ArbiterDecision, ClassificationOutput, DocumentBundle, PromptMetadata, VerificationReport
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentRunResult(BaseModel):
+    """Outcome of running the full pipeline on one PDF"""
+    doc_id: str
+    pdf_path: str
+    status: str = Field(description="completed | failed")
+    decision: Optional[str] = Field(default=None, description="Final V5 decision (AUTO_ACCEPT | ESCALATE_TO_SME)")
+    retry_attempts: int = Field(default=0, ge=0, description="AUTO_RETRY cycles before the final decision")
+    total_pages: Optional[int] = None
+    stage_seconds: Dict[str, float] = Field(default_factory=dict, description="Wall-clock seconds per stage")
+    error: Optional[str] = None
+    packet_path: Optional[str] = None
+    prompt_metadata: Optional[PromptMetadata] = Field(default=None, description="Classifier prompt token estimate and reduction strategy")
+
+
+class DocumentPipeline:
+    """Run extraction, classification, verification and SME packet generation for one PDF"""
+
+    STAGES = ("extraction", "classification", "verification", "packet")
+
+    def __init__(
+        self,
+        output_dir: str = None,
+        bundle_dir: str = "output/document_bundles",
+        journal_dir: Optional[str] = None,
+        resume: bool = True
+    ):
+        """
+        Initialize pipeline components (one Gemini client, one Document AI client)
+
+        Args:
+            output_dir: Directory for classification/verification JSON (defaults to settings.default_output_dir)
+            bundle_dir: Directory for saved DocumentBundles (used by SME review)
+            journal_dir: Enable checkpointing to this directory (None disables it)
+            resume: Skip stages already recorded as complete in the journal
+        """
+        self.output_dir = Path(output_dir or settings.default_output_dir)
+        self.bundle_dir = Path(bundle_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.bundle_dir.mkdir(parents=True, exist_ok=True)
+        self.journal = CheckpointJournal(journal_dir) if journal_dir else None
+        self.resume = resume
+
+        self.gemini_client = create_genai_client()
+        self.doc_processor = DocumentProcessor()
+        self.classifier = PrimaryClassifierAgent(client=self.gemini_client)
+        self.orchestrator = RetryOrchestrator(client=self.gemini_client, journal=self.journal)
+        self.packet_generator = SMEPacketGenerator()
+
+    def run(self, pdf_path: str) -> DocumentRunResult:
+        """
+        Process one PDF end to end
+
+        Failures are captured on the result rather than raised, so one bad
+        document never stops a batch. With a journal, stages completed by a
+        previous (crashed) run are restored from their artifacts and skipped;
+        a stage missing from stage_seconds was restored, not re-run.
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            DocumentRunResult with decision and per-stage timings
+        """
+        pdf_path = Path(pdf_path)
+        doc_id = pdf_path.stem
+        result = DocumentRunResult(doc_id=doc_id, pdf_path=str(pdf_path), status="failed")
+        journal = self.journal
+        stage = "extraction"
+
+        try:
+            if journal:
+                journal.begin(doc_id, str(pdf_path), resume=self.resume)
+
+            # Stage 1: Document AI extraction
+            checkpoint = journal.get(doc_id, "extraction") if journal else None
+            if checkpoint:
+                doc_bundle = self._load_bundle(checkpoint["bundle_path"])
+            else:
+                start = time.perf_counter()
+                doc_bundle = self.doc_processor.process_pdf(str(pdf_path))
+                doc_bundle = self._finish_extraction(doc_bundle, result, start)
+            result.total_pages = doc_bundle.total_pages
+
+            # Stage 2: Primary classification
+            stage = "classification"
+            checkpoint = journal.get(doc_id, "classification") if journal else None
+            if checkpoint:
+                classification = self._restore_classification(checkpoint, result)
+            else:
+                start = time.perf_counter()
+                classification = self.classifier.classify_bundle(doc_bundle)
+                self._finish_classification(doc_id, classification, self.classifier.last_prompt_metadata, result, start)
+            doc_bundle.document_type = classification.dominant_type_overall.value
+
+            # Stage 3: V1-V5 verification with auto-retry (V-agents checkpoint individually)
+            stage = "verification"
+            checkpoint = journal.get(doc_id, "verification") if journal else None
+            if checkpoint:
+                final_classification, report, decision = self._load_verification(checkpoint)
+                retry_attempts = checkpoint["retry_attempts"]
+            else:
+                start = time.perf_counter()
+                verified = self.orchestrator.verify_with_retry(classification, doc_bundle)
+                final_classification, report, decision, retry_log = verified
+                retry_attempts = self._finish_verification(doc_bundle, verified, result, start)
+            result.decision = decision.decision
+            result.retry_attempts = retry_attempts
+
+            # Stage 4: SME packet (escalations only), with any agents skipped by
+            # decision-bound verification added back in
+            stage = "packet"
+            if decision.decision == "ESCALATE_TO_SME":
+                report = self.orchestrator.verification_runner.enrich_report(report, doc_id)
+            self._packet_stage(pdf_path, final_classification, report, decision, result)
+
+            result.status = "completed"
+
+        except Exception as e:
+            logger.error(f"{result.doc_id}: {stage} failed: {e}")
+            result.error = f"{stage}: {e}"
+
+        return result
+
+    async def arun(self, pdf_path: str) -> DocumentRunResult:
+        """
+        Async counterpart of run()
+
+        Extraction, classification and V2-V4 verification await their API
+        calls, so one event loop can keep many documents in flight on this
+        pipeline's shared clients. Local file, cache and journal work runs
+        inline or in worker threads.
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            DocumentRunResult with decision and per-stage timings
+        """
+        pdf_path = Path(pdf_path)
+        doc_id = pdf_path.stem
+        result = DocumentRunResult(doc_id=doc_id, pdf_path=str(pdf_path), status="failed")
+        journal = self.journal
+        stage = "extraction"
+
+        try:
+            if journal:
+                journal.begin(doc_id, str(pdf_path), resume=self.resume)
+
+            checkpoint = journal.get(doc_id, "extraction") if journal else None
+            if checkpoint:
+                doc_bundle = self._load_bundle(checkpoint["bundle_path"])
+            else:
+                start = time.perf_counter()
+                doc_bundle = await self.doc_processor.aprocess_pdf(str(pdf_path))
+                doc_bundle = await asyncio.to_thread(self._finish_extraction, doc_bundle, result, start)
+            result.total_pages = doc_bundle.total_pages
+
+            stage = "classification"
+            checkpoint = journal.get(doc_id, "classification") if journal else None
+            if checkpoint:
+                classification = self._restore_classification(checkpoint, result)
+            else:
+                start = time.perf_counter()
+                classification, prompt_metadata = await self.classifier.aclassify_bundle(doc_bundle)
+                self._finish_classification(doc_id, classification, prompt_metadata, result, start)
+            doc_bundle.document_type = classification.dominant_type_overall.value
+
+            stage = "verification"
+            checkpoint = journal.get(doc_id, "verification") if journal else None
+            if checkpoint:
+                final_classification, report, decision = self._load_verification(checkpoint)
+                retry_attempts = checkpoint["retry_attempts"]
+            else:
+                start = time.perf_counter()
+                verified = await self.orchestrator.averify_with_retry(classification, doc_bundle)
+                final_classification, report, decision, retry_log = verified
+                retry_attempts = self._finish_verification(doc_bundle, verified, result, start)
+            result.decision = decision.decision
+            result.retry_attempts = retry_attempts
+
+            stage = "packet"
+            if decision.decision == "ESCALATE_TO_SME":
+                report = await self.orchestrator.verification_runner.aenrich_report(report, doc_id)
+            await asyncio.to_thread(self._packet_stage, pdf_path, final_classification, report, decision, result)
+
+            result.status = "completed"
+
+        except Exception as e:
+            logger.error(f"{result.doc_id}: {stage} failed: {e}")
+            result.error = f"{stage}: {e}"
+
+        return result
+
+    def _finish_extraction(self, doc_bundle: DocumentBundle, result: DocumentRunResult, start: float) -> DocumentBundle:
+        """Save the extracted bundle, record the stage, and return the bundle reloaded from disk"""
+        bundle_path = self._save_bundle(doc_bundle)
+        # Continue from the saved file so pages are read on demand
+        # (memory-mapped for long documents) instead of held in memory
+        doc_bundle = self._load_bundle(str(bundle_path))
+        result.stage_seconds["extraction"] = time.perf_counter() - start
+        if self.journal:
+            self.journal.mark_complete(doc_bundle.doc_id, "extraction", bundle_path=str(bundle_path))
+        return doc_bundle
+
+    def _restore_classification(self, checkpoint: Dict, result: DocumentRunResult) -> ClassificationOutput:
+        """Restore a completed classification stage from the journal"""
+        classification = self._load_classification(checkpoint["classification_path"])
+        if checkpoint.get("prompt_metadata"):
+            result.prompt_metadata = PromptMetadata.model_validate(checkpoint["prompt_metadata"])
+        return classification
+
+    def _finish_classification(
+        self,
+        doc_id: str,
+        classification: ClassificationOutput,
+        prompt_metadata: Optional[PromptMetadata],
+        result: DocumentRunResult,
+        start: float
+    ):
+        """Save the primary classification (with its prompt plan) and record the stage"""
+        result.prompt_metadata = prompt_metadata
+        classification_data = classification.model_dump(mode='json')
+        if prompt_metadata is not None:
+            classification_data['prompt_metadata'] = prompt_metadata.model_dump()
+        classification_path = self.output_dir / f"{doc_id}_primary_classification.json"
+        atomic_write_json(classification_path, classification_data)
+        result.stage_seconds["classification"] = time.perf_counter() - start
+        if self.journal:
+            self.journal.mark_complete(
+                doc_id, "classification",
+                classification_path=str(classification_path),
+                prompt_metadata=prompt_metadata.model_dump() if prompt_metadata else None
+            )
+
+    def _finish_verification(
+        self,
+        doc_bundle: DocumentBundle,
+        verified: Tuple[ClassificationOutput, VerificationReport, ArbiterDecision, list],
+        result: DocumentRunResult,
+        start: float
+    ) -> int:
+        """Save verification outputs and record the stage; returns the retry count"""
+        final_classification, report, decision, retry_log = verified
+        retry_attempts = len(retry_log)
+        output_path, verification_path = self._save_outputs(
+            doc_bundle, final_classification, report, decision, retry_log
+        )
+        result.stage_seconds["verification"] = time.perf_counter() - start
+        if self.journal:
+            self.journal.mark_complete(
+                doc_bundle.doc_id, "verification",
+                classification_path=str(output_path),
+                verification_path=str(verification_path),
+                decision=decision.decision,
+                retry_attempts=retry_attempts
+            )
+        return retry_attempts
+
+    def _packet_stage(
+        self,
+        pdf_path: Path,
+        final_classification: ClassificationOutput,
+        report: VerificationReport,
+        decision: ArbiterDecision,
+        result: DocumentRunResult
+    ):
+        """Generate the SME packet for escalations (restored from the journal when already done)"""
+        doc_id = pdf_path.stem
+        checkpoint = self.journal.get(doc_id, "packet") if self.journal else None
+        if checkpoint:
+            result.packet_path = checkpoint.get("packet_path")
+            return
+
+        if decision.decision == "ESCALATE_TO_SME":
+            start = time.perf_counter()
+            packet = self.packet_generator.generate_packet(
+                pdf_path=str(pdf_path),
+                primary_classification=final_classification,
+                verification_report=report,
+                arbiter_decision=decision,
+                document_bundle_path=str(self.bundle_dir / f"bundle_{doc_id}{BUNDLE_SUFFIX}")
+            )
+            result.packet_path = str(self.packet_generator.save_packet(packet))
+            result.stage_seconds["packet"] = time.perf_counter() - start
+        if self.journal:
+            self.journal.mark_complete(doc_id, "packet", packet_path=result.packet_path)
+
+    def _save_bundle(self, doc_bundle: DocumentBundle) -> Path:
+        """Save DocumentBundle atomically in the compact format (same location as run_classification.py)"""
+        bundle_path = self.bundle_dir / f"bundle_{doc_bundle.doc_id}{BUNDLE_SUFFIX}"
+        write_bundle(bundle_path, doc_bundle)
+        return bundle_path
+
+    def _save_outputs(self, doc_bundle, classification, report, decision, retry_log) -> Tuple[Path, Path]:
+        """Save bundle, final classification and verification report (same layout as run_classification.py)"""
+        self._save_bundle(doc_bundle)
+
+        output_path = self.output_dir / f"{doc_bundle.doc_id}_classification.json"
+        atomic_write_json(output_path, classification.model_dump(mode='json'))
+
+        verification_data = report.model_dump(mode='json')
+        verification_data['arbiter_decision'] = decision.model_dump()
+        verification_data['retry_log'] = retry_log
+        verification_path = self.output_dir / f"{output_path.stem}_verification.json"
+        atomic_write_json(verification_path, verification_data)
+
+        return output_path, verification_path
+
+    @staticmethod
+    def _load_bundle(path: str) -> DocumentBundle:
+        return load_bundle(path)
+
+    @staticmethod
+    def _load_classification(path: str) -> ClassificationOutput:
+        with open(path, 'r', encoding='utf-8') as f:
+            return ClassificationOutput.model_validate(json.load(f))
+
+    @staticmethod
+    def _load_verification(checkpoint: Dict) -> Tuple[ClassificationOutput, VerificationReport, ArbiterDecision]:
+        """Restore final classification, report and decision from a completed verification stage"""
+        classification = DocumentPipeline._load_classification(checkpoint["classification_path"])
+        with open(checkpoint["verification_path"], 'r', encoding='utf-8') as f:
+            verification_data = json.load(f)
+        decision = ArbiterDecision.model_validate(verification_data.pop('arbiter_decision'))
+        verification_data.pop('retry_log', None)
+        report = VerificationReport.model_validate(verification_data)
+        return classification, report, decision
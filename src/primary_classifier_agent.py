@@ -1,29 +1,37 @@
 """Primary classifier agent using Google Gen AI SDK"""
 
-from google import genai
 from google.genai import types
 import json
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 from .config import settings
-from .schemas import ClassificationOutput, DocumentBundle
+from .genai_client import create_genai_client
+from .llm_cache import aparse_and_commit, parse_and_commit
+from .prompt_budget import PromptAssembler
+from .schemas import ClassificationOutput, DocumentBundle, PromptMetadata
+from .windowed_classifier import WindowedClassifier
 
 
 class PrimaryClassifierAgent:
     """Call Gemini using Google Gen AI SDK with primary_classifier_agent_prompt.txt"""
     
-    def __init__(self):
-        """Initialize Gen AI SDK client with Vertex AI"""
-        # Initialize client with Vertex AI and ADC
-        self.client = genai.Client(
-            vertexai=True,
-            project=settings.gcp_project_id,
-            location=settings.vertex_ai_location
-        )
+    def __init__(self, client=None):
+        """
+        Initialize Gen AI SDK client with Vertex AI
+        
+        Args:
+            client: Shared Gemini client (created via create_genai_client if not provided)
+        """
+        # Initialize client with Vertex AI and ADC (response-cached when enabled)
+        self.client = client or create_genai_client()
         print(f"Using Google Gen AI SDK with Vertex AI project: {settings.gcp_project_id}")
         
         # Load prompt template
         self.prompt_template = self._load_prompt()
+        self.assembler = PromptAssembler(self.prompt_template)
+        
+        # Token estimate / usage of the most recent classify_bundle call
+        self.last_prompt_metadata: Optional[PromptMetadata] = None
     
     def _load_prompt(self) -> str:
         """Load primary classifier prompt from file"""
@@ -35,6 +43,96 @@ class PrimaryClassifierAgent:
         with open(prompt_path, 'r', encoding='utf-8') as f:
             return f.read()
     
+    def classify_bundle(self, doc_bundle: DocumentBundle, max_retries: int = 2) -> ClassificationOutput:
+        """
+        Classify a document bundle with the prompt fitted to the token budget
+        
+        The prompt size is estimated locally first; over-budget documents are
+        reduced (boilerplate removal, then a leading page window) before any
+        API call, and documents that still do not fit are classified as
+        overlapping page windows (see WindowedClassifier). The plan is kept
+        in last_prompt_metadata.
+        
+        Args:
+            doc_bundle: Document bundle to classify
+            max_retries: Maximum retry attempts for API failures
+            
+        Returns:
+            Validated ClassificationOutput
+            
+        Raises:
+            PromptBudgetExceeded: If a single page does not fit the budget
+        """
+        min_pages = settings.classifier_windowed_min_pages
+        if min_pages and doc_bundle.total_pages >= min_pages:
+            return self._classify_windowed(doc_bundle, None, max_retries)
+        
+        document_text, metadata = self.assembler.assemble(doc_bundle)
+        self.last_prompt_metadata = metadata
+        
+        if metadata.strategy == "map_reduce":
+            return self._classify_windowed(doc_bundle, metadata, max_retries)
+        if metadata.strategy != "full":
+            print(f"Prompt budget: ~{metadata.estimated_tokens} tokens using {metadata.strategy} "
+                  f"({metadata.pages_included}/{metadata.pages_total} pages)")
+        
+        classification, metadata.actual_prompt_tokens = self._classify_with_usage(document_text, max_retries)
+        return classification
+    
+    async def aclassify_bundle(
+        self,
+        doc_bundle: DocumentBundle,
+        max_retries: int = 2
+    ) -> Tuple[ClassificationOutput, PromptMetadata]:
+        """
+        Async counterpart of classify_bundle()
+        
+        Many documents can share one agent on an event loop, so the prompt
+        plan is returned with the classification instead of being read from
+        last_prompt_metadata.
+        
+        Args:
+            doc_bundle: Document bundle to classify
+            max_retries: Maximum retry attempts for API failures
+            
+        Returns:
+            (validated ClassificationOutput, prompt metadata)
+        """
+        min_pages = settings.classifier_windowed_min_pages
+        if min_pages and doc_bundle.total_pages >= min_pages:
+            return await self._aclassify_windowed(doc_bundle, None, max_retries)
+        
+        document_text, metadata = self.assembler.assemble(doc_bundle)
+        if metadata.strategy == "map_reduce":
+            return await self._aclassify_windowed(doc_bundle, metadata, max_retries)
+        
+        classification, metadata.actual_prompt_tokens = await self._aclassify_with_usage(document_text, max_retries)
+        return classification, metadata
+    
+    async def _aclassify_windowed(
+        self,
+        doc_bundle: DocumentBundle,
+        metadata: Optional[PromptMetadata],
+        max_retries: int
+    ) -> Tuple[ClassificationOutput, PromptMetadata]:
+        """Async map-reduce classification over page windows"""
+        windowed = WindowedClassifier(self)
+        classification = await windowed.aclassify_bundle(doc_bundle, metadata, max_retries=max_retries)
+        return classification, windowed.last_prompt_metadata
+    
+    def _classify_windowed(
+        self,
+        doc_bundle: DocumentBundle,
+        metadata: Optional[PromptMetadata],
+        max_retries: int
+    ) -> ClassificationOutput:
+        """Map-reduce classification over page windows"""
+        windowed = WindowedClassifier(self)
+        try:
+            return windowed.classify_bundle(doc_bundle, metadata, max_retries=max_retries)
+        finally:
+            self.last_prompt_metadata = windowed.last_prompt_metadata
+    
     def classify(
         self,
         document_text: str,
@@ -53,28 +151,56 @@ class PrimaryClassifierAgent:
         Raises:
             ValueError: If LLM output doesn't match schema after retries
         """
+        return self._classify_with_usage(document_text, max_retries)[0]
+    
+    async def aclassify(
+        self,
+        document_text: str,
+        max_retries: int = 2
+    ) -> ClassificationOutput:
+        """
+        Async counterpart of classify() using the client's aio API
+        
+        Args:
+            document_text: Formatted document text (from DocumentBundle)
+            max_retries: Maximum retry attempts for API failures
+            
+        Returns:
+            Validated ClassificationOutput
+            
+        Raises:
+            ValueError: If LLM output doesn't match schema after retries
+        """
+        return (await self._aclassify_with_usage(document_text, max_retries))[0]
+    
+    def _classify_with_usage(
+        self,
+        document_text: str,
+        max_retries: int
+    ) -> Tuple[ClassificationOutput, Optional[int]]:
+        """classify() plus the prompt token count Gemini reported for the successful call"""
         for attempt in range(max_retries):
             try:
-                # Construct full prompt
-                full_prompt = self._construct_prompt(document_text)
-                
-                # Call Gemini using new SDK
-                response = self.client.models.generate_content(
-                    model=settings.gemini_model,
-                    contents=full_prompt,
-                    config=types.GenerateContentConfig(
-                        temperature=settings.gemini_temperature,
-                        max_output_tokens=settings.gemini_max_tokens,
-                    )
-                )
+                response = self.client.models.generate_content(**self._request(document_text))
+                return parse_and_commit(response, self._parse_response)
                 
-                # Extract JSON from response
-                classification_json = self._extract_json(response.text)
-                
-                # Validate against schema
-                classification = ClassificationOutput(**classification_json)
-                
-                return classification
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    print(f"Attempt {attempt + 1} failed: {e}. Retrying...")
+                    continue
+                else:
+                    raise ValueError(f"Classification failed after {max_retries} attempts: {e}")
+    
+    async def _aclassify_with_usage(
+        self,
+        document_text: str,
+        max_retries: int
+    ) -> Tuple[ClassificationOutput, Optional[int]]:
+        """Async counterpart of _classify_with_usage()"""
+        for attempt in range(max_retries):
+            try:
+                response = await self.client.aio.models.generate_content(**self._request(document_text))
+                return await aparse_and_commit(response, self._parse_response)
                 
             except Exception as e:
                 if attempt < max_retries - 1:
@@ -83,6 +209,29 @@ class PrimaryClassifierAgent:
                 else:
                     raise ValueError(f"Classification failed after {max_retries} attempts: {e}")
     
+    def _request(self, document_text: str) -> dict:
+        """generate_content arguments for one classification call"""
+        return {
+            "model": settings.gemini_model,
+            "contents": self._construct_prompt(document_text),
+            "config": types.GenerateContentConfig(
+                temperature=settings.gemini_temperature,
+                max_output_tokens=settings.gemini_max_tokens,
+            ),
+        }
+    
+    def _parse_response(self, response) -> Tuple[ClassificationOutput, Optional[int]]:
+        """
+        Validate a Gemini response against the classification schema
+        
+        Returns:
+            (classification, reported prompt token count or None for cached responses)
+        """
+        # Extract JSON from response and validate against schema
+        classification_json = self._extract_json(response.text)
+        usage = getattr(response, 'usage_metadata', None)
+        return ClassificationOutput(**classification_json), getattr(usage, 'prompt_token_count', None)
+    
     def _construct_prompt(self, document_text: str) -> str:
         """Combine prompt template with document text"""
         return f"{self.prompt_template}\n\n---\n\nDOCUMENT TO CLASSIFY:\n\n{document_text}"
@@ -5,8 +5,9 @@ This classifier represents the current production prompt that we want to evaluat
 
 from pathlib import Path
 from typing import Optional
-from google import genai
 from google.genai import types
+from .genai_client import create_genai_client
+from .llm_cache import parse_and_commit
 from .production_schemas import ProductionResult
 import json
 import logging
@@ -40,12 +41,8 @@ class ProductionClassifier:
         self.location = location
         self.model_name = model_name
         
-        # Initialize Gemini client
-        self.client = genai.Client(
-            vertexai=True,
-            project=project_id,
-            location=location
-        )
+        # Initialize Gemini client (response-cached when enabled)
+        self.client = create_genai_client(project=project_id, location=location)
         
         # Load production prompt
         self.prompt_template = self._load_production_prompt()
@@ -114,11 +111,9 @@ class ProductionClassifier:
                 )
             )
             
-            # Parse JSON response
-            result_json = json.loads(response.text)
-            
-            # Validate and convert to ProductionResult
-            production_result = ProductionResult(**result_json)
+            # Parse JSON response, validate and convert to ProductionResult
+            # (cached only once it validates)
+            production_result = parse_and_commit(response, lambda r: ProductionResult(**json.loads(r.text)))
             
             logger.info(f"Production classification complete")
             logger.info(f"Dominant type: {production_result.dominant_type}")
@@ -0,0 +1,212 @@
+"""
+Prompt Budget - Local token estimation and budget-aware prompt assembly
+
+Classifier prompts are checked against settings.prompt_token_budget before
+any API call. Token counts are estimated locally and cached per prompt
+template and per page, so re-planning the same bundle is cheap. When a
+prompt is over budget the reductions are applied in a fixed order:
+
+1. strip_boilerplate - drop the bundle's indexed header/footer lines
+2. page_window       - keep the leading pages that fit, if they cover at
+                       least settings.prompt_min_window_fraction of the document
+3. map_reduce        - too long for one prompt; route to the windowed
+                       map-reduce classifier
+"""
+
+import hashlib
+import math
+import re
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+
+from .config import settings
+from .document_processor import DocumentProcessor
+from .schemas import DocumentBundle, PromptMetadata
+
+
+class PromptBudgetExceeded(Exception):
+    """Raised when a document cannot be fitted to the budget, even one page window at a time"""
+
+    def __init__(self, metadata: PromptMetadata):
+        self.metadata = metadata
+        super().__init__(
+            f"Prompt needs ~{metadata.estimated_tokens} tokens for {metadata.pages_total} pages "
+            f"(budget {metadata.budget_tokens}) and a single page is too large for a page window"
+        )
+
+
+def page_token_key(bundle: DocumentBundle, page_num: int, stripped: bool) -> Tuple:
+    """Estimator cache key for one formatted page ("--- PAGE n ---" block), shared by the classifier and V2/V4 payloads"""
+    return ("page", bundle.source_sha256 or bundle.doc_id, page_num, stripped)
+
+
+class TokenEstimator:
+    """
+    Local approximation of Gemini token counts
+
+    Letter runs count one token per chars_per_token characters, digit runs
+    one token per three digits, and each punctuation character one token,
+    which tracks SentencePiece counts on clinical text (IDs, dates, lab
+    values) far better than a flat characters/4 rule.
+    """
+
+    _PIECES = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_")
+
+    def __init__(self, chars_per_token: float = None, max_entries: int = 100_000):
+        """
+        Initialize estimator
+
+        Args:
+            chars_per_token: Characters per token for letter runs (defaults to settings.token_chars_per_token)
+            max_entries: Cached counts kept before the cache is reset
+        """
+        self.chars_per_token = chars_per_token or settings.token_chars_per_token
+        self.max_entries = max_entries
+        self._cache: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def estimate(self, text: str) -> int:
+        """Estimate tokens for text (uncached)"""
+        tokens = 0
+        for piece in self._PIECES.findall(text):
+            if piece[0].isdigit():
+                tokens += math.ceil(len(piece) / 3)
+            elif piece[0].isalpha():
+                tokens += math.ceil(len(piece) / self.chars_per_token)
+            else:
+                tokens += 1
+        return tokens
+
+    def cached(self, key: Hashable, text: str) -> int:
+        """Estimate tokens for text, memoized under key"""
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+        tokens = self.estimate(text)
+        with self._lock:
+            if len(self._cache) >= self.max_entries:
+                self._cache.clear()
+            self._cache[key] = tokens
+        return tokens
+
+    def peek(self, key: Hashable) -> Optional[int]:
+        """Memoized estimate under key, or None (lets callers skip building the text on a hit)"""
+        with self._lock:
+            return self._cache.get(key)
+
+    def template_tokens(self, template: str) -> int:
+        """Tokens for a prompt template, cached by content hash"""
+        return self.cached(("template", hashlib.sha256(template.encode('utf-8')).hexdigest()), template)
+
+
+_default_estimator: Optional[TokenEstimator] = None
+_default_estimator_lock = threading.Lock()
+
+
+def get_default_estimator() -> TokenEstimator:
+    """Process-wide estimator shared by every prompt assembler"""
+    global _default_estimator
+    with _default_estimator_lock:
+        if _default_estimator is None:
+            _default_estimator = TokenEstimator()
+        return _default_estimator
+
+
+class PromptAssembler:
+    """Fit a bundle's document text into a prompt template under a token budget"""
+
+    # Separator between template and document text in the classifier prompt
+    OVERHEAD_TOKENS = 16
+
+    def __init__(
+        self,
+        template: str,
+        budget_tokens: int = None,
+        estimator: TokenEstimator = None,
+        min_window_fraction: float = None
+    ):
+        """
+        Initialize assembler
+
+        Args:
+            template: Prompt template the document text is appended to
+            budget_tokens: Maximum prompt tokens (defaults to settings.prompt_token_budget)
+            estimator: Token estimator (defaults to the shared estimator)
+            min_window_fraction: Smallest share of pages a page window may keep
+                before routing to map-reduce (defaults to settings.prompt_min_window_fraction)
+        """
+        self.template = template
+        self.budget_tokens = budget_tokens or settings.prompt_token_budget
+        self.estimator = estimator or get_default_estimator()
+        self.min_window_fraction = (
+            settings.prompt_min_window_fraction if min_window_fraction is None else min_window_fraction
+        )
+
+    def page_tokens(self, bundle: DocumentBundle, page: Dict, stripped: bool) -> int:
+        """Tokens for one formatted page, cached per bundle content, page and stripping"""
+        boilerplate = bundle.boilerplate if stripped else None
+        key = page_token_key(bundle, page['page_num'], stripped)
+        return self.estimator.cached(key, DocumentProcessor.format_page_for_llm(page, boilerplate))
+
+    def assemble(self, bundle: DocumentBundle) -> Tuple[Optional[str], PromptMetadata]:
+        """
+        Build the document text for a bundle within the budget
+
+        Args:
+            bundle: Document bundle
+
+        Returns:
+            (document_text, metadata); document_text is None when the
+            strategy is map_reduce
+        """
+        template_tokens = self.estimator.template_tokens(self.template) + self.OVERHEAD_TOKENS
+        available = self.budget_tokens - template_tokens
+        pages = list(bundle.pages)
+        can_strip = bool(bundle.boilerplate and bundle.boilerplate.lines)
+
+        def plan(strategy, stripped, included, document_tokens):
+            return PromptMetadata(
+                strategy=strategy,
+                budget_tokens=self.budget_tokens,
+                estimated_tokens=template_tokens + document_tokens,
+                template_tokens=template_tokens,
+                document_tokens=document_tokens,
+                pages_total=len(pages),
+                pages_included=len(included),
+                omitted_pages=[p['page_num'] for p in pages if p['page_num'] not in included],
+                boilerplate_stripped=stripped
+            )
+
+        all_pages = {p['page_num'] for p in pages}
+        header_tokens = self.estimator.estimate(f"Document ID: {bundle.doc_id}\nTotal Pages: {bundle.total_pages}\n\n")
+
+        # 1. Full text (stripped up front when configured), then 2. boilerplate removal
+        attempts = [settings.strip_boilerplate and can_strip]
+        if can_strip and not attempts[0]:
+            attempts.append(True)
+        for stripped in attempts:
+            document_tokens = header_tokens + sum(self.page_tokens(bundle, p, stripped) for p in pages)
+            if document_tokens <= available:
+                strategy = "strip_boilerplate" if stripped and not settings.strip_boilerplate else "full"
+                text = DocumentProcessor.format_for_llm(bundle, strip_boilerplate=stripped)
+                return text, plan(strategy, stripped, all_pages, document_tokens)
+
+        # 3. Leading page window
+        stripped = can_strip
+        note_tokens = 32  # "Pages Included: ..." line
+        used = header_tokens + note_tokens
+        window = set()
+        for page in pages:
+            tokens = self.page_tokens(bundle, page, stripped)
+            if used + tokens > available:
+                break
+            used += tokens
+            window.add(page['page_num'])
+
+        if pages and len(window) >= self.min_window_fraction * len(pages):
+            text = DocumentProcessor.format_for_llm(bundle, strip_boilerplate=stripped, page_nums=window)
+            return text, plan("page_window", stripped, window, used)
+
+        # 4. Map-reduce over overlapping windows
+        document_tokens = header_tokens + sum(self.page_tokens(bundle, p, stripped) for p in pages)
+        return None, plan("map_reduce", stripped, all_pages, document_tokens)
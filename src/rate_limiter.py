@@ -0,0 +1,397 @@
+"""
+Rate Limiter - Shared request/token buckets and retry policy for Gemini calls
+
+Every agent (classifier, windowed classifier, V2-V4, production classifier)
+calls Gemini through the client from create_genai_client. ``RateLimitedGenAIClient``
+wraps that client so each ``generate_content`` call first reserves one
+request and its estimated prompt tokens from two token buckets
+(requests/min and tokens/min). Bucket state lives in a small SQLite file, so
+thread pools, the async executor and every worker process of a batch draw
+from the same quota.
+
+Transient failures (429, 5xx, timeouts) are retried with full-jitter
+exponential backoff. A server retry hint (``Retry-After`` header or
+``RetryInfo.retryDelay``) sets a floor on the delay and pauses the shared
+buckets, so other workers back off too instead of piling onto the quota.
+"""
+
+import asyncio
+import logging
+import random
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .config import settings
+from .prompt_budget import get_default_estimator
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying (quota, server overload, gateway errors)
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_STATUSES = {"RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL"}
+
+# Gemini bills each PDF page / image as a fixed token count
+PDF_PAGE_TOKENS = 258
+IMAGE_TOKENS = 258
+
+
+class RateLimiter:
+    """
+    Cross-process token buckets for requests/min and tokens/min.
+
+    Callers reserve capacity up front; a bucket may go negative, which
+    queues later callers behind the reservation (first come, first served)
+    rather than letting them race for the same refill.
+    """
+
+    def __init__(
+        self,
+        state_dir: str = None,
+        requests_per_minute: float = None,
+        tokens_per_minute: float = None,
+        name: str = "gemini"
+    ):
+        """
+        Initialize limiter
+
+        Args:
+            state_dir: Directory holding the shared SQLite file (defaults to settings.gemini_rate_limit_dir)
+            requests_per_minute: Request quota, 0 for unlimited (defaults to settings.gemini_requests_per_minute)
+            tokens_per_minute: Prompt token quota, 0 for unlimited (defaults to settings.gemini_tokens_per_minute)
+            name: Bucket name, so several quotas can share one file
+        """
+        self.state_dir = Path(state_dir or settings.gemini_rate_limit_dir)
+        self.requests_per_minute = (
+            settings.gemini_requests_per_minute if requests_per_minute is None else requests_per_minute
+        )
+        self.tokens_per_minute = (
+            settings.gemini_tokens_per_minute if tokens_per_minute is None else tokens_per_minute
+        )
+        self.name = name
+
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.state_dir / "ratelimit.sqlite3"),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " name TEXT PRIMARY KEY,"
+            " requests REAL NOT NULL,"
+            " tokens REAL NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " blocked_until REAL NOT NULL)"
+        )
+
+        self.reservations = 0
+        self.retries = 0
+        self.waited_seconds = 0.0
+
+    def _update(self, requests: float, tokens: float, block_until: float = 0.0) -> float:
+        """Refill, deduct and return the wait before the deducted capacity is available"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT requests, tokens, updated_at, blocked_until FROM buckets WHERE name = ?",
+                    (self.name,)
+                ).fetchone()
+                if row is None:
+                    row = (self.requests_per_minute, self.tokens_per_minute, now, 0.0)
+                level_requests, level_tokens, updated_at, blocked_until = row
+
+                elapsed = max(0.0, now - updated_at)
+                level_requests = min(self.requests_per_minute, level_requests + elapsed * self.requests_per_minute / 60)
+                level_tokens = min(self.tokens_per_minute, level_tokens + elapsed * self.tokens_per_minute / 60)
+
+                wait = 0.0
+                if self.requests_per_minute:
+                    level_requests -= requests
+                    wait = max(wait, -level_requests * 60 / self.requests_per_minute)
+                if self.tokens_per_minute:
+                    # A single request larger than the whole quota waits for one full minute at most
+                    level_tokens -= min(tokens, self.tokens_per_minute)
+                    wait = max(wait, -level_tokens * 60 / self.tokens_per_minute)
+                blocked_until = max(blocked_until, block_until)
+                wait = max(wait, blocked_until - now)
+
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, requests, tokens, updated_at, blocked_until)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (self.name, level_requests, level_tokens, now, blocked_until)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def reserve(self, tokens: int = 0) -> float:
+        """
+        Reserve one request and ``tokens`` prompt tokens
+
+        Returns:
+            Seconds the caller must wait before sending the request
+        """
+        wait = self._update(1, tokens)
+        self.reservations += 1
+        self.waited_seconds += wait
+        return wait
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Reserve and sleep until the reservation is due; returns the time waited"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, tokens: int = 0) -> float:
+        """Async counterpart of acquire() (SQLite access runs off the event loop)"""
+        wait = await asyncio.to_thread(self.reserve, tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def adjust(self, tokens: float):
+        """Charge (or refund, if negative) tokens once the real prompt size is known"""
+        if tokens and self.tokens_per_minute:
+            self._update(0, tokens)
+
+    def pause(self, seconds: float):
+        """Hold every caller of this bucket for ``seconds`` (server retry hint)"""
+        self._update(0, 0, block_until=time.time() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for this process"""
+        return {
+            "reservations": self.reservations,
+            "retries": self.retries,
+            "waited_seconds": round(self.waited_seconds, 3),
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+        }
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, floored by server retry hints"""
+
+    def __init__(self, max_attempts: int = None, base_delay: float = None, max_delay: float = None):
+        """
+        Initialize policy
+
+        Args:
+            max_attempts: Total attempts per call (defaults to settings.gemini_retry_attempts)
+            base_delay: Backoff for the first retry in seconds (defaults to settings.gemini_backoff_base)
+            max_delay: Cap on the backoff in seconds (defaults to settings.gemini_backoff_max)
+        """
+        self.max_attempts = max(1, max_attempts or settings.gemini_retry_attempts)
+        self.base_delay = settings.gemini_backoff_base if base_delay is None else base_delay
+        self.max_delay = settings.gemini_backoff_max if max_delay is None else max_delay
+
+    def delay(self, attempt: int, hint: Optional[float] = None) -> float:
+        """Seconds to sleep after failed attempt number ``attempt`` (0-based)"""
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(backoff, hint or 0.0)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for quota, overload and transport errors that may succeed on retry"""
+    if isinstance(error, (TimeoutError, ConnectionError, asyncio.TimeoutError)):
+        return True
+    try:
+        import httpx
+        if isinstance(error, httpx.TransportError):
+            return True
+    except ImportError:
+        pass
+
+    # google.genai.errors.APIError and google.api_core exceptions both carry the HTTP code
+    code = getattr(error, "code", None)
+    if isinstance(code, int) and code in RETRYABLE_CODES:
+        return True
+    status = getattr(error, "status", None)
+    return isinstance(status, str) and status in RETRYABLE_STATUSES
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Server-suggested delay in seconds, from a Retry-After header or RetryInfo detail"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        try:
+            if value is not None:
+                return max(0.0, float(value))
+        except (TypeError, ValueError):
+            pass  # HTTP-date form; fall through to the error body
+
+    details = getattr(error, "details", None)
+    if isinstance(details, dict):
+        details = details.get("error", details).get("details", [])
+    for detail in details if isinstance(details, list) else []:
+        delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+        match = re.fullmatch(r"\s*([\d.]+)s\s*", str(delay)) if delay is not None else None
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def estimate_request_tokens(contents: Any) -> int:
+    """Estimated prompt tokens for generate_content contents (text, Parts or Contents)"""
+    if contents is None:
+        return 0
+    if isinstance(contents, str):
+        return get_default_estimator().estimate(contents)
+    if isinstance(contents, (list, tuple)):
+        return sum(estimate_request_tokens(item) for item in contents)
+
+    parts = getattr(contents, "parts", None)
+    if parts is not None:
+        return estimate_request_tokens(parts)
+    text = getattr(contents, "text", None)
+    if text:
+        return get_default_estimator().estimate(text)
+    blob = getattr(contents, "inline_data", None)
+    if blob is not None and blob.data:
+        if blob.mime_type == "application/pdf":
+            pages = blob.data.count(b"/Type /Page") - blob.data.count(b"/Type /Pages")
+            return max(1, pages) * PDF_PAGE_TOKENS
+        return IMAGE_TOKENS
+    return 0
+
+
+def _reported_prompt_tokens(response: Any) -> Optional[int]:
+    usage = getattr(response, "usage_metadata", None)
+    return getattr(usage, "prompt_token_count", None)
+
+
+class _RateLimitedModels:
+    """Wraps ``client.models`` so generate_content is throttled and retried"""
+
+    def __init__(self, models, limiter: RateLimiter, policy: RetryPolicy):
+        self._models = models
+        self._limiter = limiter
+        self._policy = policy
+
+    def generate_content(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        """Reserve quota, call Gemini, and back off on transient failures"""
+        tokens = estimate_request_tokens(contents)
+        for attempt in range(self._policy.max_attempts):
+            self._limiter.acquire(tokens)
+            try:
+                response = self._models.generate_content(model=model, contents=contents, config=config, **kwargs)
+            except Exception as e:
+                if not is_retryable(e) or attempt == self._policy.max_attempts - 1:
+                    raise
+                time.sleep(_backoff(self._limiter, self._policy, attempt, e))
+                continue
+            _reconcile(self._limiter, tokens, response)
+            return response
+
+    def __getattr__(self, name):
+        return getattr(self._models, name)
+
+
+class _RateLimitedAsyncModels:
+    """Wraps ``client.aio.models``; waits use asyncio.sleep"""
+
+    def __init__(self, models, limiter: RateLimiter, policy: RetryPolicy):
+        self._models = models
+        self._limiter = limiter
+        self._policy = policy
+
+    async def generate_content(self, *, model: str, contents: Any, config: Any = None, **kwargs):
+        """Async counterpart of _RateLimitedModels.generate_content"""
+        tokens = estimate_request_tokens(contents)
+        for attempt in range(self._policy.max_attempts):
+            await self._limiter.aacquire(tokens)
+            try:
+                response = await self._models.generate_content(model=model, contents=contents, config=config, **kwargs)
+            except Exception as e:
+                if not is_retryable(e) or attempt == self._policy.max_attempts - 1:
+                    raise
+                delay = await asyncio.to_thread(_backoff, self._limiter, self._policy, attempt, e)
+                await asyncio.sleep(delay)
+                continue
+            await asyncio.to_thread(_reconcile, self._limiter, tokens, response)
+            return response
+
+    def __getattr__(self, name):
+        return getattr(self._models, name)
+
+
+def _backoff(limiter: RateLimiter, policy: RetryPolicy, attempt: int, error: Exception) -> float:
+    """Record a retry, share any server hint with other callers, and return the delay"""
+    hint = retry_after(error)
+    if hint:
+        limiter.pause(hint)
+    limiter.retries += 1
+    delay = policy.delay(attempt, hint)
+    logger.warning(f"Gemini call failed ({error}); retry {attempt + 1}/{policy.max_attempts - 1} in {delay:.1f}s")
+    return delay
+
+
+def _reconcile(limiter: RateLimiter, estimated: int, response: Any):
+    """Correct the token bucket by the difference between estimated and reported prompt tokens"""
+    reported = _reported_prompt_tokens(response)
+    if isinstance(reported, int):
+        limiter.adjust(reported - estimated)
+
+
+class _RateLimitedAsyncClient:
+    """Wraps ``client.aio`` so async calls draw from the same buckets"""
+
+    def __init__(self, aio, limiter: RateLimiter, policy: RetryPolicy):
+        self._aio = aio
+        self.models = _RateLimitedAsyncModels(aio.models, limiter, policy)
+
+    def __getattr__(self, name):
+        return getattr(self._aio, name)
+
+
+class RateLimitedGenAIClient:
+    """
+    Drop-in wrapper around ``genai.Client`` that enforces the shared quota.
+
+    Only ``models.generate_content`` (and its ``aio`` counterpart) is
+    intercepted; every other attribute is delegated to the wrapped client.
+    """
+
+    def __init__(self, client, limiter: RateLimiter, policy: RetryPolicy = None):
+        self._client = client
+        self.limiter = limiter
+        self.policy = policy or RetryPolicy()
+        self.models = _RateLimitedModels(client.models, limiter, self.policy)
+        self._aio = None
+
+    @property
+    def aio(self) -> _RateLimitedAsyncClient:
+        """Async client sharing this wrapper's limiter (built on first use)"""
+        if self._aio is None:
+            self._aio = _RateLimitedAsyncClient(self._client.aio, self.limiter, self.policy)
+        return self._aio
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_default_rate_limiter() -> RateLimiter:
+    """Process-wide limiter; other processes share its buckets through the SQLite file"""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter()
+        return _default_limiter
@@ -0,0 +1,134 @@
+"""
+Re-extraction - Rebuild DocumentBundles from archived Document AI responses
+
+After a change to DocumentProcessor._extract_pages (and an EXTRACTOR_VERSION
+bump), this replays the responses in the ResponseStore through the current
+extraction code across a worker pool. Rebuilt bundles go into the bundle
+cache under the new extractor version (and optionally to named .bundle
+files), so the next pipeline run is a cache hit with no Document AI calls.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .bundle_cache import BundleCache
+from .bundle_store import BUNDLE_SUFFIX, write_bundle
+from .config import settings
+from .document_processor import DocumentProcessor
+from .response_store import ResponseStore
+
+logger = logging.getLogger(__name__)
+
+# Per-worker processor and cache (thread-local so thread pools get their own too)
+_worker_state = threading.local()
+
+
+class ReextractResult(BaseModel):
+    """Outcome of rebuilding one bundle"""
+    pdf_sha256: Optional[str]  # None when the archive's meta could not be read
+    status: str  # "rebuilt", "missing" (no stored response) or "failed"
+    doc_id: Optional[str] = None
+    archive_path: Optional[str] = None  # stored response the bundle was rebuilt from
+    total_pages: int = 0
+    bundle_path: Optional[str] = None
+    error: Optional[str] = None
+
+
+def _init_worker(cache_dir: Optional[str], update_cache: bool):
+    """Worker initializer: one processor (no Document AI client is ever created) and cache per worker"""
+    _worker_state.processor = DocumentProcessor(bundle_cache=None, response_store=None)
+    _worker_state.cache = BundleCache(cache_dir=cache_dir) if update_cache else None
+
+
+def _rebuild(job: Tuple[str, Optional[str], Optional[str], Optional[str]]) -> ReextractResult:
+    """Rebuild one bundle from an archive file on the calling worker"""
+    archive_path, doc_id, file_path, bundle_dir = job
+    result = ReextractResult(pdf_sha256=None, status="failed", doc_id=doc_id, archive_path=archive_path)
+
+    try:
+        # A truncated or foreign file fails here and is reported like any other failure
+        meta = ResponseStore.read_meta(Path(archive_path))
+        pdf_sha256 = result.pdf_sha256 = meta['pdf_sha256']
+        _, responses = ResponseStore.load(Path(archive_path))
+        pages = _worker_state.processor.pages_from_responses(responses)
+        bundle = DocumentProcessor.build_bundle(doc_id or pdf_sha256[:16], file_path or "", pages, pdf_sha256)
+
+        if _worker_state.cache is not None:
+            _worker_state.cache.put(
+                BundleCache.make_key(pdf_sha256, meta['processor_id'], DocumentProcessor.EXTRACTOR_VERSION),
+                bundle,
+                pdf_sha256=pdf_sha256,
+                processor_id=meta['processor_id'],
+                extractor_version=DocumentProcessor.EXTRACTOR_VERSION
+            )
+        if bundle_dir and doc_id:
+            bundle_path = Path(bundle_dir) / f"bundle_{doc_id}{BUNDLE_SUFFIX}"
+            write_bundle(bundle_path, bundle)
+            result.bundle_path = str(bundle_path)
+
+        result.total_pages = len(pages)
+        result.status = "rebuilt"
+    except Exception as e:
+        logger.error(f"Re-extraction failed for {archive_path}: {e}")
+        result.error = str(e)
+
+    return result
+
+
+def reextract(
+    pdf_paths: Optional[List[Path]] = None,
+    store_dir: Optional[str] = None,
+    bundle_dir: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    update_cache: bool = True,
+    workers: Optional[int] = None,
+    executor: str = "process"
+) -> List[ReextractResult]:
+    """
+    Rebuild bundles from stored Document AI responses in parallel
+
+    Args:
+        pdf_paths: PDFs to rebuild (matched to responses by content hash);
+            None rebuilds every response in the store without file names
+        store_dir: Response store directory (defaults to settings.documentai_response_dir)
+        bundle_dir: If set, also write bundle_<doc_id>.bundle files here (pdf_paths only)
+        cache_dir: Bundle cache directory (defaults to settings.bundle_cache_dir)
+        update_cache: Put rebuilt bundles into the bundle cache
+        workers: Worker count (defaults to the number of CPUs)
+        executor: "process" (CPU-bound, default) or "thread"
+
+    Returns:
+        One ReextractResult per PDF or stored response
+    """
+    store = ResponseStore(store_dir)
+    processor_id = settings.document_ai_processor_id
+
+    jobs = []
+    results = []
+    if pdf_paths is None:
+        jobs = [(str(path), None, None, None) for path in store.paths()]
+    else:
+        for pdf_path in pdf_paths:
+            pdf_sha256 = hashlib.sha256(Path(pdf_path).read_bytes()).hexdigest()
+            archive_path = store.path_for(pdf_sha256, processor_id)
+            if archive_path.exists():
+                jobs.append((str(archive_path), Path(pdf_path).stem, str(pdf_path), bundle_dir))
+            else:
+                results.append(ReextractResult(pdf_sha256=pdf_sha256, status="missing", doc_id=Path(pdf_path).stem))
+
+    if not jobs:
+        return results
+
+    pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    with pool_class(max_workers=workers, initializer=_init_worker, initargs=(cache_dir, update_cache)) as pool:
+        results.extend(pool.map(_rebuild, jobs))
+
+    return results
@@ -0,0 +1,114 @@
+"""
+Response Store - Archive of raw Document AI responses for replayable extraction
+
+Each processed PDF's documentai.Document responses (one per shard) are
+kept as zlib-compressed protobuf, keyed by the PDF's SHA-256 and the
+processor ID. Bundles can then be rebuilt with new page extraction logic
+(see src/reextract.py) without calling Document AI again.
+
+File layout: magic, JSON meta length, JSON meta (shard page offsets and
+byte lengths), then the compressed shard responses back to back.
+"""
+
+import json
+import re
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from google.cloud import documentai_v1 as documentai
+
+from .atomic_io import atomic_write_bytes
+from .config import settings
+
+MAGIC = b"DAIR"
+META_HEAD = struct.Struct("<4sI")  # magic, meta length
+RESPONSE_SUFFIX = ".docai"
+
+# (page_offset, response) for each shard, in page order
+Shards = List[Tuple[int, documentai.Document]]
+
+
+class ResponseStore:
+    """Content-addressed archive of raw Document AI responses"""
+
+    def __init__(self, store_dir: str = None):
+        """
+        Initialize response store
+
+        Args:
+            store_dir: Archive directory (defaults to settings.documentai_response_dir)
+        """
+        self.store_dir = Path(store_dir or settings.documentai_response_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, pdf_sha256: str, processor_id: str) -> Path:
+        """Archive file for a PDF hash and processor"""
+        safe_processor = re.sub(r'[^A-Za-z0-9_.-]', '_', processor_id or 'unknown')
+        return self.store_dir / pdf_sha256[:2] / f"{pdf_sha256}-{safe_processor}{RESPONSE_SUFFIX}"
+
+    def put(self, pdf_sha256: str, processor_id: str, shards: Shards) -> Path:
+        """
+        Store the responses for one PDF
+
+        Args:
+            pdf_sha256: SHA-256 of the PDF bytes sent to Document AI
+            processor_id: Document AI processor ID
+            shards: (page_offset, document) per request
+
+        Returns:
+            Path of the archive file
+        """
+        blobs = [zlib.compress(documentai.Document.serialize(document), 6) for _, document in shards]
+        meta = {
+            'pdf_sha256': pdf_sha256,
+            'processor_id': processor_id,
+            'stored_at': time.time(),
+            'shards': [[page_offset, len(blob)] for (page_offset, _), blob in zip(shards, blobs)],
+        }
+        meta_bytes = json.dumps(meta, separators=(',', ':')).encode('utf-8')
+
+        path = self.path_for(pdf_sha256, processor_id)
+        atomic_write_bytes(path, META_HEAD.pack(MAGIC, len(meta_bytes)) + meta_bytes + b''.join(blobs))
+        return path
+
+    def get(self, pdf_sha256: str, processor_id: str) -> Optional[Shards]:
+        """Stored responses for a PDF hash and processor, or None"""
+        path = self.path_for(pdf_sha256, processor_id)
+        if not path.exists():
+            return None
+        return self.load(path)[1]
+
+    @staticmethod
+    def read_meta(path: Path) -> Dict:
+        """Read only the JSON meta of an archive file"""
+        with open(path, 'rb') as f:
+            magic, meta_len = META_HEAD.unpack(f.read(META_HEAD.size))
+            if magic != MAGIC:
+                raise ValueError(f"Not a Document AI response archive: {path}")
+            return json.loads(f.read(meta_len))
+
+    @staticmethod
+    def load(path: Path) -> Tuple[Dict, Shards]:
+        """
+        Read an archive file
+
+        Returns:
+            (meta, shards) with each shard's documentai.Document parsed
+        """
+        with open(path, 'rb') as f:
+            magic, meta_len = META_HEAD.unpack(f.read(META_HEAD.size))
+            if magic != MAGIC:
+                raise ValueError(f"Not a Document AI response archive: {path}")
+            meta = json.loads(f.read(meta_len))
+            shards = []
+            for page_offset, length in meta['shards']:
+                document = documentai.Document.deserialize(zlib.decompress(f.read(length)))
+                shards.append((page_offset, document))
+        return meta, shards
+
+    def paths(self) -> Iterator[Path]:
+        """All archive files in the store"""
+        return iter(sorted(self.store_dir.glob(f"*/*{RESPONSE_SUFFIX}")))
@@ -1,6 +1,6 @@
 """Pydantic schemas for type-safe data structures"""
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_serializer, field_validator
 from typing import List, Optional
 from enum import Enum
 
@@ -111,14 +111,43 @@ class ClassificationOutput(BaseModel):
         return v
 
 
+class PromptMetadata(BaseModel):
+    """How a classification prompt was assembled against the token budget"""
+    strategy: str = Field(description="full | strip_boilerplate | page_window | map_reduce")
+    budget_tokens: int
+    estimated_tokens: int = Field(description="Local estimate for template + document text")
+    template_tokens: int
+    document_tokens: int
+    pages_total: int
+    pages_included: int
+    omitted_pages: List[int] = Field(default_factory=list)
+    boilerplate_stripped: bool = False
+    windows: List[List[int]] = Field(default_factory=list, description="First and last page of each map-reduce window")
+    actual_prompt_tokens: Optional[int] = Field(default=None, description="Prompt token count reported by the API, when available")
+
+
+class BoilerplateIndex(BaseModel):
+    """Lines repeated at page edges across a document (headers, footers, fax banners)"""
+    lines: dict = Field(default_factory=dict, description="Normalized line -> number of pages it appears on")
+    pages_scanned: int = 0
+    min_pages: int = Field(default=0, description="Page count a line needed to be indexed")
+
+
 class DocumentBundle(BaseModel):
     """Parsed PDF document with metadata"""
     doc_id: str
     file_path: str
     total_pages: int
-    pages: List[dict]  # List of {page_num, text, paragraphs, layout_metadata}
+    pages: List[dict]  # List of {page_num, text, paragraphs, layout_metadata}; LazyPages when loaded from a .bundle file
     processing_timestamp: str
+    source_sha256: Optional[str] = Field(default=None, description="SHA-256 of the source PDF bytes")
     document_type: Optional[str] = Field(default=None, description="Classified document type (assigned after classification)")
+    boilerplate: Optional[BoilerplateIndex] = Field(default=None, description="Repeated header/footer lines, built at extraction time")
+    
+    @field_serializer('pages')
+    def serialize_pages(self, pages):
+        """Materialize lazily loaded pages when dumping"""
+        return [dict(page) for page in pages]
 
 
 # ===== Verification Agent Schemas =====
@@ -130,6 +159,35 @@ class IssueSeverity(str, Enum):
     MINOR = "MINOR"        # Minor issue, tolerable
 
 
+class CheckCode(str, Enum):
+    """Machine-readable identifier of the rule check that raised an issue"""
+    # V1: schema & completeness
+    SEGMENT_COUNT = "segment_count"
+    START_PAGE_RANGE = "start_page_range"
+    END_PAGE_RANGE = "end_page_range"
+    PAGE_RANGE_ORDER = "page_range_order"
+    SEGMENT_PAGE_COUNT = "segment_page_count"
+    SEGMENT_CONFIDENCE_RANGE = "segment_confidence_range"
+    MIXTURE_CONFIDENCE_RANGE = "mixture_confidence_range"
+    SEGMENT_TYPES_MISSING = "segment_types_missing"
+    SEGMENT_TYPES_EXTRA = "segment_types_extra"
+    MIXTURE_TYPES_MISSING = "mixture_types_missing"
+    MIXTURE_TYPES_EXTRA = "mixture_types_extra"
+    EVIDENCE_MISSING = "evidence_missing"
+    # V2: consistency rules
+    SEGMENT_SHARE_SUM = "segment_share_sum"
+    MIXTURE_SHARE_SUM = "mixture_share_sum"
+    SEGMENT_OVERLAP = "segment_overlap"
+    # V3: trap rules
+    ROUTINE_LAB_GENOMIC = "routine_lab_genomic"
+    ADMINISTRATIVE_REPORT = "administrative_report"
+    BOILERPLATE_EVIDENCE = "boilerplate_evidence"
+    # V4: local evidence screening
+    EVIDENCE_NOT_FOUND = "evidence_not_found"
+    EVIDENCE_MISPLACED = "evidence_misplaced"
+    ANCHOR_NOT_FOUND = "anchor_not_found"
+
+
 class Issue(BaseModel):
     """Single validation issue from a verification agent (V1-V4)"""
     # Core fields (match prompt output format)
@@ -139,6 +197,9 @@ class Issue(BaseModel):
     severity: IssueSeverity
     message: str = Field(description="Clear description of the issue")
     
+    # Rule that raised the issue (None for LLM-reported issues)
+    check_code: Optional[CheckCode] = Field(default=None, description="Machine-readable check identifier; auto-fixes are dispatched on it")
+    
     # Location context (optional)
     location: Optional[dict] = Field(default=None, description="Where issue occurs (e.g., {'segment_index': 1, 'field': 'segment_share'})")
     
@@ -164,6 +225,16 @@ class VerificationReport(BaseModel):
     # Cost tracking
     llm_calls_made: int = Field(default=0, ge=0, description="Number of LLM API calls made")
     
+    # Agents that did not finish within the per-agent timeout
+    timed_out_agents: List[str] = Field(default_factory=list, description="Agents whose results were dropped after timing out (e.g. ['V3'])")
+    
+    # Decision-bound mode: agents not awaited because the V5 outcome was already settled
+    skipped_agents: List[str] = Field(default_factory=list, description="LLM agents skipped once the decision could no longer change (e.g. ['V3', 'V4'])")
+    enriched_agents: List[str] = Field(default_factory=list, description="Skipped agents whose results were added afterwards for the SME packet")
+    
+    # Retry attempts: checks whose inputs were unchanged and whose earlier result was reused
+    reused_checks: List[str] = Field(default_factory=list, description="Checks served from the retry memo or the result store (e.g. ['V2-llm', 'V3-rules', 'V3-llm', 'V4'])")
+    
     @property
     def blocker_issues(self) -> List[Issue]:
         """Get all BLOCKER severity issues"""
@@ -0,0 +1,199 @@
+"""
+Trap Dictionary - Multi-pattern matcher for V3 trap terms
+
+Gene symbols, vendor names and administrative phrases are read from a
+dictionary file (src/trap_dictionary.txt by default, or
+settings.trap_dictionary_file) and compiled into one Aho-Corasick automaton
+over words. A page is scanned in a single pass over its words, so the cost
+depends on the page length, not on the number of terms, and the dictionary
+can grow to thousands of entries.
+
+Dictionary format, one term per line under a category header:
+
+    # comment
+    [gene case-sensitive]
+    BRCA1
+    [routine_lab]
+    lab corp
+
+Terms match whole words, case-insensitively unless the section is marked
+case-sensitive (gene symbols such as MET or RET are ordinary words in lower
+case). Punctuation between words is ignored ("Lab-Corp" matches "lab corp").
+The last word of a case-insensitive term also matches its plural ("fax cover"
+matches "Fax Covers", "specimen receipt" matches "Specimen Receipts").
+"""
+
+import hashlib
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .config import settings
+
+DEFAULT_DICTIONARY = Path(__file__).with_name("trap_dictionary.txt")
+
+_WORD = re.compile(r'[0-9A-Za-z]+')
+_SECTION = re.compile(r'^\[\s*([a-z_]+)((?:\s+case-sensitive)?)\s*\]$')
+
+
+def words(text: str) -> List[str]:
+    """Words of text as matched by the automaton (original case)"""
+    return _WORD.findall(text)
+
+
+def plurals(word: str) -> List[str]:
+    """Regular English plurals of a lower-case word (none for numbers and codes ending in a digit)"""
+    if not word or not word[-1].isalpha():
+        return []
+    if word.endswith(("s", "x", "z", "ch", "sh")):
+        return [word + "es"]
+    if word.endswith("y") and word[-2:-1] not in ("", "a", "e", "i", "o", "u"):
+        return [word[:-1] + "ies"]
+    return [word + "s"]
+
+
+class TrapTerm(NamedTuple):
+    """One dictionary entry"""
+    category: str
+    term: str  # as written in the dictionary
+    case_sensitive: bool
+
+
+class TrapHit(NamedTuple):
+    """One term occurrence"""
+    category: str
+    term: str
+    word: int  # index of the first matched word
+
+
+class TrapDictionary:
+    """Trap terms compiled into a word-level Aho-Corasick automaton"""
+
+    def __init__(self, terms: Iterable[TrapTerm]):
+        """
+        Compile the automaton
+
+        Args:
+            terms: Dictionary entries (terms without words are ignored)
+        """
+        self.terms: List[TrapTerm] = []
+        self._words: List[Tuple[str, ...]] = []  # original-case words per term, for case-sensitive checks
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for entry in terms:
+            term_words = tuple(words(entry.term))
+            if not term_words:
+                continue
+            state = 0
+            for word in term_words[:-1]:
+                state = self._child(state, word.lower())
+            last = term_words[-1].lower()
+            for spelling in [last] + ([] if entry.case_sensitive else plurals(last)):
+                self._out[self._child(state, spelling)].append(len(self.terms))
+            self.terms.append(entry)
+            self._words.append(term_words)
+
+        # Breadth-first failure links; each state also reports the terms of its failure chain
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, child in self._goto[state].items():
+                queue.append(child)
+                if state == 0:
+                    continue  # first words fail back to the root
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(word, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+        self.categories = sorted({entry.category for entry in self.terms})
+        self.digest = hashlib.sha256(
+            "\n".join(f"{t.category}\t{t.case_sensitive}\t{t.term}" for t in self.terms).encode("utf-8")
+        ).hexdigest()
+
+    def _child(self, state: int, word: str) -> int:
+        """Goto target of state on word, adding a state when there is none"""
+        if word not in self._goto[state]:
+            self._goto.append({})
+            self._fail.append(0)
+            self._out.append([])
+            self._goto[state][word] = len(self._goto) - 1
+        return self._goto[state][word]
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "TrapDictionary":
+        """
+        Read a dictionary file
+
+        Args:
+            path: Dictionary file (defaults to settings.trap_dictionary_file, then the bundled dictionary)
+
+        Raises:
+            ValueError: If a term appears before any section header or a header is malformed
+        """
+        path = Path(path or settings.trap_dictionary_file or DEFAULT_DICTIONARY)
+        terms = []
+        section = None
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.split("#", 1)[0].strip()
+                if not line:
+                    continue
+                if line.startswith("["):
+                    match = _SECTION.match(line)
+                    if match is None:
+                        raise ValueError(f"{path}:{line_number}: malformed section header {line!r}")
+                    section = (match.group(1), bool(match.group(2)))
+                    continue
+                if section is None:
+                    raise ValueError(f"{path}:{line_number}: term {line!r} outside a [category] section")
+                terms.append(TrapTerm(section[0], line, section[1]))
+        return cls(terms)
+
+    def scan(self, text: str) -> List[TrapHit]:
+        """
+        Find every dictionary term in text in one pass
+
+        Args:
+            text: Page or snippet text
+
+        Returns:
+            Hits in order of their last word
+        """
+        original = words(text)
+        hits = []
+        state = 0
+        for end, word in enumerate(original):
+            word = word.lower()
+            while state and word not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(word, 0)
+            for index in self._out[state]:
+                term = self.terms[index]
+                term_words = self._words[index]
+                start = end - len(term_words) + 1
+                if term.case_sensitive and tuple(original[start:end + 1]) != term_words:
+                    continue
+                hits.append(TrapHit(term.category, term.term, start))
+        return hits
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+
+_default_dictionary: Optional[TrapDictionary] = None
+_default_dictionary_lock = threading.Lock()
+
+
+def get_default_dictionary() -> TrapDictionary:
+    """Process-wide dictionary loaded from settings.trap_dictionary_file (or the bundled file) on first use"""
+    global _default_dictionary
+    with _default_dictionary_lock:
+        if _default_dictionary is None:
+            _default_dictionary = TrapDictionary.load()
+        return _default_dictionary
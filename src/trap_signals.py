@@ -0,0 +1,114 @@
+"""
+Trap Signals - Per-page trap-term index and the page windows V3 sends to Gemini
+
+V3's contextual trap check used to see only the first 4000 characters, so
+traps on later pages (gene names in a history section, an embedded lab
+report, a fax cover sheet mid-document) went unchecked. Every page is now
+scanned once with the trap dictionary (trap_dictionary), giving a page ->
+hits index that the V3 rules read and that ranks consecutive-page windows by
+weighted hit count:
+
+    gene           - oncology gene symbols and genomic result phrases
+    genomic_vendor - genomic testing vendors and assay names
+    routine_lab    - routine laboratory vendors
+    admin          - requisition / authorization / fax cover wording
+    admin_context  - weaker administrative wording (insurance, billing, ...)
+
+Only the top-k non-overlapping windows are sent, so the cost is bounded by
+k while every page is considered.
+"""
+
+from collections import Counter
+from typing import List, NamedTuple, Optional, Sequence
+
+from .schemas import DocumentBundle
+from .trap_dictionary import TrapDictionary, TrapHit, get_default_dictionary
+
+# Relative weight of one hit when ranking windows (categories not listed weigh 1)
+SIGNAL_WEIGHTS = {"gene": 1, "genomic_vendor": 3, "routine_lab": 3, "admin": 3, "admin_context": 1}
+
+
+class TrapWindow(NamedTuple):
+    """Consecutive pages sent to the LLM as one trap-check shard"""
+    first_page: int
+    last_page: int
+    score: int  # weighted signal hits in the window
+    signals: Counter  # category -> hits
+
+
+class TrapHitIndex:
+    """Trap-dictionary hits of every page of one document"""
+
+    def __init__(self, hits: List[List[TrapHit]]):
+        """
+        Build the index
+
+        Args:
+            hits: Hits per page, in page order (index 0 = page 1)
+        """
+        self.hits = hits
+        self.signals: List[Counter] = [Counter(hit.category for hit in page) for page in hits]
+
+    @classmethod
+    def from_texts(cls, texts: Sequence[str], dictionary: Optional[TrapDictionary] = None) -> "TrapHitIndex":
+        """Scan page texts (one pass per page)"""
+        dictionary = dictionary or get_default_dictionary()
+        return cls([dictionary.scan(text) for text in texts])
+
+    @classmethod
+    def from_bundle(cls, doc_bundle: DocumentBundle, dictionary: Optional[TrapDictionary] = None) -> "TrapHitIndex":
+        """Scan every page of a bundle"""
+        return cls.from_texts([page['text'] for page in doc_bundle.pages], dictionary)
+
+    def pages_with(self, category: str) -> List[int]:
+        """1-based pages with at least one hit of the category"""
+        return [n for n, signals in enumerate(self.signals, start=1) if signals[category]]
+
+    def terms(self, category: str) -> List[str]:
+        """Distinct terms of the category found in the document, in order of first occurrence"""
+        return list(dict.fromkeys(hit.term for page in self.hits for hit in page if hit.category == category))
+
+
+def _weight(signals: Counter) -> int:
+    return sum(SIGNAL_WEIGHTS.get(category, 1) * n for category, n in signals.items())
+
+
+def rank_windows(signals: List[Counter], window_pages: int, top_k: int) -> List[TrapWindow]:
+    """
+    Pick the highest-scoring non-overlapping page windows
+
+    Args:
+        signals: Per-page category hits (TrapHitIndex.signals; index 0 = page 1)
+        window_pages: Pages per window
+        top_k: Maximum windows returned
+
+    Returns:
+        Up to top_k windows with at least one hit, in page order; the first
+        window alone when no page has a signal
+    """
+    if not signals:
+        return []
+    window_pages = max(1, min(window_pages, len(signals)))
+    weights = [_weight(page) for page in signals]
+
+    # Score every window start with a running sum
+    scores = [sum(weights[:window_pages])]
+    for start in range(1, len(signals) - window_pages + 1):
+        scores.append(scores[-1] - weights[start - 1] + weights[start + window_pages - 1])
+
+    chosen = []
+    for start in sorted(range(len(scores)), key=lambda s: (-scores[s], s)):
+        if len(chosen) >= top_k or scores[start] == 0:
+            break
+        if all(start + window_pages <= other or other + window_pages <= start for other, _ in chosen):
+            chosen.append((start, scores[start]))
+    if not chosen:
+        chosen = [(0, 0)]
+
+    windows = []
+    for start, score in sorted(chosen):
+        hits = Counter()
+        for page in signals[start:start + window_pages]:
+            hits.update(page)
+        windows.append(TrapWindow(start + 1, start + window_pages, score, hits))
+    return windows
@@ -0,0 +1,223 @@
+"""
+Verification Result Store - Persistent results of the V2-V4 LLM checks
+
+VerificationMemo reuses check results across the retry attempts of one
+run. This store keeps the LLM checks' results on disk so that reruns of the
+same document, run_dual_classification.py comparisons and retries that
+return to an earlier classification reuse them across processes as well.
+
+A result is keyed by the check, the digest of the classification fields
+the check reads (see check_dependencies), a hash of the bundle's page text,
+and the agent's version (AGENT_VERSION, a hash of its prompt and the Gemini
+model). Changing a prompt file, bumping an agent's AGENT_VERSION or
+switching models therefore never serves a stale result.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .config import settings
+from .schemas import DocumentBundle, Issue
+
+logger = logging.getLogger(__name__)
+
+
+class VerificationResultStore:
+    """
+    On-disk check result store with size- and age-based LRU eviction.
+
+    Safe to share between threads and between processes (SQLite locking).
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = None,
+        max_bytes: int = None,
+        max_age_days: float = None
+    ):
+        """
+        Initialize result store
+
+        Args:
+            cache_dir: Directory holding the SQLite file (defaults to settings.verification_store_dir)
+            max_bytes: Maximum total size of stored results (defaults to settings.verification_store_max_mb)
+            max_age_days: Expire results not read for this many days (defaults to settings.verification_store_max_age_days)
+        """
+        self.cache_dir = Path(cache_dir or settings.verification_store_dir)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.verification_store_max_mb * 1024 * 1024
+        max_age_days = max_age_days if max_age_days is not None else settings.verification_store_max_age_days
+        self.max_age_seconds = max_age_days * 86400
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.cache_dir / "results.sqlite3"),
+            timeout=30,
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " check_name TEXT NOT NULL,"
+            " result_json TEXT NOT NULL,"
+            " shares TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_last_access ON results(last_access)")
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(check: str, classification_digest: str, bundle_digest: str, version: str) -> str:
+        """Store key for one check's result on a classification/bundle pair"""
+        key_data = [check, classification_digest, bundle_digest, version]
+        return hashlib.sha256(json.dumps(key_data).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[Any, str]]:
+        """
+        Return a stored result (refreshing its LRU position), or None
+
+        Returns:
+            (result, shares digest) - result is a list of issues or an (issues, score) tuple
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result_json, shares, last_access FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[2] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return _decode_result(row[0]), row[1]
+
+    def put(self, key: str, check: str, result: Any, shares: str):
+        """Store a check result and evict entries if the store is over budget"""
+        result_json = _encode_result(result)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, check_name, result_json, shares, size, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, check, result_json, shares, len(result_json.encode("utf-8")), now, now)
+            )
+            self._conn.commit()
+            self.writes += 1
+            self._evict_locked(now)
+
+    def evict(self):
+        """Run age- and size-based eviction"""
+        with self._lock:
+            self._evict_locked(time.time())
+
+    def _evict_locked(self, now: float):
+        """Evict expired entries, then least recently used until under max_bytes"""
+        cursor = self._conn.execute(
+            "DELETE FROM results WHERE last_access < ?", (now - self.max_age_seconds,)
+        )
+        evicted = cursor.rowcount
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM results ORDER BY last_access ASC"
+            ).fetchall()
+            stale_keys = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                stale_keys.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM results WHERE key = ?", stale_keys)
+            evicted += len(stale_keys)
+
+        self._conn.commit()
+        if evicted:
+            self.evictions += evicted
+            logger.info(f"Verification store evicted {evicted} entries")
+
+    def clear(self):
+        """Remove all stored results"""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus current store size"""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": total,
+        }
+
+
+_default_store: Optional[VerificationResultStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_verification_store() -> VerificationResultStore:
+    """Process-wide store instance so every runner shares one connection and one set of counters"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = VerificationResultStore()
+        return _default_store
+
+
+def bundle_content_hash(doc_bundle: DocumentBundle) -> str:
+    """SHA-256 of the page text the agents read (re-extraction with a new extractor changes it)"""
+    digest = hashlib.sha256(f"{doc_bundle.total_pages}\n".encode())
+    for page in doc_bundle.pages:
+        text = page['text']
+        digest.update(f"{len(text)}\n".encode())
+        digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def agent_version(agent: Any) -> str:
+    """Version string of an LLM agent: class, AGENT_VERSION, prompt hash, Gemini model and request variant"""
+    prompt_hash = hashlib.sha256(agent.prompt_base.encode("utf-8")).hexdigest()[:16]
+    version = f"{type(agent).__name__}:{agent.AGENT_VERSION}:{prompt_hash}:{settings.gemini_model}"
+    # Settings that change what the agent sends (e.g. payload mode)
+    variant = getattr(agent, "request_variant", None)
+    return f"{version}:{variant}" if variant else version
+
+
+def _encode_result(result: Any) -> str:
+    """Serialize a list of issues or an (issues, score) result"""
+    if isinstance(result, tuple):
+        issues, score = result
+        data = {"issues": [i.model_dump(mode='json') for i in issues], "score": score, "scored": True}
+    else:
+        data = {"issues": [i.model_dump(mode='json') for i in result], "scored": False}
+    return json.dumps(data)
+
+
+def _decode_result(result_json: str) -> Any:
+    data = json.loads(result_json)
+    issues = [Issue.model_validate(issue) for issue in data["issues"]]
+    return (issues, data["score"]) if data["scored"] else issues
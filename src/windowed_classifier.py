@@ -0,0 +1,420 @@
+"""
+Windowed Classifier - Map-reduce classification over overlapping page windows
+
+Long documents are split into overlapping page windows that each fit the
+prompt budget (and keep the segment list short enough for the output token
+limit). Windows are classified concurrently with the primary classifier
+prompt, then merged:
+
+1. Each window keeps only its core pages; pages shared with a neighbour are
+   split at the middle of the overlap
+2. Segments that continue across a window boundary (same dominant type on
+   both sides) are stitched into one segment
+3. document_mixture shares are recomputed as page-weighted averages of the
+   merged segment compositions
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .config import settings
+from .document_processor import DocumentProcessor, format_page_ranges
+from .prompt_budget import PromptAssembler, PromptBudgetExceeded
+from .schemas import (
+    ClassificationOutput,
+    DocumentBundle,
+    DocumentType,
+    PresenceLevel,
+    PromptMetadata,
+    Segment,
+)
+
+logger = logging.getLogger(__name__)
+
+# Higher rank wins when compositions are merged
+PRESENCE_RANK = {
+    PresenceLevel.NO_EVIDENCE: 0,
+    PresenceLevel.MENTION_ONLY: 1,
+    PresenceLevel.EMBEDDED_RAW: 2,
+    PresenceLevel.PRIMARY: 3,
+}
+
+MAX_EVIDENCE = 3
+
+# "Pages Included: ..." line added to each window prompt
+NOTE_TOKENS = 48
+
+
+def plan_windows(
+    page_tokens: List[Tuple[int, int]],
+    max_pages: int,
+    max_tokens: int,
+    overlap: int
+) -> List[List[int]]:
+    """
+    Split pages into overlapping windows
+
+    Args:
+        page_tokens: (page_num, estimated tokens) for each page, in order
+        max_pages: Maximum pages per window
+        max_tokens: Maximum document tokens per window
+        overlap: Pages shared by neighbouring windows
+
+    Returns:
+        Page numbers of each window, in order
+
+    Raises:
+        ValueError: If a single page does not fit max_tokens
+    """
+    windows = []
+    start = 0
+    while start < len(page_tokens):
+        end = start
+        used = 0
+        while end < len(page_tokens) and end - start < max_pages:
+            tokens = page_tokens[end][1]
+            if used + tokens > max_tokens:
+                break
+            used += tokens
+            end += 1
+        if end == start:
+            raise ValueError(f"Page {page_tokens[start][0]} alone exceeds the window budget of {max_tokens} tokens")
+
+        windows.append([page_num for page_num, _ in page_tokens[start:end]])
+        if end >= len(page_tokens):
+            break
+        start = max(start + 1, end - overlap)
+    return windows
+
+
+def core_ranges(windows: List[List[int]]) -> List[Tuple[int, int]]:
+    """
+    Pages each window is responsible for in the merge
+
+    Pages shared by two windows are split at the middle of the overlap, so
+    every page belongs to exactly one window.
+
+    Returns:
+        (first_page, last_page) per window
+    """
+    cores = []
+    for k, window in enumerate(windows):
+        first, last = window[0], window[-1]
+        if k > 0:
+            first = cores[-1][1] + 1
+        if k + 1 < len(windows):
+            next_first = windows[k + 1][0]
+            last = max(first, (next_first + window[-1]) // 2)
+        cores.append((first, last))
+    return cores
+
+
+class WindowedClassifier:
+    """Classify long documents as concurrent overlapping page windows and merge the results"""
+
+    def __init__(
+        self,
+        classifier,
+        window_pages: int = None,
+        overlap_pages: int = None,
+        concurrency: int = None
+    ):
+        """
+        Initialize windowed classifier
+
+        Args:
+            classifier: PrimaryClassifierAgent (provides classify() and its prompt assembler)
+            window_pages: Maximum pages per window (defaults to settings.classifier_window_pages)
+            overlap_pages: Pages shared by neighbouring windows (defaults to settings.classifier_window_overlap)
+            concurrency: Window requests in flight (defaults to settings.classifier_window_concurrency)
+        """
+        self.classifier = classifier
+        self.assembler: PromptAssembler = classifier.assembler
+        self.window_pages = window_pages or settings.classifier_window_pages
+        self.overlap_pages = settings.classifier_window_overlap if overlap_pages is None else overlap_pages
+        self.concurrency = concurrency or settings.classifier_window_concurrency
+        self.last_prompt_metadata: Optional[PromptMetadata] = None
+
+    def classify_bundle(
+        self,
+        doc_bundle: DocumentBundle,
+        metadata: Optional[PromptMetadata] = None,
+        max_retries: int = 2
+    ) -> ClassificationOutput:
+        """
+        Classify a document bundle window by window
+
+        Args:
+            doc_bundle: Document bundle
+            metadata: Plan from PromptAssembler.assemble (its boilerplate choice is reused)
+            max_retries: Maximum retry attempts per window
+
+        Returns:
+            Merged, validated ClassificationOutput covering every page
+
+        Raises:
+            PromptBudgetExceeded: If a single page does not fit the budget
+            ValueError: If a window fails after retries
+        """
+        windows, stripped = self._plan(doc_bundle, metadata)
+
+        def classify_window(k: int) -> ClassificationOutput:
+            try:
+                return self.classifier.classify(
+                    self._window_text(doc_bundle, windows, k, stripped), max_retries=max_retries
+                )
+            except ValueError as e:
+                raise ValueError(f"Window {k + 1} (pages {format_page_ranges(windows[k])}) failed: {e}")
+
+        workers = max(1, min(self.concurrency, len(windows)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="classifier-window") as executor:
+            outputs = list(executor.map(classify_window, range(len(windows))))
+
+        return merge_window_classifications(outputs, windows, [page['page_num'] for page in doc_bundle.pages])
+
+    async def aclassify_bundle(
+        self,
+        doc_bundle: DocumentBundle,
+        metadata: Optional[PromptMetadata] = None,
+        max_retries: int = 2
+    ) -> ClassificationOutput:
+        """
+        Async counterpart of classify_bundle() (at most `concurrency` windows in flight)
+
+        Args:
+            doc_bundle: Document bundle
+            metadata: Plan from PromptAssembler.assemble (its boilerplate choice is reused)
+            max_retries: Maximum retry attempts per window
+
+        Returns:
+            Merged, validated ClassificationOutput covering every page
+        """
+        windows, stripped = self._plan(doc_bundle, metadata)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def classify_window(k: int) -> ClassificationOutput:
+            async with semaphore:
+                try:
+                    return await self.classifier.aclassify(
+                        self._window_text(doc_bundle, windows, k, stripped), max_retries=max_retries
+                    )
+                except ValueError as e:
+                    raise ValueError(f"Window {k + 1} (pages {format_page_ranges(windows[k])}) failed: {e}")
+
+        outputs = await asyncio.gather(*(classify_window(k) for k in range(len(windows))))
+        return merge_window_classifications(list(outputs), windows, [page['page_num'] for page in doc_bundle.pages])
+
+    def _plan(self, doc_bundle: DocumentBundle, metadata: Optional[PromptMetadata]) -> Tuple[List[List[int]], bool]:
+        """Plan the windows and record them in last_prompt_metadata; returns (windows, boilerplate_stripped)"""
+        pages = list(doc_bundle.pages)
+        if metadata is not None:
+            stripped = metadata.boilerplate_stripped
+        else:
+            stripped = bool(settings.strip_boilerplate and doc_bundle.boilerplate and doc_bundle.boilerplate.lines)
+
+        page_tokens = [(page['page_num'], self.assembler.page_tokens(doc_bundle, page, stripped)) for page in pages]
+        template_tokens = self.assembler.estimator.template_tokens(self.assembler.template) + self.assembler.OVERHEAD_TOKENS
+        header_tokens = self.assembler.estimator.estimate(
+            f"Document ID: {doc_bundle.doc_id}\nTotal Pages: {doc_bundle.total_pages}\n\n"
+        )
+        document_tokens = header_tokens + sum(tokens for _, tokens in page_tokens)
+
+        self.last_prompt_metadata = PromptMetadata(
+            strategy="map_reduce",
+            budget_tokens=self.assembler.budget_tokens,
+            estimated_tokens=template_tokens + document_tokens,
+            template_tokens=template_tokens,
+            document_tokens=document_tokens,
+            pages_total=len(pages),
+            pages_included=len(pages),
+            boilerplate_stripped=stripped
+        )
+
+        try:
+            windows = plan_windows(
+                page_tokens,
+                self.window_pages,
+                self.assembler.budget_tokens - template_tokens - header_tokens - NOTE_TOKENS,
+                self.overlap_pages
+            )
+        except ValueError as e:
+            logger.error(str(e))
+            raise PromptBudgetExceeded(self.last_prompt_metadata)
+        self.last_prompt_metadata.windows = [[window[0], window[-1]] for window in windows]
+
+        print(f"Map-reduce classification: {len(windows)} windows of up to {self.window_pages} pages "
+              f"({self.overlap_pages}-page overlap)")
+        return windows, stripped
+
+    @staticmethod
+    def _window_text(doc_bundle: DocumentBundle, windows: List[List[int]], k: int, stripped: bool) -> str:
+        """Formatted document text for window k"""
+        note = (
+            f"page window {k + 1} of {len(windows)}; classify only these pages "
+            f"and report page numbers exactly as marked"
+        )
+        return DocumentProcessor.format_for_llm(
+            doc_bundle, strip_boilerplate=stripped, page_nums=windows[k], pages_note=note
+        )
+
+
+def _window_segments(output: ClassificationOutput, window: List[int], core: Tuple[int, int]) -> List[Dict]:
+    """A window's segments on absolute page numbers, clipped to its core pages"""
+    segments = [segment.model_dump() for segment in output.segments]
+
+    # Some responses number pages from 1 within the window despite the page markers
+    if segments and window[0] > 1 and max(s['end_page'] for s in segments) < window[0]:
+        for segment in segments:
+            segment['start_page'] += window[0] - 1
+            segment['end_page'] += window[0] - 1
+
+    clipped = []
+    for segment in sorted(segments, key=lambda s: s['start_page']):
+        segment['start_page'] = max(segment['start_page'], core[0])
+        segment['end_page'] = min(segment['end_page'], core[1])
+        if segment['start_page'] <= segment['end_page']:
+            clipped.append(segment)
+    return clipped
+
+
+def _page_count(segment: Dict) -> int:
+    return segment['end_page'] - segment['start_page'] + 1
+
+
+def _merge_compositions(a: Dict, b: Dict) -> List[Dict]:
+    """Page-weighted merge of two segments' compositions"""
+    weight_a, weight_b = _page_count(a), _page_count(b)
+    total = weight_a + weight_b
+    by_type = {comp['document_type']: comp for comp in b['segment_composition']}
+
+    merged = []
+    for comp_a in a['segment_composition']:
+        comp_b = by_type[comp_a['document_type']]
+        larger = comp_a if weight_a >= weight_b else comp_b
+        merged.append({
+            'document_type': comp_a['document_type'],
+            'presence_level': max(comp_a['presence_level'], comp_b['presence_level'], key=PRESENCE_RANK.get),
+            'confidence': (comp_a['confidence'] * weight_a + comp_b['confidence'] * weight_b) / total,
+            'segment_share': (comp_a['segment_share'] * weight_a + comp_b['segment_share'] * weight_b) / total,
+            'top_evidence': (comp_a['top_evidence'] + comp_b['top_evidence'])[:MAX_EVIDENCE],
+            'reasoning': larger['reasoning'],
+        })
+    return merged
+
+
+def _normalize_shares(compositions: List[Dict]) -> None:
+    """Rescale segment_share values to sum to 1.0"""
+    total = sum(comp['segment_share'] for comp in compositions)
+    for comp in compositions:
+        comp['segment_share'] = round(comp['segment_share'] / total, 4) if total > 0 else round(1 / len(compositions), 4)
+
+
+def merge_window_classifications(
+    outputs: List[ClassificationOutput],
+    windows: List[List[int]],
+    page_nums: List[int]
+) -> ClassificationOutput:
+    """
+    Merge per-window classifications into one document classification
+
+    Args:
+        outputs: Classification of each window, in window order
+        windows: Page numbers of each window
+        page_nums: Page numbers of the whole document
+
+    Returns:
+        Validated ClassificationOutput with contiguous segments over all pages
+    """
+    cores = core_ranges(windows)
+
+    merged: List[Dict] = []
+    stitched = []
+    for k, (output, window, core) in enumerate(zip(outputs, windows, cores)):
+        for position, segment in enumerate(_window_segments(output, window, core)):
+            if merged:
+                prev = merged[-1]
+                if segment['start_page'] <= prev['end_page']:
+                    segment['start_page'] = prev['end_page'] + 1
+                    if segment['start_page'] > segment['end_page']:
+                        continue
+                elif segment['start_page'] > prev['end_page'] + 1:
+                    # Pages no segment claimed stay with the preceding segment
+                    prev['end_page'] = segment['start_page'] - 1
+
+                # The first segment of a window continues the previous window's last one
+                if k > 0 and position == 0 and prev['_window'] == k - 1 \
+                        and segment['dominant_type'] == prev['dominant_type']:
+                    prev['segment_composition'] = _merge_compositions(prev, segment)
+                    prev['end_page'] = segment['end_page']
+                    prev['embedded_types'] += [t for t in segment['embedded_types'] if t not in prev['embedded_types']]
+                    prev['_window'] = k
+                    stitched.append(f"{prev['dominant_type'].value} across pages {segment['start_page'] - 1}/{segment['start_page']}")
+                    continue
+
+            segment['_window'] = k
+            merged.append(segment)
+
+    if not merged:
+        raise ValueError("No window returned segments for the document's pages")
+
+    merged[0]['start_page'] = page_nums[0]
+    merged[-1]['end_page'] = page_nums[-1]
+
+    segments = []
+    for index, segment in enumerate(merged, start=1):
+        segment.pop('_window')
+        _normalize_shares(segment['segment_composition'])
+        segment['segment_index'] = index
+        segment['segment_page_count'] = _page_count(segment)
+        segments.append(Segment(**segment))
+
+    total_pages = sum(segment.segment_page_count for segment in segments)
+    mixture = []
+    for doc_type in DocumentType:
+        comps = [
+            (segment.segment_page_count, next(c for c in segment.segment_composition if c.document_type == doc_type))
+            for segment in segments
+        ]
+        window_mixtures = [next(m for m in output.document_mixture if m.document_type == doc_type) for output in outputs]
+
+        evidence = []
+        seen = set()
+        for window_mixture in window_mixtures:
+            for item in window_mixture.top_evidence:
+                if (item.page, item.snippet) not in seen:
+                    seen.add((item.page, item.snippet))
+                    evidence.append(item)
+
+        mixture.append({
+            'document_type': doc_type,
+            'presence_level': max((comp.presence_level for _, comp in comps), key=PRESENCE_RANK.get),
+            'confidence': round(sum(pages * comp.confidence for pages, comp in comps) / total_pages, 4),
+            'overall_share': round(sum(pages * comp.segment_share for pages, comp in comps) / total_pages, 4),
+            'overall_share_explanation': (
+                f"Page-weighted segment_share across {len(segments)} segments "
+                f"merged from {len(outputs)} page windows"
+            ),
+            'top_evidence': evidence[:MAX_EVIDENCE],
+            'reasoning': max(window_mixtures, key=lambda m: m.overall_share).reasoning,
+        })
+
+    vendor_signals = []
+    for output in outputs:
+        vendor_signals += [signal for signal in output.vendor_signals if signal not in vendor_signals]
+
+    return ClassificationOutput(
+        dominant_type_overall=max(mixture, key=lambda m: m['overall_share'])['document_type'],
+        segments=segments,
+        document_mixture=mixture,
+        vendor_signals=vendor_signals,
+        number_of_segments=len(segments),
+        self_evaluation={
+            'evaluation_summary': (
+                f"Merged {len(outputs)} page-window classifications "
+                f"(windows: {', '.join(f'{w[0]}-{w[-1]}' for w in windows)})"
+            ),
+            'changes_made': f"Stitched segments: {'; '.join(stitched)}" if stitched else "No segments stitched across windows",
+        },
+    )
@@ -13,7 +13,7 @@ Tests all scenarios for the AUTO_RETRY mechanism:
 import json
 from pathlib import Path
 from datetime import datetime
-from src.schemas import ClassificationOutput, DocumentBundle, Issue, IssueSeverity, VerificationReport, ArbiterDecision
+from src.schemas import CheckCode, ClassificationOutput, DocumentBundle, Issue, IssueSeverity, VerificationReport, ArbiterDecision
 from src.agents import RetryOrchestrator, V5ArbiterAgent
 
 
@@ -185,8 +185,9 @@ class AutoRetryTestSuite:
                 issue_id="TEST-003",
                 severity=IssueSeverity.MAJOR,
                 agent="V2",
+                check_code=CheckCode.SEGMENT_SHARE_SUM,
                 message="Segment 1: share sum error (sum=1.10)",
-                location={'segment': 1},
+                location={'segment_index': 1, 'field': 'segment_share'},
                 auto_fixable=True,
                 suggested_fix="Normalize segment shares to sum to 1.0"
             )
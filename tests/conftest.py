@@ -5,9 +5,24 @@ Pytest fixtures for verification agent testing
 import pytest
 from pathlib import Path
 from typing import Optional
+from src.config import settings
 from src.schemas import ClassificationOutput, DocumentBundle
 
 
+@pytest.fixture(autouse=True)
+def no_default_caches(monkeypatch):
+    """Keep tests from creating or reading the on-disk caches under output/
+
+    Tests that exercise a cache (or the rate limiter or result store) pass their own instance
+    rooted in tmp_path.
+    """
+    monkeypatch.setattr(settings, "bundle_cache_enabled", False)
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(settings, "documentai_store_responses", False)
+    monkeypatch.setattr(settings, "gemini_rate_limit_enabled", False)
+    monkeypatch.setattr(settings, "verification_store_enabled", False)
+
+
 @pytest.fixture
 def sample_doc_bundle():
     """Create a simple document bundle for testing"""
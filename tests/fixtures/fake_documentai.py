@@ -0,0 +1,68 @@
+"""
+Fake Document AI client for offline DocumentProcessor tests
+
+Returns Layout Parser style documents (documentLayout.blocks) built from
+real documentai proto types, one text block per page.
+"""
+
+import io
+import threading
+from types import SimpleNamespace
+from google.cloud import documentai_v1 as documentai
+from pypdf import PdfReader
+
+Block = documentai.Document.DocumentLayout.DocumentLayoutBlock
+
+
+def make_layout_document(page_texts):
+    """Build a Layout Parser Document with one paragraph block per page"""
+    blocks = [
+        Block(
+            block_id=str(page_num),
+            text_block=Block.LayoutTextBlock(text=text, type_="paragraph"),
+            page_span=Block.LayoutPageSpan(page_start=page_num, page_end=page_num)
+        )
+        for page_num, text in enumerate(page_texts, start=1)
+    ]
+    return documentai.Document(document_layout=documentai.Document.DocumentLayout(blocks=blocks))
+
+
+class FakeDocumentAIClient:
+    """Records process_document calls and returns a fixed layout document"""
+
+    def __init__(self, page_texts=None):
+        self.page_texts = page_texts or ["Page one text", "Page two text"]
+        self.calls = 0
+
+    def process_document(self, request):
+        self.calls += 1
+        return SimpleNamespace(document=make_layout_document(self.page_texts))
+
+
+class PdfTextFakeClient:
+    """
+    Returns each page's real text layer as a Layout Parser document
+
+    Page numbers in the response are relative to the PDF sent, like a real
+    processor handling one shard. Calls whose 1-based index is in fail_calls
+    raise, to simulate transient shard failures.
+    """
+
+    def __init__(self, fail_calls=()):
+        self.fail_calls = set(fail_calls)
+        self.calls = 0
+        self.page_counts = []
+        self._lock = threading.Lock()
+
+    def process_document(self, request):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call in self.fail_calls:
+            raise RuntimeError(f"simulated failure on call {call}")
+
+        reader = PdfReader(io.BytesIO(request.raw_document.content))
+        page_texts = [(page.extract_text() or "").strip() for page in reader.pages]
+        with self._lock:
+            self.page_counts.append(len(page_texts))
+        return SimpleNamespace(document=make_layout_document(page_texts))
@@ -0,0 +1,81 @@
+"""
+Fake Gemini (google-genai) client for offline agent, cache and rate-limiter tests
+
+Every request is answered by a reply function of the prompt contents, which
+returns the response text, a FakeResponse, or an exception to raise. The sync
+(client.models) and async (client.aio.models) APIs share the reply function
+but count calls and record prompts separately.
+"""
+
+from types import SimpleNamespace
+from typing import Callable, List, Optional
+
+
+class FakeResponse:
+    """generate_content response with text and optional usage metadata"""
+
+    def __init__(self, text: str, prompt_token_count: Optional[int] = None):
+        self.text = text
+        self.usage_metadata = (
+            None if prompt_token_count is None else SimpleNamespace(prompt_token_count=prompt_token_count)
+        )
+
+
+def verification_agent(contents) -> str:
+    """Which verification agent built a prompt ("V2", "V3" or "V4")"""
+    return "V2" if "segment_texts" in contents else "V3" if "document_text" in contents else "V4"
+
+
+def replies(*items) -> Callable:
+    """Reply function answering successive requests with items in order (the last one repeats)"""
+    queue = list(items)
+
+    def reply(contents):
+        return queue.pop(0) if len(queue) > 1 else queue[0]
+    return reply
+
+
+class FakeModels:
+    """client.models: answers generate_content with the reply function"""
+
+    def __init__(self, reply: Callable):
+        self.reply = reply
+        self.calls = 0
+        self.prompts: List = []
+
+    @property
+    def agents(self) -> List[str]:
+        """Verification agent of every prompt received, in order"""
+        return [verification_agent(contents) for contents in self.prompts]
+
+    def _respond(self, contents) -> FakeResponse:
+        self.calls += 1
+        self.prompts.append(contents)
+        reply = self.reply(contents)
+        if isinstance(reply, BaseException):
+            raise reply
+        return reply if isinstance(reply, FakeResponse) else FakeResponse(reply)
+
+    def generate_content(self, *, model, contents, config=None, **kwargs):
+        return self._respond(contents)
+
+
+class FakeAsyncModels(FakeModels):
+    """client.aio.models"""
+
+    async def generate_content(self, *, model, contents, config=None, **kwargs):
+        return self._respond(contents)
+
+
+class FakeGenAIClient:
+    """Stands in for genai.Client (and the cached / rate-limited wrappers around it)"""
+
+    def __init__(self, reply: Optional[Callable] = None):
+        """
+        Args:
+            reply: Function of the prompt contents returning text, a FakeResponse or
+                an exception to raise (defaults to an empty JSON array)
+        """
+        reply = reply or (lambda contents: "[]")
+        self.models = FakeModels(reply)
+        self.aio = SimpleNamespace(models=FakeAsyncModels(reply))
@@ -0,0 +1,117 @@
+"""
+Unit tests for AutoFixEngine check-code dispatch and copy-on-write fixes
+"""
+
+import pytest
+from copy import deepcopy
+from src.agents.auto_fix_engine import AutoFixEngine
+from src.agents.v1_schema_validator import V1SchemaValidator
+from src.agents.v2_consistency_checker import V2ConsistencyChecker
+from src.schemas import CheckCode, Issue, IssueSeverity
+
+
+def _share_issue(message, location, check_code=None):
+    return Issue(
+        ig_id="IG-8",
+        issue_id="V2-0000",
+        agent="V2",
+        severity=IssueSeverity.MAJOR,
+        check_code=check_code,
+        message=message,
+        location=location,
+        auto_fixable=True
+    )
+
+
+@pytest.fixture
+def broken_classification(clean_classification):
+    """Classification with the first segment's and the mixture's shares scaled off 1.0"""
+    classification = deepcopy(clean_classification)
+    for comp in classification.segments[0].segment_composition:
+        comp.segment_share *= 0.8
+    for mix in classification.document_mixture:
+        mix.overall_share *= 1.25
+    return classification
+
+
+@pytest.mark.unit
+class TestAutoFixEngine:
+    """Test suite for AutoFixEngine"""
+
+    def test_segment_fix_copies_only_target_segment(self, broken_classification):
+        original = broken_classification.model_dump()
+        segment = broken_classification.segments[0]
+        issue = _share_issue(f"Segment {segment.segment_index} shares sum to 0.800 instead of 1.0",
+                             {"segment_index": segment.segment_index, "field": "segment_share"},
+                             CheckCode.SEGMENT_SHARE_SUM)
+
+        fixed, log = AutoFixEngine().apply_fixes(broken_classification, [issue])
+
+        assert len(log) == 1
+        assert sum(c.segment_share for c in fixed.segments[0].segment_composition) == pytest.approx(1.0)
+        assert broken_classification.model_dump() == original
+        assert fixed.segments[0] is not segment
+        assert all(a is b for a, b in zip(fixed.segments[1:], broken_classification.segments[1:]))
+        assert fixed.document_mixture is broken_classification.document_mixture
+        # Evidence lists are shared, not copied
+        assert fixed.segments[0].segment_composition[0].top_evidence is segment.segment_composition[0].top_evidence
+
+    def test_document_fix_shares_segments(self, broken_classification):
+        original = broken_classification.model_dump()
+        issue = _share_issue("Document mixture overall_share sums to 1.250 instead of 1.0", {"field": "document_mixture"},
+                             CheckCode.MIXTURE_SHARE_SUM)
+
+        fixed, _ = AutoFixEngine().apply_fixes(broken_classification, [issue])
+
+        assert sum(m.overall_share for m in fixed.document_mixture) == pytest.approx(1.0)
+        assert broken_classification.model_dump() == original
+        assert fixed.segments is broken_classification.segments
+
+    def test_no_fixable_issues_returns_input(self, clean_classification):
+        fixed, log = AutoFixEngine().apply_fixes(clean_classification, [])
+        assert fixed is clean_classification
+        assert log == []
+
+    def test_uncoded_issue_dispatched_by_field(self, broken_classification):
+        # LLM-reported issues carry no check code; the location field selects the fixer
+        issue = _share_issue("Shares look off", {"segment_index": 1, "field": "segment_share"})
+
+        fixed, log = AutoFixEngine().apply_fixes(broken_classification, [issue])
+
+        assert len(log) == 1
+        assert sum(c.segment_share for c in fixed.segments[0].segment_composition) == pytest.approx(1.0)
+
+    def test_message_text_does_not_select_fix(self, broken_classification):
+        issue = _share_issue("Segment 1 share sum is wrong", {"field": "reasoning"})
+
+        fixed, log = AutoFixEngine().apply_fixes(broken_classification, [issue])
+
+        assert fixed is broken_classification
+        assert log == []
+
+    def test_rule_issues_fixed_in_one_pass(self, broken_classification, sample_doc_bundle):
+        """V1/V2 auto-fixable rule issues are all resolved by a single apply_fixes call"""
+        segment = broken_classification.segments[0]
+        classification = broken_classification.model_copy(update={
+            "segments": [segment.model_copy(update={"segment_page_count": segment.segment_page_count + 2})]
+            + broken_classification.segments[1:]
+        })
+
+        rule_checker = V2ConsistencyChecker.__new__(V2ConsistencyChecker)  # rule checks need no client or prompt
+
+        def rule_issues(c):
+            v1_issues = V1SchemaValidator().validate(c, sample_doc_bundle)
+            v2_issues = rule_checker._run_rule_checks(c, 0)
+            return [i for i in v1_issues + v2_issues if i.auto_fixable]
+
+        issues = rule_issues(classification)
+        assert {i.check_code for i in issues} == {
+            CheckCode.SEGMENT_PAGE_COUNT, CheckCode.SEGMENT_SHARE_SUM, CheckCode.MIXTURE_SHARE_SUM
+        }
+
+        fixed, log = AutoFixEngine().apply_fixes(classification, issues)
+
+        assert len(log) == len(issues)
+        assert rule_issues(fixed) == []
+        assert fixed.segments[0].segment_page_count == segment.end_page - segment.start_page + 1
+        assert fixed.segments[1:] == classification.segments[1:]
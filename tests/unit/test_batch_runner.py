@@ -0,0 +1,156 @@
+"""
+Unit tests for the batch corpus runner
+
+A stub pipeline replaces DocumentPipeline so no GCP clients are created.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import pytest
+from pathlib import Path
+from src.batch_runner import BatchRunner, check_unique_doc_ids, collect_inputs, percentile
+from src.pipeline import DocumentRunResult
+
+
+class StubPipeline:
+    """Pipeline stand-in: decision derived from the file name"""
+
+    instances = 0
+    instances_lock = threading.Lock()
+    in_flight = 0
+    peak_in_flight = 0
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.pid = os.getpid()
+        with StubPipeline.instances_lock:
+            StubPipeline.instances += 1
+
+    def run(self, pdf_path: str) -> DocumentRunResult:
+        time.sleep(self.delay)
+        return self._result(pdf_path)
+
+    async def arun(self, pdf_path: str) -> DocumentRunResult:
+        StubPipeline.in_flight += 1
+        StubPipeline.peak_in_flight = max(StubPipeline.peak_in_flight, StubPipeline.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return self._result(pdf_path)
+        finally:
+            StubPipeline.in_flight -= 1
+
+    @staticmethod
+    def _result(pdf_path: str) -> DocumentRunResult:
+        stem = Path(pdf_path).stem
+        if stem.startswith("bad"):
+            return DocumentRunResult(doc_id=stem, pdf_path=pdf_path, status="failed", error="extraction: boom")
+        decision = "ESCALATE_TO_SME" if stem.startswith("esc") else "AUTO_ACCEPT"
+        return DocumentRunResult(
+            doc_id=stem,
+            pdf_path=pdf_path,
+            status="completed",
+            decision=decision,
+            retry_attempts=1 if stem.startswith("retry") else 0,
+            stage_seconds={"extraction": 0.1, "classification": 0.2, "verification": 0.3}
+        )
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """Directory of empty placeholder PDFs"""
+    names = ["a", "b", "retry_c", "esc_d", "bad_e"]
+    for name in names:
+        (tmp_path / f"{name}.pdf").write_bytes(b"%PDF-1.4")
+    return tmp_path
+
+
+@pytest.mark.unit
+class TestCollectInputs:
+    """Test suite for batch input resolution"""
+
+    def test_directory(self, corpus):
+        paths = collect_inputs(str(corpus))
+        assert [p.stem for p in paths] == ["a", "b", "bad_e", "esc_d", "retry_c"]
+
+    def test_glob(self, corpus):
+        paths = collect_inputs(str(corpus / "esc_*.pdf"))
+        assert [p.stem for p in paths] == ["esc_d"]
+
+    def test_manifest_relative_paths_and_dedup(self, corpus):
+        manifest = corpus / "manifest.txt"
+        manifest.write_text("# nightly backfill\nb.pdf\n\na.pdf\nb.pdf\n")
+        paths = collect_inputs(str(manifest))
+        assert [p.name for p in paths] == ["b.pdf", "a.pdf"]
+
+    def test_duplicate_stems_rejected(self, corpus):
+        """PDFs in different directories with one stem would share a doc_id"""
+        (corpus / "site_b").mkdir()
+        (corpus / "site_b" / "a.pdf").write_bytes(b"%PDF-1.4")
+
+        with pytest.raises(ValueError, match="a: "):
+            collect_inputs(str(corpus / "**" / "*.pdf"))
+        with pytest.raises(ValueError):
+            BatchRunner(executor="thread").run([corpus / "a.pdf", corpus / "site_b" / "a.pdf"])
+        check_unique_doc_ids([corpus / "a.pdf", corpus / "b.pdf"])
+
+
+@pytest.mark.unit
+class TestBatchRunner:
+    """Test suite for BatchRunner"""
+
+    def test_summary_counts_decisions_and_failures(self, corpus):
+        runner = BatchRunner(workers=2, executor="thread", pipeline_factory=StubPipeline)
+        results, summary = runner.run(collect_inputs(str(corpus)))
+
+        assert len(results) == 5
+        assert summary.completed == 4
+        assert summary.failed == 1
+        assert summary.decisions["AUTO_ACCEPT"] == 3
+        assert summary.decisions["ESCALATE_TO_SME"] == 1
+        assert summary.decisions["AUTO_RETRY"] == 1
+        assert summary.failures == {"bad_e": "extraction: boom"}
+        assert summary.stage_latency["verification"]["p50"] == pytest.approx(0.3)
+        assert summary.docs_per_minute > 0
+
+    def test_bounded_concurrency(self, corpus):
+        """Five 0.2s documents on 5 thread workers finish in well under the serial 1.0s"""
+        runner = BatchRunner(
+            workers=5, executor="thread", pipeline_factory=StubPipeline, pipeline_kwargs={"delay": 0.2}
+        )
+        start = time.monotonic()
+        runner.run(collect_inputs(str(corpus)))
+        assert time.monotonic() - start < 0.8
+
+    def test_one_pipeline_per_worker(self, corpus):
+        """Each worker builds its pipeline (and clients) once, not once per document"""
+        StubPipeline.instances = 0
+        runner = BatchRunner(workers=2, executor="thread", pipeline_factory=StubPipeline)
+        runner.run(collect_inputs(str(corpus)))
+        assert StubPipeline.instances <= 2
+
+    def test_process_executor(self, corpus):
+        runner = BatchRunner(workers=2, executor="process", pipeline_factory=StubPipeline)
+        results, summary = runner.run(collect_inputs(str(corpus)))
+        assert summary.total_documents == 5
+
+    def test_async_executor_limits_documents_in_flight(self, corpus):
+        """One pipeline, one event loop, never more than `workers` documents at once"""
+        StubPipeline.instances = 0
+        StubPipeline.peak_in_flight = 0
+        runner = BatchRunner(
+            workers=2, executor="async", pipeline_factory=StubPipeline, pipeline_kwargs={"delay": 0.1}
+        )
+        results, summary = runner.run(collect_inputs(str(corpus)))
+
+        assert StubPipeline.instances == 1
+        assert StubPipeline.peak_in_flight == 2
+        assert summary.completed == 4
+        assert summary.failures == {"bad_e": "extraction: boom"}
+
+    def test_percentile_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 95) == 95.0
+        assert percentile([], 95) == 0.0
@@ -0,0 +1,74 @@
+"""
+Unit tests for the per-bundle boilerplate (header/footer) index
+"""
+
+import pytest
+from pathlib import Path
+from src.agents.v3_trap_detector import V3TrapDetector
+from src.trap_signals import TrapHitIndex
+from src.boilerplate import build_boilerplate_index, is_boilerplate_snippet, normalize_line, strip_boilerplate
+from src.document_processor import DocumentProcessor
+from src.extraction_backends import LocalPDFBackend
+
+SAMPLE_PDF = Path(__file__).resolve().parents[2] / "data" / "input" / "raw_documents" / "doc2_1.pdf"
+
+
+def _pages(texts):
+    return [{"page_num": n, "text": text} for n, text in enumerate(texts, start=1)]
+
+
+@pytest.fixture
+def sample_bundle():
+    pages = LocalPDFBackend().extract(SAMPLE_PDF.read_bytes())
+    return DocumentProcessor.build_bundle("doc2_1", str(SAMPLE_PDF), pages)
+
+
+@pytest.mark.unit
+class TestBoilerplateIndex:
+    """Test suite for build_boilerplate_index and helpers"""
+
+    def test_normalize_line(self):
+        assert normalize_line("  Page 3 of  12 ") == normalize_line("page 4 of 9") == "page # of #"
+
+    def test_repeated_edge_lines_indexed(self):
+        pages = _pages([
+            f"FAX from 555-123-4567\nBody text {n}\nunique finding {n * 7}\nPage {n} of 4"
+            for n in range(1, 5)
+        ])
+        index = build_boilerplate_index(pages, min_fraction=0.5, min_pages=3, edge_lines=1)
+
+        assert set(index.lines) == {"fax from #-#-#", "page # of #"}
+        assert strip_boilerplate(pages[1]["text"], index) == "Body text 2\nunique finding 14\n"
+
+    def test_short_document_has_empty_index(self):
+        index = build_boilerplate_index(_pages(["Page 1 of 2\nA", "Page 2 of 2\nB"]), min_pages=3)
+        assert index.lines == {}
+
+    def test_sample_report_footer(self, sample_bundle):
+        lines = sample_bundle.boilerplate.lines
+
+        assert "case number: #" in lines
+        assert is_boilerplate_snippet("PATIENT: Alison Jones", sample_bundle.boilerplate)
+        assert not is_boilerplate_snippet("Pathogenic p.G12D", sample_bundle.boilerplate)
+
+    def test_format_for_llm_strips_on_request(self, sample_bundle):
+        processor = DocumentProcessor.__new__(DocumentProcessor)
+        full = processor.format_for_llm(sample_bundle, strip_boilerplate=False)
+        stripped = processor.format_for_llm(sample_bundle, strip_boilerplate=True)
+
+        assert full.count("CASE NUMBER") == sample_bundle.total_pages
+        assert "CASE NUMBER" not in stripped
+        assert "Date of Birth" in stripped
+
+    def test_v3_flags_evidence_from_indexed_boilerplate(self, sample_bundle, clean_classification):
+        data = clean_classification.model_dump()
+        composition = next(c for c in data["segments"][0]["segment_composition"] if c["top_evidence"])
+        composition["top_evidence"][0]["snippet"] = "PHYSICIAN: Dr. Wanda Nguyen"
+        classification = type(clean_classification).model_validate(data)
+        detector = V3TrapDetector.__new__(V3TrapDetector)
+
+        without_index = detector._run_rule_traps(classification, TrapHitIndex([]), 0)
+        with_index = detector._run_rule_traps(classification, TrapHitIndex([]), 0, sample_bundle.boilerplate)
+
+        header_issues = [i for i in with_index if "header/footer" in i.message]
+        assert len(header_issues) == len([i for i in without_index if "header/footer" in i.message]) + 1
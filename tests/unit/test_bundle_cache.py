@@ -0,0 +1,114 @@
+"""
+Unit tests for the content-hash keyed DocumentBundle cache
+"""
+
+import secrets
+import time
+import pytest
+from datetime import datetime
+from src.bundle_cache import BundleCache
+from src.bundle_store import encode_bundle
+from src.document_processor import DocumentProcessor
+from src.schemas import DocumentBundle
+from tests.fixtures.fake_documentai import FakeDocumentAIClient
+
+
+def _bundle(doc_id="doc", text="x"):
+    return DocumentBundle(
+        doc_id=doc_id,
+        file_path=f"/tmp/{doc_id}.pdf",
+        total_pages=1,
+        pages=[{"page_num": 1, "text": text, "paragraphs": [text], "layout_metadata": {}}],
+        processing_timestamp=datetime.utcnow().isoformat()
+    )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return BundleCache(cache_dir=str(tmp_path / "bundles"), max_bytes=10_000_000, max_age_days=1)
+
+
+@pytest.fixture
+def processor(cache):
+    return DocumentProcessor(client=FakeDocumentAIClient(), bundle_cache=cache)
+
+
+@pytest.mark.unit
+class TestBundleCache:
+    """Test suite for BundleCache"""
+
+    def test_key_depends_on_hash_processor_and_version(self):
+        base = BundleCache.make_key("abc", "proc", "1")
+        assert base == BundleCache.make_key("abc", "proc", "1")
+        assert base != BundleCache.make_key("abd", "proc", "1")
+        assert base != BundleCache.make_key("abc", "other", "1")
+        assert base != BundleCache.make_key("abc", "proc", "2")
+
+    def test_put_get_roundtrip(self, cache):
+        cache.put("k1", _bundle(text="hello"), pdf_sha256="abc")
+        restored = cache.get("k1")
+
+        assert restored.pages[0]["text"] == "hello"
+        assert cache.stats()["hits"] == 1
+
+    def test_size_eviction_is_lru(self, tmp_path):
+        bundles = {key: _bundle(text=secrets.token_hex(300)) for key in "abc"}
+        entry_size = len(encode_bundle(bundles["a"]))
+        cache = BundleCache(cache_dir=str(tmp_path / "bundles"), max_bytes=int(entry_size * 2.5), max_age_days=1)
+        cache.put("a", bundles["a"], pdf_sha256="a")
+        cache.put("b", bundles["b"], pdf_sha256="b")
+        cache.get("a")
+        cache.put("c", bundles["c"], pdf_sha256="c")
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["evictions"] >= 1
+
+    def test_age_eviction(self, tmp_path):
+        cache = BundleCache(cache_dir=str(tmp_path / "bundles"), max_age_days=0.5 / 86400)
+        cache.put("a", _bundle(), pdf_sha256="a")
+        time.sleep(1.0)
+
+        assert cache.get("a") is None
+
+
+@pytest.mark.unit
+class TestDocumentProcessorCaching:
+    """DocumentProcessor.process_pdf behind the bundle cache"""
+
+    def test_duplicate_bytes_cost_one_extraction(self, processor, tmp_path):
+        """Same bytes under a different filename are served from cache with the new doc_id"""
+        first = tmp_path / "fax_1.pdf"
+        second = tmp_path / "fax_1_forwarded.pdf"
+        first.write_bytes(b"%PDF-1.4 same bytes")
+        second.write_bytes(b"%PDF-1.4 same bytes")
+
+        bundle_a = processor.process_pdf(str(first))
+        bundle_b = processor.process_pdf(str(second))
+
+        assert processor.client.calls == 1
+        assert bundle_b.doc_id == "fax_1_forwarded"
+        assert bundle_b.file_path == str(second)
+        assert bundle_a.source_sha256 == bundle_b.source_sha256
+        assert bundle_b.pages == bundle_a.pages
+
+    def test_same_stem_different_bytes_not_shared(self, processor, tmp_path):
+        """Two different PDFs with the same stem never share a bundle"""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        (tmp_path / "a" / "report.pdf").write_bytes(b"%PDF-1.4 first")
+        (tmp_path / "b" / "report.pdf").write_bytes(b"%PDF-1.4 second")
+
+        processor.process_pdf(str(tmp_path / "a" / "report.pdf"))
+        processor.process_pdf(str(tmp_path / "b" / "report.pdf"))
+
+        assert processor.client.calls == 2
+
+    def test_changed_pdf_is_reextracted(self, processor, tmp_path):
+        pdf = tmp_path / "doc.pdf"
+        pdf.write_bytes(b"%PDF-1.4 v1")
+        processor.process_pdf(str(pdf))
+        pdf.write_bytes(b"%PDF-1.4 v2")
+        processor.process_pdf(str(pdf))
+
+        assert processor.client.calls == 2
@@ -0,0 +1,143 @@
+"""
+Unit tests for the compact binary bundle format and lazy page access
+"""
+
+import json
+import pickle
+import pytest
+import tracemalloc
+from datetime import datetime
+from src.bundle_store import BundleReader, LazyPage, LazyPages, load_bundle, read_pages, write_bundle
+from src.config import settings
+from src.schemas import DocumentBundle
+
+
+def _page(page_num, paragraphs, **extra):
+    return {
+        "page_num": page_num,
+        "text": "".join(p + "\n" for p in paragraphs),
+        "paragraphs": list(paragraphs),
+        "layout_metadata": {"block_types": ["paragraph"] * len(paragraphs), "has_tables": page_num % 2 == 0},
+        **extra
+    }
+
+
+@pytest.fixture
+def bundle():
+    pages = [
+        _page(n, [f"Page {n} heading", "Patient seen for follow-up.", "Plan: continue therapy."])
+        for n in range(1, 21)
+    ]
+    return DocumentBundle(
+        doc_id="doc_1",
+        file_path="/tmp/doc_1.pdf",
+        total_pages=len(pages),
+        pages=pages,
+        processing_timestamp=datetime.utcnow().isoformat(),
+        source_sha256="abc",
+        document_type="Clinical Note"
+    )
+
+
+@pytest.mark.unit
+class TestBundleStore:
+    """Test suite for write_bundle / load_bundle"""
+
+    @pytest.mark.parametrize("compress", [True, False])
+    def test_roundtrip(self, bundle, tmp_path, compress):
+        path = tmp_path / "doc_1.bundle"
+        write_bundle(path, bundle, compress=compress)
+
+        restored = load_bundle(path)
+
+        assert isinstance(restored.pages, LazyPages)
+        assert restored.model_dump(mode="json") == bundle.model_dump(mode="json")
+
+    def test_smaller_than_json(self, bundle, tmp_path):
+        path = tmp_path / "doc_1.bundle"
+        size = write_bundle(path, bundle)
+
+        assert size < len(json.dumps(bundle.model_dump(mode="json"), indent=2)) / 2
+
+    def test_paragraph_not_in_text_and_extra_keys(self, tmp_path, bundle):
+        page = _page(1, ["Alpha", "Beta"], ocr_confidence=0.9)
+        page["paragraphs"].append("Only in paragraphs")
+        bundle = bundle.model_copy(update={"pages": [page], "total_pages": 1})
+        write_bundle(tmp_path / "b.bundle", bundle)
+
+        assert load_bundle(tmp_path / "b.bundle").pages[0] == page
+
+    def test_slices_decode_only_requested_pages(self, bundle, tmp_path, monkeypatch):
+        path = tmp_path / "doc_1.bundle"
+        write_bundle(path, bundle)
+        restored = load_bundle(path)
+
+        reads = []
+        original = BundleReader.read_page
+        monkeypatch.setattr(BundleReader, "read_page", lambda self, i: reads.append(i) or original(self, i))
+
+        pages = restored.pages[4:9]
+        assert [p["page_num"] for p in pages] == [5, 6, 7, 8, 9]
+        assert restored.pages[-1]["page_num"] == 20
+        assert reads == [4, 5, 6, 7, 8, 19]
+
+    def test_read_pages_binary_and_legacy_json(self, bundle, tmp_path):
+        binary = tmp_path / "doc_1.bundle"
+        legacy = tmp_path / "doc_1.json"
+        write_bundle(binary, bundle)
+        legacy.write_text(json.dumps(bundle.model_dump(mode="json")))
+
+        assert read_pages(binary, 3, 5) == read_pages(legacy, 3, 5) == bundle.pages[2:5]
+        assert load_bundle(legacy).pages == bundle.pages
+
+    def test_lazy_bundle_pickles_as_list(self, bundle, tmp_path):
+        write_bundle(tmp_path / "doc_1.bundle", bundle)
+        restored = pickle.loads(pickle.dumps(load_bundle(tmp_path / "doc_1.bundle")))
+
+        assert restored.pages == bundle.pages
+
+
+@pytest.mark.unit
+class TestMappedBundle:
+    """Test suite for memory-mapped access to uncompressed bundles"""
+
+    def test_uncompressed_bundle_is_memory_mapped(self, bundle, tmp_path):
+        path = tmp_path / "doc_1.bundle"
+        write_bundle(path, bundle, compress=False)
+        restored = load_bundle(path)
+
+        assert isinstance(restored.pages[0], LazyPage)
+        assert restored.pages[2:4] == bundle.pages[2:4]
+        assert restored.pages[0]["paragraphs"] == bundle.pages[0]["paragraphs"]
+        assert bytes(restored.pages[0].text_view()) == bundle.pages[0]["text"].encode("utf-8")
+        assert restored.model_dump(mode="json") == bundle.model_dump(mode="json")
+        assert pickle.loads(pickle.dumps(restored)).pages == bundle.pages
+
+    def test_long_bundles_default_to_uncompressed(self, bundle, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "bundle_mmap_min_pages", 10)
+        write_bundle(tmp_path / "long.bundle", bundle)
+        short = bundle.model_copy(update={"pages": bundle.pages[:5], "total_pages": 5})
+        write_bundle(tmp_path / "short.bundle", short)
+
+        assert isinstance(load_bundle(tmp_path / "long.bundle").pages[0], LazyPage)
+        assert isinstance(load_bundle(tmp_path / "short.bundle").pages[0], dict)
+
+    def test_reading_every_page_keeps_memory_flat(self, tmp_path):
+        text = "Outside records: prior imaging and labs reviewed in detail. " * 40
+        pages = [_page(n, [text.strip()]) for n in range(1, 1001)]
+        bundle = DocumentBundle(
+            doc_id="long", file_path="/tmp/long.pdf", total_pages=len(pages),
+            pages=pages, processing_timestamp=datetime.utcnow().isoformat()
+        )
+        path = tmp_path / "long.bundle"
+        size = write_bundle(path, bundle, compress=False)
+        del bundle, pages
+
+        tracemalloc.start()
+        restored = load_bundle(path)
+        total_chars = sum(len(page["text"]) for page in restored.pages)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert total_chars == 1000 * (len(text.strip()) + 1)
+        assert peak < size / 5
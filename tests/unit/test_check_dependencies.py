@@ -0,0 +1,76 @@
+"""
+Unit tests for per-check dependency tracking and the retry memo
+
+The V2-V4 agents run for real against a fake Gemini client that counts calls.
+"""
+
+import json
+import pytest
+from tests.fixtures.fake_genai import FakeGenAIClient, verification_agent
+from src.agents.check_dependencies import VerificationMemo
+from src.agents.verification_runner import VerificationRunner
+
+
+def _fake_client(v2_issues=()):
+    """Fake client returning v2_issues to V2 and no issues to V3/V4"""
+    return FakeGenAIClient(lambda contents: json.dumps(list(v2_issues) if verification_agent(contents) == "V2" else []))
+
+
+def _scale_overall_shares(classification, factor):
+    mixture = [m.model_copy(update={"overall_share": m.overall_share * factor}) for m in classification.document_mixture]
+    return classification.model_copy(update={"document_mixture": mixture})
+
+
+@pytest.fixture
+def make_runner(monkeypatch, tmp_path, clean_classification):
+    def make(**client_kwargs):
+        client = _fake_client(**client_kwargs)
+        runner = VerificationRunner(client=client, concurrent=False)
+        # Agents load their prompts from the repo; outputs go to a temp dir
+        monkeypatch.chdir(tmp_path)
+        return runner, client.models
+    return make
+
+
+@pytest.mark.unit
+class TestVerificationMemo:
+    """Test suite for incremental re-verification"""
+
+    def test_share_fix_reuses_llm_checks(self, make_runner, clean_classification, sample_doc_bundle):
+        runner, models = make_runner()
+        memo = VerificationMemo()
+
+        first, _ = runner.run_all(_scale_overall_shares(clean_classification, 1.2), sample_doc_bundle, memo=memo)
+        assert sorted(models.agents) == ["V2", "V3", "V4"]
+        assert first.reused_checks == []
+
+        second, _ = runner.run_all(clean_classification, sample_doc_bundle, memo=memo)
+        assert sorted(models.agents) == ["V2", "V3", "V4"]  # no new calls
+        assert second.reused_checks == ["V2-llm", "V3-rules", "V3-llm", "V4"]
+        assert second.llm_calls_made == 0
+
+    def test_evidence_change_reruns_llm_checks(self, make_runner, clean_classification, sample_doc_bundle):
+        runner, models = make_runner()
+        memo = VerificationMemo()
+        runner.run_all(clean_classification, sample_doc_bundle, memo=memo)
+
+        relabelled = clean_classification.model_copy(update={"vendor_signals": ["Quest Diagnostics"]})
+        report, _ = runner.run_all(relabelled, sample_doc_bundle, memo=memo)
+
+        assert len(models.agents) == 6
+        assert report.reused_checks == []
+
+    def test_reused_share_issue_dropped(self, make_runner, clean_classification, sample_doc_bundle):
+        share_issue = {
+            "ig_id": "IG-8", "issue_id": "V2-LLM-0001", "severity": "MINOR",
+            "location": {"segment_index": 1, "field": "overall_share"},
+            "message": "Mixture shares look off", "auto_fixable": True,
+        }
+        runner, models = make_runner(v2_issues=[share_issue])
+        memo = VerificationMemo()
+
+        first, _ = runner.run_all(_scale_overall_shares(clean_classification, 1.2), sample_doc_bundle, memo=memo)
+        assert "V2-LLM-0001" in [i.issue_id for i in first.issues]
+
+        second, _ = runner.run_all(clean_classification, sample_doc_bundle, memo=memo)
+        assert "V2-LLM-0001" not in [i.issue_id for i in second.issues]
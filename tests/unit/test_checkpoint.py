@@ -0,0 +1,210 @@
+"""
+Unit tests for atomic writes, the checkpoint journal and resumable pipeline runs
+
+Pipeline components are replaced with stubs so no GCP clients are created.
+"""
+
+import asyncio
+import json
+import os
+import pytest
+from datetime import datetime
+from pathlib import Path
+import src.pipeline as pipeline_module
+from src.atomic_io import atomic_write_json
+from src.checkpoint import CheckpointJournal
+from src.pipeline import DocumentPipeline
+from src.schemas import ArbiterDecision, DocumentBundle, VerificationReport
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / "doc_1.pdf"
+    path.write_bytes(b"%PDF-1.4 test")
+    return path
+
+
+@pytest.mark.unit
+class TestAtomicWrite:
+    """Test suite for atomic_write_json"""
+
+    def test_writes_and_leaves_no_temp_files(self, tmp_path):
+        target = tmp_path / "out" / "data.json"
+        atomic_write_json(target, {"a": 1})
+
+        assert json.loads(target.read_text()) == {"a": 1}
+        assert os.listdir(target.parent) == ["data.json"]
+
+    def test_failed_write_keeps_previous_file(self, tmp_path):
+        target = tmp_path / "data.json"
+        atomic_write_json(target, {"version": 1})
+
+        with pytest.raises(TypeError):
+            atomic_write_json(target, {"version": object()})  # not serializable
+
+        assert json.loads(target.read_text()) == {"version": 1}
+        assert os.listdir(tmp_path) == ["data.json"]
+
+
+@pytest.mark.unit
+class TestCheckpointJournal:
+    """Test suite for CheckpointJournal"""
+
+    def test_resume_keeps_completed_stages(self, tmp_path, pdf):
+        journal = CheckpointJournal(str(tmp_path / "journal"))
+        journal.begin("doc_1", str(pdf))
+        journal.mark_complete("doc_1", "extraction", bundle_path="b.json")
+
+        restarted = CheckpointJournal(str(tmp_path / "journal"))
+        restarted.begin("doc_1", str(pdf))
+        assert restarted.get("doc_1", "extraction")["bundle_path"] == "b.json"
+        assert not restarted.is_complete("doc_1", "classification")
+
+    def test_no_resume_resets(self, tmp_path, pdf):
+        journal = CheckpointJournal(str(tmp_path / "journal"))
+        journal.begin("doc_1", str(pdf))
+        journal.mark_complete("doc_1", "extraction", bundle_path="b.json")
+
+        journal.begin("doc_1", str(pdf), resume=False)
+        assert not journal.is_complete("doc_1", "extraction")
+
+    def test_changed_source_resets(self, tmp_path, pdf):
+        journal = CheckpointJournal(str(tmp_path / "journal"))
+        journal.begin("doc_1", str(pdf))
+        journal.mark_complete("doc_1", "extraction", bundle_path="b.json")
+
+        pdf.write_bytes(b"%PDF-1.4 a different, longer document")
+        journal.begin("doc_1", str(pdf))
+        assert not journal.is_complete("doc_1", "extraction")
+
+    def test_agent_results_keyed_by_classification(self, tmp_path, pdf):
+        journal = CheckpointJournal(str(tmp_path / "journal"))
+        journal.begin("doc_1", str(pdf))
+        journal.record_agent_result("doc_1", "digest-a", "V2", [], 0.9)
+
+        assert journal.get_agent_result("doc_1", "digest-a", "V2") == {"issues": [], "result": 0.9}
+        assert journal.get_agent_result("doc_1", "digest-b", "V2") is None
+
+
+class _Calls:
+    """Counts stage invocations across stub instances"""
+    extraction = 0
+    classification = 0
+    verification = 0
+    fail_verification = False
+
+
+class _StubProcessor:
+    def process_pdf(self, pdf_path):
+        _Calls.extraction += 1
+        return DocumentBundle(
+            doc_id=Path(pdf_path).stem,
+            file_path=pdf_path,
+            total_pages=1,
+            pages=[{"page_num": 1, "text": "text"}],
+            processing_timestamp=datetime.utcnow().isoformat()
+        )
+
+    async def aprocess_pdf(self, pdf_path):
+        return self.process_pdf(pdf_path)
+
+    def format_for_llm(self, bundle):
+        return "text"
+
+
+class _StubClassifier:
+    def __init__(self, client=None):
+        self.classification = None
+        self.last_prompt_metadata = None
+
+    def classify_bundle(self, doc_bundle):
+        _Calls.classification += 1
+        return _StubClassifier.classification
+
+    async def aclassify_bundle(self, doc_bundle):
+        return self.classify_bundle(doc_bundle), None
+
+
+class _StubOrchestrator:
+    def __init__(self, client=None, journal=None):
+        pass
+
+    def verify_with_retry(self, classification, doc_bundle):
+        _Calls.verification += 1
+        if _Calls.fail_verification:
+            raise RuntimeError("worker killed")
+        report = VerificationReport(v1_validation_passed=True, has_blocker_issues=False, total_issues=0)
+        decision = ArbiterDecision(
+            decision="AUTO_ACCEPT", reason="ok", issues_analyzed=0,
+            blocker_count=0, major_count=0, minor_count=0, fixable_count=0
+        )
+        return classification, report, decision, []
+
+    async def averify_with_retry(self, classification, doc_bundle):
+        return self.verify_with_retry(classification, doc_bundle)
+
+
+@pytest.fixture
+def stub_pipeline(monkeypatch, tmp_path, clean_classification):
+    _Calls.extraction = _Calls.classification = _Calls.verification = 0
+    _Calls.fail_verification = False
+    _StubClassifier.classification = clean_classification
+    monkeypatch.setattr(pipeline_module, "create_genai_client", lambda: object())
+    monkeypatch.setattr(pipeline_module, "DocumentProcessor", _StubProcessor)
+    monkeypatch.setattr(pipeline_module, "PrimaryClassifierAgent", _StubClassifier)
+    monkeypatch.setattr(pipeline_module, "RetryOrchestrator", _StubOrchestrator)
+
+    def build(resume=True):
+        return DocumentPipeline(
+            output_dir=str(tmp_path / "out"),
+            bundle_dir=str(tmp_path / "bundles"),
+            journal_dir=str(tmp_path / "journal"),
+            resume=resume
+        )
+    return build
+
+
+@pytest.mark.unit
+class TestResumablePipeline:
+    """Test suite for stage skipping in DocumentPipeline"""
+
+    def test_restart_resumes_at_failed_stage(self, stub_pipeline, pdf):
+        _Calls.fail_verification = True
+        first = stub_pipeline().run(str(pdf))
+        assert first.status == "failed"
+        assert first.error.startswith("verification")
+
+        _Calls.fail_verification = False
+        second = stub_pipeline().run(str(pdf))
+
+        assert second.status == "completed"
+        assert second.decision == "AUTO_ACCEPT"
+        assert (_Calls.extraction, _Calls.classification, _Calls.verification) == (1, 1, 2)
+        assert set(second.stage_seconds) == {"verification"}
+
+    def test_completed_document_is_skipped(self, stub_pipeline, pdf):
+        stub_pipeline().run(str(pdf))
+        result = stub_pipeline().run(str(pdf))
+
+        assert result.status == "completed"
+        assert result.decision == "AUTO_ACCEPT"
+        assert result.stage_seconds == {}
+        assert (_Calls.extraction, _Calls.classification, _Calls.verification) == (1, 1, 1)
+
+    def test_no_resume_reprocesses(self, stub_pipeline, pdf):
+        stub_pipeline().run(str(pdf))
+        stub_pipeline(resume=False).run(str(pdf))
+
+        assert (_Calls.extraction, _Calls.classification, _Calls.verification) == (2, 2, 2)
+
+    def test_async_run_shares_checkpoints(self, stub_pipeline, pdf):
+        """arun resumes from stages completed by run and vice versa"""
+        _Calls.fail_verification = True
+        first = asyncio.run(stub_pipeline().arun(str(pdf)))
+        assert first.error.startswith("verification")
+
+        _Calls.fail_verification = False
+        second = stub_pipeline().run(str(pdf))
+
+        assert second.status == "completed"
+        assert (_Calls.extraction, _Calls.classification, _Calls.verification) == (1, 1, 2)
@@ -0,0 +1,150 @@
+"""
+Unit tests for DocumentProcessor layout block traversal
+"""
+
+import io
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+from google.cloud import documentai_v1 as documentai
+from pypdf import PdfReader, PdfWriter
+from src.config import settings
+from src.document_processor import DocumentProcessor
+from tests.fixtures.fake_documentai import FakeDocumentAIClient, PdfTextFakeClient
+
+SAMPLE_PDF = str(Path(__file__).resolve().parents[2] / "data" / "input" / "raw_documents" / "doc2_1.pdf")
+
+Block = documentai.Document.DocumentLayout.DocumentLayoutBlock
+
+
+def _text(text, page=1, block_type="paragraph", children=None):
+    return Block(
+        text_block=Block.LayoutTextBlock(text=text, type_=block_type, blocks=children or []),
+        page_span=Block.LayoutPageSpan(page_start=page, page_end=page)
+    )
+
+
+def _table(rows, page=1):
+    body_rows = [
+        Block.LayoutTableRow(
+            cells=[Block.LayoutTableCell(blocks=[_text(cell, page)]) for cell in row]
+        )
+        for row in rows
+    ]
+    return Block(
+        table_block=Block.LayoutTableBlock(body_rows=body_rows),
+        page_span=Block.LayoutPageSpan(page_start=page, page_end=page)
+    )
+
+
+def _document(blocks):
+    return documentai.Document(document_layout=documentai.Document.DocumentLayout(blocks=blocks))
+
+
+@pytest.fixture
+def processor():
+    return DocumentProcessor(client=FakeDocumentAIClient(), bundle_cache=None)
+
+
+@pytest.mark.unit
+class TestLayoutTraversal:
+    """Test suite for DocumentProcessor._extract_pages"""
+
+    def test_nested_and_table_blocks_in_document_order(self, processor):
+        document = _document([
+            _text("Heading", block_type="heading-1", children=[
+                _text("Intro"),
+                _table([["A1", "B1"], ["A2", "B2"]]),
+                _text("Outro"),
+            ]),
+            _text("   "),
+            _text("Second page", page=2),
+        ])
+
+        pages = processor._extract_pages(document)
+
+        assert [p["page_num"] for p in pages] == [1, 2]
+        assert pages[0]["paragraphs"] == ["Heading", "Intro", "A1", "B1", "A2", "B2", "Outro"]
+        assert pages[0]["text"] == "Heading\nIntro\nA1\nB1\nA2\nB2\nOutro\n"
+        assert pages[0]["layout_metadata"]["has_tables"] is True
+        assert pages[0]["layout_metadata"]["block_types"][0] == "heading-1"
+        assert pages[1]["text"] == "Second page\n"
+
+    def test_deep_nesting_does_not_recurse(self, processor):
+        depth = 5000
+        # Protobuf caps message nesting far below this, so use plain objects
+        # shaped like Layout Parser blocks
+        block = SimpleNamespace(
+            text_block=SimpleNamespace(text=f"level {depth}", type="paragraph", blocks=[]),
+            page_span=None
+        )
+        for level in range(depth - 1, 0, -1):
+            block = SimpleNamespace(
+                text_block=SimpleNamespace(text=f"level {level}", type="paragraph", blocks=[block]),
+                page_span=None
+            )
+
+        pages_dict = {}
+        processor._process_blocks([block], pages_dict)
+
+        assert len(pages_dict[1]["paragraphs"]) == depth
+        assert pages_dict[1]["paragraphs"][0] == "level 1"
+        assert pages_dict[1]["paragraphs"][-1] == f"level {depth}"
+
+
+def _merged_pdf(copies):
+    """Concatenate the sample PDF with itself to build a long document"""
+    writer = PdfWriter()
+    for _ in range(copies):
+        writer.append(SAMPLE_PDF)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def shard_settings(monkeypatch):
+    monkeypatch.setattr(settings, "document_ai_shard_pages", 4)
+    monkeypatch.setattr(settings, "document_ai_shard_concurrency", 3)
+    monkeypatch.setattr(settings, "document_ai_shard_retries", 1)
+    monkeypatch.setattr(settings, "document_ai_shard_retry_backoff", 0.0)
+
+
+@pytest.mark.unit
+class TestShardedExtraction:
+    """Test suite for sharded Document AI extraction"""
+
+    def test_shards_merge_in_page_order(self, shard_settings):
+        pdf_content = _merged_pdf(3)  # 15 pages -> shards of 4, 4, 4, 3
+        client = PdfTextFakeClient()
+        processor = DocumentProcessor(client=client, bundle_cache=None)
+
+        pages = processor.extract(pdf_content)
+
+        reader = PdfReader(io.BytesIO(pdf_content))
+        assert [p["page_num"] for p in pages] == list(range(1, 16))
+        assert [p["paragraphs"][0] for p in pages] == [page.extract_text().strip() for page in reader.pages]
+        assert sorted(client.page_counts) == [3, 4, 4, 4]
+
+    def test_failed_shard_retried_alone(self, shard_settings):
+        client = PdfTextFakeClient(fail_calls={2})
+        processor = DocumentProcessor(client=client, bundle_cache=None)
+
+        pages = processor.extract(_merged_pdf(3))
+
+        assert [p["page_num"] for p in pages] == list(range(1, 16))
+        assert client.calls == 5  # 4 shards + 1 retry
+
+    def test_shard_failing_every_attempt_raises(self, shard_settings):
+        processor = DocumentProcessor(client=PdfTextFakeClient(fail_calls=range(1, 20)), bundle_cache=None)
+
+        with pytest.raises(RuntimeError):
+            processor.extract(_merged_pdf(2))
+
+    def test_pdf_within_shard_size_sent_whole(self, shard_settings, monkeypatch):
+        monkeypatch.setattr(settings, "document_ai_shard_pages", 5)
+        client = PdfTextFakeClient()
+        with open(SAMPLE_PDF, "rb") as f:
+            DocumentProcessor(client=client, bundle_cache=None).extract(f.read())
+
+        assert client.page_counts == [5]
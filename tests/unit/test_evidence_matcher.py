@@ -0,0 +1,131 @@
+"""
+Unit tests for local evidence matching and V4 evidence screening
+"""
+
+import pytest
+from src.agents.v4_evidence_quality import V4EvidenceQualityAssessor
+from src.evidence_matcher import EvidenceIndex, MatchStatus
+from src.payload_planner import PayloadPlanner
+from src.schemas import CheckCode, IssueSeverity
+
+PATHOLOGY = (
+    "SURGICAL PATHOLOGY REPORT\n"
+    "Gross Description: Left breast, central, 12:00, suspicious mass, core needle biopsy.\n"
+    "FINAL DIAGNOSIS: Infiltrating moderately-differentiated mammary carcinoma, grade 2, "
+    "Nottingham score 6. Margins are negative for carcinoma."
+)
+GENOMIC = (
+    "Genomic Signatures\n"
+    "Microsatellite instability: High. Tumor mutational burden: 11 mutations/Mb.\n"
+    "Genes Tested with Pathogenic Alterations: BRCA2, TP53"
+)
+
+
+@pytest.fixture
+def index():
+    return EvidenceIndex({1: "Clinic visit. Patient doing well.", 2: GENOMIC, 3: PATHOLOGY})
+
+
+@pytest.mark.unit
+class TestEvidenceIndex:
+    """Test suite for snippet and anchor matching"""
+
+    def test_exact_after_normalization(self, index):
+        match = index.match_snippet("final diagnosis:  INFILTRATING moderately differentiated mammary carcinoma", 3)
+        assert match.status == MatchStatus.EXACT
+        assert match.page == 3
+
+    def test_ocr_noise_is_fuzzy_match(self, index):
+        match = index.match_snippet(
+            "FINAL DIAGNOSIS: Infiltrating moderately-differentiated mammary carcinorna, grade 2, "
+            "Nottingham score 6. Margins are negative for carcinoma.", 3
+        )
+        assert match.status == MatchStatus.FUZZY
+
+    def test_elided_snippet_matches_fragments(self, index):
+        match = index.match_snippet("Gross Description: Left breast, central ... Margins are negative for carcinoma", 3)
+        assert match.status == MatchStatus.EXACT
+
+    def test_wrong_page_is_misplaced(self, index):
+        match = index.match_snippet("Microsatellite instability: High. Tumor mutational burden: 11 mutations/Mb", 3)
+        assert match.status == MatchStatus.MISPLACED
+        assert match.page == 2
+
+    def test_fabricated_snippet_not_found(self, index):
+        match = index.match_snippet("CT chest with contrast demonstrates a 2 cm spiculated nodule in the right upper lobe", 3)
+        assert match.status == MatchStatus.NOT_FOUND
+
+    def test_scrambled_words_unresolved(self, index):
+        # Same vocabulary as the page, but only part of it in the quoted order
+        match = index.match_snippet("Gross Description: Left breast, central, 12:00, negative margins, carcinoma grade 6 Nottingham", 3)
+        assert match.status == MatchStatus.UNRESOLVED
+
+    def test_anchors(self, index):
+        assert index.find_anchor("Final Diagnosis", 3)
+        assert index.find_anchor("FINAL DIAGN0SIS", 3)  # OCR-damaged page or anchor
+        assert not index.find_anchor("Final Diagnosis", 2)
+        assert not index.find_anchor("Impression", 3)
+
+
+@pytest.mark.unit
+class TestV4EvidenceScreening:
+    """Test suite for the V4 local screening phase"""
+
+    @pytest.fixture
+    def bundle(self, sample_doc_bundle):
+        pages = [{"page_number": n, "text": f"Page {n} clinic note"} for n in range(1, 6)]
+        pages[1]["text"] = GENOMIC
+        pages[3]["text"] = PATHOLOGY
+        return sample_doc_bundle.model_copy(update={"pages": pages})
+
+    @pytest.fixture
+    def v4(self):
+        return V4EvidenceQualityAssessor.__new__(V4EvidenceQualityAssessor)  # screening needs no client or prompt
+
+    def _with_evidence(self, classification, updates):
+        """Replace fields of each evidence entry; updates maps document type -> dict"""
+        segment = classification.segments[0]
+        composition = [
+            comp.model_copy(update={"top_evidence": [ev.model_copy(update=updates[comp.document_type.value]) for ev in comp.top_evidence]})
+            if comp.document_type.value in updates else comp
+            for comp in segment.segment_composition
+        ]
+        return classification.model_copy(update={"segments": [segment.model_copy(update={"segment_composition": composition})]})
+
+    def test_reports_fabricated_misplaced_and_anchor_issues(self, v4, clean_classification, bundle):
+        classification = self._with_evidence(clean_classification, {
+            "Genomic Report": {"page": 4, "snippet": "Microsatellite instability: High. Tumor mutational burden: 11 mutations/Mb"},
+            "Pathology Report": {"snippet": "FINAL DIAGNOSIS: Infiltrating moderately-differentiated mammary carcinoma, grade 2",
+                                 "anchors_found": ["Final Diagnosis", "Immunohistochemistry"]},
+        })
+
+        screening = v4._screen_evidence(classification, bundle)
+
+        codes = {issue.check_code: issue for issue in screening.issues}
+        assert set(codes) == {CheckCode.EVIDENCE_MISPLACED, CheckCode.ANCHOR_NOT_FOUND}
+        assert "page 2" in codes[CheckCode.EVIDENCE_MISPLACED].message
+        assert codes[CheckCode.ANCHOR_NOT_FOUND].location["anchor"] == "Immunohistochemistry"
+        assert screening.verified == 1
+        assert screening.unresolved_pages == []
+
+        fabricated = self._with_evidence(classification, {"Genomic Report": {"snippet": "Whole exome sequencing identified no reportable variants in any gene"}})
+        issues = v4._screen_evidence(fabricated, bundle).issues
+        assert [i.check_code for i in issues] == [CheckCode.ANCHOR_NOT_FOUND, CheckCode.EVIDENCE_NOT_FOUND]
+        assert issues[1].severity == IssueSeverity.BLOCKER  # Genomic Report is PRIMARY
+
+    def test_prompt_carries_only_unresolved_pages(self, v4, clean_classification, bundle):
+        v4.prompt_base = "V4 prompt"
+        v4.planner = PayloadPlanner(mode="full")
+        classification = self._with_evidence(clean_classification, {
+            "Genomic Report": {"snippet": "Microsatellite instability: High. Tumor mutational burden: 11 mutations/Mb", "anchors_found": []},
+            "Pathology Report": {"snippet": "Gross Description: Left breast, central, 12:00, negative margins, carcinoma grade 6 Nottingham",
+                                 "anchors_found": []},
+        })
+
+        screening = v4._screen_evidence(classification, bundle)
+        prompt = v4._llm_request(classification, bundle, screening)["contents"]
+
+        assert screening.issues == [] and screening.unresolved_pages == [4]
+        assert "SURGICAL PATHOLOGY REPORT" in prompt
+        assert "Genes Tested with Pathogenic Alterations: BRCA2" not in prompt
+        assert len(prompt) < len(v4._llm_request(classification, bundle, None)["contents"])
@@ -0,0 +1,81 @@
+"""
+Unit tests for pluggable extraction backends
+"""
+
+import io
+import pytest
+from pathlib import Path
+from pypdf import PdfReader, PdfWriter
+from src.bundle_cache import BundleCache
+from src.document_processor import DocumentProcessor
+from src.extraction_backends import ExtractionBackend, LocalPDFBackend
+from tests.fixtures.fake_documentai import FakeDocumentAIClient
+
+SAMPLE_PDF = str(Path(__file__).resolve().parents[2] / "data" / "input" / "raw_documents" / "doc2_1.pdf")
+
+
+def _with_blank_page(pdf_path, position):
+    """Copy a PDF, inserting a page with no text layer at the given index"""
+    reader = PdfReader(pdf_path)
+    writer = PdfWriter()
+    for page in reader.pages:
+        writer.add_page(page)
+    box = reader.pages[0].mediabox
+    writer.insert_blank_page(width=box.width, height=box.height, index=position)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def documentai_backend():
+    return DocumentProcessor(client=FakeDocumentAIClient(["Scanned page text"]), bundle_cache=None)
+
+
+@pytest.mark.unit
+class TestLocalPDFBackend:
+    """Test suite for LocalPDFBackend"""
+
+    def test_backends_satisfy_protocol(self, documentai_backend):
+        assert isinstance(LocalPDFBackend(), ExtractionBackend)
+        assert isinstance(documentai_backend, ExtractionBackend)
+
+    def test_extracts_bundle_page_shape(self):
+        with open(SAMPLE_PDF, 'rb') as f:
+            pages = LocalPDFBackend().extract(f.read())
+
+        assert [p["page_num"] for p in pages] == list(range(1, len(pages) + 1))
+        first = pages[0]
+        assert first["paragraphs"][0] == "Final Report"
+        assert first["text"] == "".join(p + "\n" for p in first["paragraphs"])
+        assert first["layout_metadata"]["block_types"] == ["paragraph"] * len(first["paragraphs"])
+        assert first["layout_metadata"]["source"] == "pdf_text_layer"
+
+    def test_pages_without_text_layer_use_fallback(self, documentai_backend):
+        pdf_bytes = _with_blank_page(SAMPLE_PDF, position=1)
+        pages = LocalPDFBackend(fallback=documentai_backend).extract(pdf_bytes)
+
+        assert documentai_backend.client.calls == 1
+        assert pages[1]["page_num"] == 2
+        assert pages[1]["paragraphs"] == ["Scanned page text"]
+        assert pages[1]["layout_metadata"]["source"] == "documentai"
+        assert pages[2]["paragraphs"][0] == "Final Report"
+
+    def test_no_fallback_keeps_empty_page(self):
+        pages = LocalPDFBackend().extract(_with_blank_page(SAMPLE_PDF, position=0))
+
+        assert pages[0]["page_num"] == 1
+        assert pages[0]["paragraphs"] == []
+
+    def test_cache_key_includes_backend(self, documentai_backend, tmp_path):
+        cache = BundleCache(cache_dir=str(tmp_path / "bundles"), max_bytes=10_000_000, max_age_days=1)
+        local = DocumentProcessor(
+            client=documentai_backend.client, bundle_cache=cache, backend=LocalPDFBackend()
+        )
+        remote = DocumentProcessor(client=documentai_backend.client, bundle_cache=cache)
+
+        local.process_pdf(SAMPLE_PDF)
+        bundle = remote.process_pdf(SAMPLE_PDF)
+
+        assert documentai_backend.client.calls == 1
+        assert bundle.pages[0]["paragraphs"] == ["Scanned page text"]
@@ -0,0 +1,158 @@
+"""
+Unit tests for the disk-backed LLM response cache
+"""
+
+import asyncio
+import itertools
+import json
+import time
+import pytest
+from google.genai.types import GenerateContentConfig, Part
+from tests.fixtures.fake_genai import FakeGenAIClient, replies
+from src.llm_cache import LLMResponseCache, CachedGenAIClient, commit_response, discard_response, parse_and_commit
+
+
+def _numbered_client() -> FakeGenAIClient:
+    """Fake client answering "response #n" for the n-th network call"""
+    numbers = itertools.count(1)
+    return FakeGenAIClient(lambda contents: f"response #{next(numbers)}")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMResponseCache(cache_dir=str(tmp_path), max_bytes=10_000, max_age_days=1)
+
+
+@pytest.fixture
+def client(cache):
+    return CachedGenAIClient(_numbered_client(), cache)
+
+
+DETERMINISTIC = GenerateContentConfig(temperature=0.0, response_mime_type="application/json")
+
+
+@pytest.mark.unit
+class TestLLMResponseCache:
+    """Test suite for LLMResponseCache and CachedGenAIClient"""
+
+    def test_repeat_call_served_from_cache(self, client, cache):
+        """Identical deterministic requests make exactly one network call"""
+        first = client.models.generate_content(model="m", contents="prompt", config=DETERMINISTIC)
+        commit_response(first)
+        second = client.models.generate_content(model="m", contents="prompt", config=DETERMINISTIC)
+
+        assert client._client.models.calls == 1
+        assert first.text == second.text
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_uncommitted_response_is_not_cached(self, client, cache):
+        """Responses only reach the store once the caller commits them"""
+        client.models.generate_content(model="m", contents="prompt", config=DETERMINISTIC)
+        client.models.generate_content(model="m", contents="prompt", config=DETERMINISTIC)
+
+        assert client._client.models.calls == 2
+        assert cache.stats()["entries"] == 0
+
+    def test_bad_response_retried_then_good_one_cached(self, cache):
+        """A reply that fails to parse is not replayed to the retry or to later runs"""
+        client = CachedGenAIClient(FakeGenAIClient(replies('[{"ig_id": "IG-1", "sev', '[{"ig_id": "IG-1"}]')), cache)
+
+        def call():
+            response = client.models.generate_content(model="m", contents="prompt", config=DETERMINISTIC)
+            return parse_and_commit(response, lambda r: json.loads(r.text))
+
+        with pytest.raises(json.JSONDecodeError):
+            call()
+        assert call() == [{"ig_id": "IG-1"}]
+        # Served from the store now; the truncated reply was never stored
+        assert call() == [{"ig_id": "IG-1"}]
+        assert cache.stats()["entries"] == 1
+
+    def test_discard_drops_cached_entry(self, client, cache):
+        """Discarding a cache hit evicts it so the next call goes to the network"""
+        commit_response(client.models.generate_content(model="m", contents="prompt", config=DETERMINISTIC))
+        hit = client.models.generate_content(model="m", contents="prompt", config=DETERMINISTIC)
+        discard_response(hit)
+        client.models.generate_content(model="m", contents="prompt", config=DETERMINISTIC)
+
+        assert client._client.models.calls == 2
+
+    def test_key_covers_model_contents_and_config(self, client):
+        """Changing model, prompt or config is a cache miss"""
+        client.models.generate_content(model="m", contents="prompt", config=DETERMINISTIC)
+        client.models.generate_content(model="other", contents="prompt", config=DETERMINISTIC)
+        client.models.generate_content(model="m", contents="prompt v2", config=DETERMINISTIC)
+        client.models.generate_content(
+            model="m", contents="prompt", config=GenerateContentConfig(temperature=0.0)
+        )
+
+        assert client._client.models.calls == 4
+
+    def test_multimodal_parts_are_hashed(self, client):
+        """PDF bytes are part of the key"""
+        for pdf in (b"%PDF-a", b"%PDF-b", b"%PDF-a"):
+            commit_response(client.models.generate_content(
+                model="m",
+                contents=[Part.from_bytes(data=pdf, mime_type="application/pdf"), "prompt"],
+                config=DETERMINISTIC
+            ))
+
+        assert client._client.models.calls == 2
+
+    def test_non_zero_temperature_bypasses_cache(self, client, cache):
+        """Sampling requests are never cached"""
+        config = GenerateContentConfig(temperature=0.7)
+        client.models.generate_content(model="m", contents="prompt", config=config)
+        client.models.generate_content(model="m", contents="prompt", config=config)
+
+        assert client._client.models.calls == 2
+        assert cache.stats()["bypassed"] == 2
+
+    def test_persists_across_instances(self, tmp_path):
+        """A new process (new cache instance) reuses the on-disk store"""
+        first = CachedGenAIClient(_numbered_client(), LLMResponseCache(cache_dir=str(tmp_path)))
+        commit_response(first.models.generate_content(model="m", contents="prompt", config=DETERMINISTIC))
+
+        second = CachedGenAIClient(_numbered_client(), LLMResponseCache(cache_dir=str(tmp_path)))
+        second.models.generate_content(model="m", contents="prompt", config=DETERMINISTIC)
+
+        assert second._client.models.calls == 0
+
+    def test_size_eviction_is_lru(self, cache):
+        """Least recently read entries are evicted first when over max_bytes"""
+        cache.put("a", "x" * 4000)
+        cache.put("b", "x" * 4000)
+        cache.get("a")  # refresh 'a'
+        cache.put("c", "x" * 4000)  # total 12000 > 10000
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_age_eviction(self, tmp_path):
+        """Entries older than max_age are treated as misses and evicted"""
+        cache = LLMResponseCache(cache_dir=str(tmp_path), max_age_days=0.5 / 86400)
+        cache.put("a", "value")
+        time.sleep(1.0)
+
+        assert cache.get("a") is None
+        cache.evict()
+        assert cache.stats()["entries"] == 0
+
+    def test_aio_shares_cache_with_sync_api(self, client, cache):
+        """Async calls are cached in the same store and served to the sync API"""
+        async def call_twice():
+            first = await client.aio.models.generate_content(model="m", contents="prompt", config=DETERMINISTIC)
+            commit_response(first)
+            second = await client.aio.models.generate_content(model="m", contents="prompt", config=DETERMINISTIC)
+            return first, second
+
+        first, second = asyncio.run(call_twice())
+
+        assert first.text == second.text == "response #1"
+        assert client.aio is client.aio
+        assert client.models.generate_content(model="m", contents="prompt", config=DETERMINISTIC).text == first.text
+        assert client._client.aio.models.calls == 1
+        assert client._client.models.calls == 0
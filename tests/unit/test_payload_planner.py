@@ -0,0 +1,88 @@
+"""
+Unit tests for evidence-scoped V2/V4 payload planning
+"""
+
+import pytest
+from src.agents.v2_consistency_checker import V2ConsistencyChecker
+from src.payload_planner import PayloadPlanner
+from src.prompt_budget import PromptAssembler, TokenEstimator
+
+
+class _CountingPages(list):
+    """Page list that records which pages are read"""
+
+    def __init__(self, pages):
+        super().__init__(pages)
+        self.read = []
+
+    def __getitem__(self, index):
+        self.read.append(index + 1)
+        return super().__getitem__(index)
+
+
+@pytest.fixture
+def bundle(sample_doc_bundle):
+    pages = [{"page_number": n, "text": f"Page {n} clinic note, routine follow up."} for n in range(1, 13)]
+    pages[6]["text"] = "Genomic Signatures summary continued from page 2."
+    pages[8]["text"] = "GROSS DESCRIPTION addendum. Pathological diagnosis unchanged."
+    return sample_doc_bundle.model_copy(update={"pages": pages, "total_pages": 12})
+
+
+@pytest.fixture
+def classification(clean_classification):
+    """One segment over pages 1-12 citing evidence on pages 2 and 4"""
+    segment = clean_classification.segments[0].model_copy(update={"end_page": 12, "segment_page_count": 12})
+    return clean_classification.model_copy(update={"segments": [segment]})
+
+
+@pytest.mark.unit
+class TestPayloadPlanner:
+    """Test suite for page selection and the full-context fallback"""
+
+    def test_selects_boundary_evidence_and_anchor_pages(self, classification, bundle):
+        planner = PayloadPlanner(mode="planned", max_anchor_pages=1)
+        plan = planner.plan(classification, bundle)
+
+        # Page 9 hits two anchors, page 7 one; only the best anchor page is kept
+        assert plan.pages == {1: [1, 2, 4, 9, 12]}
+        assert plan.reasons[1] == {"boundary"} and plan.reasons[2] == {"evidence"} and plan.reasons[9] == {"anchor"}
+        assert "--- PAGE 9 ---" in plan.text and "--- PAGE 7 ---" not in plan.text
+        assert "\n  " not in plan.classification_json
+        assert 0 < plan.tokens_sent < plan.tokens_full
+        assert planner.stats()["tokens_saved"] == plan.tokens_saved
+
+    def test_extra_pages_only(self, classification, bundle):
+        plan = PayloadPlanner(mode="planned").plan(classification, bundle, reasons=(), extra_pages=[4, 40])
+        assert plan.pages == {1: [4]}
+        assert plan.reasons == {4: {"requested"}}
+
+    def test_decodes_only_pages_it_needs(self, classification, bundle):
+        """Full-context pricing reuses the classifier's page estimates instead of decoding every page"""
+        estimator = TokenEstimator()
+        pages = _CountingPages([{"page_num": n, "text": page["text"]} for n, page in enumerate(bundle.pages, start=1)])
+        bundle = bundle.model_copy(update={"pages": pages})
+        PromptAssembler("Classify.", estimator=estimator).assemble(bundle)
+        bundle.pages.read.clear()
+
+        plan = PayloadPlanner(mode="planned", estimator=estimator).plan(classification, bundle, reasons=(), extra_pages=[4])
+
+        assert bundle.pages.read == [4]
+        assert plan.tokens_full > plan.tokens_sent
+
+    def test_full_mode_keeps_every_page(self, classification, bundle):
+        v2 = V2ConsistencyChecker.__new__(V2ConsistencyChecker)  # request building needs no client
+        v2.prompt_base = "V2 prompt"
+
+        v2.planner = PayloadPlanner(mode="full")
+        assert v2.planner.plan(classification, bundle) is None
+        full = v2._llm_request(classification, bundle)["contents"]
+        v2.planner = PayloadPlanner(mode="planned")
+        planned = v2._llm_request(classification, bundle)["contents"]
+
+        assert all(f"--- PAGE {n} ---" in full for n in range(1, 13))
+        assert "--- PAGE 5 ---" not in planned and "--- PAGE 9 ---" in planned
+        assert len(planned) < len(full)
+
+    def test_rejects_unknown_mode(self):
+        with pytest.raises(ValueError):
+            PayloadPlanner(mode="minimal")
@@ -0,0 +1,85 @@
+"""
+Unit tests for token estimation and budget-aware prompt assembly
+"""
+
+import pytest
+from pathlib import Path
+from src.document_processor import DocumentProcessor
+from src.extraction_backends import LocalPDFBackend
+from src.prompt_budget import PromptAssembler, TokenEstimator
+
+SAMPLE_PDF = Path(__file__).resolve().parents[2] / "data" / "input" / "raw_documents" / "doc2_1.pdf"
+TEMPLATE = "Classify the following clinical document.\n"
+
+
+@pytest.fixture
+def sample_bundle():
+    pages = LocalPDFBackend().extract(SAMPLE_PDF.read_bytes())
+    return DocumentProcessor.build_bundle("doc2_1", str(SAMPLE_PDF), pages)
+
+
+def _assembler(budget, min_window_fraction=0.5):
+    return PromptAssembler(TEMPLATE, budget_tokens=budget, estimator=TokenEstimator(),
+                           min_window_fraction=min_window_fraction)
+
+
+def _full_tokens(bundle, stripped):
+    assembler = _assembler(10**9)
+    return sum(assembler.page_tokens(bundle, page, stripped) for page in bundle.pages)
+
+
+@pytest.mark.unit
+class TestTokenEstimator:
+    """Test suite for TokenEstimator"""
+
+    def test_estimate_counts_digits_and_punctuation(self):
+        estimator = TokenEstimator(chars_per_token=4)
+        assert estimator.estimate("") == 0
+        assert estimator.estimate("abcdefgh") == 2
+        assert estimator.estimate("123456") == 2
+        assert estimator.estimate("p.G12D") == estimator.estimate("p") + 1 + estimator.estimate("G") + 1 + 1
+
+    def test_cached_reuses_key(self):
+        estimator = TokenEstimator()
+        assert estimator.cached("k", "one two three") == estimator.estimate("one two three")
+        # Cached value wins for a known key
+        assert estimator.cached("k", "different text entirely") == estimator.estimate("one two three")
+
+
+@pytest.mark.unit
+class TestPromptAssembler:
+    """Test suite for PromptAssembler strategies"""
+
+    def test_full_when_within_budget(self, sample_bundle):
+        text, metadata = _assembler(200_000).assemble(sample_bundle)
+        assert metadata.strategy == "full"
+        assert text == DocumentProcessor.format_for_llm(sample_bundle, strip_boilerplate=False)
+        assert metadata.omitted_pages == []
+        assert metadata.estimated_tokens <= metadata.budget_tokens
+
+    def test_strip_boilerplate_before_dropping_pages(self, sample_bundle):
+        assert _full_tokens(sample_bundle, True) < _full_tokens(sample_bundle, False)
+
+        # One token short of the unstripped prompt
+        _, full = _assembler(200_000).assemble(sample_bundle)
+        text, metadata = _assembler(full.estimated_tokens - 1).assemble(sample_bundle)
+        assert metadata.strategy == "strip_boilerplate"
+        assert metadata.boilerplate_stripped
+        assert metadata.pages_included == sample_bundle.total_pages
+        assert "CASE NUMBER" not in text
+
+    def test_page_window_omits_trailing_pages(self, sample_bundle):
+        stripped = _full_tokens(sample_bundle, True)
+        text, metadata = _assembler(stripped // 2 + 200, min_window_fraction=0.1).assemble(sample_bundle)
+        assert metadata.strategy == "page_window"
+        assert metadata.omitted_pages
+        assert metadata.pages_included + len(metadata.omitted_pages) == sample_bundle.total_pages
+        assert metadata.omitted_pages[-1] == sample_bundle.total_pages
+        assert metadata.estimated_tokens <= metadata.budget_tokens
+        assert "Pages Included:" in text
+
+    def test_map_reduce_when_window_too_small(self, sample_bundle):
+        text, metadata = _assembler(300, min_window_fraction=0.9).assemble(sample_bundle)
+        assert text is None
+        assert metadata.strategy == "map_reduce"
+        assert metadata.estimated_tokens > metadata.budget_tokens
@@ -0,0 +1,140 @@
+"""
+Unit tests for the shared Gemini rate limiter and retry policy
+"""
+
+import asyncio
+import pytest
+from google.genai import errors
+from tests.fixtures.fake_genai import FakeGenAIClient, replies
+from src.rate_limiter import (
+    RateLimitedGenAIClient,
+    RateLimiter,
+    RetryPolicy,
+    estimate_request_tokens,
+    is_retryable,
+    retry_after,
+)
+
+
+def _quota_error(retry_delay="7s"):
+    body = {"error": {
+        "code": 429,
+        "status": "RESOURCE_EXHAUSTED",
+        "message": "Quota exceeded",
+        "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": retry_delay}],
+    }}
+    return errors.APIError(429, body)
+
+
+def _flaky_client(failures):
+    """Fake client raising the given errors, then answering ok"""
+    return FakeGenAIClient(replies(*failures, "ok"))
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record sleeps instead of waiting"""
+    recorded = []
+
+    async def fake_async_sleep(seconds):
+        recorded.append(seconds)
+
+    monkeypatch.setattr("src.rate_limiter.time.sleep", recorded.append)
+    monkeypatch.setattr("src.rate_limiter.asyncio.sleep", fake_async_sleep)
+    return recorded
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    """Test suite for RateLimiter buckets"""
+
+    def test_request_bucket_queues_after_burst(self, tmp_path):
+        limiter = RateLimiter(state_dir=str(tmp_path), requests_per_minute=60, tokens_per_minute=0)
+        waits = [limiter.reserve() for _ in range(62)]
+        assert all(wait == 0 for wait in waits[:60])
+        # Each extra request queues one refill interval (1s) behind the previous one
+        assert waits[60] == pytest.approx(1.0, abs=0.1)
+        assert waits[61] == pytest.approx(2.0, abs=0.1)
+
+    def test_token_bucket_shared_across_instances(self, tmp_path):
+        first = RateLimiter(state_dir=str(tmp_path), requests_per_minute=0, tokens_per_minute=6000)
+        second = RateLimiter(state_dir=str(tmp_path), requests_per_minute=0, tokens_per_minute=6000)
+        assert first.reserve(6000) == 0
+        # The second "process" sees the first one's reservation
+        assert second.reserve(1000) == pytest.approx(10.0, abs=0.1)
+
+    def test_pause_holds_every_caller(self, tmp_path):
+        limiter = RateLimiter(state_dir=str(tmp_path), requests_per_minute=0, tokens_per_minute=0)
+        limiter.pause(5)
+        assert limiter.reserve() == pytest.approx(5.0, abs=0.1)
+
+
+@pytest.mark.unit
+class TestRetryPolicy:
+    """Test suite for retry classification, hints and backoff"""
+
+    def test_retryable_errors(self):
+        assert is_retryable(_quota_error())
+        assert is_retryable(errors.APIError(503, {"error": {"status": "UNAVAILABLE"}}))
+        assert is_retryable(TimeoutError())
+        assert not is_retryable(errors.APIError(400, {"error": {"status": "INVALID_ARGUMENT"}}))
+        assert not is_retryable(ValueError("bad json"))
+
+    def test_retry_after_from_retry_info(self):
+        assert retry_after(_quota_error("7s")) == 7.0
+        assert retry_after(_quota_error("0.5s")) == 0.5
+        assert retry_after(ValueError()) is None
+
+    def test_delay_is_jittered_and_floored_by_hint(self):
+        policy = RetryPolicy(max_attempts=5, base_delay=1.0, max_delay=8.0)
+        assert all(0 <= policy.delay(10) <= 8.0 for _ in range(50))
+        assert policy.delay(0, hint=12.0) == 12.0
+
+    def test_estimate_request_tokens_counts_pdf_pages(self):
+        from google.genai.types import Part
+        pdf = Part.from_bytes(data=b"<< /Type /Pages >> << /Type /Page >> << /Type /Page >>", mime_type="application/pdf")
+        assert estimate_request_tokens([pdf, "abcdefgh"]) == 2 * 258 + 2
+
+
+@pytest.mark.unit
+class TestRateLimitedClient:
+    """Test suite for RateLimitedGenAIClient"""
+
+    def test_429_retried_with_server_hint(self, tmp_path, sleeps):
+        limiter = RateLimiter(state_dir=str(tmp_path), requests_per_minute=0, tokens_per_minute=0)
+        fake = _flaky_client([_quota_error("3s"), _quota_error("3s")])
+        client = RateLimitedGenAIClient(fake, limiter, RetryPolicy(max_attempts=4, base_delay=0.01))
+
+        response = client.models.generate_content(model="m", contents="prompt")
+
+        assert response.text == "ok"
+        assert fake.models.calls == 3
+        assert limiter.retries == 2
+        assert max(sleeps) >= 3.0
+
+    def test_non_retryable_error_raised_immediately(self, tmp_path, sleeps):
+        limiter = RateLimiter(state_dir=str(tmp_path), requests_per_minute=0, tokens_per_minute=0)
+        fake = _flaky_client([errors.APIError(400, {"error": {"status": "INVALID_ARGUMENT"}})])
+        client = RateLimitedGenAIClient(fake, limiter, RetryPolicy(max_attempts=4))
+
+        with pytest.raises(errors.APIError):
+            client.models.generate_content(model="m", contents="prompt")
+        assert fake.models.calls == 1
+
+    def test_gives_up_after_max_attempts(self, tmp_path, sleeps):
+        limiter = RateLimiter(state_dir=str(tmp_path), requests_per_minute=0, tokens_per_minute=0)
+        fake = _flaky_client([_quota_error("0s")] * 5)
+        client = RateLimitedGenAIClient(fake, limiter, RetryPolicy(max_attempts=3, base_delay=0.01))
+
+        with pytest.raises(errors.APIError):
+            client.models.generate_content(model="m", contents="prompt")
+        assert fake.models.calls == 3
+
+    def test_async_client_retries(self, tmp_path, sleeps):
+        limiter = RateLimiter(state_dir=str(tmp_path), requests_per_minute=0, tokens_per_minute=0)
+        fake = _flaky_client([TimeoutError()])
+        client = RateLimitedGenAIClient(fake, limiter, RetryPolicy(max_attempts=3, base_delay=0.01))
+
+        response = asyncio.run(client.aio.models.generate_content(model="m", contents="prompt"))
+        assert response.text == "ok"
+        assert fake.aio.models.calls == 2
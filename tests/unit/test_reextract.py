@@ -0,0 +1,105 @@
+"""
+Unit tests for the Document AI response archive and bundle re-extraction
+"""
+
+import hashlib
+import shutil
+import pytest
+from pathlib import Path
+from src.bundle_cache import BundleCache
+from src.bundle_store import load_bundle
+from src.config import settings
+from src.document_processor import DocumentProcessor
+from src.reextract import reextract
+from src.response_store import RESPONSE_SUFFIX, ResponseStore
+from tests.fixtures.fake_documentai import PdfTextFakeClient
+
+SAMPLE_PDF = Path(__file__).resolve().parents[2] / "data" / "input" / "raw_documents" / "doc2_1.pdf"
+
+
+@pytest.fixture
+def archived(tmp_path, monkeypatch):
+    """Extract the sample PDF in 3 shards with response archiving on"""
+    monkeypatch.setattr(settings, "document_ai_shard_pages", 2)
+    store = ResponseStore(str(tmp_path / "responses"))
+    client = PdfTextFakeClient()
+    processor = DocumentProcessor(client=client, bundle_cache=None, response_store=store)
+    pdf = tmp_path / "doc2_1.pdf"
+    shutil.copy(SAMPLE_PDF, pdf)
+    pages = processor.process_pdf(str(pdf)).pages
+    return store, client, pdf, pages
+
+
+@pytest.mark.unit
+class TestResponseStore:
+    """Test suite for ResponseStore"""
+
+    def test_responses_roundtrip_to_identical_pages(self, archived):
+        store, _, pdf, pages = archived
+        processor = DocumentProcessor(client=PdfTextFakeClient(), bundle_cache=None, response_store=None)
+
+        responses = store.get(hashlib.sha256(pdf.read_bytes()).hexdigest(), settings.document_ai_processor_id)
+
+        assert [offset for offset, _ in responses] == [0, 2, 4]
+        assert processor.pages_from_responses(responses) == pages
+
+    def test_missing_entry(self, tmp_path):
+        assert ResponseStore(str(tmp_path)).get("0" * 64, "proc") is None
+
+
+@pytest.mark.unit
+class TestReextract:
+    """Test suite for reextract"""
+
+    def test_rebuilds_cache_and_named_bundles_without_api_calls(self, archived, tmp_path, monkeypatch):
+        store, client, pdf, pages = archived
+        monkeypatch.setattr(DocumentProcessor, "EXTRACTOR_VERSION", "99")
+
+        results = reextract(
+            pdf_paths=[pdf],
+            store_dir=str(store.store_dir),
+            bundle_dir=str(tmp_path / "bundles"),
+            cache_dir=str(tmp_path / "cache"),
+            workers=2,
+            executor="thread"
+        )
+
+        assert [(r.status, r.doc_id, r.total_pages) for r in results] == [("rebuilt", "doc2_1", 5)]
+        assert load_bundle(results[0].bundle_path).pages == pages
+
+        # The pipeline now hits the cache for the new extractor version instead of calling Document AI
+        cache = BundleCache(cache_dir=str(tmp_path / "cache"))
+        processor = DocumentProcessor(client=client, bundle_cache=cache, response_store=None)
+        processor.process_pdf(str(pdf))
+        assert client.calls == 3
+
+    def test_pdf_without_stored_response_is_reported(self, archived, tmp_path):
+        store, _, _, _ = archived
+        other = tmp_path / "other.pdf"
+        other.write_bytes(b"%PDF-1.4 never processed")
+
+        results = reextract(pdf_paths=[other], store_dir=str(store.store_dir), update_cache=False, executor="thread")
+
+        assert [r.status for r in results] == ["missing"]
+
+    def test_whole_store_in_worker_processes(self, archived, tmp_path):
+        store, _, _, _ = archived
+
+        results = reextract(store_dir=str(store.store_dir), cache_dir=str(tmp_path / "cache"), workers=2)
+
+        assert [(r.status, r.total_pages) for r in results] == [("rebuilt", 5)]
+        assert BundleCache(cache_dir=str(tmp_path / "cache")).stats()["entries"] == 1
+
+    def test_unreadable_archive_does_not_abort_run(self, archived, tmp_path):
+        """A truncated or foreign archive file is reported as failed; other archives still rebuild"""
+        store, _, _, _ = archived
+        foreign = next(store.paths()).with_name(f"foreign{RESPONSE_SUFFIX}")
+        foreign.write_bytes(b"\x00\x01")
+
+        results = reextract(store_dir=str(store.store_dir), update_cache=False, executor="thread")
+
+        by_status = {r.status: r for r in results}
+        assert sorted(by_status) == ["failed", "rebuilt"]
+        assert by_status["failed"].archive_path == str(foreign)
+        assert by_status["failed"].pdf_sha256 is None and by_status["failed"].error
+        assert by_status["rebuilt"].total_pages == 5
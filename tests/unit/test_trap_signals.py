@@ -0,0 +1,205 @@
+"""
+Unit tests for the trap dictionary, trap-signal window ranking and sharded V3 LLM trap checks
+"""
+
+import asyncio
+import json
+import pytest
+from collections import Counter
+from pathlib import Path
+from tests.fixtures.fake_genai import FakeGenAIClient
+from src.agents.check_dependencies import DegradedResult, VerificationMemo
+from src.agents.v3_trap_detector import V3TrapDetector
+from src.schemas import CheckCode, DocumentType, Issue, IssueSeverity, PresenceLevel
+from src.trap_dictionary import TrapDictionary, TrapTerm
+from src.trap_signals import TrapHitIndex, rank_windows
+
+
+def _window_reply(contents):
+    """Reports the same trap for every window, plus a fax-cover trap where one is present"""
+    issues = [{"ig_id": "IG-4", "issue_id": "V3-LLM-0001", "severity": "MAJOR",
+               "location": {"document_type": "Genomic Report"}, "message": "Gene names in history"}]
+    if "FAX COVER" in contents:
+        issues[0]["severity"] = "BLOCKER"
+        issues.append({"ig_id": "IG-2", "issue_id": "V3-LLM-0002", "severity": "BLOCKER",
+                       "location": {"document_type": "Pathology Report"}, "message": "Fax cover sheet"})
+    return json.dumps(issues)
+
+
+@pytest.fixture
+def make_v3(monkeypatch):
+    def make(client):
+        monkeypatch.chdir(Path(__file__).resolve().parents[2])  # prompt is loaded from the repo
+        return V3TrapDetector(client)
+    return make
+
+
+@pytest.mark.unit
+class TestTrapDictionary:
+    """Test suite for the word-level multi-pattern matcher"""
+
+    def test_default_dictionary(self):
+        index = TrapHitIndex.from_texts([
+            "History: BRCA2 carrier, tumor mutational burden high.",
+            "Quest Diagnostics. FAX COVER sheet",
+            "Patient will return (ret) next week, criteria met",
+        ])
+        assert index.signals == [Counter({"gene": 2}), Counter({"routine_lab": 1, "admin": 1}), Counter()]
+        assert index.pages_with("admin") == [2]
+        assert index.terms("gene") == ["BRCA2", "tumor mutational burden"]
+
+    def test_overlapping_terms(self):
+        dictionary = TrapDictionary([
+            TrapTerm("a", "lab corp test", False), TrapTerm("b", "corp", False),
+            TrapTerm("c", "corp panel", False), TrapTerm("d", "TP53", True),
+        ])
+        hits = dictionary.scan("Lab-Corp panel; labcorp test; tp53 and TP53")
+        # "corp panel" is only reachable through the failure link out of "lab corp"
+        assert [(h.term, h.word) for h in hits] == [("corp", 1), ("corp panel", 1), ("TP53", 7)]
+
+    def test_plural_forms(self):
+        """Inflected admin wording hits its dictionary term; case-sensitive symbols stay exact"""
+        index = TrapHitIndex.from_texts([
+            "Requisitions attached",
+            "Specimen Receipts and Fax Covers",
+            "Test Requests pending",
+            "BRCA1s LabCorps",
+        ])
+        assert index.pages_with("admin") == [1, 2, 3]
+        assert index.terms("admin") == ["requisition", "specimen receipt", "fax cover", "test request"]
+        assert index.terms("gene") == []
+        assert index.terms("routine_lab") == ["labcorp"]
+
+    def test_load(self, tmp_path):
+        path = tmp_path / "traps.txt"
+        path.write_text("# test\n[gene case-sensitive]\nMET\n[admin]\nfax cover  # inline\n")
+        dictionary = TrapDictionary.load(str(path))
+        assert dictionary.terms == [TrapTerm("gene", "MET", True), TrapTerm("admin", "fax cover", False)]
+
+        path.write_text("requisition\n")
+        with pytest.raises(ValueError):
+            TrapDictionary.load(str(path))
+
+
+@pytest.mark.unit
+class TestTrapSignals:
+    """Test suite for trap window ranking"""
+
+    def test_rank_windows(self):
+        signals = [Counter(), Counter({"gene": 1}), Counter(), Counter(), Counter({"admin": 1}),
+                   Counter({"gene": 2}), Counter(), Counter({"gene": 1})]
+        windows = rank_windows(signals, window_pages=2, top_k=2)
+
+        # Pages 5-6 score 5 (4-5 and 6-7 overlap it); 1-2, 2-3 and 7-8 tie at 1 and the earliest wins
+        assert [(w.first_page, w.last_page, w.score) for w in windows] == [(1, 2, 1), (5, 6, 5)]
+        assert windows[1].signals == Counter({"admin": 1, "gene": 2})
+
+    def test_no_signals_sends_first_window(self):
+        windows = rank_windows([Counter()] * 5, window_pages=2, top_k=3)
+        assert [(w.first_page, w.last_page) for w in windows] == [(1, 2)]
+
+
+@pytest.mark.unit
+class TestShardedTrapCheck:
+    """Test suite for V3's windowed LLM phase"""
+
+    @pytest.fixture
+    def bundle(self, sample_doc_bundle):
+        pages = [{"page_number": n, "text": f"Page {n} clinic note"} for n in range(1, 11)]
+        pages[1]["text"] = "Family history: mother BRCA1 positive"
+        pages[8]["text"] = "FAX COVER - test requisition enclosed"
+        return sample_doc_bundle.model_copy(update={"pages": pages, "total_pages": 10})
+
+    def test_rules_use_page_index(self, make_v3, clean_classification, bundle):
+        v3 = make_v3(FakeGenAIClient(_window_reply))
+        data = clean_classification.model_dump()
+        data["vendor_signals"] = ["LabCorp"]
+        classification = type(clean_classification).model_validate(data)
+
+        issues = v3._rule_phase(classification, bundle)
+
+        assert [i.location for i in issues if i.check_code == CheckCode.ROUTINE_LAB_GENOMIC] == [
+            {"document_type": "Genomic Report", "field": "presence_level"}
+        ]
+        admin = [i for i in issues if i.check_code == CheckCode.ADMINISTRATIVE_REPORT]
+        reports = {m.document_type.value for m in classification.document_mixture
+                   if m.document_type in (DocumentType.GENOMIC_REPORT, DocumentType.PATHOLOGY_REPORT)
+                   and m.presence_level != PresenceLevel.NO_EVIDENCE}
+        assert {i.location["document_type"] for i in admin} == reports
+        assert "(fax cover, requisition) on page(s) 9" in admin[0].message
+        assert v3._hit_index(bundle) is v3._hit_index(bundle)
+
+    def test_admin_rule_matches_plurals(self, make_v3, clean_classification, bundle):
+        pages = [dict(page) for page in bundle.pages]
+        pages[8]["text"] = "Test Requests and Specimen Receipts"
+        v3 = make_v3(FakeGenAIClient(_window_reply))
+
+        issues = v3._rule_phase(clean_classification, bundle.model_copy(update={"pages": pages}))
+
+        admin = [i for i in issues if i.check_code == CheckCode.ADMINISTRATIVE_REPORT]
+        assert admin and all(i.severity == IssueSeverity.BLOCKER for i in admin)
+        assert "(test request, specimen receipt) on page(s) 9" in admin[0].message
+
+    def test_windows_are_checked_and_merged(self, monkeypatch, make_v3, clean_classification, bundle):
+        monkeypatch.setattr("src.agents.v3_trap_detector.settings.v3_trap_window_pages", 1)
+        client = FakeGenAIClient(_window_reply)
+        prompts = client.models.prompts
+        v3 = make_v3(client)
+
+        issues = v3._run_llm_check(clean_classification, bundle, 3)
+
+        assert len(prompts) == 2
+        assert any("FAX COVER" in p for p in prompts) and any("BRCA1" in p for p in prompts)
+        assert not any("Page 5 clinic note" in p for p in prompts)
+        # The repeated trap is kept once at its highest severity; ids continue after the rule issues
+        assert [(i.issue_id, i.ig_id, i.severity) for i in issues] == [
+            ("V3-LLM-0003", "IG-4", IssueSeverity.BLOCKER),
+            ("V3-LLM-0004", "IG-2", IssueSeverity.BLOCKER),
+        ]
+        assert asyncio.run(v3._arun_llm_check(clean_classification, bundle, 3)) == issues
+
+    def test_failed_window_is_degraded(self, monkeypatch, make_v3, clean_classification, bundle):
+        monkeypatch.setattr("src.agents.v3_trap_detector.settings.v3_trap_window_pages", 1)
+        v3 = make_v3(FakeGenAIClient(lambda contents: '[{"ig_id": ' if "BRCA1" in contents else _window_reply(contents)))
+
+        with pytest.raises(DegradedResult) as failed:
+            v3._run_llm_check(clean_classification, bundle, 0)
+        with pytest.raises(DegradedResult):
+            asyncio.run(v3._arun_llm_check(clean_classification, bundle, 0))
+        assert [i.ig_id for i in failed.value.result] == ["IG-4", "IG-2"]
+
+        # validate() keeps the partial issues but the memo does not reuse them
+        memo = VerificationMemo()
+        issues, _ = v3.validate(clean_classification, bundle, memo)
+        assert {"IG-4", "IG-2"} <= {i.ig_id for i in issues}
+        v3.validate(clean_classification, bundle, memo)
+        assert memo.hit_counts()["V3-llm"] == 0
+
+    def test_distinct_traps_at_one_location_are_kept(self, make_v3):
+        v3 = make_v3(FakeGenAIClient(_window_reply))
+        location = {"document_type": "Genomic Report"}
+
+        def issue(message, severity=IssueSeverity.MAJOR):
+            return Issue(ig_id="IG-4", issue_id="V3-LLM-0001", agent="V3", severity=severity,
+                         message=message, location=location)
+
+        issues = v3._merge_shard_issues([
+            [issue("Gene names in history"), issue("Germline result from a prior report")],
+            [issue("Gene names in history.", IssueSeverity.BLOCKER)],
+        ], 0)
+
+        assert [(i.message, i.severity) for i in issues] == [
+            ("Gene names in history.", IssueSeverity.BLOCKER),
+            ("Germline result from a prior report", IssueSeverity.MAJOR),
+        ]
+
+    def test_head_mode(self, monkeypatch, make_v3, clean_classification, bundle):
+        monkeypatch.setattr("src.agents.v3_trap_detector.settings.v3_trap_scan_mode", "head")
+        client = FakeGenAIClient(_window_reply)
+        prompts = client.models.prompts
+        v3 = make_v3(client)
+
+        issues = v3._run_llm_check(clean_classification, bundle, 0)
+
+        assert len(prompts) == 1 and "First 4000 characters" in prompts[0]
+        assert [i.issue_id for i in issues] == ["V3-LLM-0001", "V3-LLM-0002"]
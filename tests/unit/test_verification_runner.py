@@ -0,0 +1,266 @@
+"""
+Unit tests for VerificationRunner concurrent V2-V4 execution
+
+LLM agents are replaced with sleeping stubs so no Gemini calls are made.
+"""
+
+import asyncio
+import time
+import pytest
+from src.agents.check_dependencies import amemoized, memoized
+from src.agents.verification_runner import VerificationRunner
+from src.schemas import Issue, IssueSeverity
+
+
+def _issue(agent: str, n: int) -> Issue:
+    return Issue(
+        ig_id="IG-3",
+        issue_id=f"{agent}-{n:04d}",
+        agent=agent,
+        severity=IssueSeverity.MINOR,
+        message=f"{agent} stub issue {n}"
+    )
+
+
+def _slow_agent(agent: str, delay: float, result_tail):
+    def validate(classification, doc_bundle):
+        time.sleep(delay)
+        return [_issue(agent, 0), _issue(agent, 1)], result_tail
+    return validate
+
+
+def _failing_llm_check():
+    raise ValueError("truncated LLM reply")
+
+
+async def _afailing_llm_check():
+    _failing_llm_check()
+
+
+def _degraded_v2(calls):
+    """V2 stub whose LLM check fails and falls back to rule-only issues, like the real agent"""
+    def validate(classification, doc_bundle):
+        calls.append(1)
+        try:
+            memoized(None, "V2-llm", classification, doc_bundle, _failing_llm_check)
+        except ValueError:
+            pass
+        return [_issue("V2", 0)], 1.0
+
+    async def avalidate(classification, doc_bundle):
+        calls.append(1)
+        try:
+            await amemoized(None, "V2-llm", classification, doc_bundle, _afailing_llm_check)
+        except ValueError:
+            pass
+        return [_issue("V2", 0)], 1.0
+    return validate, avalidate
+
+
+def _async_agent(agent: str, delay: float, result_tail):
+    async def avalidate(classification, doc_bundle):
+        await asyncio.sleep(delay)
+        return [_issue(agent, 0), _issue(agent, 1)], result_tail
+    return avalidate
+
+
+@pytest.fixture
+def runner(monkeypatch, tmp_path, clean_classification):
+    """Runner with stubbed LLM agents; agent outputs go to a temp dir"""
+    # clean_classification is requested first so it loads from the repo before chdir
+    runner = VerificationRunner(client=object(), concurrent=True, agent_timeout=5.0)
+    # V3 finishes first, V2 last - results must still come back in V2, V3, V4 order
+    runner.v2.validate = _slow_agent("V2", 0.3, 1.0)
+    runner.v3.validate = _slow_agent("V3", 0.1, 2)
+    runner.v4.validate = _slow_agent("V4", 0.2, 0.9)
+    runner.v2.avalidate = _async_agent("V2", 0.3, 1.0)
+    runner.v3.avalidate = _async_agent("V3", 0.1, 2)
+    runner.v4.avalidate = _async_agent("V4", 0.2, 0.9)
+    monkeypatch.chdir(tmp_path)
+    return runner
+
+
+@pytest.mark.unit
+class TestConcurrentVerification:
+    """Test suite for concurrent V2-V4 execution"""
+
+    def test_wall_clock_is_max_not_sum(self, runner, clean_classification, sample_doc_bundle):
+        """Three agents sleeping 0.1-0.3s should finish in ~0.3s, not 0.6s"""
+        start = time.monotonic()
+        runner.run_all(clean_classification, sample_doc_bundle)
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 0.5, f"Expected ~0.3s concurrent run, took {elapsed:.2f}s"
+
+    def test_issue_order_is_deterministic(self, runner, clean_classification, sample_doc_bundle):
+        """Issues are consolidated in V1 → V4 order regardless of completion order"""
+        report, _ = runner.run_all(clean_classification, sample_doc_bundle)
+
+        llm_ids = [i.issue_id for i in report.issues if i.agent != "V1"]
+        assert llm_ids == ["V2-0000", "V2-0001", "V3-0000", "V3-0001", "V4-0000", "V4-0001"]
+        assert report.v3_traps_triggered == 2
+        assert report.timed_out_agents == []
+
+    def test_matches_sequential_mode(self, runner, clean_classification, sample_doc_bundle):
+        """Concurrent and sequential modes produce identical reports"""
+        concurrent_report, _ = runner.run_all(clean_classification, sample_doc_bundle)
+        runner.concurrent = False
+        sequential_report, _ = runner.run_all(clean_classification, sample_doc_bundle)
+
+        assert [i.issue_id for i in concurrent_report.issues] == [i.issue_id for i in sequential_report.issues]
+
+    def test_agent_timeout_drops_result(self, runner, clean_classification, sample_doc_bundle):
+        """An agent exceeding its timeout is dropped and recorded on the report"""
+        runner.agent_timeout = 0.5
+        runner.v4.validate = _slow_agent("V4", 2.0, 0.9)
+
+        start = time.monotonic()
+        report, _ = runner.run_all(clean_classification, sample_doc_bundle)
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 1.5
+        assert report.timed_out_agents == ["V4"]
+        assert not any(i.agent == "V4" for i in report.issues)
+        assert report.v4_evidence_quality_score is None
+
+    def test_journal_restores_completed_agents(self, runner, clean_classification, sample_doc_bundle, tmp_path):
+        """With a checkpoint journal, a rerun replays recorded V-agent results"""
+        from src.checkpoint import CheckpointJournal
+        calls = []
+        stub = _slow_agent("V2", 0.0, 1.0)
+
+        def counting_v2(classification, doc_bundle):
+            calls.append(1)
+            return stub(classification, doc_bundle)
+
+        runner.v2.validate = counting_v2
+        runner.journal = CheckpointJournal(str(tmp_path / "journal"))
+        first, _ = runner.run_all(clean_classification, sample_doc_bundle)
+        second, _ = runner.run_all(clean_classification, sample_doc_bundle)
+
+        assert len(calls) == 1
+        assert [i.issue_id for i in first.issues] == [i.issue_id for i in second.issues]
+
+    def test_journal_skips_degraded_agents(self, runner, clean_classification, sample_doc_bundle, tmp_path):
+        """An agent whose LLM check failed is not journaled, so a rerun retries it"""
+        from src.checkpoint import CheckpointJournal
+        calls = []
+        runner.v2.validate, runner.v2.avalidate = _degraded_v2(calls)
+        runner.journal = CheckpointJournal(str(tmp_path / "journal"))
+
+        runner.run_all(clean_classification, sample_doc_bundle)
+        runner.run_all(clean_classification, sample_doc_bundle)
+        asyncio.run(runner.arun_all(clean_classification, sample_doc_bundle))
+
+        assert len(calls) == 3
+        digest = runner._classification_digest(clean_classification)
+        assert runner.journal.get_agent_result(sample_doc_bundle.doc_id, digest, "V2") is None
+        assert runner.journal.get_agent_result(sample_doc_bundle.doc_id, digest, "V3") is not None
+
+
+@pytest.mark.unit
+class TestAsyncVerification:
+    """Test suite for arun_all on an event loop"""
+
+    def test_matches_threaded_report(self, runner, clean_classification, sample_doc_bundle):
+        """arun_all overlaps V2-V4 and consolidates in the same order as run_all"""
+        threaded_report, threaded_decision = runner.run_all(clean_classification, sample_doc_bundle)
+
+        start = time.monotonic()
+        async_report, async_decision = asyncio.run(runner.arun_all(clean_classification, sample_doc_bundle))
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 0.5
+        assert [i.issue_id for i in async_report.issues] == [i.issue_id for i in threaded_report.issues]
+        assert async_decision.decision == threaded_decision.decision
+
+    def test_agent_timeout_cancels_task(self, runner, clean_classification, sample_doc_bundle):
+        runner.agent_timeout = 0.5
+        runner.v4.avalidate = _async_agent("V4", 5.0, 0.9)
+
+        start = time.monotonic()
+        report, _ = asyncio.run(runner.arun_all(clean_classification, sample_doc_bundle))
+
+        assert time.monotonic() - start < 1.5
+        assert report.timed_out_agents == ["V4"]
+        assert report.v4_evidence_quality_score is None
+
+
+def _blocker_agent(agent: str, delay: float, result_tail):
+    def validate(classification, doc_bundle):
+        time.sleep(delay)
+        issue = _issue(agent, 0).model_copy(update={"severity": IssueSeverity.BLOCKER})
+        return [issue], result_tail
+    return validate
+
+
+def _v1_blocker(classification, doc_bundle):
+    return [_issue("V1", 0).model_copy(update={"severity": IssueSeverity.BLOCKER})]
+
+
+@pytest.mark.unit
+class TestDecisionBoundVerification:
+    """Test suite for decision-bound early exit"""
+
+    def test_v1_blocker_skips_llm_agents(self, runner, clean_classification, sample_doc_bundle):
+        calls = []
+        runner.decision_bound = True
+        runner.v1.validate = _v1_blocker
+        runner.v2.validate = lambda c, b: calls.append("V2")
+
+        report, decision = runner.run_all(clean_classification, sample_doc_bundle)
+
+        assert calls == []
+        assert report.skipped_agents == ["V2", "V3", "V4"]
+        assert report.llm_calls_made == 0
+        assert decision.decision == "ESCALATE_TO_SME"
+
+    def test_blocker_from_first_agent_stops_waiting(self, runner, clean_classification, sample_doc_bundle):
+        runner.decision_bound = True
+        runner.v3.validate = _blocker_agent("V3", 0.05, 1)
+        runner.v4.validate = _slow_agent("V4", 2.0, 0.9)
+
+        start = time.monotonic()
+        report, decision = runner.run_all(clean_classification, sample_doc_bundle)
+
+        assert time.monotonic() - start < 1.0
+        assert set(report.skipped_agents) == {"V2", "V4"}
+        assert report.timed_out_agents == []
+        assert decision.decision == "ESCALATE_TO_SME"
+
+    def test_sequential_mode_skips_after_blocker(self, runner, clean_classification, sample_doc_bundle):
+        runner.decision_bound = True
+        runner.concurrent = False
+        runner.v2.validate = _blocker_agent("V2", 0.0, 0.0)
+
+        report, _ = runner.run_all(clean_classification, sample_doc_bundle)
+        assert report.skipped_agents == ["V3", "V4"]
+
+    def test_skipped_agents_enrich_report(self, runner, clean_classification, sample_doc_bundle):
+        runner.decision_bound = True
+        runner.enrich_skipped = True
+        runner.v1.validate = _v1_blocker
+
+        report, _ = runner.run_all(clean_classification, sample_doc_bundle)
+        assert not any(i.agent == "V4" for i in report.issues)
+
+        enriched = runner.enrich_report(report, sample_doc_bundle.doc_id)
+        assert enriched.enriched_agents == ["V2", "V3", "V4"]
+        assert [i.agent for i in enriched.issues].count("V4") == 2
+        assert enriched.v4_evidence_quality_score == 0.9
+        # Collected once
+        assert runner.enrich_report(report, sample_doc_bundle.doc_id) is report
+
+    def test_async_blocker_cancels_remaining(self, runner, clean_classification, sample_doc_bundle):
+        async def blocker(classification, doc_bundle):
+            return _blocker_agent("V3", 0.0, 1)(classification, doc_bundle)
+
+        runner.decision_bound = True
+        runner.v3.avalidate = blocker
+        runner.v4.avalidate = _async_agent("V4", 5.0, 0.9)
+
+        start = time.monotonic()
+        report, _ = asyncio.run(runner.arun_all(clean_classification, sample_doc_bundle))
+
+        assert time.monotonic() - start < 1.0
+        assert set(report.skipped_agents) == {"V2", "V4"}
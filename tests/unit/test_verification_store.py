@@ -0,0 +1,138 @@
+"""
+Unit tests for the persistent verification result store
+
+The V2-V4 agents run for real against a fake Gemini client that counts calls;
+each "run" uses a fresh runner and memo, as a separate process would.
+"""
+
+import json
+import pytest
+from pathlib import Path
+from tests.fixtures.fake_genai import FakeGenAIClient, verification_agent
+from src.agents.verification_runner import VerificationRunner
+from src.schemas import Issue, IssueSeverity
+from src.verification_store import VerificationResultStore, bundle_content_hash
+
+
+V4_ISSUE = json.dumps([{
+    "ig_id": "IG-4", "issue_id": "V4-0001", "severity": "MINOR",
+    "location": {"segment_index": 1}, "message": "Weak evidence snippet", "auto_fixable": False,
+}])
+
+
+@pytest.fixture
+def store(tmp_path):
+    return VerificationResultStore(cache_dir=str(tmp_path / "store"))
+
+
+@pytest.fixture
+def make_runner(monkeypatch, tmp_path, store):
+    truncated = set()  # agents whose next reply is cut off
+
+    def reply(contents):
+        agent = verification_agent(contents)
+        if agent in truncated:
+            truncated.discard(agent)
+            return '[{"ig_id": "IG-'
+        return V4_ISSUE if agent == "V4" else "[]"
+
+    client = FakeGenAIClient(reply)
+    client.truncated = truncated
+
+    def make():
+        # Agents load their prompts from the repo; outputs go to a temp dir
+        monkeypatch.chdir(Path(__file__).resolve().parents[2])
+        runner = VerificationRunner(client=client, concurrent=False, result_store=store)
+        monkeypatch.chdir(tmp_path)
+        return runner
+    return make, client.models
+
+
+@pytest.mark.unit
+class TestVerificationResultStore:
+    """Test suite for cross-run reuse of LLM check results"""
+
+    def test_rerun_reuses_llm_checks(self, make_runner, store, clean_classification, sample_doc_bundle):
+        make, models = make_runner
+        first, _ = make().run_all(clean_classification, sample_doc_bundle)
+        assert sorted(models.agents) == ["V2", "V3", "V4"]
+        assert first.llm_calls_made == 3
+
+        second, _ = make().run_all(clean_classification, sample_doc_bundle)
+        assert sorted(models.agents) == ["V2", "V3", "V4"]  # no new calls
+        assert second.reused_checks == ["V2-llm", "V3-llm", "V4"]
+        assert second.llm_calls_made == 0
+        assert [i.issue_id for i in second.issues] == [i.issue_id for i in first.issues]
+        assert store.stats()["hits"] == 3
+
+    def test_changed_bundle_text_misses(self, make_runner, clean_classification, sample_doc_bundle):
+        make, models = make_runner
+        make().run_all(clean_classification, sample_doc_bundle)
+
+        edited = sample_doc_bundle.model_copy(update={
+            "pages": [{"page_number": 1, "text": "Re-extracted page 1"}] + sample_doc_bundle.pages[1:]
+        })
+        report, _ = make().run_all(clean_classification, edited)
+
+        assert len(models.agents) == 6
+        assert report.reused_checks == []
+
+    def test_changed_prompt_misses(self, make_runner, clean_classification, sample_doc_bundle):
+        make, models = make_runner
+        make().run_all(clean_classification, sample_doc_bundle)
+
+        runner = make()
+        runner.v4.prompt_base += "\nAlso check anchor spelling."
+        report, _ = runner.run_all(clean_classification, sample_doc_bundle)
+
+        assert sorted(models.agents) == ["V2", "V3", "V4", "V4"]
+        assert report.reused_checks == ["V2-llm", "V3-llm"]
+
+    def test_failed_llm_checks_are_not_stored(self, make_runner, clean_classification, sample_doc_bundle):
+        make, models = make_runner
+        runner = make()
+        runner.client.truncated.update({"V2", "V3", "V4"})
+        runner.run_all(clean_classification, sample_doc_bundle)
+
+        report, _ = make().run_all(clean_classification, sample_doc_bundle)
+
+        assert sorted(models.agents) == ["V2", "V2", "V3", "V3", "V4", "V4"]
+        assert report.reused_checks == []
+        assert "Weak evidence snippet" in [i.message for i in report.issues]
+
+    def test_v4_local_check_setting_misses(self, monkeypatch, make_runner, clean_classification, sample_doc_bundle):
+        make, models = make_runner
+        make().run_all(clean_classification, sample_doc_bundle)
+
+        monkeypatch.setattr("src.agents.v4_evidence_quality.settings.v4_local_evidence_check", False)
+        report, _ = make().run_all(clean_classification, sample_doc_bundle)
+
+        assert sorted(models.agents) == ["V2", "V3", "V4", "V4"]
+        assert report.reused_checks == ["V2-llm", "V3-llm"]
+
+    @pytest.mark.parametrize("setting, value", [
+        ("verification_payload_anchor_pages", 1),
+        ("strip_boilerplate", True),
+    ])
+    def test_payload_settings_miss(self, monkeypatch, make_runner, clean_classification, sample_doc_bundle, setting, value):
+        make, models = make_runner
+        make().run_all(clean_classification, sample_doc_bundle)
+
+        monkeypatch.setattr(f"src.payload_planner.settings.{setting}", value)
+        report, _ = make().run_all(clean_classification, sample_doc_bundle)
+
+        assert sorted(models.agents) == ["V2", "V2", "V3", "V4", "V4"]
+        assert report.reused_checks == ["V3-llm"]
+
+    def test_round_trip_and_eviction(self, tmp_path, sample_doc_bundle):
+        store = VerificationResultStore(cache_dir=str(tmp_path / "small"), max_bytes=600)
+        issue = Issue(ig_id="IG-4", issue_id="V4-0001", agent="V4", severity=IssueSeverity.MINOR, message="x" * 200)
+
+        store.put("a", "V4", ([issue], 0.9), "shares")
+        result, shares = store.get("a")
+        assert result == ([issue], 0.9) and shares == "shares"
+
+        store.put("b", "V3-llm", [issue], "shares")
+        assert store.get("b") == ([issue], "shares")
+        assert store.get("a") is None  # least recently used, evicted over budget
+        assert bundle_content_hash(sample_doc_bundle) == bundle_content_hash(sample_doc_bundle.model_copy())
@@ -0,0 +1,187 @@
+"""
+Unit tests for map-reduce classification over page windows
+"""
+
+import asyncio
+import re
+import threading
+import pytest
+from tests.fixtures.fake_genai import FakeGenAIClient, FakeResponse
+from src.document_processor import DocumentProcessor
+from src.primary_classifier_agent import PrimaryClassifierAgent
+from src.prompt_budget import PromptAssembler, TokenEstimator
+from src.schemas import ClassificationOutput, DocumentType, PresenceLevel
+from src.windowed_classifier import WindowedClassifier, core_ranges, plan_windows
+
+TEMPLATE = "Classify the following clinical document.\n"
+
+
+def _composition(dominant):
+    return [
+        {
+            "document_type": doc_type,
+            "presence_level": PresenceLevel.PRIMARY if doc_type == dominant else PresenceLevel.NO_EVIDENCE,
+            "confidence": 0.9,
+            "segment_share": 1.0 if doc_type == dominant else 0.0,
+            "top_evidence": [],
+            "reasoning": f"{doc_type.value} reasoning",
+        }
+        for doc_type in DocumentType
+    ]
+
+
+class _FakeClassifier:
+    """Classifies each page by a fixed page -> type map, seen through the window's page markers"""
+
+    def __init__(self, page_types, budget=200_000, relative_pages=False):
+        self.page_types = page_types
+        self.relative_pages = relative_pages
+        self.assembler = PromptAssembler(TEMPLATE, budget_tokens=budget, estimator=TokenEstimator())
+        self.windows = []
+        self.lock = threading.Lock()
+
+    def classify(self, document_text, max_retries=2):
+        pages = [int(n) for n in re.findall(r"--- PAGE (\d+) ---", document_text)]
+        with self.lock:
+            self.windows.append(pages)
+        offset = pages[0] - 1 if self.relative_pages else 0
+
+        runs = []
+        for page in pages:
+            if runs and runs[-1][2] == self.page_types[page]:
+                runs[-1][1] = page
+            else:
+                runs.append([page, page, self.page_types[page]])
+
+        segments = [
+            {
+                "segment_index": i,
+                "start_page": start - offset,
+                "end_page": end - offset,
+                "segment_page_count": end - start + 1,
+                "dominant_type": doc_type,
+                "segment_composition": _composition(doc_type),
+            }
+            for i, (start, end, doc_type) in enumerate(runs, start=1)
+        ]
+        mixture = [
+            {
+                "document_type": doc_type,
+                "presence_level": PresenceLevel.NO_EVIDENCE,
+                "confidence": 0.9,
+                "overall_share": sum(1 for p in pages if self.page_types[p] == doc_type) / len(pages),
+                "overall_share_explanation": "",
+                "reasoning": f"window {pages[0]}",
+            }
+            for doc_type in DocumentType
+        ]
+        return ClassificationOutput(
+            dominant_type_overall=runs[0][2],
+            segments=segments,
+            document_mixture=mixture,
+            number_of_segments=len(segments),
+            self_evaluation={"evaluation_summary": "", "changes_made": ""},
+        )
+
+
+def _bundle(total_pages):
+    pages = [{"page_num": n, "text": f"Report text for page {n}\n"} for n in range(1, total_pages + 1)]
+    return DocumentProcessor.build_bundle("long_doc", "long_doc.pdf", pages)
+
+
+def _page_types(total_pages, boundary):
+    return {
+        n: DocumentType.PATHOLOGY_REPORT if n <= boundary else DocumentType.GENOMIC_REPORT
+        for n in range(1, total_pages + 1)
+    }
+
+
+@pytest.mark.unit
+class TestWindowPlanning:
+    """Test suite for plan_windows and core_ranges"""
+
+    def test_overlapping_windows_cover_document(self):
+        windows = plan_windows([(n, 10) for n in range(1, 13)], max_pages=5, max_tokens=1000, overlap=1)
+        assert windows[0] == [1, 2, 3, 4, 5]
+        assert windows[1][0] == 5
+        assert windows[-1][-1] == 12
+
+        cores = core_ranges(windows)
+        owned = [page for first, last in cores for page in range(first, last + 1)]
+        assert owned == list(range(1, 13))
+
+    def test_token_limit_shrinks_windows(self):
+        windows = plan_windows([(n, 40) for n in range(1, 7)], max_pages=10, max_tokens=100, overlap=0)
+        assert [len(window) for window in windows] == [2, 2, 2]
+
+    def test_oversized_page_rejected(self):
+        with pytest.raises(ValueError):
+            plan_windows([(1, 10), (2, 500)], max_pages=5, max_tokens=100, overlap=0)
+
+
+@pytest.mark.unit
+class TestWindowedClassifier:
+    """Test suite for WindowedClassifier merge"""
+
+    def test_segment_stitched_across_window_boundary(self):
+        fake = _FakeClassifier(_page_types(12, boundary=7))
+        result = WindowedClassifier(fake, window_pages=5, overlap_pages=1, concurrency=3).classify_bundle(_bundle(12))
+
+        assert len(fake.windows) == 3
+        assert [(s.start_page, s.end_page) for s in result.segments] == [(1, 7), (8, 12)]
+        assert [s.segment_page_count for s in result.segments] == [7, 5]
+        assert result.number_of_segments == 2
+        assert result.dominant_type_overall == DocumentType.PATHOLOGY_REPORT
+
+        shares = {m.document_type: m.overall_share for m in result.document_mixture}
+        assert shares[DocumentType.PATHOLOGY_REPORT] == pytest.approx(7 / 12, abs=1e-3)
+        assert shares[DocumentType.GENOMIC_REPORT] == pytest.approx(5 / 12, abs=1e-3)
+
+    def test_window_relative_page_numbers_shifted(self):
+        fake = _FakeClassifier(_page_types(10, boundary=3), relative_pages=True)
+        result = WindowedClassifier(fake, window_pages=4, overlap_pages=0).classify_bundle(_bundle(10))
+        assert [(s.start_page, s.end_page) for s in result.segments] == [(1, 3), (4, 10)]
+
+    def test_over_budget_bundle_routed_to_windows(self):
+        fake = _FakeClassifier(_page_types(30, boundary=30), budget=150)
+        agent = PrimaryClassifierAgent.__new__(PrimaryClassifierAgent)
+        agent.prompt_template = TEMPLATE
+        agent.assembler = fake.assembler
+        agent.last_prompt_metadata = None
+        agent.classify = fake.classify
+
+        result = agent.classify_bundle(_bundle(30))
+
+        assert agent.last_prompt_metadata.strategy == "map_reduce"
+        assert len(agent.last_prompt_metadata.windows) == len(fake.windows) > 1
+        assert [(s.start_page, s.end_page) for s in result.segments] == [(1, 30)]
+
+
+@pytest.mark.unit
+class TestPromptTokenUsage:
+    """Test suite for reported prompt tokens on the async path"""
+
+    def test_concurrent_documents_keep_their_own_token_counts(self, clean_classification):
+        """Documents sharing one agent on an event loop each record their own reported prompt size"""
+        reply_json = clean_classification.model_dump_json()
+        client = FakeGenAIClient(
+            lambda contents: FakeResponse(reply_json, prompt_token_count=111 if "alpha" in contents else 222)
+        )
+        agent = PrimaryClassifierAgent.__new__(PrimaryClassifierAgent)
+        agent.client = client
+        agent.prompt_template = TEMPLATE
+        agent.assembler = PromptAssembler(TEMPLATE, budget_tokens=10**6)
+
+        def bundle(doc_id, word):
+            pages = [{"page_num": 1, "text": f"{word} report text"}]
+            return DocumentProcessor.build_bundle(doc_id, f"{doc_id}.pdf", pages)
+
+        async def classify_both():
+            return await asyncio.gather(
+                agent.aclassify_bundle(bundle("a", "alpha")),
+                agent.aclassify_bundle(bundle("b", "beta")),
+            )
+
+        (_, metadata_a), (_, metadata_b) = asyncio.run(classify_both())
+
+        assert (metadata_a.actual_prompt_tokens, metadata_b.actual_prompt_tokens) == (111, 222)